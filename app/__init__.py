@@ -1,11 +1,24 @@
+import importlib
 
-from app.models.mainrace_pipeline import build_mainrace_pipeline
-from app.models.qualifying_pipeline import build_qualifying_pipeline
-
-from .schemas.dto import Race
+# resolved on first access (PEP 562) so importing the app package does not
+# pull in sklearn; the pipeline builders are only needed by training scripts
+_LAZY_EXPORTS = {
+    "build_mainrace_pipeline": "app.models.mainrace_pipeline",
+    "build_qualifying_pipeline": "app.models.qualifying_pipeline",
+    "Race": "app.schemas.dto",
+}
 
 __all__ = [
     "build_mainrace_pipeline",
     "build_qualifying_pipeline",
     "Race",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
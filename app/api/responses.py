@@ -0,0 +1,128 @@
+import json
+import math
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import Request, Response
+
+from app.services.feature_builder import RACE_LEVEL_FEATURES, features_columns, features_records
+
+try:  # orjson ships with the dvc/autogluon dependency tree; stdlib json otherwise
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# opt-in compact format for the batch routes: ?format=columnar or this Accept type
+COLUMNAR_MEDIA_TYPE = "application/vnd.f1.columnar+json"
+
+
+def _json_default(value: Any):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _finite(value: Any) -> Any:
+    """`value` with NaN / inf floats (numpy ones included) replaced by None, as orjson writes them."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return _finite(value.tolist())
+    return value
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Encode a payload of plain Python values (dates as ISO strings) with
+    orjson when available, else the stdlib encoder FastAPI uses. Either way
+    NaN and inf are written as null.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        encoded = json.dumps(content, default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    except ValueError:
+        # a non-finite float somewhere: retry with them nulled (the rare case pays the walk)
+        encoded = json.dumps(_finite(content), default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return encoded.encode("utf-8")
+
+
+def wants_columnar(request: Request, format: Optional[str] = None) -> bool:
+    if format is not None:
+        return format == "columnar"
+    return COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def prediction_payload(
+    key: str,
+    inputs: List[Dict],
+    features: pd.DataFrame,
+    outputs: Dict[str, list],
+    meta: Optional[Dict],
+    columnar: bool = False,
+) -> Dict:
+    """
+    Batch response body assembled column-wise, without per-row Pydantic items:
+    - key: list field of the response model ("predictions" / "percentages")
+    - outputs: prediction field -> one plain value per row, in item field order
+    Rows: {key: [{"input", "features", **outputs}, ...], "model_meta"}, the
+    same JSON as the response models. Columnar: {key: {"input": {field: [...]},
+    "features": {column: [...]}, **outputs}, "model_meta", "format": "columnar"}.
+    """
+    if columnar:
+        fields = list(inputs[0]) if inputs else []
+        columns = {
+            "input": {field: [inp[field] for inp in inputs] for field in fields},
+            "features": features_columns(features),
+            **outputs,
+        }
+        return {key: columns, "model_meta": meta, "format": "columnar"}
+
+    names = list(outputs)
+    items = [
+        {"input": inp, "features": feats, **dict(zip(names, row))}
+        for inp, feats, row in zip(inputs, features_records(features), zip(*outputs.values()))
+    ]
+    return {key: items, "model_meta": meta}
+
+
+def grid_payload(
+    race: Dict,
+    entries: List[Dict],
+    features: pd.DataFrame,
+    outputs: Dict[str, list],
+    meta: Optional[Dict],
+) -> Dict:
+    """
+    Whole-grid response body (MainRaceGridPredictResponse): the race-level
+    feature columns once under "race_features", then {"entry", "features",
+    **outputs} per entry with only the per-entry features.
+    """
+    race_columns = [c for c in RACE_LEVEL_FEATURES if c in features.columns]
+    race_features = features_records(features[race_columns].iloc[:1])[0] if len(features) else {}
+    names = list(outputs)
+    items = [
+        {"entry": entry, "features": feats, **dict(zip(names, row))}
+        for entry, feats, row in zip(
+            entries, features_records(features.drop(columns=race_columns)), zip(*outputs.values())
+        )
+    ]
+    return {"race": race, "race_features": race_features, "predictions": items, "model_meta": meta}
+
+
+def json_response(body: bytes, columnar: bool = False) -> Response:
+    """
+    Response for a body from render_json; returning a Response directly
+    also skips FastAPI's response_model re-validation.
+    """
+    return Response(content=body, media_type=COLUMNAR_MEDIA_TYPE if columnar else "application/json")
@@ -1,34 +1,60 @@
 # ...existing code...
-from pathlib import Path
-from typing import List
-
-from fastapi import APIRouter
-from app.schemas.dto import MainRacePredictInput, MainRacePredictionItem, MainRacePredictResponse
-from app.services.feature_builder import build_main_race_features_from_dto
-from app.services.feature_service import read_options_csv
-from app.services.model_service import load_model, predict_df, predict_batch_and_rank
-import pandas as pd
-
-router = APIRouter(prefix="/main-race", tags=["Predict Main Race"])
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+import numpy as np
+from app.api.responses import grid_payload, json_response, prediction_payload, render_json, wants_columnar
+from app.api.streaming import NDJSON_REQUEST_BODY, NDJSONStreamingResponse, StreamSpec, stream_predictions
+from app.core import config
+from app.core.logging import InstrumentedRoute, timed_stage
+from app.schemas.dto import (
+    MainRaceGridPredictInput,
+    MainRaceGridPredictResponse,
+    MainRacePredictInput,
+    MainRacePredictionItem,
+    MainRacePredictResponse,
+    MainRaceSimulateInput,
+    MainRaceSimulateResponse,
+)
+from app.services.feature_builder import (
+    build_main_race_features_batch,
+    build_main_race_features_from_dto,
+    build_main_race_grid_features,
+    WeekendFeatures,
+)
+from app.services.feature_service import options_response
+from app.services.inference_executor import get_inference_executor
+from app.services.micro_batcher import get_batcher
+from app.services.prediction_table import prediction_tables
+from app.services.model_service import get_batch_proba, get_model, predict_batch_and_rank
+from app.services.race_simulator import NoResidualNoise, noise_for, simulate_race
+
+router = APIRouter(prefix="/main-race", tags=["Predict Main Race"], route_class=InstrumentedRoute)
 
 @router.get("/")
 async def root():
     return {"Predict Main Race is running"}
 
 @router.post("/predict", response_model=MainRacePredictResponse)
-def predict(req: MainRacePredictInput):
+async def predict(req: MainRacePredictInput):
     input_dto = req.model_dump()
 
-    # 2) expand minimal DTO into models features
-    features = build_main_race_features_from_dto(input_dto)  # -> dict of models features
+    # 2) precomputed for the upcoming race weekend? (see app.services.prediction_table)
+    _, meta = get_model("mainrace")
+    precomputed = prediction_tables.lookup("mainrace", input_dto)
+    if precomputed is not None:
+        features, prediction = precomputed
+    else:
+        # expand minimal DTO into models features
+        with timed_stage("features"):
+            features = build_main_race_features_from_dto(input_dto)  # -> dict of models features
 
-    # 3) predict
-    df = pd.DataFrame([features])
-    pipeline, meta = load_model(path="trained_mainrace_pipeline.pkl", meta_path="mainrace_metadata.json")
-    predictions = predict_df(df, pipeline=pipeline)
+        # 3) predict, coalesced with concurrent single requests into one pipeline call
+        with timed_stage("predict"):
+            prediction = await get_batcher("mainrace").submit(features)
 
     # 4) build response item(s)
-    predicted_deviation = float(predictions.iloc[0])
+    predicted_deviation = prediction
     item = MainRacePredictionItem(
         input=input_dto,
         features=features,
@@ -38,61 +64,174 @@ def predict(req: MainRacePredictInput):
 
     return MainRacePredictResponse(predictions=[item], model_meta=meta)
 
+def _predict_batch(inputs: List[dict], columnar: bool = False) -> bytes:
+    """
+    Features, scoring and the encoded MainRacePredictResponse body for a batch,
+    assembled column-wise (see app.api.responses.prediction_payload).
+    """
+    # 2) build the feature DataFrame column-wise (one join per reference table)
+    with timed_stage("features"):
+        df = build_main_race_features_batch(inputs)
+
+    # 3) predict + rank
+    df_preds, meta = predict_batch_and_rank(df, model_name="mainrace")
+    # 4) response columns straight from the prediction arrays, in item field order
+    outputs = {
+        "predicted_deviation_from_median": df_preds["predicted_deviation_from_median"].to_numpy(dtype=float).tolist(),
+        "predicted_final_position": df_preds["predicted_final_position"].to_numpy(dtype=int).tolist(),
+    }
+    with timed_stage("serialize"):
+        return render_json(prediction_payload("predictions", inputs, df, outputs, meta, columnar=columnar))
+
 @router.post("/predict/batch", response_model=MainRacePredictResponse)
-def predict_batch(reqs: List[MainRacePredictInput]):
+async def predict_batch(reqs: List[MainRacePredictInput], request: Request, format: Optional[str] = Query(None, pattern="^(rows|columnar)$")):
     """
     Accepts a list of minimal DTOs, expands each to model features,
     predicts batch deviations, and computes predicted_final_position per race.
+    Pass ?format=columnar (or Accept: application/vnd.f1.columnar+json) for
+    one array per field instead of one item per input.
     Returns the same MainRacePredictResponse with one PredictionItem per input.
     """
-    # 1) expand all DTOs to feature dicts
+    # 1) dump all DTOs to plain dicts
     inputs = [r.model_dump() for r in reqs]
-    features_list = [build_main_race_features_from_dto(inp) for inp in inputs]
+    columnar = wants_columnar(request, format)
+    # 2-4) features, scoring and JSON encoding run on the bounded inference executor
+    body = await get_inference_executor().run(_predict_batch, inputs, columnar)
+    return json_response(body, columnar=columnar)
 
-    # 2) build DataFrame in stable column order
-    df = pd.DataFrame(features_list)
+def _predict_grid(grid: dict) -> bytes:
+    """
+    Features, scoring and the encoded MainRaceGridPredictResponse body for
+    one race: race-level features are resolved once and broadcast.
+    """
+    race, entries = grid["race"], grid["entries"]
+    with timed_stage("features"):
+        df = build_main_race_grid_features(race, entries)
+    df_preds, meta = predict_batch_and_rank(df, model_name="mainrace")
+    outputs = {
+        "predicted_deviation_from_median": df_preds["predicted_deviation_from_median"].to_numpy(dtype=float).tolist(),
+        "predicted_final_position": df_preds["predicted_final_position"].to_numpy(dtype=int).tolist(),
+    }
+    with timed_stage("serialize"):
+        return render_json(grid_payload(race, entries, df, outputs, meta))
+
+@router.post("/predict/grid", response_model=MainRaceGridPredictResponse)
+async def predict_grid(req: MainRaceGridPredictInput):
+    """
+    Whole-grid prediction for one race: a race header (circuit, race_date,
+    laps, rain) plus one (driver, constructor, qualification_position) entry
+    per car. Race-level features are computed once and returned once under
+    race_features; predictions hold per-entry features, deviation and the
+    predicted_final_position within the grid, in request order.
+    """
+    body = await get_inference_executor().run(_predict_grid, req.model_dump())
+    return json_response(body)
 
-    # 3) predict + rank
-    df_preds, meta = predict_batch_and_rank(df, model_path="trained_mainrace_pipeline.pkl", meta_path="mainrace_metadata.json")  # symbol: app.services.model_service.predict_batch_and_rank
-    # 4) build response items preserving original inputs
-    items = []
-    for inp, feats, (_, row) in zip(inputs, features_list, df_preds.iterrows()):
-        items.append(
-            MainRacePredictionItem(
-                input=inp,
-                features=feats,
-                predicted_deviation_from_median=float(row["predicted_deviation_from_median"]),
-                predicted_final_position=int(row["predicted_final_position"]),
-            )
+def _simulate(payload: dict) -> bytes:
+    """
+    Point estimates for one grid (main race deviation, status DNF odds from
+    each entry's grid slot), then payload["simulations"] races simulated from
+    them at once with the main race model's residual noise (noise_for).
+    Returns the encoded MainRaceSimulateResponse body; raises
+    NoResidualNoise when there is no noise model.
+    """
+    # resolved here, not on the event loop: it may load the model and read its residuals file
+    noise = noise_for("mainrace")
+    race, entries = payload["race"], payload["entries"]
+    with timed_stage("features"):
+        features = WeekendFeatures(race, entries, types=("mainrace", "status"))
+        grid = [e["qualification_position"] for e in entries]
+        race_df = features.main_race(grid)
+    race_preds, race_meta = predict_batch_and_rank(race_df, model_name="mainrace")
+    status_preds, status_meta = get_batch_proba(features.status(grid), model_name="status")
+    deviation = race_preds["predicted_deviation_from_median"].to_numpy(dtype=float)
+    dnf_percentage = status_preds["predicted_proba"].to_numpy(dtype=float)
+
+    with timed_stage("simulate"):
+        simulation = simulate_race(
+            deviation, dnf_percentage / 100.0, noise, payload["simulations"], np.random.default_rng(payload["seed"])
         )
-
-    return MainRacePredictResponse(predictions=items, model_meta=meta)
+    outputs = {
+        "predicted_deviation_from_median": deviation.tolist(),
+        "predicted_final_position": race_preds["predicted_final_position"].to_numpy(dtype=int).tolist(),
+        "dnf_percentage": dnf_percentage.tolist(),
+        "win_probability": simulation.top(1).tolist(),
+        "podium_probability": simulation.top(3).tolist(),
+        "top10_probability": simulation.top(10).tolist(),
+        "expected_position": simulation.expected_position.tolist(),
+        "position_probabilities": simulation.position_probabilities.tolist(),
+    }
+    with timed_stage("serialize"):
+        body = grid_payload(race, entries, race_df, outputs, {"mainrace": race_meta, "status": status_meta})
+        body["simulation"] = {
+            "simulations": simulation.n_simulations,
+            "seed": payload["seed"],
+            "noise": {"source": noise.source, "std": noise.std},
+        }
+        return render_json(body)
+
+@router.post("/simulate", response_model=MainRaceSimulateResponse)
+async def simulate(req: MainRaceSimulateInput):
+    """
+    Finishing position distributions for one grid (race header plus one
+    (driver, constructor, qualification_position) entry per car): the main
+    race and status models' point estimates, perturbed with the main race
+    model's training residuals and random retirements over `simulations`
+    races (default SIMULATION_DEFAULT_RUNS). Per entry: win / podium / top 10
+    probabilities, expected position and P(position) for every position.
+    """
+    payload = req.model_dump()
+    payload["simulations"] = payload["simulations"] or config.SIMULATION_DEFAULT_RUNS
+    if payload["simulations"] > config.SIMULATION_MAX_RUNS:
+        raise HTTPException(status_code=422, detail=f"simulations must be at most {config.SIMULATION_MAX_RUNS}")
+    try:
+        body = await get_inference_executor().run(_simulate, payload)
+    except NoResidualNoise as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return json_response(body)
+
+_STREAM = StreamSpec("mainrace", MainRacePredictInput, build_main_race_features_batch, "predicted_deviation_from_median", ranked=True)
+
+@router.post("/predict/stream", openapi_extra=NDJSON_REQUEST_BODY)
+async def predict_stream(request: Request):
+    """
+    Streaming batch: reads an NDJSON body (one MainRacePredictInput per line)
+    incrementally, scores it in chunks of STREAM_CHUNK_ROWS and writes NDJSON
+    back as each chunk finishes: a {"model_meta"} line, then one prediction item
+    per input ({"line", "error"} for rejected lines). predicted_final_position is
+    computed per race, so the rows of each race must be contiguous in the body;
+    a race's rows are written once the next race starts.
+    """
+    _, meta = get_model("mainrace")
+    return NDJSONStreamingResponse(
+        stream_predictions(_STREAM, request.stream(), meta, config.STREAM_CHUNK_ROWS, config.STREAM_MAX_LINE_BYTES)
+    )
 
 @router.get("/options/drivers")
-def get_driver_options():
+async def get_driver_options(request: Request):
     """
     Return driver pick list (records). Primary source:
     data/processed/features_helper/drivers_mainrace.csv
     Fallback: data/processed/drivers.csv
     """
-    return read_options_csv("drivers_mainrace.csv", "drivers.csv")
+    return options_response(request, "drivers_mainrace.csv", "drivers.csv")
 
 
 @router.get("/options/constructors")
-def get_constructor_options():
+async def get_constructor_options(request: Request):
     """
     Return constructor pick list (records). Primary source:
     data/processed/features_helper/constructors_mainrace.csv
     Fallback: data/processed/constructors.csv
     """
-    return read_options_csv("constructors_mainrace.csv", "constructors.csv")
+    return options_response(request, "constructors_mainrace.csv", "constructors.csv")
 
 
 @router.get("/options/circuits")
-def get_circuit_options():
+async def get_circuit_options(request: Request):
     """
     Return circuit pick list (records). Primary source:
     data/processed/features_helper/circuits_mainrace.csv
     Fallback: data/processed/circuits.csv
     """
-    return read_options_csv("circuits_mainrace.csv", "circuits.csv")
\ No newline at end of file
+    return options_response(request, "circuits_mainrace.csv", "circuits.csv")
\ No newline at end of file
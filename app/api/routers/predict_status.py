@@ -1,34 +1,45 @@
 # ...existing code...
-from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
+from app.api.responses import json_response, prediction_payload, render_json, wants_columnar
+from app.api.streaming import NDJSON_REQUEST_BODY, NDJSONStreamingResponse, StreamSpec, stream_predictions
+from app.core import config
+from app.core.logging import InstrumentedRoute, timed_stage
 from app.schemas.dto import StatusPredictInput, StatusPredictionItem, StatusPredictResponse
-from app.services.feature_builder import build_status_features_from_dto
-from app.services.feature_service import read_options_csv
-from app.services.model_service import load_model, get_proba_df, get_batch_proba
-import pandas as pd
+from app.services.feature_builder import build_status_features_from_dto, build_status_features_batch
+from app.services.feature_service import options_response
+from app.services.inference_executor import get_inference_executor
+from app.services.micro_batcher import get_batcher
+from app.services.prediction_table import prediction_tables
+from app.services.model_service import get_model, get_batch_proba
 
-router = APIRouter(prefix="/status", tags=["Predict Status"])
+router = APIRouter(prefix="/status", tags=["Predict Status"], route_class=InstrumentedRoute)
 
 @router.get("/")
 async def root():
     return {"Predict Status is running"}
 
 @router.post("/predict", )
-def predict(req: StatusPredictInput):
+async def predict(req: StatusPredictInput):
     input_dto = req.model_dump()
 
-    # 2) expand minimal DTO into models features
-    features = build_status_features_from_dto(input_dto)  # -> dict of models features
+    # 2) precomputed for the upcoming race weekend? (see app.services.prediction_table)
+    _, meta = get_model("status")
+    precomputed = prediction_tables.lookup("status", input_dto)
+    if precomputed is not None:
+        features, prediction = precomputed
+    else:
+        # expand minimal DTO into models features
+        with timed_stage("features"):
+            features = build_status_features_from_dto(input_dto)  # -> dict of models features
 
-    # 3) predict
-    df = pd.DataFrame([features])
-    pipeline, meta = load_model(path="trained_status_pipeline.pkl", meta_path="status_metadata.json")
-    predictions = get_proba_df(df, pipeline=pipeline)
+        # 3) predict, coalesced with concurrent single requests into one pipeline call
+        with timed_stage("predict"):
+            prediction = await get_batcher("status").submit(features)
 
     # 4) build response item(s)
-    predicted_percentage = float(predictions.iloc[0])
+    predicted_percentage = prediction
     item = StatusPredictionItem(
         input=input_dto,
         features=features,
@@ -37,60 +48,78 @@ def predict(req: StatusPredictInput):
 
     return StatusPredictResponse(percentages=[item], model_meta=meta)
 
+def _predict_batch(inputs: List[dict], columnar: bool = False) -> bytes:
+    """
+    Features, scoring and the encoded StatusPredictResponse body for a batch,
+    assembled column-wise (see app.api.responses.prediction_payload).
+    """
+    # 2) build the feature DataFrame column-wise (one join per reference table)
+    with timed_stage("features"):
+        df = build_status_features_batch(inputs)
+
+    # 3) predict
+    df_preds, meta = get_batch_proba(df, model_name="status")
+    # 4) response columns straight from the prediction arrays, in item field order
+    outputs = {"dnf_percentage": df_preds["predicted_proba"].to_numpy(dtype=float).tolist()}
+    with timed_stage("serialize"):
+        return render_json(prediction_payload("percentages", inputs, df, outputs, meta, columnar=columnar))
+
 @router.post("/predict/batch", response_model=StatusPredictResponse)
-def predict_batch(reqs: List[StatusPredictInput]):
+async def predict_batch(reqs: List[StatusPredictInput], request: Request, format: Optional[str] = Query(None, pattern="^(rows|columnar)$")):
     """
     Accepts a list of minimal DTOs, expands each to model features,
     predicts batch deviations, and computes predicted_final_position per race.
+    Pass ?format=columnar (or Accept: application/vnd.f1.columnar+json) for
+    one array per field instead of one item per input.
     Returns the same QualifyingPredictResponse with one QualifyingPredictInput per input.
     """
-    # 1) expand all DTOs to feature dicts
+    # 1) dump all DTOs to plain dicts
     inputs = [r.model_dump() for r in reqs]
-    features_list = [build_status_features_from_dto(inp) for inp in inputs]
-
-    # 2) build DataFrame in stable column order
-    df = pd.DataFrame(features_list)
-
-    # 3) predict + rank
-    df_preds, meta = get_batch_proba(df, model_path="trained_status_pipeline.pkl",  meta_path="status_metadata.json")  # symbol: app.services.model_service.predict_batch_and_rank
-    # 4) build response items preserving original inputs
-    items = []
-    for inp, feats, (_, row) in zip(inputs, features_list, df_preds.iterrows()):
-        items.append(
-            StatusPredictionItem(
-                input=inp,
-                features=feats,
-                dnf_percentage=float(row["predicted_proba"]),
-            )
-        )
-
-    return StatusPredictResponse(percentages=items, model_meta=meta)
+    columnar = wants_columnar(request, format)
+    # 2-4) features, scoring and JSON encoding run on the bounded inference executor
+    body = await get_inference_executor().run(_predict_batch, inputs, columnar)
+    return json_response(body, columnar=columnar)
+
+_STREAM = StreamSpec("status", StatusPredictInput, build_status_features_batch, "dnf_percentage", ranked=False)
+
+@router.post("/predict/stream", openapi_extra=NDJSON_REQUEST_BODY)
+async def predict_stream(request: Request):
+    """
+    Streaming batch: reads an NDJSON body (one StatusPredictInput per line)
+    incrementally, scores it in chunks of STREAM_CHUNK_ROWS and writes NDJSON
+    back as each chunk finishes: a {"model_meta"} line, then one prediction item
+    per input ({"line", "error"} for rejected lines).
+    """
+    _, meta = get_model("status")
+    return NDJSONStreamingResponse(
+        stream_predictions(_STREAM, request.stream(), meta, config.STREAM_CHUNK_ROWS, config.STREAM_MAX_LINE_BYTES)
+    )
 
 @router.get("/options/drivers")
-def get_driver_options():
+async def get_driver_options(request: Request):
     """
     Return driver pick list (records). Primary source:
     data/processed/features_helper/drivers_status.csv
     Fallback: data/processed/drivers.csv
     """
-    return read_options_csv("drivers_status.csv", "drivers.csv")
+    return options_response(request, "drivers_status.csv", "drivers.csv")
 
 
 @router.get("/options/constructors")
-def get_constructor_options():
+async def get_constructor_options(request: Request):
     """
     Return constructor pick list (records). Primary source:
     data/processed/features_helper/constructors_status.csv
     Fallback: data/processed/constructors.csv
     """
-    return read_options_csv("constructors_status.csv", "constructors.csv")
+    return options_response(request, "constructors_status.csv", "constructors.csv")
 
 
 @router.get("/options/circuits")
-def get_circuit_options():
+async def get_circuit_options(request: Request):
     """
     Return circuit pick list (records). Primary source:
     data/processed/features_helper/circuits_status.csv
     Fallback: data/processed/circuits.csv
     """
-    return read_options_csv("circuits_status.csv", "circuits.csv")
\ No newline at end of file
+    return options_response(request, "circuits_status.csv", "circuits.csv")
\ No newline at end of file
@@ -0,0 +1,171 @@
+import numpy as np
+from fastapi import APIRouter, HTTPException
+
+from app.api.responses import grid_payload, json_response, render_json
+from app.core import config
+from app.core.logging import InstrumentedRoute, timed_stage
+from app.schemas.dto import LineupOptimizeInput, LineupOptimizeResponse, WeekendPredictInput, WeekendPredictResponse
+from app.services.feature_builder import WeekendFeatures
+from app.services.inference_executor import get_inference_executor
+from app.services.lineup_optimizer import ScoringRules, expected_driver_points, optimize_lineups, price_units
+from app.services.model_service import get_batch_proba, predict_batch_and_rank
+
+router = APIRouter(prefix="/weekend", tags=["Predict Weekend"], route_class=InstrumentedRoute)
+
+@router.get("/")
+async def root():
+    return {"Predict Weekend is running"}
+
+def _weekend_outputs(race: dict, entries: list):
+    """
+    Qualifying -> main race -> DNF for one race, in one process: the shared
+    reference features are resolved once, and the predicted qualifying order
+    becomes qualification_position for the main race and status models.
+    Returns (main race features, outputs per entry, model_meta).
+    """
+    with timed_stage("features"):
+        features = WeekendFeatures(race, entries)
+
+    # 1) qualifying: deviation + grid slot within this race
+    quali_preds, quali_meta = predict_batch_and_rank(features.qualifying(), model_name="qualifying")
+    grid = quali_preds["predicted_final_position"].to_numpy(dtype=int)
+
+    # 2) main race and DNF from the predicted grid
+    race_df = features.main_race(grid)
+    race_preds, race_meta = predict_batch_and_rank(race_df, model_name="mainrace")
+    status_preds, status_meta = get_batch_proba(features.status(grid), model_name="status")
+
+    outputs = {
+        "predicted_qualifying_deviation_from_median": quali_preds["predicted_deviation_from_median"].to_numpy(dtype=float).tolist(),
+        "predicted_qualifying_position": grid.tolist(),
+        "predicted_deviation_from_median": race_preds["predicted_deviation_from_median"].to_numpy(dtype=float).tolist(),
+        "predicted_final_position": race_preds["predicted_final_position"].to_numpy(dtype=int).tolist(),
+        "dnf_percentage": status_preds["predicted_proba"].to_numpy(dtype=float).tolist(),
+    }
+    return race_df, outputs, {"qualifying": quali_meta, "mainrace": race_meta, "status": status_meta}
+
+def _predict_weekend(weekend: dict) -> bytes:
+    """Weekend outputs (_weekend_outputs) encoded as the WeekendPredictResponse body."""
+    race, entries = weekend["race"], weekend["entries"]
+    race_df, outputs, meta = _weekend_outputs(race, entries)
+    with timed_stage("serialize"):
+        return render_json(grid_payload(race, entries, race_df, outputs, meta))
+
+@router.post("/predict", response_model=WeekendPredictResponse)
+async def predict(req: WeekendPredictInput):
+    """
+    Whole-weekend prediction for one race: a race header (circuit, race_date,
+    laps, rain) plus one (driver, constructor) entry per car. Runs the
+    qualifying model, feeds its predicted grid order into the main race and
+    status models, and returns all three outputs per entry in request order,
+    with race-level features once under race_features.
+    """
+    body = await get_inference_executor().run(_predict_weekend, req.model_dump())
+    return json_response(body)
+
+def _priced(prices: dict, refs: list, kind: str) -> dict:
+    """Price per entry ref (as written in the entries), matched like the feature builders match refs."""
+    wanted = {str(ref).strip().lower(): ref for ref in refs}
+    priced = {}
+    for ref, price in prices.items():
+        key = str(ref).strip().lower()
+        if key not in wanted:
+            raise ValueError(f"Priced {kind} {ref!r} is not in the entries")
+        priced[wanted[key]] = price
+    return priced
+
+def _lineup_prices(payload: dict) -> tuple:
+    """
+    (drivers, constructors, driver_units, constructor_units): price per entry
+    ref and the prices in LINEUP_PRICE_STEP units. Raises ValueError for
+    prices off the step or refs missing from the entries.
+    """
+    entries = payload["entries"]
+    drivers = _priced(payload["driver_prices"], [e["driver"] for e in entries], "driver")
+    constructors = _priced(payload["constructor_prices"], [e["constructor"] for e in entries], "constructor")
+    step = config.LINEUP_PRICE_STEP
+    return drivers, constructors, price_units(list(drivers.values()), step), price_units(list(constructors.values()), step)
+
+def _budget_units(budget: float) -> int:
+    """The budget in LINEUP_PRICE_STEP units, rounded down."""
+    return int(np.floor(budget / config.LINEUP_PRICE_STEP + 1e-9))
+
+def _optimize_lineups(payload: dict, prices: tuple) -> bytes:
+    """
+    Weekend outputs (_weekend_outputs), expected fantasy points per entry and
+    per constructor (the sum of its entries), then the top_k lineups within
+    the budget (app.services.lineup_optimizer) at `prices` (_lineup_prices).
+    Returns the encoded LineupOptimizeResponse body.
+    """
+    race, entries = payload["race"], payload["entries"]
+    drivers, constructors, driver_units, constructor_units = prices
+    step = config.LINEUP_PRICE_STEP
+
+    race_df, outputs, meta = _weekend_outputs(race, entries)
+    with timed_stage("optimize"):
+        rules = ScoringRules(**{k: v for k, v in payload["scoring"].items() if v is not None})
+        points = expected_driver_points(
+            outputs["predicted_qualifying_position"],
+            outputs["predicted_final_position"],
+            np.asarray(outputs["dnf_percentage"]) / 100.0,
+            rules,
+        )
+        # first entry of each priced driver; every entry of a constructor scores for it
+        row = {}
+        for i, entry in enumerate(entries):
+            row.setdefault(entry["driver"], i)
+        driver_points = points[[row[ref] for ref in drivers]]
+        entry_constructors = np.array([str(e["constructor"]).strip().lower() for e in entries])
+        constructor_points = np.array([points[entry_constructors == ref.strip().lower()].sum() for ref in constructors])
+        lineups = optimize_lineups(
+            driver_points, driver_units, constructor_points, constructor_units,
+            _budget_units(payload["budget"]), payload["drivers"], payload["constructors"], payload["top_k"],
+        )
+
+    driver_refs, constructor_refs = list(drivers), list(constructors)
+    outputs["expected_points"] = points.tolist()
+    outputs["price"] = [
+        drivers.get(entry["driver"]) if row[entry["driver"]] == i else None for i, entry in enumerate(entries)
+    ]
+    with timed_stage("serialize"):
+        body = grid_payload(race, entries, race_df, outputs, meta)
+        body["constructors"] = [
+            {"constructor": ref, "expected_points": value, "price": constructors[ref]}
+            for ref, value in zip(constructor_refs, constructor_points.tolist())
+        ]
+        body["lineups"] = [
+            {
+                "drivers": [driver_refs[i] for i in lineup.drivers],
+                "constructors": [constructor_refs[i] for i in lineup.constructors],
+                "price": round(lineup.price_units * step, 6),
+                "expected_points": lineup.expected_points,
+            }
+            for lineup in lineups
+        ]
+        return render_json(body)
+
+@router.post("/lineups", response_model=LineupOptimizeResponse)
+async def lineups(req: LineupOptimizeInput):
+    """
+    Fantasy lineup optimizer for one race: the weekend predictions (as
+    /weekend/predict) turned into expected points under `scoring`, then the
+    top_k selections of `drivers` drivers and `constructors` constructors
+    from the priced ones whose total price fits `budget`, best first. Exact
+    (a k-best knapsack over prices in LINEUP_PRICE_STEP units), not
+    enumeration. Prices must be multiples of LINEUP_PRICE_STEP and name
+    drivers / constructors of the entries, and the budget is at most
+    LINEUP_MAX_BUDGET_UNITS steps (422 otherwise).
+    """
+    if req.top_k > config.LINEUP_MAX_TOP_K:
+        raise HTTPException(status_code=422, detail=f"top_k must be at most {config.LINEUP_MAX_TOP_K}")
+    if _budget_units(req.budget) > config.LINEUP_MAX_BUDGET_UNITS:
+        max_budget = round(config.LINEUP_MAX_BUDGET_UNITS * config.LINEUP_PRICE_STEP, 6)
+        raise HTTPException(status_code=422, detail=f"budget must be at most {max_budget}")
+    payload = req.model_dump()
+    # validated before dispatch, so only the request's own errors become 422s
+    try:
+        prices = _lineup_prices(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    body = await get_inference_executor().run(_optimize_lineups, payload, prices)
+    return json_response(body)
@@ -0,0 +1,40 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import config
+from app.core.logging import InstrumentedRoute
+from app.schemas.dto import PredictionTableRefreshInput
+from app.services.prediction_table import prediction_tables, refresh_prediction_tables
+
+router = APIRouter(prefix="/prediction-table", tags=["Prediction Table"], route_class=InstrumentedRoute)
+
+
+@router.get("/")
+async def status():
+    """
+    The precomputed tables this worker serves from, per model: race, rows,
+    model version and whether that version is still the loaded one.
+    """
+    return prediction_tables.snapshot()
+
+
+@router.post("/refresh")
+async def refresh(req: PredictionTableRefreshInput, ml_admin_key: Optional[str] = Header(None)):
+    """
+    Rebuild the tables for one race (circuit, race_date, laps): each of its
+    entrants (driver, constructor) x grid slot x rain, scored in one pass
+    per model. Needs Ml-Admin-Key matching PREDICTION_TABLE_ADMIN_KEY.
+    Reaches the other server workers only through PREDICTION_TABLE_PATH.
+    """
+    expected = config.PREDICTION_TABLE_ADMIN_KEY
+    if not expected or not (ml_admin_key and hmac.compare_digest(ml_admin_key, expected)):
+        raise HTTPException(status_code=403, detail="Missing or invalid admin key")
+    entrants = [entrant.model_dump() for entrant in req.entrants]
+    try:
+        # not the inference executor: a process pool would build the tables in its own workers
+        return await run_in_threadpool(refresh_prediction_tables, req.circuit, req.race_date, req.laps, entrants)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
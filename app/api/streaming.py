@@ -0,0 +1,248 @@
+import asyncio
+import json
+from bisect import bisect_left
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Type
+
+import pandas as pd
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.requests import ClientDisconnect
+
+from app.api.responses import prediction_payload, render_json
+from app.core.logging import timed_stage
+from app.services.inference_executor import InferenceSaturated, get_inference_executor
+from app.services.micro_batcher import SCORERS
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# columns that identify one race, as in model_service.predict_batch_and_rank
+RACE_KEYS = ("race_year", "race_month", "race_day", "circuit")
+
+# OpenAPI body for the /predict/stream routes, which read the request themselves
+NDJSON_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "description": "One input DTO per line"}}},
+    }
+}
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for routes that keep reading the request body while
+    they respond. Below ASGI spec 2.4 StreamingResponse listens for
+    http.disconnect on the same receive channel and would swallow the body,
+    so a dropped client is detected from failed sends instead, as Starlette
+    does for 2.4 servers.
+    """
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+@dataclass(frozen=True)
+class StreamSpec:
+    """
+    What a /predict/stream route scores:
+    - model_name: registry name (see MODEL_SPECS), also the SCORERS key
+    - input_model: DTO each NDJSON line is validated against
+    - build_features: batch feature builder (inputs -> features DataFrame)
+    - output: prediction field written on each item
+    - ranked: add predicted_final_position per race (RACE_KEYS)
+    """
+    model_name: str
+    input_model: Type[BaseModel]
+    build_features: Callable[[List[dict]], pd.DataFrame]
+    output: str
+    ranked: bool = False
+
+
+def score_chunk(spec: StreamSpec, inputs: List[dict]) -> Tuple[List[dict], List[tuple]]:
+    """
+    Features and predictions for one chunk of inputs. Returns (items, race_keys):
+    items in the batch response shape without predicted_final_position, and
+    one race key per item (empty when the spec is not ranked).
+    Module-level so it can run on a process pool.
+    """
+    with timed_stage("features"):
+        df = spec.build_features(inputs)
+    values = SCORERS[spec.model_name](spec.model_name, df)
+    with timed_stage("serialize"):
+        items = prediction_payload("items", inputs, df, {spec.output: values}, None)["items"]
+    if not spec.ranked:
+        return items, []
+    used_keys = [k for k in RACE_KEYS if k in df.columns]
+    return items, list(zip(*(df[k].tolist() for k in used_keys))) if used_keys else [()] * len(items)
+
+
+def _error_line(line: int, error) -> dict:
+    return {"line": line, "error": error}
+
+
+class RaceRanker:
+    """
+    Holds scored rows until their race is complete, then assigns
+    predicted_final_position (rank of the deviation, method="min", as
+    predict_batch_and_rank does). Rows of one race must be contiguous in the
+    stream: a race closes when a row of another race arrives, so only the
+    open race is ever buffered. Rows of a race that was already ranked are
+    rejected rather than ranked against a partial field.
+    """
+
+    def __init__(self, output: str):
+        self.output = output
+        self.open_key: Optional[tuple] = None
+        self.open_rows: List[dict] = []
+        self.closed: Set[tuple] = set()
+
+    def add(self, line: int, item: dict, key: tuple) -> List[dict]:
+        """Buffer one scored row; returns the rows (or errors) ready to emit."""
+        ready: List[dict] = []
+        if key != self.open_key:
+            ready = self.finish()
+            if key in self.closed:
+                return ready + [_error_line(
+                    line, f"Race {list(key)} was already ranked; rows of a race must be contiguous in the stream"
+                )]
+            self.open_key = key
+        self.open_rows.append(item)
+        return ready
+
+    def finish(self) -> List[dict]:
+        """Rank and release the open race (end of stream or next race)."""
+        rows = self.open_rows
+        if self.open_key is not None:
+            self.closed.add(self.open_key)
+        self.open_key, self.open_rows = None, []
+        # min rank: 1 + number of strictly lower deviations in the race
+        ordered = sorted(row[self.output] for row in rows)
+        for row in rows:
+            row["predicted_final_position"] = bisect_left(ordered, row[self.output]) + 1
+        return rows
+
+
+async def ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a request body stream into (line number, line) pairs as bytes
+    arrive, holding at most one partial line of up to `max_line_bytes`.
+    A longer line is dropped as it arrives and yielded as None. Blank lines
+    are skipped.
+    """
+    buffer = b""
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if oversized or len(line) > max_line_bytes:
+                oversized = False
+                yield line_no, None
+            elif line.strip():
+                yield line_no, line
+        if len(buffer) > max_line_bytes:
+            # keep skipping until the line's newline arrives
+            oversized, buffer = True, b""
+    if oversized:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, buffer
+
+
+async def _run_chunk(spec: StreamSpec, inputs: List[dict]) -> Tuple[List[dict], List[tuple]]:
+    # a stream has already answered 200, so wait for capacity instead of a 503
+    executor = get_inference_executor()
+    while True:
+        try:
+            return await executor.run(score_chunk, spec, inputs)
+        except InferenceSaturated as e:
+            await asyncio.sleep(e.retry_after or 0.05)
+
+
+async def _score_lines(spec: StreamSpec, lines: List[int], inputs: List[dict]) -> List[Tuple[int, dict, Optional[tuple]]]:
+    """
+    Score one chunk; (line, item or error, race key) per input. When the
+    chunk fails (e.g. one row is not pickable) its rows are retried one by one
+    so only the offending rows come back as errors.
+    """
+    try:
+        items, keys = await _run_chunk(spec, inputs)
+        return list(zip(lines, items, keys or [None] * len(items)))
+    except Exception as e:
+        if len(inputs) == 1:
+            return [(lines[0], _error_line(lines[0], str(e)), None)]
+        logger.debug("Stream chunk of %d rows failed for %s, scoring rows individually", len(inputs), spec.model_name)
+    results = []
+    for line, inp in zip(lines, inputs):
+        results.extend(await _score_lines(spec, [line], [inp]))
+    return results
+
+
+def _encode(rows: List[dict]) -> bytes:
+    with timed_stage("serialize"):
+        return b"".join(render_json(row) + b"\n" for row in rows)
+
+
+async def stream_predictions(
+    spec: StreamSpec,
+    body: AsyncIterator[bytes],
+    meta: Optional[Dict],
+    chunk_rows: int,
+    max_line_bytes: int,
+) -> AsyncIterator[bytes]:
+    """
+    NDJSON predictions for an NDJSON body of input DTOs. The first line is
+    {"model_meta": ...}; then one batch-shaped item per valid input, written
+    as each chunk of `chunk_rows` lines is scored, or {"line", "error"} for
+    inputs that fail validation or scoring or exceed `max_line_bytes`.
+    Memory holds one chunk (plus the open race when ranked), whatever the
+    body size.
+    """
+    chunk_rows = max(1, chunk_rows)
+    ranker = RaceRanker(spec.output) if spec.ranked else None
+    yield render_json({"model_meta": meta}) + b"\n"
+
+    async def flush(lines: List[int], inputs: List[dict], errors: List[dict]) -> bytes:
+        out = list(errors)
+        scored = await _score_lines(spec, lines, inputs) if inputs else []
+        for line, item, key in scored:
+            if ranker is None or "error" in item:
+                out.append(item)
+            else:
+                out.extend(ranker.add(line, item, key))
+        return _encode(out)
+
+    lines: List[int] = []
+    inputs: List[dict] = []
+    errors: List[dict] = []
+    async for line_no, raw in ndjson_lines(body, max_line_bytes):
+        if raw is None:
+            errors.append(_error_line(line_no, f"Line is longer than {max_line_bytes} bytes"))
+        else:
+            try:
+                inputs.append(spec.input_model.model_validate_json(raw).model_dump())
+                lines.append(line_no)
+            except ValidationError as e:
+                errors.append(_error_line(line_no, json.loads(e.json(include_url=False))))
+        # errors count too, so a run of rejected lines is written (and released) as it goes
+        if len(inputs) + len(errors) >= chunk_rows:
+            yield await flush(lines, inputs, errors)
+            lines, inputs, errors = [], [], []
+    if inputs or errors:
+        yield await flush(lines, inputs, errors)
+    if ranker is not None:
+        rest = ranker.finish()
+        if rest:
+            yield _encode(rest)
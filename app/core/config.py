@@ -0,0 +1,123 @@
+import os
+import tempfile
+
+# Worker processes for `python -m app.main` (app.server); 1 unless set. Above 1,
+# workers are forked from one parent and share its listening socket. With
+# SERVER_PRELOAD the parent loads every model and the reference tables before
+# forking, so workers share them copy-on-write instead of each unpickling its
+# own copy. WEB_CONCURRENCY is not read: on Heroku, where the platform sets it
+# from the dyno size, copy it over (SERVER_WORKERS=$WEB_CONCURRENCY) to run that
+# many workers, each with its own inference executor and caches.
+SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "1"))
+SERVER_PRELOAD: bool = os.getenv("SERVER_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+# INFERENCE_BACKEND selects how fitted pipelines are scored at serving time:
+# "sklearn" (default) runs Pipeline.predict as trained, "compiled" flattens the
+# gradient boosting trees into NumPy arrays (app.models.compiled_ensemble).
+INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "sklearn")
+# With the compiled backend, batches above this many rows go back to the sklearn estimator.
+COMPILED_MAX_ROWS: int = int(os.getenv("COMPILED_MAX_ROWS", "32"))
+# Replace the fitted ColumnTransformer with the precomputed FastPreprocessor at
+# load time (app.models.fast_preprocessor); its output is identical.
+FAST_PREPROCESSING: bool = os.getenv("FAST_PREPROCESSING", "true").lower() in ("1", "true", "yes")
+# Per-row prediction cache (app.services.model_service.PredictionCache); size 0 disables it.
+PREDICTION_CACHE_SIZE: int = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL_SECONDS: float = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "900"))
+# Score each distinct feature row of a batch once and copy the result to its
+# repeats (app.services.model_service.dedupe_rows).
+BATCH_DEDUP: bool = os.getenv("BATCH_DEDUP", "true").lower() in ("1", "true", "yes")
+# Micro-batching of concurrent single-row predictions (app.services.micro_batcher):
+# a batch is flushed at MICRO_BATCH_MAX_SIZE rows or after MICRO_BATCH_MAX_WAIT_MS.
+# MICRO_BATCH_MAX_SIZE=1 scores every request on its own.
+MICRO_BATCH_MAX_SIZE: int = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+MICRO_BATCH_MAX_WAIT_MS: float = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "2"))
+# Rows a micro-batcher queues before answering 503.
+MICRO_BATCH_MAX_QUEUE: int = int(os.getenv("MICRO_BATCH_MAX_QUEUE", "1024"))
+
+# Dedicated inference executor (app.services.inference_executor): "thread" or
+# "process"; INFERENCE_WORKERS=0 splits the CPUs between the SERVER_WORKERS
+# processes (at least one worker each). Work admitted beyond
+# the busy workers is capped at INFERENCE_MAX_QUEUE, after which predict routes
+# answer 503 with Retry-After: INFERENCE_RETRY_AFTER_SECONDS.
+INFERENCE_EXECUTOR: str = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "0"))
+INFERENCE_MAX_QUEUE: int = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+INFERENCE_RETRY_AFTER_SECONDS: float = float(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "1"))
+
+# Cache-Control sent with the pre-encoded /options responses (they also carry an ETag).
+OPTIONS_CACHE_CONTROL: str = os.getenv("OPTIONS_CACHE_CONTROL", "public, max-age=300")
+
+# Materialized predictions for one race weekend (app.services.prediction_table):
+# every input of the weekend's entrants (driver, constructor) x grid slot x rain
+# for a circuit / race date / laps, scored ahead of time so the single /predict
+# routes answer them with a lookup. Built by
+# `python -m app.services.prediction_table` or POST /prediction-table/refresh
+# (which needs Ml-Admin-Key matching PREDICTION_TABLE_ADMIN_KEY; unset disables
+# the route). With PREDICTION_TABLE_PATH the table is also written there, loaded
+# at startup, and re-read in the background by every server worker once the
+# file changes (checked at most every PREDICTION_TABLE_CHECK_SECONDS). Rows
+# scored by another model version than the one loaded are never served.
+PREDICTION_TABLE_PATH: str | None = os.getenv("PREDICTION_TABLE_PATH")
+PREDICTION_TABLE_CHECK_SECONDS: float = float(os.getenv("PREDICTION_TABLE_CHECK_SECONDS", "5"))
+PREDICTION_TABLE_ADMIN_KEY: str | None = os.getenv("PREDICTION_TABLE_ADMIN_KEY")
+# Grid slots (qualification_position 1..N) enumerated for the main race and status models.
+PREDICTION_TABLE_GRID_SIZE: int = int(os.getenv("PREDICTION_TABLE_GRID_SIZE", "20"))
+
+# Monte Carlo race simulations (app.services.race_simulator, /main-race/simulate):
+# races per request by default and at most. Residual noise comes from the main
+# race model's training residuals (MODEL_DIR/mainrace_residuals.json, written by
+# `scripts/train_mainrace_model.py`, 5 folds by default, and committed next to
+# the metadata JSONs). For artifacts trained without them, setting
+# SIMULATION_RESIDUAL_STD (ms; unset by default) draws a normal with that std
+# instead, e.g. 57000, the held-out RMSE of the gradient boosting main race
+# model in research/Thesis.ipynb; with neither, the simulate route answers 503.
+SIMULATION_DEFAULT_RUNS: int = int(os.getenv("SIMULATION_DEFAULT_RUNS", "10000"))
+SIMULATION_MAX_RUNS: int = int(os.getenv("SIMULATION_MAX_RUNS", "100000"))
+SIMULATION_RESIDUAL_STD: float | None = (
+    float(os.getenv("SIMULATION_RESIDUAL_STD")) if os.getenv("SIMULATION_RESIDUAL_STD") else None
+)
+
+# Fantasy lineup optimizer (app.services.lineup_optimizer, /weekend/lineups):
+# prices must be multiples of LINEUP_PRICE_STEP (the exact search runs over
+# budgets in these units), and a request asks for at most LINEUP_MAX_TOP_K lineups.
+# The search's tables grow with the budget in units, so a budget above
+# LINEUP_MAX_BUDGET_UNITS steps (200.0 at the default step) is refused.
+LINEUP_PRICE_STEP: float = float(os.getenv("LINEUP_PRICE_STEP", "0.1"))
+LINEUP_MAX_TOP_K: int = int(os.getenv("LINEUP_MAX_TOP_K", "50"))
+LINEUP_MAX_BUDGET_UNITS: int = int(os.getenv("LINEUP_MAX_BUDGET_UNITS", "2000"))
+
+# Rows scored per chunk by the NDJSON /predict/stream routes (app.api.streaming),
+# and the longest body line they buffer: a longer one is answered with an error line.
+STREAM_CHUNK_ROWS: int = int(os.getenv("STREAM_CHUNK_ROWS", "512"))
+STREAM_MAX_LINE_BYTES: int = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
+
+# APP_STARTUP_MODE (app.services.startup): "blocking" pulls DVC artifacts and
+# loads every model before serving; "background" serves at once and does both
+# on a thread (/ready turns 200 when done, predict routes answer 503 until
+# then); "prestart" expects a separate `python -m app.utils` pull step and
+# only loads. With SERVER_WORKERS > 1 and SERVER_PRELOAD, the parent process
+# runs "blocking" (or "prestart") once and the workers start "preloaded".
+APP_STARTUP_MODE: str = os.getenv("APP_STARTUP_MODE", "blocking")
+
+# Request / stage timing behind /metrics (app.core.logging, app.core.metrics).
+# When off, requests are not timed and /metrics only reports collected stats.
+METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# With SERVER_WORKERS > 1 each worker writes its metrics to METRICS_DIR (default:
+# a temporary directory per server) every METRICS_FLUSH_SECONDS, and /metrics
+# merges every worker's: counters and histograms summed, gauges labelled
+# worker="<pid>". Other workers' values lag by up to METRICS_FLUSH_SECONDS; a
+# replaced worker's counters drop out (a counter reset to Prometheus).
+METRICS_DIR: str | None = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", "1"))
+
+# Opt-in request profiling (app.core.logging.MetricsMiddleware): a request sent
+# with "Ml-Profile: timing" gets a Server-Timing header with its stage breakdown;
+# "Ml-Profile: cprofile" also dumps a cProfile of the request to PROFILE_DIR.
+# The header is honoured only when APP_MODE is one of PROFILING_APP_MODES, and
+# the request carries Ml-Admin-Key matching PROFILING_ADMIN_KEY when that is set
+# (in prod, PROFILING_ADMIN_KEY is required).
+PROFILING_APP_MODES: tuple = tuple(
+    mode.strip() for mode in os.getenv("PROFILING_APP_MODES", "dev").split(",") if mode.strip()
+)
+PROFILING_ADMIN_KEY: str | None = os.getenv("PROFILING_ADMIN_KEY")
+PROFILE_DIR: str = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "f1-profiles"))
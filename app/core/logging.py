@@ -0,0 +1,354 @@
+import contextvars
+import cProfile
+import functools
+import hmac
+import inspect
+import logging
+import pstats
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi.routing import APIRoute
+
+from app.core import config
+from app.core.metrics import LATENCY_SECONDS_BUCKETS, metrics_registry
+
+# route label for requests no route matched, and for work outside a request
+UNMATCHED_ROUTE = "unmatched"
+BACKGROUND_ROUTE = "background"
+
+REQUEST_SECONDS = metrics_registry.histogram(
+    "f1_http_request_duration_seconds", LATENCY_SECONDS_BUCKETS, "HTTP request duration", ("route", "method")
+)
+REQUESTS_TOTAL = metrics_registry.counter("f1_http_requests_total", "HTTP requests", ("route", "method", "status"))
+STAGE_SECONDS = metrics_registry.histogram(
+    "f1_stage_duration_seconds", LATENCY_SECONDS_BUCKETS, "Time spent in each stage of a request", ("route", "stage")
+)
+
+# opt-in profiling headers (see PROFILING_APP_MODES)
+PROFILE_HEADER = b"ml-profile"
+ADMIN_KEY_HEADER = b"ml-admin-key"
+PROFILE_ID_HEADER = b"ml-profile-id"
+PROFILE_MODES = ("timing", "cprofile")
+
+logger = logging.getLogger(__name__)
+
+# cProfile captures are serialized: the event-loop profiler would also see
+# every other request in flight
+_cprofile_lock = threading.Lock()
+
+
+class RequestTiming:
+    """
+    Timestamps (time.perf_counter) of one request, shared by the metrics
+    middleware, the route handler and timed_stage through a ContextVar:
+    - route: path template of the matched route (set by InstrumentedRoute)
+    - start: the request reached MetricsMiddleware
+    - endpoint_start / endpoint_end: the endpoint function was entered / returned
+    - stages: (stage, seconds) in order, only for a profiled request
+    - profiles: cProfile captures of work run on executor threads, only when
+      the request asked for one
+    """
+    __slots__ = ("route", "start", "endpoint_start", "endpoint_end", "stages", "profiles")
+
+    def __init__(self, start: float, route: Optional[str] = None):
+        self.route = route
+        self.start = start
+        self.endpoint_start = 0.0
+        self.endpoint_end = 0.0
+        self.stages: Optional[List[tuple]] = None
+        self.profiles: Optional[List[cProfile.Profile]] = None
+
+
+_timing: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar("f1_request_timing", default=None)
+
+
+def bind_route(route: str):
+    """
+    Attribute the stages timed in the current context (e.g. a background
+    task) to `route` instead of BACKGROUND_ROUTE.
+    """
+    _timing.set(RequestTiming(time.perf_counter(), route))
+
+
+def _record_stage(timing: Optional[RequestTiming], stage: str, seconds: float):
+    if timing is not None and timing.stages is not None:
+        timing.stages.append((stage, seconds))
+    if config.METRICS_ENABLED:
+        route = (timing.route or UNMATCHED_ROUTE) if timing is not None else BACKGROUND_ROUTE
+        STAGE_SECONDS.labels(route, stage).observe(seconds)
+
+
+def observe_stage(stage: str, seconds: float):
+    """
+    Record `seconds` in f1_stage_duration_seconds{route, stage} for the
+    current request, and in its Server-Timing breakdown when profiled.
+    """
+    _record_stage(_timing.get(), stage, seconds)
+
+
+def profiling_active() -> bool:
+    """Whether the current request is capturing a cProfile."""
+    timing = _timing.get()
+    return timing is not None and timing.profiles is not None
+
+
+def call_profiled(fn, *args, **kwargs):
+    """
+    fn(*args, **kwargs); when the current request is capturing a cProfile,
+    under a profiler of its own that is merged into the request's dump
+    (for work handed to executor threads).
+    """
+    timing = _timing.get()
+    if timing is None or timing.profiles is None:
+        return fn(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: the request's profiler already sees every thread
+        return fn(*args, **kwargs)
+    timing.profiles.append(profiler)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+
+
+class timed_stage:
+    """
+    Context manager timing a block as one stage of the current request:
+
+        with timed_stage("features"):
+            df = build_main_race_features_batch(inputs)
+
+    Stages are:
+    - validation: request body parsing and DTO validation (FastAPI, before the endpoint)
+    - endpoint: the endpoint function
+    - features: feature building, including dataframe (DataFrame construction)
+    - predict: pipeline scoring, including dedup (collapsing repeated rows)
+      and prediction cache lookups
+    - rank: predicted_final_position per race
+    - simulate: Monte Carlo races (/main-race/simulate)
+    - optimize: fantasy lineup search (/weekend/lineups)
+    - serialize: encoding the response body (routes that render their own JSON)
+    - response: response_model validation and encoding (FastAPI, after the endpoint)
+    No-op when METRICS_ENABLED is off, unless the request is profiled.
+    """
+    __slots__ = ("stage", "started", "timing")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started = 0.0
+
+    def __enter__(self):
+        timing = self.timing = _timing.get()
+        if config.METRICS_ENABLED or (timing is not None and timing.stages is not None):
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.started:
+            _record_stage(self.timing, self.stage, time.perf_counter() - self.started)
+        return False
+
+
+def profiling_allowed(app_mode: str) -> bool:
+    """
+    Whether the Ml-Profile header is honoured in `app_mode`: it must be one
+    of PROFILING_APP_MODES, and prod also needs PROFILING_ADMIN_KEY.
+    """
+    return app_mode in config.PROFILING_APP_MODES and (app_mode != "prod" or bool(config.PROFILING_ADMIN_KEY))
+
+
+def _profile_mode(scope) -> Optional[str]:
+    mode, key = None, None
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            mode = value.decode("latin-1").strip().lower()
+        elif name == ADMIN_KEY_HEADER:
+            key = value.decode("latin-1")
+    if mode not in PROFILE_MODES:
+        return None
+    if config.PROFILING_ADMIN_KEY and not (key and hmac.compare_digest(key, config.PROFILING_ADMIN_KEY)):
+        return None
+    return mode
+
+
+def server_timing(timing: RequestTiming) -> str:
+    """
+    Server-Timing header value for a profiled request: milliseconds per
+    stage (repeated stages, e.g. one predict per model, are summed) plus the
+    total so far.
+    """
+    totals = {}
+    for stage, seconds in list(timing.stages or ()):
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    parts = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in totals.items()]
+    parts.append(f"total;dur={(time.perf_counter() - timing.start) * 1000:.3f}")
+    return ", ".join(parts)
+
+
+def dump_profile(path: Path, profiler: cProfile.Profile, others: List[cProfile.Profile]) -> Path:
+    """Write the merged captures of one request as a pstats file (`python -m pstats <file>`)."""
+    stats = pstats.Stats(profiler)
+    for other in others:
+        stats.add(other)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    stats.dump_stats(str(path))
+    return path
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request:
+    - f1_http_request_duration_seconds{route, method}: until the response is sent
+    - f1_http_requests_total{route, method, status}
+    route is the matched path template (e.g. /main-race/predict/batch), so
+    path parameters and unknown paths do not create new series.
+
+    With `profiling` (see profiling_allowed), a request sent with
+    "Ml-Profile: timing" gets its stage breakdown as a Server-Timing header;
+    "Ml-Profile: cprofile" also captures a cProfile of the request (event
+    loop plus its inference executor calls; other requests running
+    meanwhile show up too) into PROFILE_DIR, named by the Ml-Profile-Id
+    response header. One capture runs at a time; Server-Timing covers the
+    stages finished before the headers were sent (not a streamed body).
+    """
+
+    def __init__(self, app, profiling: bool = False):
+        self.app = app
+        self.profiling = profiling
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.profiling:
+            mode = _profile_mode(scope)
+            if mode is not None:
+                await self._call_profiled(scope, receive, send, mode)
+                return
+        if not config.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        timing = RequestTiming(time.perf_counter())
+        token = _timing.set(timing)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _timing.reset(token)
+            self._record(scope, timing, status)
+
+    @staticmethod
+    def _record(scope, timing: RequestTiming, status: int):
+        elapsed = time.perf_counter() - timing.start
+        # other routes: the route FastAPI records in the scope, when it does
+        route = timing.route or getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+        REQUEST_SECONDS.labels(route, scope["method"]).observe(elapsed)
+        REQUESTS_TOTAL.labels(route, scope["method"], status).inc()
+
+    async def _call_profiled(self, scope, receive, send, mode: str):
+        timing = RequestTiming(time.perf_counter())
+        timing.stages = []
+        profiler, profile_id, extra = None, None, []
+        if mode == "cprofile":
+            if _cprofile_lock.acquire(blocking=False):
+                profiler, timing.profiles = cProfile.Profile(), []
+                profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+                extra.append((PROFILE_ID_HEADER, profile_id.encode()))
+            else:
+                timing.stages.append(("cprofile-busy", 0.0))
+        token = _timing.set(timing)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", ())) + extra
+                headers.append((b"server-timing", server_timing(timing).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            _timing.reset(token)
+            if profiler is not None:
+                try:
+                    path = dump_profile(Path(config.PROFILE_DIR) / f"{profile_id}.prof", profiler, timing.profiles)
+                    logger.info("Request profile written to %s", path)
+                except Exception:
+                    logger.exception("Could not write request profile %s", profile_id)
+                finally:
+                    _cprofile_lock.release()
+            if config.METRICS_ENABLED:
+                self._record(scope, timing, status)
+
+
+def _instrument_endpoint(endpoint):
+    @functools.wraps(endpoint)
+    async def instrumented(*args, **kwargs):
+        timing = _timing.get()
+        if timing is None:
+            return await endpoint(*args, **kwargs)
+        timing.endpoint_start = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timing.endpoint_end = time.perf_counter()
+
+    instrumented.__f1_instrumented__ = True
+    return instrumented
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that labels the request with its path template and records the
+    validation, endpoint and response stages around async endpoints. Use as
+    APIRouter(route_class=InstrumentedRoute).
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "__f1_instrumented__", False):
+            endpoint = _instrument_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route = self.path
+
+        async def timed_handler(request):
+            timing = _timing.get()
+            if timing is None:
+                return await handler(request)
+            timing.route = route
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                if timing.endpoint_start:
+                    observe_stage("validation", timing.endpoint_start - started)
+                    if timing.endpoint_end:
+                        observe_stage("endpoint", timing.endpoint_end - timing.endpoint_start)
+                        observe_stage("response", time.perf_counter() - timing.endpoint_end)
+
+        return timed_handler
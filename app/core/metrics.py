@@ -0,0 +1,304 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# upper bounds (inclusive) for the default histograms
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+LATENCY_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+# request / stage durations exported to Prometheus, in seconds
+LATENCY_SECONDS_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (Prometheus semantics: each bucket counts
+    observations <= its upper bound, plus an implicit +Inf bucket).
+    Thread-safe; `snapshot` returns cumulative counts, sum and count.
+    """
+    __slots__ = ("name", "description", "buckets", "_counts", "_sum", "_lock")
+
+    def __init__(self, name: str, buckets: Sequence[float], description: str = ""):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        # on the request path: one bisect and one lock, the count is derived at snapshot
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        n = sum(counts)
+        cumulative, running = {}, 0
+        for bound, c in zip(list(self.buckets) + [float("inf")], counts):
+            running += c
+            cumulative[str(bound) if bound != float("inf") else "+Inf"] = running
+        return {"buckets": cumulative, "sum": total, "count": n}
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+
+
+class Counter:
+    """
+    Monotonically increasing value (Prometheus counter). Thread-safe.
+    """
+    __slots__ = ("name", "description", "_value", "_lock")
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def reset(self):
+        with self._lock:
+            self._value = 0.0
+
+
+# ((label, value), ...) in exposition order
+Labels = Tuple[Tuple[str, object], ...]
+# what a collector reports per sample: (name, type, help, labels, value)
+Sample = Tuple[str, str, str, Labels, Union[float, Histogram, Counter]]
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class MetricFamily:
+    """
+    One named metric and its series, one per combination of label values:
+    `family.labels("/main-race/predict", "POST").observe(0.01)`. Series are
+    created on first use and then found with a single dict lookup; label
+    values are stringified only when exposed.
+    """
+
+    def __init__(self, name: str, kind: str, description: str, label_names: Sequence[str], factory: Callable):
+        self.name = name
+        self.kind = kind
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._children: Dict[tuple, Union[Histogram, Counter]] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Union[Histogram, Counter]:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def samples(self) -> List[Tuple[Labels, Union[Histogram, Counter]]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(tuple(zip(self.label_names, values)), child) for values, child in children]
+
+    def clear(self):
+        with self._lock:
+            self._children.clear()
+
+
+class MetricsRegistry:
+    """
+    Metric families behind /metrics: histograms and counters recorded in
+    process, plus collectors called at scrape time for values other modules
+    already keep (cache, executor, model stats). `expose` renders the
+    Prometheus text format (version 0.0.4).
+    """
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+        # set by share(): the directory the server workers' collections are written to
+        self._directory: Optional[Path] = None
+
+    def _family(self, name: str, kind: str, description: str, label_names: Sequence[str], factory) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(name, kind, description, label_names, factory)
+        if family.kind != kind or family.label_names != tuple(label_names):
+            raise ValueError(f"Metric {name} is already registered as a {family.kind} with labels {family.label_names}")
+        return family
+
+    def histogram(self, name: str, buckets: Sequence[float], description: str = "", label_names: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, "histogram", description, label_names, lambda: Histogram(name, buckets, description))
+
+    def counter(self, name: str, description: str = "", label_names: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, "counter", description, label_names, lambda: Counter(name, description))
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def reset(self):
+        """Drop every recorded series (families and collectors stay registered)."""
+        with self._lock:
+            families = list(self._families.values())
+        for family in families:
+            family.clear()
+
+    def collect(self) -> Dict[str, Tuple[str, str, list]]:
+        """
+        Every family with samples: name -> (kind, help, [(labels, value)]),
+        label values as strings and values as plain data (histograms as
+        their snapshot), so a collection can be written out and merged.
+        """
+        families: Dict[str, Tuple[str, str, list]] = {}
+        with self._lock:
+            registered = list(self._families.values())
+            collectors = list(self._collectors)
+        for family in registered:
+            samples = family.samples()
+            if samples:
+                families[family.name] = (family.kind, family.description, samples)
+        for collector in collectors:
+            for name, kind, description, labels, value in collector():
+                families.setdefault(name, (kind, description, []))[2].append((labels, value))
+        for kind, description, samples in families.values():
+            samples[:] = [(tuple((k, str(v)) for k, v in labels), _plain(value)) for labels, value in samples]
+        return families
+
+    def share(self, directory: str, flush_seconds: float):
+        """
+        Multi-worker mode, called in each forked server worker: this process's
+        collection is written to `directory` every flush_seconds (and on each
+        scrape), and expose() renders the merge of every worker's file, so
+        /metrics reports the whole server whichever worker answers.
+        """
+        self._directory = Path(directory)
+        self._write()
+        thread = threading.Thread(target=self._flush_loop, args=(flush_seconds,), name="metrics-flush", daemon=True)
+        thread.start()
+
+    def _write(self) -> Dict[str, Tuple[str, str, list]]:
+        families = self.collect()
+        path = self._directory / f"{os.getpid()}.json"
+        # per thread: the flush loop and a scrape may write at once
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(families))
+        os.replace(tmp, path)
+        return families
+
+    def _flush_loop(self, flush_seconds: float):
+        while True:
+            time.sleep(flush_seconds)
+            try:
+                self._write()
+            except Exception:
+                logger.exception("Writing metrics to %s failed", self._directory)
+
+    def expose(self) -> str:
+        if self._directory is None:
+            return render(self.collect())
+        collections = {str(os.getpid()): self._write()}
+        for path in self._directory.glob("*.json"):
+            if path.stem not in collections:
+                try:
+                    collections[path.stem] = json.loads(path.read_text())
+                except (OSError, ValueError):  # the worker exited meanwhile
+                    continue
+        return render(merge(collections))
+
+
+def _plain(value) -> Union[float, Dict]:
+    if isinstance(value, Histogram):
+        return value.snapshot()
+    return float(value.value if isinstance(value, Counter) else value)
+
+
+def merge(collections: Dict[str, Dict[str, Tuple[str, str, list]]]) -> Dict[str, Tuple[str, str, list]]:
+    """
+    One collection from several workers' (worker id -> collect()): counters
+    and histograms are summed per label set; gauges are kept per worker,
+    with a worker="<id>" label, as their sum is not always meaningful.
+    """
+    merged: Dict[str, Tuple[str, str, Dict]] = {}
+    for worker, families in collections.items():
+        for name, (kind, description, samples) in families.items():
+            series = merged.setdefault(name, (kind, description, {}))[2]
+            for labels, value in samples:
+                labels = tuple(tuple(pair) for pair in labels)
+                if kind == "gauge":
+                    labels += (("worker", worker),)
+                current = series.get(labels)
+                if current is None:
+                    series[labels] = value
+                elif isinstance(value, dict):
+                    series[labels] = {
+                        "buckets": {bound: current["buckets"][bound] + count for bound, count in value["buckets"].items()},
+                        "sum": current["sum"] + value["sum"],
+                        "count": current["count"] + value["count"],
+                    }
+                else:
+                    series[labels] = current + value
+    return {name: (kind, description, list(series.items())) for name, (kind, description, series) in merged.items()}
+
+
+def render(families: Dict[str, Tuple[str, str, list]]) -> str:
+    """Prometheus text format (version 0.0.4) of a collection (MetricsRegistry.collect)."""
+    lines: List[str] = []
+    for name, (kind, description, samples) in families.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if isinstance(value, dict):
+                for bound, count in value["buckets"].items():
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# process-wide registry served at /metrics
+metrics_registry = MetricsRegistry()
@@ -1,12 +1,20 @@
-import uvicorn
+import math
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
-from app.api.routers import predict_mainrace, predict_qualifying, predict_status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.routers import prediction_table, predict_mainrace, predict_qualifying, predict_status, predict_weekend
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from app.utils import dvc_pull_with_gcp_key
+from app.core import config
+from app.core.logging import InstrumentedRoute, MetricsMiddleware, profiling_allowed
+from app.core.metrics import metrics_registry
+from app.services import startup
+from app.services.inference_executor import InferenceSaturated, shutdown_inference_executor
+from app.services.micro_batcher import stop_batchers
+from app.services.model_service import model_registry
+from app.services.prediction_table import prediction_tables
 
-dvc_pull_with_gcp_key()
 # APP_MODE controls whether docs/openapi are exposed. Default to dev for local runs.
 APP_MODE: str = os.getenv("APP_MODE", "dev")
 # API_KEY is optional at import time to allow local/dev runs. Middleware will enforce it only if set.
@@ -15,20 +23,72 @@ API_KEY: str | None = os.getenv("API_KEY")
 if APP_MODE == "dev":
     load_dotenv()
 
+# served while a background startup is still running
+_STARTUP_EXEMPT_PATHS = ("/health", "/ready", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # DVC pull + unpickle every pipeline once per process (see APP_STARTUP_MODE)
+    startup.start(config.APP_STARTUP_MODE)
+    yield
+    await stop_batchers()
+    shutdown_inference_executor()
+    model_registry.clear()
+    prediction_tables.clear()
+
 def create_app() -> FastAPI:
     docs_url = None if APP_MODE == "prod" else "/docs"  # disables docs
     redoc_url = None if APP_MODE == "prod" else "/redoc"  # disables redoc
     openapi_url = None if APP_MODE == "prod" else "/openapi.json"  # disables openapi.json suggested by tobias comment.
-    created_app = FastAPI(title="f1-fantasy-ml-api",docs_url=docs_url, redoc_url=redoc_url, openapi_url=openapi_url)
+    created_app = FastAPI(title="f1-fantasy-ml-api",docs_url=docs_url, redoc_url=redoc_url, openapi_url=openapi_url, lifespan=lifespan)
+    created_app.router.route_class = InstrumentedRoute  # /health, /ready, /metrics
 
     created_app.include_router(predict_mainrace.router)
     created_app.include_router(predict_qualifying.router)
     created_app.include_router(predict_status.router)
+    created_app.include_router(predict_weekend.router)
+    created_app.include_router(prediction_table.router)
+
+    # backpressure: the inference executor / micro-batch queues are full
+    @created_app.exception_handler(InferenceSaturated)
+    async def _saturated(_request: Request, exc: InferenceSaturated):
+        retry_after = exc.retry_after or config.INFERENCE_RETRY_AFTER_SECONDS
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    # background startup: answer 503 instead of racing the artifact pull / model load
+    @created_app.middleware("http")
+    async def _wait_for_startup(request: Request, call_next):
+        if startup.startup_state.starting and request.url.path not in _STARTUP_EXEMPT_PATHS:
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "Service is starting"},
+                headers={"Retry-After": str(max(1, math.ceil(config.INFERENCE_RETRY_AFTER_SECONDS)))},
+            )
+        return await call_next(request)
+
+    # per-route / per-stage timings (outermost of the app's own middleware, see METRICS_ENABLED),
+    # plus Ml-Profile requests where APP_MODE allows them (see PROFILING_APP_MODES)
+    created_app.add_middleware(MetricsMiddleware, profiling=profiling_allowed(APP_MODE))
 
     # lightweight health endpoint that does not require an API key
     @created_app.get("/health", include_in_schema=False)
     def _health():
         return {"status": "ok"}
+
+    # readiness: 200 once startup finished and every model is loaded
+    @created_app.get("/ready", include_in_schema=False)
+    def _ready():
+        state = startup.startup_state
+        return JSONResponse(status_code=200 if state.ready else 503, content=state.snapshot())
+
+    # Prometheus text exposition of app.core.metrics.metrics_registry
+    @created_app.get("/metrics", include_in_schema=False)
+    def _metrics():
+        return PlainTextResponse(metrics_registry.expose(), media_type="text/plain; version=0.0.4")
     return created_app
 
 app = create_app()
@@ -44,8 +104,8 @@ app.add_middleware(
 
 @app.middleware("http")
 async def verify_api_key(request: Request, call_next):
-    # let health endpoint through without API key
-    if request.url.path == "/health":
+    # let health/readiness endpoints through without API key
+    if request.url.path in ("/health", "/ready"):
         return await call_next(request)
 
     # If API_KEY is set in environment, require matching header. If not set, allow requests (useful for dev).
@@ -56,5 +116,7 @@ async def verify_api_key(request: Request, call_next):
     return await call_next(request)
 
 if __name__ == "__main__":
+    from app import server
+
     port = int(os.environ.get("PORT", 8080))
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port)
\ No newline at end of file
+    raise SystemExit(server.serve("0.0.0.0", port, config.SERVER_WORKERS, preload_models=config.SERVER_PRELOAD))
\ No newline at end of file
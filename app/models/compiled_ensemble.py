@@ -0,0 +1,188 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit, softmax
+from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
+
+
+class CompiledEnsemble:
+    """
+    A fitted GradientBoostingRegressor / GradientBoostingClassifier flattened
+    into packed NumPy arrays, one row per node across all trees:
+    - feature, threshold: split column and cut point (leaves: 0, +inf)
+    - left, right: global child indices (leaves point at themselves)
+    - value: leaf output already multiplied by the learning rate
+    Trees for output k are the slice roots[k]; `decision_function` walks every
+    tree for a whole batch at once, `max_depth` vectorized steps in total.
+    """
+
+    chunk_rows = 64
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        baseline: np.ndarray,
+        max_depth: int,
+        is_classifier: bool,
+        classes: Optional[np.ndarray] = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # interleaved (left, right) pairs: child of node n is children[2n + went_right]
+        self.children = np.column_stack([left, right]).ravel()
+        self.value = value
+        self.roots = roots  # (n_outputs, n_trees) global root node ids
+        self.baseline = baseline  # (n_outputs,) init estimator raw prediction
+        self.max_depth = max_depth
+        self.is_classifier = is_classifier
+        self.classes_ = classes
+
+    @classmethod
+    def from_estimator(cls, model) -> "CompiledEnsemble":
+        if not isinstance(model, (GradientBoostingRegressor, GradientBoostingClassifier)):
+            raise TypeError(f"Cannot compile {type(model).__name__}; expected a fitted gradient boosting model")
+        if model.init_ != "zero" and not type(model.init_).__name__.startswith("Dummy"):
+            raise TypeError("Only constant init estimators (the default) can be compiled")
+
+        estimators = model.estimators_  # (n_estimators, n_outputs)
+        n_estimators, n_outputs = estimators.shape
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        roots = np.empty((n_outputs, n_estimators), dtype=np.intp)
+        offset = 0
+        max_depth = 0
+        for k in range(n_outputs):
+            for i in range(n_estimators):
+                tree = estimators[i, k].tree_
+                n = tree.node_count
+                leaf = tree.children_left == -1
+                own = np.arange(offset, offset + n, dtype=np.intp)
+                features.append(np.where(leaf, 0, tree.feature).astype(np.intp))
+                thresholds.append(np.where(leaf, np.inf, tree.threshold))
+                lefts.append(np.where(leaf, own, tree.children_left + offset).astype(np.intp))
+                rights.append(np.where(leaf, own, tree.children_right + offset).astype(np.intp))
+                values.append(model.learning_rate * tree.value[:, 0, 0])
+                roots[k, i] = offset
+                offset += n
+                max_depth = max(max_depth, tree.max_depth)
+
+        compiled = cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=roots,
+            baseline=np.zeros(n_outputs),
+            max_depth=max_depth,
+            is_classifier=isinstance(model, GradientBoostingClassifier),
+            classes=getattr(model, "classes_", None),
+        )
+        # the default init estimators are constant, so recover their raw output
+        # from the public decision function on any row
+        probe = np.zeros((1, model.n_features_in_))
+        raw = model.decision_function(probe) if compiled.is_classifier else model.predict(probe)
+        compiled.baseline = np.asarray(raw, dtype=np.float64).reshape(n_outputs) - compiled._tree_sum(probe)[0]
+        return compiled
+
+    def _tree_sum(self, X: np.ndarray) -> np.ndarray:
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if not np.isfinite(X).all():
+            # gradient boosting estimators reject NaN/inf; do the same rather than route them silently
+            raise ValueError("Input X contains NaN or infinity.")
+        n_rows, n_features = X.shape
+        n_outputs = self.roots.shape[0]
+        out = np.empty((n_rows, n_outputs), dtype=np.float64)
+        flat = X.ravel()
+        # bounded row chunks keep the (rows, trees) node matrix cache-sized
+        for start in range(0, n_rows, self.chunk_rows):
+            stop = min(start + self.chunk_rows, n_rows)
+            row_offsets = (np.arange(start, stop, dtype=np.intp) * n_features)[:, None]
+            for k in range(n_outputs):
+                nodes = np.broadcast_to(self.roots[k], (stop - start, self.roots.shape[1]))
+                for _ in range(self.max_depth):
+                    go_right = flat.take(row_offsets + self.feature.take(nodes)) > self.threshold.take(nodes)
+                    nodes = self.children.take(2 * nodes + go_right)
+                out[start:stop, k] = self.value.take(nodes).sum(axis=1)
+        return out
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """
+        Raw ensemble output for transformed features X: (n_samples,) for
+        regression and binary classification, (n_samples, n_classes) otherwise.
+        """
+        raw = self._tree_sum(X) + self.baseline
+        return raw.ravel() if raw.shape[1] == 1 else raw
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        raw = self.decision_function(X)
+        if not self.is_classifier:
+            return raw
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classifiers")
+        raw = self.decision_function(X)
+        if raw.ndim == 1:
+            proba = expit(raw)
+            return np.column_stack([1.0 - proba, proba])
+        return softmax(raw, axis=1)
+
+
+class CompiledPipeline:
+    """
+    Drop-in for a fitted Pipeline([("preprocessing", ...), ("models", gbr)]):
+    the fitted preprocessing step (or its FastPreprocessor) is reused and the
+    final estimator is replaced by a CompiledEnsemble. Exposes predict / predict_proba on raw
+    feature DataFrames, like the sklearn pipeline.
+
+    The vectorized walk wins on small batches (single-row requests, grids) but
+    sklearn's per-row Cython traversal is faster on large ones, so batches above
+    `max_rows` are scored by the original estimator when it is kept.
+    """
+
+    def __init__(self, preprocessor, ensemble: CompiledEnsemble, estimator=None, max_rows: Optional[int] = None):
+        self.preprocessor = preprocessor
+        self.ensemble = ensemble
+        self.estimator = estimator
+        self.max_rows = max_rows
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        Xt = self.preprocessor.transform(df)
+        return Xt.toarray() if hasattr(Xt, "toarray") else np.asarray(Xt)
+
+    def _scorer(self, n_rows: int):
+        if self.estimator is not None and self.max_rows is not None and n_rows > self.max_rows:
+            return self.estimator
+        return self.ensemble
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        Xt = self.transform(df)
+        return self._scorer(Xt.shape[0]).predict(Xt)
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        Xt = self.transform(df)
+        return self._scorer(Xt.shape[0]).predict_proba(Xt)
+
+
+def compile_pipeline(pipeline, max_rows: Optional[int] = None, preprocessor=None) -> CompiledPipeline:
+    """
+    Export step: flatten the gradient boosting estimator at the end of a fitted
+    mainrace/qualifying/status pipeline into packed arrays. Raises TypeError
+    for estimators that cannot be compiled (e.g. the random forest fallback).
+    - max_rows: batches larger than this fall back to the sklearn estimator (None: never)
+    - preprocessor: replacement for the fitted preprocessing steps (e.g. a FastPreprocessor)
+    """
+    estimator = pipeline[-1]
+    if preprocessor is None:
+        preprocessor = pipeline[:-1]
+    return CompiledPipeline(preprocessor, CompiledEnsemble.from_estimator(estimator), estimator=estimator, max_rows=max_rows)
@@ -0,0 +1,216 @@
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, RobustScaler
+
+from app.models.representation import COMPACT_STEP, Float32Features
+
+
+def _category_lookup(categories: np.ndarray) -> tuple[Dict, int]:
+    """
+    value -> position in a fitted OneHotEncoder category array, plus the
+    position of the NaN category (-1 if none), since NaN never equals itself.
+    """
+    lookup, nan_index = {}, -1
+    for i, value in enumerate(categories.tolist()):
+        if isinstance(value, float) and math.isnan(value):
+            nan_index = i
+        else:
+            lookup.setdefault(value, i)
+    return lookup, nan_index
+
+
+class FastPreprocessor:
+    """
+    Serving-time replacement for the fitted ColumnTransformer of the
+    mainrace/qualifying/status pipelines (RobustScaler on the numeric columns,
+    OneHotEncoder on the categorical ones). The fitted state is precomputed:
+    - center, scale: RobustScaler statistics as arrays
+    - one dict per categorical column mapping value -> output column index
+    `transform` writes straight into a preallocated matrix laid out like
+    ColumnTransformer's output, and is bit-identical to `preprocessor.transform`
+    (followed by the pipeline's "compact" float32 step, when it has one).
+    """
+
+    def __init__(
+        self,
+        numeric_cols: List[str],
+        center: Optional[np.ndarray],
+        scale: Optional[np.ndarray],
+        categorical_cols: List[str],
+        lookups: List[Dict],
+        nan_indices: List[int],
+        offsets: np.ndarray,
+        n_output: int,
+        handle_unknown: str = "ignore",
+        dtype=np.float64,
+        sparse_output: bool = False,
+        output_dtype=None,
+    ):
+        self.numeric_cols = numeric_cols
+        self.center = center
+        self.scale = scale
+        self.categorical_cols = categorical_cols
+        self.lookups = lookups
+        self.nan_indices = nan_indices
+        self.offsets = offsets  # first output column of each categorical column
+        self.n_output = n_output
+        self.handle_unknown = handle_unknown
+        self.dtype = dtype
+        self.sparse_output = sparse_output
+        self.output_dtype = np.dtype(output_dtype or np.result_type(dtype, np.float64))
+
+    @classmethod
+    def from_column_transformer(cls, ct: ColumnTransformer, sparse_output: Optional[bool] = None) -> "FastPreprocessor":
+        """
+        Build from a fitted ColumnTransformer. Raises TypeError for layouts the
+        fast path does not reproduce (other transformers, non-empty remainder,
+        dropped or infrequent categories), so callers can keep the original.
+        - sparse_output: return CSR matrices (default: whatever the ColumnTransformer returns)
+        """
+        if not isinstance(ct, ColumnTransformer) or not hasattr(ct, "transformers_"):
+            raise TypeError("Expected a fitted ColumnTransformer")
+        scaler, numeric_cols, encoder, categorical_cols = None, [], None, []
+        for name, transformer, columns in ct.transformers_:
+            if name == "remainder":
+                if transformer != "drop" and len(columns):
+                    raise TypeError("Remainder columns are not supported")
+                continue
+            if transformer == "drop" or not len(columns):
+                continue
+            if not all(isinstance(c, str) for c in columns):
+                raise TypeError("Columns must be selected by name")
+            if isinstance(transformer, RobustScaler) and scaler is None and encoder is None:
+                scaler, numeric_cols = transformer, list(columns)
+            elif isinstance(transformer, OneHotEncoder) and encoder is None:
+                encoder, categorical_cols = transformer, list(columns)
+            else:
+                raise TypeError(f"Unsupported transformer {name!r}: {type(transformer).__name__}")
+        if encoder is not None:
+            if encoder.drop_idx_ is not None or getattr(encoder, "_infrequent_enabled", False):
+                raise TypeError("Dropped or infrequent categories are not supported")
+
+        lookups, nan_indices, sizes = [], [], []
+        for categories in (encoder.categories_ if encoder is not None else []):
+            lookup, nan_index = _category_lookup(categories)
+            lookups.append(lookup)
+            nan_indices.append(nan_index)
+            sizes.append(len(categories))
+        offsets = len(numeric_cols) + np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+
+        return cls(
+            numeric_cols=numeric_cols,
+            center=scaler.center_ if scaler is not None and scaler.with_centering else None,
+            scale=scaler.scale_ if scaler is not None and scaler.with_scaling else None,
+            categorical_cols=categorical_cols,
+            lookups=lookups,
+            nan_indices=nan_indices,
+            offsets=offsets,
+            n_output=len(numeric_cols) + int(sum(sizes)),
+            handle_unknown=encoder.handle_unknown if encoder is not None else "ignore",
+            dtype=encoder.dtype if encoder is not None else np.float64,
+            sparse_output=ct.sparse_output_ if sparse_output is None else sparse_output,
+        )
+
+    @classmethod
+    def from_pipeline(cls, pipeline, sparse_output: Optional[bool] = None) -> "FastPreprocessor":
+        """
+        Build from a fitted Pipeline([("preprocessing", ColumnTransformer), ("models", ...)]),
+        optionally with a Float32Features "compact" step in between (see
+        app.models.representation), whose float32 layout it then produces.
+        - sparse_output: return CSR matrices (default: whatever the pipeline feeds its estimator)
+        """
+        steps = getattr(pipeline, "named_steps", {})
+        if "preprocessing" not in steps:
+            raise TypeError("Pipeline has no 'preprocessing' step")
+        compact = steps.get(COMPACT_STEP)
+        if compact is not None and not isinstance(compact, Float32Features):
+            raise TypeError(f"Unsupported compact step: {type(compact).__name__}")
+        if len(steps) != 2 + (compact is not None):
+            raise TypeError("Unsupported pipeline steps")
+        fast = cls.from_column_transformer(
+            steps["preprocessing"],
+            sparse_output=compact.sparse if compact is not None and sparse_output is None else sparse_output,
+        )
+        if compact is not None:
+            fast.output_dtype = np.dtype(np.float32)
+        return fast
+
+    def _scaled(self, df: pd.DataFrame) -> np.ndarray:
+        # column-by-column reads avoid building a sub-frame, which dominates single-row calls
+        X = np.empty((len(df), len(self.numeric_cols)), dtype=np.float64)
+        for j, column in enumerate(self.numeric_cols):
+            X[:, j] = df[column].to_numpy(dtype=np.float64)
+        # same operations, same order as RobustScaler.transform
+        if self.center is not None:
+            X -= self.center
+        if self.scale is not None:
+            X /= self.scale
+        return X
+
+    def _codes(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        (n_rows, n_categorical) output column index of each value, -1 for unknowns.
+        """
+        codes = np.empty((len(df), len(self.categorical_cols)), dtype=np.intp)
+        for j, (lookup, nan_index) in enumerate(zip(self.lookups, self.nan_indices)):
+            column = df[self.categorical_cols[j]].tolist()
+            found = [lookup.get(value, -1) for value in column]
+            if nan_index >= 0 and -1 in found:
+                found = [
+                    nan_index if index < 0 and isinstance(value, float) and math.isnan(value) else index
+                    for index, value in zip(found, column)
+                ]
+            codes[:, j] = found
+        if self.handle_unknown == "error" and (codes < 0).any():
+            raise ValueError("Found unknown categories during transform")
+        known = codes >= 0
+        return np.where(known, codes + self.offsets, -1)
+
+    def transform(self, df: pd.DataFrame):
+        missing = set(self.numeric_cols).union(self.categorical_cols).difference(df.columns)
+        if missing:
+            raise ValueError(f"columns are missing: {missing}")
+        n_rows = len(df)
+        n_numeric = len(self.numeric_cols)
+        scaled = self._scaled(df) if n_numeric else np.empty((n_rows, 0))
+        codes = self._codes(df) if self.categorical_cols else np.empty((n_rows, 0), dtype=np.intp)
+        hot_rows, hot_cols = np.nonzero(codes >= 0)
+        hot_cols = codes[hot_rows, hot_cols]
+
+        if self.sparse_output:
+            num_rows, num_cols = np.nonzero(scaled)
+            rows = np.concatenate([num_rows, hot_rows])
+            cols = np.concatenate([num_cols, hot_cols])
+            data = np.concatenate([scaled[num_rows, num_cols], np.ones(len(hot_rows))]).astype(self.output_dtype, copy=False)
+            return sp.csr_matrix((data, (rows, cols)), shape=(n_rows, self.n_output))
+
+        out = np.zeros((n_rows, self.n_output), dtype=self.output_dtype)
+        out[:, :n_numeric] = scaled
+        out[hot_rows, hot_cols] = 1.0
+        return out
+
+
+class FastPipeline:
+    """
+    Fitted pipeline served with a FastPreprocessor in front of the original
+    final estimator. Exposes predict / predict_proba on raw feature
+    DataFrames, like the sklearn pipeline.
+    """
+
+    def __init__(self, preprocessor: FastPreprocessor, estimator):
+        self.preprocessor = preprocessor
+        self.estimator = estimator
+
+    def transform(self, df: pd.DataFrame):
+        return self.preprocessor.transform(df)
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.estimator.predict(self.transform(df))
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        return self.estimator.predict_proba(self.transform(df))
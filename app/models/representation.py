@@ -0,0 +1,70 @@
+from typing import List
+
+import numpy as np
+from scipy import sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.preprocessing import OneHotEncoder
+
+# How the preprocessing step hands the transformed features to the estimator:
+# - "dense": float64 ndarray (the original layout)
+# - "float32": float32 ndarray, the dtype the tree estimators convert to anyway
+# - "sparse": float32 CSR matrix (about one stored value per input column and row)
+# The compact variants never build the dense float64 matrix: the one-hot
+# columns stay sparse through the ColumnTransformer and are cast (and, for
+# "float32", densified) by a "compact" step before the estimator.
+REPRESENTATIONS = ("dense", "float32", "sparse")
+COMPACT_STEP = "compact"
+
+
+def check_representation(representation: str) -> str:
+    if representation not in REPRESENTATIONS:
+        raise ValueError(f"Unknown feature representation: {representation} (expected one of {REPRESENTATIONS})")
+    return representation
+
+
+class Float32Features(TransformerMixin, BaseEstimator):
+    """
+    Stateless pipeline step casting the ColumnTransformer output to float32,
+    as a CSR matrix (`sparse`) or a dense array.
+    """
+
+    def __init__(self, sparse: bool = False):
+        self.sparse = sparse
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        if sp.issparse(X):
+            X = X.astype(np.float32).tocsr()
+            if self.sparse:
+                return X
+            # written in full first: pages np.zeros leaves untouched map the shared
+            # zero page, which makes the tree splitters' scans markedly slower
+            out = np.empty(X.shape, dtype=np.float32)
+            out.fill(0.0)
+            return X.toarray(out=out)
+        X = np.asarray(X, dtype=np.float32)
+        return sp.csr_matrix(X) if self.sparse else X
+
+    def __sklearn_is_fitted__(self) -> bool:
+        return True
+
+
+def one_hot_encoder(representation: str = "dense") -> OneHotEncoder:
+    """The pipelines' OneHotEncoder for a feature representation."""
+    if check_representation(representation) == "dense":
+        return OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    return OneHotEncoder(handle_unknown="ignore", sparse_output=True, dtype=np.float32)
+
+
+def sparse_threshold(representation: str = "dense") -> float:
+    """ColumnTransformer sparse_threshold: the compact variants always stack sparse."""
+    return 1.0 if check_representation(representation) != "dense" else 0.3
+
+
+def compact_steps(representation: str = "dense") -> List[tuple]:
+    """Pipeline steps between "preprocessing" and "models" for a feature representation."""
+    if check_representation(representation) == "dense":
+        return []
+    return [(COMPACT_STEP, Float32Features(sparse=representation == "sparse"))]
@@ -1,15 +1,18 @@
 from typing import Iterable, Optional, Sequence
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, RobustScaler
+from sklearn.preprocessing import RobustScaler
 from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
 
+from app.models.representation import compact_steps, one_hot_encoder, sparse_threshold
+
 
 def build_status_pipeline(
     numeric_cols: Optional[Sequence[str]] = None,
     categorical_cols: Optional[Sequence[str]] = None,
     passthrough_cols: Optional[Sequence[str]] = None,
     estimator: str = "gbr",
+    representation: str = "dense",
 ):
 
     # sensible defaults matching research/Thesis.ipynb
@@ -36,9 +39,10 @@ def build_status_pipeline(
     preprocessor = ColumnTransformer(
         transformers=[
             ("num", RobustScaler(), list(numeric_cols)),
-            ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), list(categorical_cols)),
+            ("cat", one_hot_encoder(representation), list(categorical_cols)),
         ],
         remainder="passthrough",  # passthrough_cols will remain, but ColumnTransformer doesn't accept explicit passthrough list; caller should ensure ordering if needed
+        sparse_threshold=sparse_threshold(representation),
     )
 
     est_lower = (estimator or "gbr").lower()
@@ -61,5 +65,6 @@ def build_status_pipeline(
             min_samples_split=10,
             n_estimators=800)
 
-    pipeline = Pipeline([("preprocessing", preprocessor), ("models", model)])
+    # representation: "dense", "float32" or "sparse" features (app.models.representation)
+    pipeline = Pipeline([("preprocessing", preprocessor), *compact_steps(representation), ("models", model)])
     return pipeline
\ No newline at end of file
@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:  # pyarrow ships with the dvc/autogluon dependency tree; pickled DataFrames otherwise
+    import pyarrow
+    import pyarrow.feather
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# jolpica-dump tables of the base join, in merge order
+JOLPICA_TABLES = ("round", "session", "roundentry", "sessionentry", "teamdriver", "driver", "team", "circuit", "lap")
+# part of the cache key: bump when build_base_join changes, so older cache files are not read
+BASE_JOIN_VERSION = 1
+
+
+def jolpica_paths(raw_base: Path, sources: Optional[Dict[str, Path]] = None) -> Dict[str, Path]:
+    """CSV per table of JOLPICA_TABLES: raw_base/jolpica-dump/formula_one_<table>.csv unless in `sources`."""
+    sources = sources or {}
+    return {
+        table: Path(sources.get(table, raw_base / "jolpica-dump" / f"formula_one_{table}.csv"))
+        for table in JOLPICA_TABLES
+    }
+
+
+def raw_tables_hash(paths: Dict[str, Path]) -> str:
+    """sha256 of the base join's input CSVs (contents, in table order) and BASE_JOIN_VERSION."""
+    digest = hashlib.sha256(f"base_join v{BASE_JOIN_VERSION}".encode())
+    for table in JOLPICA_TABLES:
+        digest.update(f"\0{table}\0".encode())
+        with open(paths[table], "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_base_join(paths: Dict[str, Path]) -> pd.DataFrame:
+    """
+    The notebook merge chain shared by every preprocessing pipeline (same as
+    Thesis.ipynb): round -> session -> roundentry -> sessionentry ->
+    teamdriver -> driver -> team -> circuit -> lap, one row per lap of each
+    session entry (left joins: sessions without entries, entries without laps
+    are kept).
+    """
+    rounds = pd.read_csv(paths["round"])
+    sessions = pd.read_csv(paths["session"])
+    round_entries = pd.read_csv(paths["roundentry"])
+    session_entries = pd.read_csv(paths["sessionentry"])
+    team_drivers = pd.read_csv(paths["teamdriver"])
+    drivers = pd.read_csv(paths["driver"])
+    teams = pd.read_csv(paths["team"])
+    circuits = pd.read_csv(paths["circuit"])
+    laps = pd.read_csv(paths["lap"])
+
+    df1 = pd.merge(rounds, sessions, how='left', left_on='id', right_on='round_id', suffixes=('_round', '_session'))
+    df2 = pd.merge(df1, round_entries, how='left', left_on='id_round', right_on='round_id',
+                   suffixes=('', '_round_entry'))
+    df2 = df2.rename(columns={'id': 'id_round_entry'})
+    df3 = pd.merge(df2, session_entries, how='left', left_on=['id_round_entry', 'id_session'],
+                   right_on=['round_entry_id', 'session_id'], suffixes=('', '_session_entry'))
+    df3 = df3.rename(columns={'id': 'id_session_entry'})
+    df4 = pd.merge(df3, team_drivers, how='left', left_on='team_driver_id', right_on='id',
+                   suffixes=('', '_team_driver'))
+    df4 = df4.rename(columns={'id': 'id_team_driver'})
+    df5 = pd.merge(df4, drivers, how='left', left_on='driver_id', right_on='id', suffixes=('', '_driver'))
+    df5 = df5.rename(columns={'id': 'id_driver'})
+    df6 = pd.merge(df5, teams, how='left', left_on='team_id', right_on='id', suffixes=('', '_team'))
+    df6 = df6.rename(columns={'id': 'id_team'})
+    df7 = pd.merge(df6, circuits, how='left', left_on='circuit_id', right_on='id', suffixes=('', '_circuit'))
+    df7 = df7.rename(columns={'id': 'id_circuit'})
+    df8 = pd.merge(df7, laps, how='left', left_on='id_session_entry', right_on='session_entry_id',
+                   suffixes=('', '_lap'))
+    df8 = df8.rename(columns={'id': 'id_lap'})
+    return df8
+
+
+def base_join_path(cache_dir: Path, digest: str, suffix: str = "feather") -> Path:
+    return Path(cache_dir) / f"base_join_{digest[:16]}.{suffix}"
+
+
+def _write_cache(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        if path.suffix == ".feather":
+            # Arrow IPC, lz4: several times faster to write and read back than parquet
+            df.to_feather(tmp, compression="lz4")
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    # one cache per input: drop the files of earlier CSVs
+    for stale in path.parent.glob("base_join_*"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def _project(df: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+    return df[columns].copy() if columns is not None else df
+
+
+def _read_cache(path: Path, columns: Optional[List[str]]) -> pd.DataFrame:
+    if path.suffix != ".feather":
+        return _project(pd.read_pickle(path), columns)
+    table = pyarrow.feather.read_table(path, columns=columns)
+    with_nulls = {name for name in table.column_names if table.column(name).null_count}
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    # Arrow reads missing strings back as None: restore read_csv's NaN
+    for column in df.columns[df.dtypes == object]:
+        if column in with_nulls:
+            values = df[column].to_numpy(copy=True)
+            values[pd.isna(values)] = np.nan
+            df[column] = values
+    return df
+
+
+def load_base_join(
+    raw_dir: Optional[str] = "data/raw",
+    cache_dir: Optional[str] = "data/processed/cache",
+    columns: Optional[List[str]] = None,
+    sources: Optional[Dict[str, Path]] = None,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    build_base_join over the jolpica-dump CSVs under raw_dir (or `sources`),
+    computed once per input: the result is kept in cache_dir as a columnar
+    file (Arrow feather with pyarrow, else a pickled DataFrame) named after
+    raw_tables_hash, and read back while the CSVs are unchanged. `columns`
+    reads only those columns. use_cache=False always joins (and writes nothing).
+    """
+    project_root = Path(__file__).resolve().parents[2]
+    raw_base = Path(raw_dir) if raw_dir and Path(raw_dir).is_absolute() else (project_root / (raw_dir or "data/raw"))
+    paths = jolpica_paths(raw_base, sources)
+    if not use_cache:
+        df = build_base_join(paths)
+        return _project(df, columns)
+
+    cache_base = Path(cache_dir) if cache_dir and Path(cache_dir).is_absolute() else (project_root / (cache_dir or "data/processed/cache"))
+    digest = raw_tables_hash(paths)
+    for suffix in ("feather", "pkl"):
+        path = base_join_path(cache_base, digest, suffix)
+        if path.exists():
+            return _read_cache(path, columns)
+
+    df = build_base_join(paths)
+    path = base_join_path(cache_base, digest, "feather" if pyarrow is not None else "pkl")
+    try:
+        _write_cache(df, path)
+    except (TypeError, ValueError) as e:  # pyarrow: e.g. a column mixing numbers and strings
+        logger.warning("Base join not cached as feather, pickling it: %s", e)
+        path = base_join_path(cache_base, digest, "pkl")
+        _write_cache(df, path)
+    logger.info("Cached base join (%d rows) at %s", len(df), path)
+    return _project(df, columns)
@@ -2,8 +2,12 @@ import os
 from pathlib import Path
 from typing import  List, Optional
 import pandas as pd
+from app.preprocess.preprocess_base import load_base_join
 from app.schemas.dto import Race
 
+# base join columns build_driver_country_table reads
+BASE_JOIN_DRIVER_COLUMNS = ["driver_id", "date_round", "reference", "country_code", "date_of_birth"]
+
 def build_all_general_processed_data():
     build_driver_country_table()
     build_constructor_country_table()
@@ -12,43 +16,31 @@ def build_all_general_processed_data():
 def build_driver_country_table(
     drivers_path: Optional[str] = None,
     save_to: str = "data/processed/drivers.csv",
+    raw_dir: Optional[str] = "data/raw",
+    cache_dir: Optional[str] = "data/processed/cache",
+    use_cache: bool = True,
 ):
     """
     Build and persist unique driver table with alpha-3 nationality.
     - If drivers_path is None, loads data/raw/jolpica-dump/formula_one_driver.csv.
     - Assumes the driver CSV has columns: reference (driverRef), country_code
+    - Reads its columns of the jolpica-dump base join (first race dates need
+      the rounds each driver entered), shared with the serve_*_df pipelines and
+      cached under cache_dir (see app.preprocess.preprocess_base.load_base_join)
     - Saves to drivers.csv with columns: driverRef, driver_nationality, driver_date_of_birth, first_race_date
     """
     project_root = Path(__file__).resolve().parents[2]
     # Resolve drivers CSV
-    if drivers_path is None:
-        raw_path = project_root / "data" / "raw" / "jolpica-dump" / "formula_one_driver.csv"
-    else:
+    sources = None
+    if drivers_path is not None:
         raw_path = Path(drivers_path)
         if not raw_path.is_absolute():
             raw_path = project_root / raw_path
+        sources = {"driver": raw_path}
 
-    drivers = pd.read_csv(raw_path)
-    rounds = pd.read_csv(project_root / "data" / "raw" /"jolpica-dump" / "formula_one_round.csv")
-    round_entries = pd.read_csv(project_root / "data" / "raw" /"jolpica-dump" / "formula_one_roundentry.csv")
-    sessions = pd.read_csv(project_root / "data" / "raw" /"jolpica-dump" / "formula_one_session.csv")
-    session_entries = pd.read_csv(project_root / "data" / "raw" /"jolpica-dump" / "formula_one_sessionentry.csv")
-    team_drivers = pd.read_csv(project_root / "data" / "raw" /"jolpica-dump" / "formula_one_teamdriver.csv")
-
-    df1 = pd.merge(rounds, sessions, how='left', left_on='id', right_on='round_id', suffixes=('_round', '_session'))
-    df2 = pd.merge(df1, round_entries, how='left', left_on='id_round', right_on='round_id',
-                   suffixes=('', '_round_entry'))
-    df2 = df2.rename(columns={'id': 'id_round_entry'})
-    df3 = pd.merge(df2, session_entries, how='left', left_on=['id_round_entry', 'id_session'],
-                   right_on=['round_entry_id', 'session_id'], suffixes=('', '_session_entry'))
-    df3 = df3.rename(columns={'id': 'id_session_entry'})
-    df4 = pd.merge(df3, team_drivers, how='left', left_on='team_driver_id', right_on='id',
-                   suffixes=('', '_team_driver'))
-    df4 = df4.rename(columns={'id': 'id_team_driver'})
-    df5 = pd.merge(df4, drivers, how='left', left_on='driver_id', right_on='id', suffixes=('', '_driver'))
-    df5 = df5.rename(columns={'id': 'id_driver'})
-
-    data = df5
+    data = load_base_join(
+        raw_dir, cache_dir, columns=BASE_JOIN_DRIVER_COLUMNS, sources=sources, use_cache=use_cache,
+    )
 
     # rename/normalize columns used in notebook
     rename_map = {
@@ -4,6 +4,7 @@ import pandas as pd
 from typing import Optional
 import re
 
+from app.preprocess.preprocess_base import load_base_join
 from app.preprocess.preprocess_helper import export_unique_data
 
 
@@ -12,16 +13,16 @@ def serve_status_df(
     processed_dir: Optional[str] = "data/processed",
     date_col: str = "date",
     year_from: int = 1981,
+    use_cache: bool = True,
     ) -> pd.DataFrame:
     """
     Build the merged DataFrame used as input to
     [`app.preprocess.create_training_datasets`](app/preprocess/preprocess_qualifying.py).
 
-    - Loads raw CSVs from data/raw by default:
-      data/raw/races.csv, results.csv, qualifying.csv, drivers.csv,
-      constructors.csv, circuits.csv, status.csv, lap_times.csv
-    - Performs the merges from the notebook:
-      races -> results -> qualifying -> drivers -> constructors -> circuits
+    - Starts from the jolpica-dump base join under data/raw by default
+      (app.preprocess.preprocess_base.load_base_join: computed once and cached
+      under processed_dir/cache while the CSVs are unchanged; use_cache=False
+      joins afresh)
     - Normalizes race dates, driver DOB, computes race_year/month/day,
       age_at_gp_in_days, first_race_date, days_since_first_race.
     """
@@ -30,41 +31,11 @@ def serve_status_df(
     processed_base = Path(processed_dir) if processed_dir and Path(processed_dir).is_absolute() else (project_root / (processed_dir or "data" / "processed"))
 
     # load raw CSVs (fail early if missing)
-    rounds = pd.read_csv(raw_base / "jolpica-dump/formula_one_round.csv")
-    round_entries = pd.read_csv(raw_base / "jolpica-dump/formula_one_roundentry.csv")
-    sessions = pd.read_csv(raw_base / "jolpica-dump/formula_one_session.csv")
-    session_entries = pd.read_csv(raw_base / "jolpica-dump/formula_one_sessionentry.csv")
-    team_drivers = pd.read_csv(raw_base / "jolpica-dump/formula_one_teamdriver.csv")
-    drivers = pd.read_csv(raw_base / "jolpica-dump/formula_one_driver.csv")
-    teams = pd.read_csv(raw_base / "jolpica-dump/formula_one_team.csv")
-    circuits = pd.read_csv(raw_base / "jolpica-dump/formula_one_circuit.csv")
-    laps = pd.read_csv(raw_base / "jolpica-dump/formula_one_lap.csv")
-
     race_weather = pd.read_csv(raw_base / "race_weather.csv")
     circuit_type = pd.read_csv(raw_base / "circuit_type.csv")
 
-    # Notebook merge order (same as Thesis.ipynb)
-    df1 = pd.merge(rounds, sessions, how='left', left_on='id', right_on='round_id', suffixes=('_round', '_session'))
-    df2 = pd.merge(df1, round_entries, how='left', left_on='id_round', right_on='round_id',
-                   suffixes=('', '_round_entry'))
-    df2 = df2.rename(columns={'id': 'id_round_entry'})
-    df3 = pd.merge(df2, session_entries, how='left', left_on=['id_round_entry', 'id_session'],
-                   right_on=['round_entry_id', 'session_id'], suffixes=('', '_session_entry'))
-    df3 = df3.rename(columns={'id': 'id_session_entry'})
-    df4 = pd.merge(df3, team_drivers, how='left', left_on='team_driver_id', right_on='id',
-                   suffixes=('', '_team_driver'))
-    df4 = df4.rename(columns={'id': 'id_team_driver'})
-    df5 = pd.merge(df4, drivers, how='left', left_on='driver_id', right_on='id', suffixes=('', '_driver'))
-    df5 = df5.rename(columns={'id': 'id_driver'})
-    df6 = pd.merge(df5, teams, how='left', left_on='team_id', right_on='id', suffixes=('', '_team'))
-    df6 = df6.rename(columns={'id': 'id_team'})
-    df7 = pd.merge(df6, circuits, how='left', left_on='circuit_id', right_on='id', suffixes=('', '_circuit'))
-    df7 = df7.rename(columns={'id': 'id_circuit'})
-    df8 = pd.merge(df7, laps, how='left', left_on='id_session_entry', right_on='session_entry_id',
-                   suffixes=('', '_lap'))
-    df8 = df8.rename(columns={'id': 'id_lap'})
-
-    data = df8
+    # base join shared by every pipeline (app.preprocess.preprocess_base), cached per raw CSV hash
+    data = load_base_join(raw_base, processed_base / "cache", use_cache=use_cache)
 
     data = data.drop(['abbreviation', 'altitude', 'average_speed', 'base_team_id',
                       'car_number', 'circuit_id', 'country', 'date_session', 'detail',
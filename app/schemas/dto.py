@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import date
 from pydantic import BaseModel, Field
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 
 class Race(BaseModel):
     raceId: Optional[int]
@@ -35,6 +35,60 @@ class MainRacePredictResponse(BaseModel):
     predictions: List[MainRacePredictionItem] = Field(..., description="List of prediction results")
     model_meta: Dict[str, Any] = Field(..., description="Model metadata / provenance")
 
+class MainRaceGridRace(BaseModel):
+    circuit: str
+    race_date: date
+    laps: int
+    rain: Optional[int] = 0
+
+class MainRaceGridEntry(BaseModel):
+    driver: str
+    constructor: str
+    qualification_position: int
+
+class MainRaceGridPredictInput(BaseModel):
+    race: MainRaceGridRace = Field(..., description="Race-level inputs shared by every entry")
+    entries: List[MainRaceGridEntry] = Field(..., min_length=1, description="One entry per car on the grid")
+
+class MainRaceGridPredictionItem(BaseModel):
+    entry: MainRaceGridEntry
+    features: Dict[str, Any] = Field(..., description="Per-entry features (race-level ones are in race_features)")
+    predicted_deviation_from_median: float = Field(..., description="Model predicted deviation (ms)")
+    predicted_final_position: int = Field(..., description="Rank of the entry in this race")
+
+class MainRaceGridPredictResponse(BaseModel):
+    race: MainRaceGridRace
+    race_features: Dict[str, Any] = Field(..., description="Race-level features shared by every entry")
+    predictions: List[MainRaceGridPredictionItem] = Field(..., description="One result per entry, in request order")
+    model_meta: Dict[str, Any] = Field(..., description="Model metadata / provenance")
+
+class MainRaceSimulateInput(BaseModel):
+    race: MainRaceGridRace = Field(..., description="Race-level inputs shared by every entry")
+    entries: List[MainRaceGridEntry] = Field(
+        ..., min_length=1, max_length=26, description="One entry per car on the grid (at most 26)"
+    )
+    simulations: Optional[int] = Field(None, ge=1, description="Simulated races (default SIMULATION_DEFAULT_RUNS)")
+    seed: Optional[int] = Field(None, description="Random seed, for reproducible distributions")
+
+class MainRaceSimulationItem(BaseModel):
+    entry: MainRaceGridEntry
+    features: Dict[str, Any] = Field(..., description="Per-entry features (race-level ones are in race_features)")
+    predicted_deviation_from_median: float = Field(..., description="Main race model deviation (ms)")
+    predicted_final_position: int = Field(..., description="Rank of the point estimate in this race")
+    dnf_percentage: float = Field(..., description="Status model DNF percentage (0-100)")
+    win_probability: float = Field(..., description="Share of simulated races won")
+    podium_probability: float = Field(..., description="Share of simulated races finished in the top 3")
+    top10_probability: float = Field(..., description="Share of simulated races finished in the top 10")
+    expected_position: float = Field(..., description="Mean simulated finishing position")
+    position_probabilities: List[float] = Field(..., description="P(finishing position = i + 1) for each i")
+
+class MainRaceSimulateResponse(BaseModel):
+    race: MainRaceGridRace
+    race_features: Dict[str, Any] = Field(..., description="Race-level features shared by every entry")
+    predictions: List[MainRaceSimulationItem] = Field(..., description="One result per entry, in request order")
+    simulation: Dict[str, Any] = Field(..., description="Simulated races, seed and residual noise model")
+    model_meta: Dict[str, Any] = Field(..., description="Metadata / provenance per model name")
+
 class QualifyingPredictInput(BaseModel):
     constructor: str
     circuit: str
@@ -70,4 +124,81 @@ class StatusPredictionItem(BaseModel):
 class StatusPredictResponse(BaseModel):
     percentages: List[StatusPredictionItem] = Field(..., description="Per-race DNF percentages for requested inputs")
     # keep model_meta for parity with other endpoints but optional here
-    model_meta: Optional[Dict[str, Any]] = Field(None, description="Optional metadata/provenance")
\ No newline at end of file
+    model_meta: Optional[Dict[str, Any]] = Field(None, description="Optional metadata/provenance")
+
+class WeekendEntry(BaseModel):
+    driver: str
+    constructor: str
+
+class WeekendPredictInput(BaseModel):
+    race: MainRaceGridRace = Field(..., description="Race-level inputs shared by every entry")
+    entries: List[WeekendEntry] = Field(..., min_length=1, description="One entry per car")
+
+class WeekendPredictionItem(BaseModel):
+    entry: WeekendEntry
+    features: Dict[str, Any] = Field(
+        ..., description="Per-entry main race features (qualification_position is the predicted one)"
+    )
+    predicted_qualifying_deviation_from_median: float = Field(..., description="Qualifying model deviation (ms)")
+    predicted_qualifying_position: int = Field(..., description="Predicted grid slot, fed to the race and DNF models")
+    predicted_deviation_from_median: float = Field(..., description="Main race model deviation (ms)")
+    predicted_final_position: int = Field(..., description="Predicted finishing position in this race")
+    dnf_percentage: float = Field(..., description="DNF percentage (0-100) from the predicted grid slot")
+
+class WeekendPredictResponse(BaseModel):
+    race: MainRaceGridRace
+    race_features: Dict[str, Any] = Field(..., description="Race-level features shared by every entry")
+    predictions: List[WeekendPredictionItem] = Field(..., description="One result per entry, in request order")
+    model_meta: Dict[str, Any] = Field(..., description="Metadata / provenance per model name")
+
+class FantasyScoringRules(BaseModel):
+    qualifying_points: Optional[List[float]] = Field(None, description="Points for qualifying P1, P2, ... (default 10..1)")
+    race_points: Optional[List[float]] = Field(None, description="Points for race P1, P2, ... (default 25, 18, ..., 1)")
+    positions_gained_points: Optional[float] = Field(None, description="Per place gained from the grid (default 1)")
+    dnf_points: Optional[float] = Field(None, description="Race points on a retirement (default -20)")
+
+class LineupOptimizeInput(BaseModel):
+    race: MainRaceGridRace = Field(..., description="Race-level inputs shared by every entry")
+    entries: List[WeekendEntry] = Field(..., min_length=1, description="One entry per car")
+    driver_prices: Dict[str, Annotated[float, Field(gt=0, le=1000)]] = Field(
+        ..., min_length=1, description="Price per pickable driver (an entry's driver)"
+    )
+    constructor_prices: Dict[str, Annotated[float, Field(gt=0, le=1000)]] = Field(
+        ..., min_length=1, description="Price per pickable constructor"
+    )
+    budget: float = Field(100.0, gt=0, description="Budget cap on the lineup's total price (at most LINEUP_MAX_BUDGET_UNITS price steps)")
+    drivers: int = Field(5, ge=1, description="Drivers per lineup")
+    constructors: int = Field(2, ge=0, description="Constructors per lineup")
+    top_k: int = Field(1, ge=1, le=100, description="Lineups returned, best first (at most LINEUP_MAX_TOP_K)")
+    scoring: FantasyScoringRules = Field(default_factory=FantasyScoringRules)
+
+class LineupPredictionItem(WeekendPredictionItem):
+    expected_points: float = Field(..., description="Expected fantasy points under the scoring rules")
+    price: Optional[float] = Field(None, description="Driver price (None: not pickable)")
+
+class LineupConstructorItem(BaseModel):
+    constructor: str
+    expected_points: float = Field(..., description="Sum of the constructor's entries' expected points")
+    price: float
+
+class Lineup(BaseModel):
+    drivers: List[str]
+    constructors: List[str]
+    price: float
+    expected_points: float
+
+class LineupOptimizeResponse(BaseModel):
+    race: MainRaceGridRace
+    race_features: Dict[str, Any] = Field(..., description="Race-level features shared by every entry")
+    predictions: List[LineupPredictionItem] = Field(..., description="One result per entry, in request order")
+    constructors: List[LineupConstructorItem] = Field(..., description="One result per priced constructor")
+    lineups: List[Lineup] = Field(..., description="Best lineups within the budget, best first (empty when none fits)")
+    model_meta: Dict[str, Any] = Field(..., description="Metadata / provenance per model name")
+
+class PredictionTableRefreshInput(BaseModel):
+    circuit: str
+    race_date: date
+    laps: int = Field(..., description="Main race laps; the qualifying and status tables do not depend on it")
+    entrants: List[WeekendEntry] = Field(
+        ..., min_length=1, description="The weekend's cars: the tables cover these (x grid slot x rain), not the pick lists"
+    )
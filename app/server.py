@@ -0,0 +1,141 @@
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import uvicorn
+
+from app.core import config
+from app.core.metrics import metrics_registry
+from app.services import startup
+
+# uvicorn's logging config only has handlers for its own loggers
+logger = logging.getLogger("uvicorn.error")
+
+# a worker exiting sooner than this after its fork is a boot failure, not a crash to recover from
+WORKER_MIN_UPTIME_SECONDS = 5.0
+
+
+def preload(mode: str) -> startup.StartupState:
+    """
+    Startup in the parent, before any worker is forked: pull artifacts
+    (unless `mode` is "prestart") and load every pipeline and the reference
+    tables, then move everything allocated so far out of the cyclic GC's
+    reach, so collections in the workers do not write to (and un-share)
+    those pages. Workers start with APP_STARTUP_MODE="preloaded".
+    """
+    state = startup.start("prestart" if mode in ("prestart", "preloaded") else "blocking")
+    gc.collect()
+    gc.freeze()
+    return state
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _spawn(server_config: uvicorn.Config, sock: socket.socket, preloaded: bool) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 1
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        if preloaded:
+            config.APP_STARTUP_MODE = "preloaded"
+        metrics_registry.share(config.METRICS_DIR, config.METRICS_FLUSH_SECONDS)
+        server = uvicorn.Server(server_config)
+        server.run(sockets=[sock])
+        code = 0 if server.started else 3
+    except BaseException:
+        logger.exception("Worker %s crashed", os.getpid())
+    finally:
+        os._exit(code)
+
+
+def serve(host: str, port: int, workers: int, preload_models: bool = True) -> int:
+    """
+    Serve app.main:app with `workers` uvicorn processes forked from this one,
+    all accepting on one listening socket. With `preload_models` (see
+    SERVER_PRELOAD) the models and reference tables are loaded here first and
+    shared copy-on-write by the workers; without it each worker loads its
+    own copy at startup, as with `uvicorn --workers`.
+    Crashed workers are replaced; SIGTERM / SIGINT stop them all. Workers
+    share their metrics through METRICS_DIR, so /metrics reports all of them
+    (see MetricsRegistry.share). Returns the exit code (1 when a worker
+    failed to boot).
+    """
+    if workers <= 1:
+        uvicorn.run("app.main:app", host=host, port=port)
+        return 0
+
+    from app.main import app
+
+    if preload_models:
+        preload(config.APP_STARTUP_MODE)
+    server_config = uvicorn.Config(app, host=host, port=port)
+    own_metrics_dir = config.METRICS_DIR is None
+    if own_metrics_dir:
+        config.METRICS_DIR = tempfile.mkdtemp(prefix="f1-metrics-")
+    else:
+        Path(config.METRICS_DIR).mkdir(parents=True, exist_ok=True)
+        # workers of an earlier run
+        for stale in Path(config.METRICS_DIR).glob("*.json"):
+            stale.unlink(missing_ok=True)
+    sock = _bind(host, port)
+    children: Dict[int, float] = {}
+    stopping = False
+    exit_code = 0
+
+    def stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        children[_spawn(server_config, sock, preload_models)] = time.monotonic()
+    logger.info("Serving on %s:%d with %d workers (pids %s, preload=%s)", host, port, workers,
+                sorted(children), preload_models)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None:
+            continue
+        Path(config.METRICS_DIR, f"{pid}.json").unlink(missing_ok=True)
+        if stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if code != 0 and time.monotonic() - started < WORKER_MIN_UPTIME_SECONDS:
+            logger.error("Worker %d failed to boot (exit code %d), shutting down", pid, code)
+            exit_code = 1
+            stop(signal.SIGTERM, None)
+            continue
+        logger.warning("Worker %d exited (code %d), starting a new one", pid, code)
+        children[_spawn(server_config, sock, preload_models)] = time.monotonic()
+    sock.close()
+    if own_metrics_dir:
+        shutil.rmtree(config.METRICS_DIR, ignore_errors=True)
+    return exit_code
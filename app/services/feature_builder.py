@@ -1,38 +1,20 @@
-import os
-from pathlib import Path
-from typing import Dict
+from typing import Dict, List
+import numpy as np
 import pandas as pd
-from datetime import datetime
 
-project_root = Path(__file__).resolve().parents[2]  # repo root (.. / .. from this file)
-DATA_DIR = Path(os.environ.get("MODEL_DIR", str(project_root / "data")))
-
-def _load_csv(path: Path) -> pd.DataFrame:
-    if not path.exists():
-        return pd.DataFrame()
-    return pd.read_csv(path, dtype=str)
+from app.core.logging import timed_stage
+from app.services.reference_data import get_reference_index
 
 def validate_features_pickable(driver: str, constructor: str, circuit: str, type: str) -> bool:
-    drivers = _load_csv(DATA_DIR / "processed" / "features_helper" / f"drivers_{type}.csv")
-    constructors = _load_csv(DATA_DIR / "processed" / "features_helper" / f"constructors_{type}.csv")
-    circuits = _load_csv(DATA_DIR / "processed" / "features_helper" / f"circuits_{type}.csv")
-
-    driver_valid = not drivers.empty and (drivers.get("driverRef", "").fillna("").str.lower() == driver.lower()).any()
-    constructor_valid = not constructors.empty and (constructors.get("constructorRef", "").fillna("").str.lower() == constructor.lower()).any()
-    circuit_valid = not circuits.empty and (circuits.get("circuitRef", "").fillna("").str.lower() == circuit.lower()).any()
+    return get_reference_index().is_pickable(driver, constructor, circuit, type)
 
-    return driver_valid and constructor_valid and circuit_valid
 
-
-def build_main_race_features_from_dto(dto: Dict) -> Dict:
+def _lookup_reference_features(dto: Dict, type: str) -> Dict:
     """
-    Input: dict with keys matching PredictInput (driver, constructor, circuit, race_date (date), ...)
-    Output: dict with full feature set expected by the pipeline (age_at_gp_in_days, driver_nationality, etc.)
+    Resolve the driver/constructor/circuit attributes shared by every model
+    from the in-memory reference index (no CSV reads on the request path).
     """
-    # lookup tables (small)
-    drivers = _load_csv(DATA_DIR / "processed" / "drivers.csv")
-    constructors = _load_csv(DATA_DIR / "processed" / "constructors.csv")
-    circuits = _load_csv(DATA_DIR / "processed" / "circuits.csv")
+    index = get_reference_index()
 
     # canonical inputs
     driver_ref = str(dto.get("driver")).strip()
@@ -41,242 +23,405 @@ def build_main_race_features_from_dto(dto: Dict) -> Dict:
     race_date = pd.to_datetime(dto.get("race_date"))
 
     # validate pickable
-    if not validate_features_pickable(driver_ref, constructor_ref, circuit_ref, "mainrace"):
+    if not index.is_pickable(driver_ref, constructor_ref, circuit_ref, type):
         raise ValueError("One or more of driver, constructor, or circuit is not pickable data.")
 
-    drv_row = pd.DataFrame()
-    if not drivers.empty:
-        drv_row = drivers[drivers.get("driverRef", "").fillna("").str.lower() == driver_ref.lower()]
-        if drv_row.empty:
-            # try composite name fallback
-            full = drivers.get("forename", "").fillna("") + " " + drivers.get("surname", "").fillna("")
-            drv_row = drivers[full.str.lower() == driver_ref.lower()]
-
-    driver_nationality = drv_row.iloc[0]["driver_nationality"] if not drv_row.empty and "driver_nationality" in drv_row.columns else None
-
-    driver_date_of_birth = None
-    if not drv_row.empty and "driver_date_of_birth" in drv_row.columns:
-        try:
-            driver_date_of_birth = pd.to_datetime(drv_row.iloc[0]["driver_date_of_birth"], errors="coerce")
-        except Exception:
-            driver_date_of_birth = None
-
-    age_at_gp_in_days = (race_date - driver_date_of_birth).days if driver_date_of_birth is not None else None
-
-    first_race_date = None
-    if not drv_row.empty and "first_race_date" in drv_row.columns:
-        try:
-            first_race_date = pd.to_datetime(drv_row.iloc[0]["first_race_date"], errors="coerce")
-        except Exception:
-            first_race_date = None
-
-    days_since_first_race = (race_date - first_race_date).days if first_race_date is not None else None
-    # constructor nationality
-    cons_row = pd.DataFrame()
-    if not constructors.empty:
-        mask = constructors.get("constructorRef", "").fillna("").str.lower() == constructor_ref.lower()
-        cons_row = constructors[mask]
-    constructor_nationality = cons_row.iloc[0].get("constructor_nationality") if not cons_row.empty else None
-
-    # circuit nationality / type: prefer circuits.name or circuitRef
-    circ_row = pd.DataFrame()
-    if not circuits.empty:
-        mask = circuits.get("circuitRef", "").fillna("").str.lower() == circuit_ref.lower()
-        circ_row = circuits[mask]
-    circuit_country = circ_row.iloc[0].get("circuit_nationality") if not circ_row.empty and "circuit_nationality" in circ_row.columns else None
-    type_circuit = circ_row.iloc[0].get("type_circuit") if not circ_row.empty and "type_circuit" in circ_row.columns else None
+    # look up driver row (driverRef then forename+surname)
+    drv = index.driver(driver_ref) or {}
+    driver_date_of_birth = drv.get("driver_date_of_birth")
+    first_race_date = drv.get("first_race_date")
+    cons = index.constructor(constructor_ref) or {}
+    circ = index.circuit(circuit_ref) or {}
+
+    return {
+        "driver_ref": driver_ref,
+        "constructor_ref": constructor_ref,
+        "circuit_ref": circuit_ref,
+        "race_date": race_date,
+        "driver_nationality": drv.get("driver_nationality"),
+        "constructor_nationality": cons.get("constructor_nationality"),
+        "circuit_country": circ.get("circuit_nationality"),
+        "type_circuit": circ.get("type_circuit"),
+        "age_at_gp_in_days": (race_date - driver_date_of_birth).days if driver_date_of_birth is not None else None,
+        "days_since_first_race": (race_date - first_race_date).days if first_race_date is not None else None,
+    }
+
+
+def _features_from_dto(dto: Dict, type: str, leading: tuple = (), rain: bool = False) -> Dict:
+    """
+    Feature dict of one DTO for model `type`: the integer DTO fields in
+    `leading` first, then the reference features shared by every model, with
+    rain (default 0) when the model takes it.
+    """
+    ref = _lookup_reference_features(dto, type)
+    driver_nationality = ref["driver_nationality"]
+    constructor_nationality = ref["constructor_nationality"]
+    circuit_country = ref["circuit_country"]
+    race_date = ref["race_date"]
 
     # build final features dict (fill None -> pd.NA or defaults)
-    features = {
-        "qualification_position": int(dto["qualification_position"]),
-        "laps": int(dto["laps"]),
-        "constructor": constructor_ref,
-        "circuit": circuit_ref,
-        "type_circuit": type_circuit or dto.get("type_circuit"),
-        "driver": driver_ref,
+    features = {name: int(dto[name]) for name in leading}
+    features.update({
+        "constructor": ref["constructor_ref"],
+        "circuit": ref["circuit_ref"],
+        "type_circuit": ref["type_circuit"] or dto.get("type_circuit"),
+        "driver": ref["driver_ref"],
         "circuit_nationality": circuit_country,
         "driver_nationality": driver_nationality,
         "constructor_nationality": constructor_nationality,
         "race_year": int(race_date.year),
         "race_month": int(race_date.month),
         "race_day": int(race_date.day),
-        "rain": int(dto.get("rain", 0)),
-        "driver_home": 1 if driver_nationality and circuit_country and driver_nationality == circuit_country else 0,
-        "constructor_home": 1 if constructor_nationality and circuit_country and constructor_nationality == circuit_country else 0,
-    }
-    if age_at_gp_in_days is not None:
-        features["age_at_gp_in_days"] = int(age_at_gp_in_days)
-    if days_since_first_race is not None:
-        features["days_since_first_race"] = int(days_since_first_race)
+    })
+    if rain:
+        features["rain"] = int(dto.get("rain", 0))
+    features["driver_home"] = 1 if driver_nationality and circuit_country and driver_nationality == circuit_country else 0
+    features["constructor_home"] = 1 if constructor_nationality and circuit_country and constructor_nationality == circuit_country else 0
+    if ref["age_at_gp_in_days"] is not None:
+        features["age_at_gp_in_days"] = int(ref["age_at_gp_in_days"])
+    if ref["days_since_first_race"] is not None:
+        features["days_since_first_race"] = int(ref["days_since_first_race"])
 
     return features
 
+
+def build_main_race_features_from_dto(dto: Dict) -> Dict:
+    """
+    Input: dict with keys matching PredictInput (driver, constructor, circuit, race_date (date), ...)
+    Output: dict with full feature set expected by the pipeline (age_at_gp_in_days, driver_nationality, etc.)
+    """
+    return _features_from_dto(dto, "mainrace", ("qualification_position", "laps"), rain=True)
+
 def build_qualifying_features_from_dto(dto: Dict) -> Dict:
     """
     Input: dict with keys matching PredictInput (driver, constructor, circuit, race_date (date), ...)
     Output: dict with full feature set expected by the pipeline (age_at_gp_in_days, driver_nationality, etc.)
     """
-    # lookup tables (small)
-    drivers = _load_csv(DATA_DIR / "processed" / "drivers.csv")
-    constructors = _load_csv(DATA_DIR / "processed" / "constructors.csv")
-    circuits = _load_csv(DATA_DIR / "processed" / "circuits.csv")
+    return _features_from_dto(dto, "qualifying")
 
-    # canonical inputs
-    driver_ref = str(dto.get("driver")).strip()
-    constructor_ref = str(dto.get("constructor")).strip()
-    circuit_ref = str(dto.get("circuit")).strip()
-    race_date = pd.to_datetime(dto.get("race_date"))
+def build_status_features_from_dto(dto: Dict) -> Dict:
+    """
+    Input: dict with keys matching PredictInput (driver, constructor, circuit, race_date (date), ...)
+    Output: dict with full feature set expected by the pipeline (age_at_gp_in_days, driver_nationality, etc.)
+    """
+    return _features_from_dto(dto, "status", ("qualification_position",), rain=True)
+
+def _canonical_refs(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    str(x).strip() over a whole column, plus the lowercase lookup keys.
+    """
+    refs = np.array([str(v).strip() for v in values.tolist()], dtype=object)
+    keys = np.array([r.lower() for r in refs], dtype=object)
+    return refs, keys
+
+
+def _join(index, keys: np.ndarray, kind: str) -> tuple[Dict[str, np.ndarray], np.ndarray]:
+    table_keys, arrays = index.table(kind)
+    positions = table_keys.get_indexer(keys)
+    return arrays, positions
+
+
+def _attr(joined: tuple, column: str) -> np.ndarray:
+    arrays, positions = joined
+    values = arrays[column].take(positions) if len(arrays[column]) else np.empty(len(positions), dtype=object)
+    # rows without a match resolve to None, like the scalar lookups
+    values[positions < 0] = None
+    return values
+
+
+def _date(joined: tuple, column: str) -> pd.DatetimeIndex:
+    arrays, positions = joined
+    values = arrays[column].take(positions) if len(arrays[column]) else np.empty(len(positions), dtype="datetime64[ns]")
+    values[positions < 0] = np.datetime64("NaT")
+    return pd.DatetimeIndex(values)
+
+
+def _lookup_reference_frame(dtos: List[Dict], type: str) -> tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    """
+    Columnar counterpart of _lookup_reference_features: takes the whole batch
+    as one DataFrame and resolves drivers, constructors and circuits with one
+    join (hash lookup on the key index) each. Returns (inputs_frame, columns) where columns
+    holds one array per reference feature, aligned with the inputs.
+    """
+    index = get_reference_index()
+    frame = pd.DataFrame(list(dtos))
+    if frame.empty:
+        frame = pd.DataFrame(columns=["driver", "constructor", "circuit", "race_date"])
+
+    # canonical inputs (object columns: a comprehension beats three .str passes)
+    driver_ref, driver_key = _canonical_refs(frame["driver"])
+    constructor_ref, constructor_key = _canonical_refs(frame["constructor"])
+    circuit_ref, circuit_key = _canonical_refs(frame["circuit"])
+    race_date = pd.DatetimeIndex(pd.to_datetime(frame["race_date"]))
 
     # validate pickable
-    if not validate_features_pickable(driver_ref, constructor_ref, circuit_ref, "qualifying"):
+    refs = index.pickable.get(type)
+    if refs is None or not (
+        all(k in refs["drivers"] for k in driver_key)
+        and all(k in refs["constructors"] for k in constructor_key)
+        and all(k in refs["circuits"] for k in circuit_key)
+    ):
         raise ValueError("One or more of driver, constructor, or circuit is not pickable data.")
 
-    # look up driver row (try driverRef then forename+surname)
-    drv_row = pd.DataFrame()
-    if not drivers.empty:
-        drv_row = drivers[drivers.get("driverRef", "").fillna("").str.lower() == driver_ref.lower()]
-        if drv_row.empty:
-            # try composite name fallback
-            full = drivers.get("forename", "").fillna("") + " " + drivers.get("surname", "").fillna("")
-            drv_row = drivers[full.str.lower() == driver_ref.lower()]
-
-    driver_nationality = drv_row.iloc[0]["driver_nationality"] if not drv_row.empty and "driver_nationality" in drv_row.columns else None
-
-    driver_date_of_birth = None
-    if not drv_row.empty and "driver_date_of_birth" in drv_row.columns:
-        try:
-            driver_date_of_birth = pd.to_datetime(drv_row.iloc[0]["driver_date_of_birth"], errors="coerce")
-        except Exception:
-            driver_date_of_birth = None
-
-    age_at_gp_in_days = (race_date - driver_date_of_birth).days if driver_date_of_birth is not None else None
-
-    first_race_date = None
-    if not drv_row.empty and "first_race_date" in drv_row.columns:
-        try:
-            first_race_date = pd.to_datetime(drv_row.iloc[0]["first_race_date"], errors="coerce")
-        except Exception:
-            first_race_date = None
-
-    days_since_first_race = (race_date - first_race_date).days if first_race_date is not None else None
-
-    # constructor nationality
-    cons_row = pd.DataFrame()
-    if not constructors.empty:
-        cons_row = constructors[constructors.get("constructorRef", "").fillna("").str.lower() == constructor_ref.lower()]
-    constructor_nationality = cons_row.iloc[0].get("constructor_nationality") if not cons_row.empty else None
-
-    # circuit nationality / type: prefer circuits.name or circuitRef
-    circ_row = pd.DataFrame()
-    if not circuits.empty:
-        circ_row = circuits[circuits.get("circuitRef", "").fillna("").str.lower() == circuit_ref.lower()]
-    circuit_country = circ_row.iloc[0].get("circuit_nationality") if not circ_row.empty and "circuit_nationality" in circ_row.columns else None
-    type_circuit = circ_row.iloc[0].get("type_circuit") if not circ_row.empty and "type_circuit" in circ_row.columns else None
-
-    # build final features dict (fill None -> pd.NA or defaults)
-    features = {
-        "constructor": constructor_ref,
-        "circuit": circuit_ref,
-        "type_circuit": type_circuit or dto.get("type_circuit"),
-        "driver": driver_ref,
-        "circuit_nationality": circuit_country,
-        "driver_nationality": driver_nationality,
-        "constructor_nationality": constructor_nationality,
-        "race_year": int(race_date.year),
-        "race_month": int(race_date.month),
-        "race_day": int(race_date.day),
-        "driver_home": 1 if driver_nationality and circuit_country and driver_nationality == circuit_country else 0,
-        "constructor_home": 1 if constructor_nationality and circuit_country and constructor_nationality == circuit_country else 0,
+    drv = _join(index, driver_key, "drivers")
+    cons = _join(index, constructor_key, "constructors")
+    circ = _join(index, circuit_key, "circuits")
+
+    type_circuit = _attr(circ, "type_circuit")
+    if "type_circuit" in frame.columns:
+        missing = np.array([not v for v in type_circuit], dtype=bool)
+        type_circuit[missing] = frame["type_circuit"].to_numpy(dtype=object)[missing]
+
+    columns = {
+        "driver_ref": driver_ref,
+        "constructor_ref": constructor_ref,
+        "circuit_ref": circuit_ref,
+        "race_year": race_date.year.to_numpy(dtype=int),
+        "race_month": race_date.month.to_numpy(dtype=int),
+        "race_day": race_date.day.to_numpy(dtype=int),
+        "driver_nationality": _attr(drv, "driver_nationality"),
+        "constructor_nationality": _attr(cons, "constructor_nationality"),
+        "circuit_country": _attr(circ, "circuit_nationality"),
+        "type_circuit": type_circuit,
+        "age_at_gp_in_days": (race_date - _date(drv, "driver_date_of_birth")).days.to_numpy(dtype=float),
+        "days_since_first_race": (race_date - _date(drv, "first_race_date")).days.to_numpy(dtype=float),
     }
-    if age_at_gp_in_days is not None:
-        features["age_at_gp_in_days"] = int(age_at_gp_in_days)
-    if days_since_first_race is not None:
-        features["days_since_first_race"] = int(days_since_first_race)
+    return frame, columns
 
-    return features
 
-def build_status_features_from_dto(dto: Dict) -> Dict:
+def _lookup_grid_frame(race: Dict, entries: List[Dict], types: tuple) -> tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
     """
-    Input: dict with keys matching PredictInput (driver, constructor, circuit, race_date (date), ...)
-    Output: dict with full feature set expected by the pipeline (age_at_gp_in_days, driver_nationality, etc.)
+    _lookup_reference_frame for one race: the circuit and race date come from
+    the race header, are resolved once and broadcast to every entry; drivers
+    and constructors are joined as in the batch path. Entries must be
+    pickable for every model type in `types`. Returns (inputs, columns) with
+    inputs as plain arrays (driver/constructor plus laps/rain from the header)
+    instead of a DataFrame; columns match _lookup_reference_frame.
     """
-    # lookup tables (small)
-    drivers = _load_csv(DATA_DIR / "processed" / "drivers.csv")
-    constructors = _load_csv(DATA_DIR / "processed" / "constructors.csv")
-    circuits = _load_csv(DATA_DIR / "processed" / "circuits.csv")
+    index = get_reference_index()
+    n = len(entries)
 
-    # canonical inputs
-    driver_ref = str(dto.get("driver")).strip()
-    constructor_ref = str(dto.get("constructor")).strip()
-    circuit_ref = str(dto.get("circuit")).strip()
-    race_date = pd.to_datetime(dto.get("race_date"))
+    def _broadcast(value, dtype=object) -> np.ndarray:
+        return np.full(n, value, dtype=dtype)
+
+    frame = {
+        "driver": np.array([e["driver"] for e in entries], dtype=object),
+        "constructor": np.array([e["constructor"] for e in entries], dtype=object),
+        "laps": _broadcast(race["laps"], int),
+        "rain": _broadcast(race.get("rain") or 0, int),
+    }
+    driver_ref, driver_key = _canonical_refs(frame["driver"])
+    constructor_ref, constructor_key = _canonical_refs(frame["constructor"])
+    circuit_ref = str(race.get("circuit")).strip()
+    race_date = pd.Timestamp(race["race_date"])
 
     # validate pickable
-    if not validate_features_pickable(driver_ref, constructor_ref, circuit_ref, "status"):
-        raise ValueError("One or more of driver, constructor, or circuit is not pickable data.")
+    for type in types:
+        refs = index.pickable.get(type)
+        if refs is None or not (
+            circuit_ref.lower() in refs["circuits"]
+            and all(k in refs["drivers"] for k in driver_key)
+            and all(k in refs["constructors"] for k in constructor_key)
+        ):
+            raise ValueError("One or more of driver, constructor, or circuit is not pickable data.")
+
+    drv = _join(index, driver_key, "drivers")
+    cons = _join(index, constructor_key, "constructors")
+    circ = _join(index, np.array([circuit_ref.lower()], dtype=object), "circuits")
+
+    columns = {
+        "driver_ref": driver_ref,
+        "constructor_ref": constructor_ref,
+        "circuit_ref": _broadcast(circuit_ref),
+        "race_year": _broadcast(race_date.year, int),
+        "race_month": _broadcast(race_date.month, int),
+        "race_day": _broadcast(race_date.day, int),
+        "driver_nationality": _attr(drv, "driver_nationality"),
+        "constructor_nationality": _attr(cons, "constructor_nationality"),
+        "circuit_country": _broadcast(_attr(circ, "circuit_nationality")[0]),
+        "type_circuit": _broadcast(_attr(circ, "type_circuit")[0]),
+        "age_at_gp_in_days": (race_date - _date(drv, "driver_date_of_birth")).days.to_numpy(dtype=float),
+        "days_since_first_race": (race_date - _date(drv, "first_race_date")).days.to_numpy(dtype=float),
+    }
+    return frame, columns
 
-    # look up driver row (try driverRef then forename+surname)
-    drv_row = pd.DataFrame()
-    if not drivers.empty:
-        drv_row = drivers[drivers.get("driverRef", "").fillna("").str.lower() == driver_ref.lower()]
-        if drv_row.empty:
-            # try composite name fallback
-            full = drivers.get("forename", "").fillna("") + " " + drivers.get("surname", "").fillna("")
-            drv_row = drivers[full.str.lower() == driver_ref.lower()]
-
-    driver_nationality = drv_row.iloc[0]["driver_nationality"] if not drv_row.empty and "driver_nationality" in drv_row.columns else None
-
-    driver_date_of_birth = None
-    if not drv_row.empty and "driver_date_of_birth" in drv_row.columns:
-        try:
-            driver_date_of_birth = pd.to_datetime(drv_row.iloc[0]["driver_date_of_birth"], errors="coerce")
-        except Exception:
-            driver_date_of_birth = None
-
-    age_at_gp_in_days = (race_date - driver_date_of_birth).days if driver_date_of_birth is not None else None
-
-    first_race_date = None
-    if not drv_row.empty and "first_race_date" in drv_row.columns:
-        try:
-            first_race_date = pd.to_datetime(drv_row.iloc[0]["first_race_date"], errors="coerce")
-        except Exception:
-            first_race_date = None
-
-    days_since_first_race = (race_date - first_race_date).days if first_race_date is not None else None
-
-    # constructor nationality
-    cons_row = pd.DataFrame()
-    if not constructors.empty:
-        cons_row = constructors[constructors.get("constructorRef", "").fillna("").str.lower() == constructor_ref.lower()]
-    constructor_nationality = cons_row.iloc[0].get("constructor_nationality") if not cons_row.empty else None
-
-    # circuit nationality / type: prefer circuits.name or circuitRef
-    circ_row = pd.DataFrame()
-    if not circuits.empty:
-        circ_row = circuits[circuits.get("circuitRef", "").fillna("").str.lower() == circuit_ref.lower()]
-    circuit_country = circ_row.iloc[0].get("circuit_nationality") if not circ_row.empty and "circuit_nationality" in circ_row.columns else None
-    type_circuit = circ_row.iloc[0].get("type_circuit") if not circ_row.empty and "type_circuit" in circ_row.columns else None
 
-    # build final features dict (fill None -> pd.NA or defaults)
-    features = {
-        "qualification_position": int(dto["qualification_position"]),
-        "constructor": constructor_ref,
-        "circuit": circuit_ref,
-        "type_circuit": type_circuit or dto.get("type_circuit"),
-        "driver": driver_ref,
-        "circuit_nationality": circuit_country,
-        "driver_nationality": driver_nationality,
-        "constructor_nationality": constructor_nationality,
-        "race_year": int(race_date.year),
-        "race_month": int(race_date.month),
-        "race_day": int(race_date.day),
-        "rain": int(dto.get("rain", 0)),
-        "driver_home": 1 if driver_nationality and circuit_country and driver_nationality == circuit_country else 0,
-        "constructor_home": 1 if constructor_nationality and circuit_country and constructor_nationality == circuit_country else 0,
+def _home_flag(nationality: np.ndarray, circuit_country: np.ndarray) -> np.ndarray:
+    return (pd.notna(nationality) & pd.notna(circuit_country) & (nationality == circuit_country)).astype(int)
+
+
+def _finish_batch_features(features: Dict[str, object], ref: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """
+    Assemble the batch frame, appending age/first-race columns with the same dtype
+    rules pd.DataFrame(list_of_dicts) applies to the scalar builders' output:
+    int when every row has a value, float with NaN when some do, omitted when none do.
+    """
+    for column in ("age_at_gp_in_days", "days_since_first_race"):
+        values = ref[column]
+        known = ~np.isnan(values)
+        if not known.any():
+            continue
+        features[column] = values.astype("int64") if known.all() else values
+    # let string columns pick up the same inferred dtype as the scalar path
+    with timed_stage("dataframe"):
+        return pd.DataFrame(features).infer_objects()
+
+
+def _main_race_features(frame, ref: Dict[str, np.ndarray]) -> Dict[str, object]:
+    # frame: inputs DataFrame, or the plain arrays of _lookup_grid_frame
+    return {
+        "qualification_position": np.asarray(frame["qualification_position"], dtype=int),
+        "laps": np.asarray(frame["laps"], dtype=int),
+        "constructor": ref["constructor_ref"],
+        "circuit": ref["circuit_ref"],
+        "type_circuit": ref["type_circuit"],
+        "driver": ref["driver_ref"],
+        "circuit_nationality": ref["circuit_country"],
+        "driver_nationality": ref["driver_nationality"],
+        "constructor_nationality": ref["constructor_nationality"],
+        "race_year": ref["race_year"],
+        "race_month": ref["race_month"],
+        "race_day": ref["race_day"],
+        "rain": np.asarray(frame["rain"], dtype=int) if "rain" in frame else np.zeros(len(ref["driver_ref"]), dtype=int),
+        "driver_home": _home_flag(ref["driver_nationality"], ref["circuit_country"]),
+        "constructor_home": _home_flag(ref["constructor_nationality"], ref["circuit_country"]),
+    }
+
+
+def build_main_race_features_batch(dtos: List[Dict]) -> pd.DataFrame:
+    """
+    Vectorized build_main_race_features_from_dto: one DataFrame row per DTO,
+    equal to pd.DataFrame([build_main_race_features_from_dto(d) for d in dtos]).
+    """
+    frame, ref = _lookup_reference_frame(dtos, "mainrace")
+    return _finish_batch_features(_main_race_features(frame, ref), ref)
+
+
+# main race features that are the same for every entry of a race
+RACE_LEVEL_FEATURES = (
+    "laps", "circuit", "type_circuit", "circuit_nationality", "race_year", "race_month", "race_day", "rain",
+)
+
+
+def build_main_race_grid_features(race: Dict, entries: List[Dict]) -> pd.DataFrame:
+    """
+    Main race features for one whole grid: race = {circuit, race_date, laps,
+    rain}, entries = [{driver, constructor, qualification_position}, ...].
+    Race-level features are computed once and broadcast; the frame equals
+    build_main_race_features_batch over the header merged into each entry.
+    """
+    frame, ref = _lookup_grid_frame(race, entries, ("mainrace",))
+    frame["qualification_position"] = np.array([e["qualification_position"] for e in entries], dtype=int)
+    return _finish_batch_features(_main_race_features(frame, ref), ref)
+
+
+def _qualifying_features(ref: Dict[str, np.ndarray]) -> Dict[str, object]:
+    return {
+        "constructor": ref["constructor_ref"],
+        "circuit": ref["circuit_ref"],
+        "type_circuit": ref["type_circuit"],
+        "driver": ref["driver_ref"],
+        "circuit_nationality": ref["circuit_country"],
+        "driver_nationality": ref["driver_nationality"],
+        "constructor_nationality": ref["constructor_nationality"],
+        "race_year": ref["race_year"],
+        "race_month": ref["race_month"],
+        "race_day": ref["race_day"],
+        "driver_home": _home_flag(ref["driver_nationality"], ref["circuit_country"]),
+        "constructor_home": _home_flag(ref["constructor_nationality"], ref["circuit_country"]),
     }
-    if age_at_gp_in_days is not None:
-        features["age_at_gp_in_days"] = int(age_at_gp_in_days)
-    if days_since_first_race is not None:
-        features["days_since_first_race"] = int(days_since_first_race)
 
-    return features
\ No newline at end of file
+
+def build_qualifying_features_batch(dtos: List[Dict]) -> pd.DataFrame:
+    """
+    Vectorized build_qualifying_features_from_dto (see build_main_race_features_batch).
+    """
+    _, ref = _lookup_reference_frame(dtos, "qualifying")
+    return _finish_batch_features(_qualifying_features(ref), ref)
+
+
+def _status_features(frame, ref: Dict[str, np.ndarray]) -> Dict[str, object]:
+    # frame: inputs DataFrame, or the plain arrays of _lookup_grid_frame
+    return {
+        "qualification_position": np.asarray(frame["qualification_position"], dtype=int),
+        "constructor": ref["constructor_ref"],
+        "circuit": ref["circuit_ref"],
+        "type_circuit": ref["type_circuit"],
+        "driver": ref["driver_ref"],
+        "circuit_nationality": ref["circuit_country"],
+        "driver_nationality": ref["driver_nationality"],
+        "constructor_nationality": ref["constructor_nationality"],
+        "race_year": ref["race_year"],
+        "race_month": ref["race_month"],
+        "race_day": ref["race_day"],
+        "rain": np.asarray(frame["rain"], dtype=int) if "rain" in frame else np.zeros(len(ref["driver_ref"]), dtype=int),
+        "driver_home": _home_flag(ref["driver_nationality"], ref["circuit_country"]),
+        "constructor_home": _home_flag(ref["constructor_nationality"], ref["circuit_country"]),
+    }
+
+
+def build_status_features_batch(dtos: List[Dict]) -> pd.DataFrame:
+    """
+    Vectorized build_status_features_from_dto (see build_main_race_features_batch).
+    """
+    frame, ref = _lookup_reference_frame(dtos, "status")
+    return _finish_batch_features(_status_features(frame, ref), ref)
+
+
+class WeekendFeatures:
+    """
+    Reference lookups for one race weekend, shared by the qualifying, main
+    race and status models: race = {circuit, race_date, laps, rain},
+    entries = [{driver, constructor}, ...]. Drivers, constructors and the
+    circuit are resolved once; each model's frame equals its batch builder
+    over the header merged into each entry. Entries must be pickable for
+    every model type in `types`.
+    """
+
+    def __init__(self, race: Dict, entries: List[Dict], types: tuple = ("qualifying", "mainrace", "status")):
+        self.frame, self.ref = _lookup_grid_frame(race, entries, types)
+
+    def qualifying(self) -> pd.DataFrame:
+        return _finish_batch_features(_qualifying_features(self.ref), self.ref)
+
+    def _with_grid(self, qualification_position) -> Dict[str, np.ndarray]:
+        return {**self.frame, "qualification_position": np.asarray(qualification_position, dtype=int)}
+
+    def main_race(self, qualification_position) -> pd.DataFrame:
+        return _finish_batch_features(_main_race_features(self._with_grid(qualification_position), self.ref), self.ref)
+
+    def status(self, qualification_position) -> pd.DataFrame:
+        return _finish_batch_features(_status_features(self._with_grid(qualification_position), self.ref), self.ref)
+
+
+_OPTIONAL_INT_COLUMNS = ("age_at_gp_in_days", "days_since_first_race")
+
+
+def features_columns(df: pd.DataFrame) -> Dict[str, list]:
+    """
+    Batch frame as one list of plain Python values per column, with
+    age_at_gp_in_days / days_since_first_race as int, None when unknown.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column].tolist()
+        if column in _OPTIONAL_INT_COLUMNS:
+            values = [None if pd.isna(v) else int(v) for v in values]
+        columns[column] = values
+    return columns
+
+
+def features_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    Per-row feature dicts from a batch frame, in the scalar builders' shape
+    (age_at_gp_in_days / days_since_first_race omitted when unknown).
+    """
+    columns = features_columns(df)
+    names = list(columns)
+    records = [dict(zip(names, row)) for row in zip(*columns.values())]
+    for column in _OPTIONAL_INT_COLUMNS:
+        if column in columns and None in columns[column]:
+            for record in records:
+                if record[column] is None:
+                    del record[column]
+    return records
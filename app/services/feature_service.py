@@ -1,10 +1,36 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Optional
 
 import pandas as pd
-from fastapi import HTTPException
+from fastapi import HTTPException, Request, Response
+
+from app.core import config
 
 project_root = Path(__file__).resolve().parents[2]
-FEATURES_HELPER_DIR = project_root / "data" / "processed" / "features_helper"
+PROCESSED_DIR = project_root / "data" / "processed"
+FEATURES_HELPER_DIR = PROCESSED_DIR / "features_helper"
+
+# (features_helper file, processed fallback) behind each /{model}/options/* route
+OPTION_LISTS = tuple(
+    (f"{kind}_{model_type}.csv", f"{kind}.csv")
+    for model_type in ("mainrace", "qualifying", "status")
+    for kind in ("drivers", "constructors", "circuits")
+)
+
+
+def _options_source(primary_name: str, fallback_name: str) -> Path:
+    primary = FEATURES_HELPER_DIR / primary_name
+    if primary.exists():
+        return primary
+    fallback = PROCESSED_DIR / fallback_name
+    if fallback.exists():
+        return fallback
+    raise HTTPException(status_code=404, detail=f"No options found (tried {primary} and {fallback})")
 
 
 def read_options_csv(primary_name: str, fallback_name: str):
@@ -13,20 +39,90 @@ def read_options_csv(primary_name: str, fallback_name: str):
     otherwise fall back to processed/{fallback_name} (e.g. drivers.csv).
     Returns list[dict] (records).
     """
-    primary = FEATURES_HELPER_DIR / primary_name
-    if primary.exists():
-        try:
-            df = pd.read_csv(primary)
-            return df.fillna("").to_dict(orient="records")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed reading {primary}: {e}")
+    source = _options_source(primary_name, fallback_name)
+    try:
+        df = pd.read_csv(source)
+        return df.fillna("").to_dict(orient="records")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed reading {source}: {e}")
 
-    fallback = project_root / "data" / "processed" / fallback_name
-    if fallback.exists():
+
+@dataclass(frozen=True)
+class OptionsPayload:
+    """
+    One option list encoded once: JSON bytes, their strong ETag, and the
+    (path, mtime_ns, size) of the CSV they came from.
+    """
+    body: bytes
+    etag: str
+    signature: tuple
+
+
+_options: Dict[tuple[str, str], OptionsPayload] = {}
+_options_lock = threading.Lock()
+
+
+def _signature(path: Path) -> tuple:
+    stat = os.stat(path)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def get_options_payload(primary_name: str, fallback_name: str) -> OptionsPayload:
+    """
+    Pre-encoded read_options_csv() result. The CSV is re-read only when the
+    source file changes (different path, mtime or size); otherwise the cost
+    is one stat call.
+    """
+    key = (primary_name, fallback_name)
+    source = _options_source(primary_name, fallback_name)
+    signature = _signature(source)
+    cached = _options.get(key)
+    if cached is not None and cached.signature == signature:
+        return cached
+    with _options_lock:
+        cached = _options.get(key)
+        if cached is not None and cached.signature == signature:
+            return cached
+        records = read_options_csv(primary_name, fallback_name)
+        # same encoding as FastAPI's JSONResponse, so the bytes match the uncached route
+        body = json.dumps(records, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+        payload = OptionsPayload(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"', signature=signature)
+        _options[key] = payload
+    return payload
+
+
+def warm_options_cache() -> int:
+    """
+    Encode every option list in OPTION_LISTS up front (e.g. at startup).
+    Lists without a source file are skipped. Returns the number encoded.
+    """
+    warmed = 0
+    for primary_name, fallback_name in OPTION_LISTS:
         try:
-            df = pd.read_csv(fallback)
-            return df.fillna("").to_dict(orient="records")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed reading {fallback}: {e}")
+            get_options_payload(primary_name, fallback_name)
+            warmed += 1
+        except HTTPException:
+            continue
+    return warmed
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison, as If-None-Match requires
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
 
-    raise HTTPException(status_code=404, detail=f"No options found (tried {primary} and {fallback})")
\ No newline at end of file
+
+def options_response(request: Request, primary_name: str, fallback_name: str) -> Response:
+    """
+    Cached option list as a Response with ETag and Cache-Control headers,
+    or an empty 304 when the client's If-None-Match already has it.
+    """
+    payload = get_options_payload(primary_name, fallback_name)
+    headers = {"ETag": payload.etag, "Cache-Control": config.OPTIONS_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
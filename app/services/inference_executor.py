@@ -0,0 +1,177 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from app.core import config
+from app.core.logging import call_profiled
+from app.core.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceSaturated(Exception):
+    """
+    Raised instead of queueing more work when the inference executor (or a
+    micro-batcher queue) is full; the app answers 503 with Retry-After.
+    """
+
+    def __init__(self, message: str = "Inference capacity exhausted", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _init_process_worker():
+    # each worker process serves from its own registry and reference index
+    from app.services.model_service import model_registry
+    from app.services.reference_data import load_reference_index
+
+    model_registry.load_all()
+    load_reference_index()
+
+
+class InferenceExecutor:
+    """
+    Dedicated pool for CPU-bound scoring, kept apart from Starlette's default
+    threadpool, with a bounded queue:
+    - kind: "thread" (default) or "process" (GIL-free; workers load the models at start)
+    - max_workers: pool size (default: CPU count)
+    - max_queue: work admitted beyond the busy workers; past it `run` raises InferenceSaturated
+    Gauges: `in_flight` (running) and `queued` (admitted, waiting for a worker).
+    With processes, in_flight is estimated as min(admitted, max_workers).
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: Optional[int] = None, max_queue: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max(0, max_queue)
+        self.rejected = 0
+        self._pending = 0  # admitted and not finished
+        self._running = 0  # thread pool only: currently inside the function
+        self._lock = threading.Lock()
+        self._pool: Optional[Executor] = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_init_process_worker,
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        return self._pool
+
+    @property
+    def in_flight(self) -> int:
+        if self.kind == "process":
+            return min(self._pending, self.max_workers)
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._pending - self.in_flight)
+
+    def _tracked(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            self._running += 1
+        try:
+            return call_profiled(fn, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the pool and await its result. With the
+        process pool, fn and its arguments must be picklable (module-level
+        functions, plain data).
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise InferenceSaturated(retry_after=config.INFERENCE_RETRY_AFTER_SECONDS)
+            self._pending += 1
+        try:
+            if self.kind == "process":
+                call = functools.partial(fn, *args, **kwargs)
+            else:
+                # carry the request context so stage timings are attributed to its route
+                call = functools.partial(contextvars.copy_context().run, self._tracked, fn, *args, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(self._get_pool(), call)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_executor: Optional[InferenceExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def default_worker_count() -> int:
+    """CPUs per server process: os.cpu_count() split between SERVER_WORKERS, at least 1."""
+    return max(1, (os.cpu_count() or 1) // max(1, config.SERVER_WORKERS))
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """
+    Process-wide InferenceExecutor, configured from INFERENCE_EXECUTOR,
+    INFERENCE_WORKERS and INFERENCE_MAX_QUEUE on first use.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = InferenceExecutor(
+                    kind=config.INFERENCE_EXECUTOR,
+                    max_workers=config.INFERENCE_WORKERS or default_worker_count(),
+                    max_queue=config.INFERENCE_MAX_QUEUE,
+                )
+    return _executor
+
+
+def shutdown_inference_executor():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+def _collect_metrics():
+    """/metrics gauges for the inference executor, once it exists."""
+    executor = _executor
+    if executor is None:
+        return
+    yield ("f1_inference_in_flight", "gauge", "Inference calls running", (), executor.in_flight)
+    yield ("f1_inference_queued", "gauge", "Inference calls waiting for a worker", (), executor.queued)
+    yield ("f1_inference_rejected_total", "counter", "Inference calls rejected with 503", (), executor.rejected)
+
+
+metrics_registry.add_collector(_collect_metrics)
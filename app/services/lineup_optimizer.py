@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# F1 championship points for P1..P10, and fantasy qualifying points for P1..P10
+RACE_POINTS = (25.0, 18.0, 15.0, 12.0, 10.0, 8.0, 6.0, 4.0, 2.0, 1.0)
+QUALIFYING_POINTS = (10.0, 9.0, 8.0, 7.0, 6.0, 5.0, 4.0, 3.0, 2.0, 1.0)
+# items per side are tracked as int64 bitmasks
+MAX_ITEMS = 63
+
+
+@dataclass
+class ScoringRules:
+    """
+    Fantasy points of one driver at one race weekend:
+    - qualifying_points / race_points: points for P1, P2, ... (none past the list)
+    - positions_gained_points: per place gained from the grid (negative when lost)
+    - dnf_points: replaces the race points (not qualifying) on a retirement
+    A constructor scores the sum of its drivers' points.
+    """
+    qualifying_points: Sequence[float] = QUALIFYING_POINTS
+    race_points: Sequence[float] = RACE_POINTS
+    positions_gained_points: float = 1.0
+    dnf_points: float = -20.0
+
+
+def _position_points(points: Sequence[float], position: np.ndarray) -> np.ndarray:
+    table = np.concatenate([[0.0], np.asarray(points, dtype=float), [0.0]])
+    return table[np.clip(position, 0, len(table) - 1)]
+
+
+def expected_driver_points(
+    qualifying_position: Sequence[int],
+    final_position: Sequence[int],
+    dnf_probability: Sequence[float],
+    rules: ScoringRules,
+) -> np.ndarray:
+    """
+    Expected fantasy points per entry from the predicted grid slot, finishing
+    position and DNF probability (0..1): qualifying points always, race points
+    plus positions gained when the car finishes, dnf_points when it retires.
+    """
+    qualifying_position = np.asarray(qualifying_position, dtype=int)
+    final_position = np.asarray(final_position, dtype=int)
+    p = np.asarray(dnf_probability, dtype=float)
+    finished = _position_points(rules.race_points, final_position) + rules.positions_gained_points * (
+        qualifying_position - final_position
+    )
+    return _position_points(rules.qualifying_points, qualifying_position) + (1.0 - p) * finished + p * rules.dnf_points
+
+
+def price_units(prices: Sequence[float], step: float) -> np.ndarray:
+    """Prices as integer multiples of `step`. Raises ValueError for a price off the step."""
+    prices = np.asarray(prices, dtype=float)
+    units = np.rint(prices / step)
+    off = np.abs(units * step - prices) > 1e-6 * np.maximum(1.0, np.abs(prices))
+    if off.any():
+        raise ValueError(f"Prices must be positive multiples of {step}: {prices[off].tolist()}")
+    if (units < 1).any():
+        raise ValueError(f"Prices must be positive multiples of {step}: {prices[units < 1].tolist()}")
+    return units.astype(np.int64)
+
+
+@dataclass
+class Lineup:
+    """One selection: item indices into the driver / constructor lists."""
+    drivers: List[int]
+    constructors: List[int]
+    price_units: int
+    expected_points: float
+
+
+def _members(mask: int, n: int) -> List[int]:
+    return [i for i in range(n) if mask >> i & 1]
+
+
+def _k_best_subsets(points: np.ndarray, units: np.ndarray, size: int, budget: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The k best `size`-item subsets at each exact cost 0..budget, as
+    (values, masks) of shape (budget + 1, k), best first; -inf where fewer
+    exist. A 0/1 knapsack over (items taken, cost) whose cells keep their k
+    best values, each item one vectorized update over every cell.
+    """
+    values = np.full((size + 1, budget + 1, k), -np.inf)
+    masks = np.zeros((size + 1, budget + 1, k), dtype=np.int64)
+    values[0, 0, 0] = 0.0
+    for i, (value, cost) in enumerate(zip(points.tolist(), units.tolist())):
+        if cost > budget:
+            continue
+        # subsets of one item fewer, before item i is added (the arithmetic copies them)
+        taken = values[:-1, : budget + 1 - cost] + value
+        # only cells where the best new subset beats the worst one kept change
+        d, c = np.nonzero(taken[..., 0] > values[1:, cost:, -1])
+        if not len(d):
+            continue
+        kept_d, kept_c = d + 1, c + cost
+        merged = np.concatenate([values[kept_d, kept_c], taken[d, c]], axis=-1)
+        merged_masks = np.concatenate([masks[kept_d, kept_c], masks[d, c] | np.int64(1 << i)], axis=-1)
+        best = np.argsort(-merged, axis=-1, kind="stable")[:, :k]
+        values[kept_d, kept_c] = np.take_along_axis(merged, best, axis=-1)
+        masks[kept_d, kept_c] = np.take_along_axis(merged_masks, best, axis=-1)
+    return values[size], masks[size]
+
+
+def _prefix_k_best(values: np.ndarray, masks: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Turn k best per exact cost into k best at cost <= c, for every c."""
+    values, masks = values.copy(), masks.copy()
+    for cost in range(1, len(values)):
+        merged = np.concatenate([values[cost - 1], values[cost]])
+        best = np.argsort(-merged, kind="stable")[:k]
+        values[cost] = merged[best]
+        masks[cost] = np.concatenate([masks[cost - 1], masks[cost]])[best]
+    return values, masks
+
+
+def optimize_lineups(
+    driver_points: Sequence[float],
+    driver_units: Sequence[int],
+    constructor_points: Sequence[float],
+    constructor_units: Sequence[int],
+    budget_units: int,
+    n_drivers: int = 5,
+    n_constructors: int = 2,
+    top_k: int = 1,
+) -> List[Lineup]:
+    """
+    The top_k lineups of exactly n_drivers drivers and n_constructors
+    constructors whose total price fits budget_units, by expected points
+    (best first; fewer when fewer fit). Exact: the k best driver subsets per
+    exact cost (_k_best_subsets) are paired with the k best constructor
+    subsets costing at most the rest of the budget, so no combination is
+    enumerated. Prices are integers (price_units).
+    """
+    driver_points = np.asarray(driver_points, dtype=float)
+    constructor_points = np.asarray(constructor_points, dtype=float)
+    driver_units = np.asarray(driver_units, dtype=np.int64)
+    constructor_units = np.asarray(constructor_units, dtype=np.int64)
+    if len(driver_points) > MAX_ITEMS or len(constructor_points) > MAX_ITEMS:
+        raise ValueError(f"At most {MAX_ITEMS} drivers and {MAX_ITEMS} constructors can be priced")
+    if n_drivers > len(driver_points) or n_constructors > len(constructor_points):
+        return []
+    # no lineup costs more than its most expensive picks: cap the budget axis there
+    ceiling = int(np.sort(driver_units)[::-1][:n_drivers].sum() + np.sort(constructor_units)[::-1][:n_constructors].sum())
+    budget = min(int(budget_units), ceiling)
+    if budget < 0:
+        return []
+
+    d_values, d_masks = _k_best_subsets(driver_points, driver_units, n_drivers, budget, top_k)
+    c_values, c_masks = _k_best_subsets(constructor_points, constructor_units, n_constructors, budget, top_k)
+    c_values, c_masks = _prefix_k_best(c_values, c_masks, top_k)
+
+    # driver cost a (k best) x constructors costing <= budget - a (k best)
+    rest = budget - np.arange(budget + 1)
+    totals = (d_values[:, :, None] + c_values[rest][:, None, :]).ravel()
+    n_found = min(top_k, int(np.isfinite(totals).sum()))
+    if n_found == 0:
+        return []
+    best = np.argpartition(-totals, n_found - 1)[:n_found]
+    best = best[np.argsort(-totals[best], kind="stable")]
+    cost, i, j = np.unravel_index(best, (budget + 1, top_k, top_k))
+
+    lineups = []
+    for a, di, cj, total in zip(cost.tolist(), i.tolist(), j.tolist(), totals[best].tolist()):
+        drivers = _members(int(d_masks[a, di]), len(driver_points))
+        constructors = _members(int(c_masks[budget - a, cj]), len(constructor_points))
+        lineups.append(Lineup(
+            drivers=drivers,
+            constructors=constructors,
+            price_units=int(driver_units[drivers].sum() + constructor_units[constructors].sum()),
+            expected_points=total,
+        ))
+    return lineups
+
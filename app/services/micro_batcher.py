@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from app.core import config
+from app.core.logging import bind_route, profiling_active
+from app.core.metrics import BATCH_SIZE_BUCKETS, LATENCY_MS_BUCKETS, Histogram, metrics_registry
+from app.services.inference_executor import InferenceSaturated, get_inference_executor
+from app.services.model_service import get_model, get_proba_df, predict_df
+
+logger = logging.getLogger(__name__)
+
+
+def score_predict(model_name: str, df: pd.DataFrame) -> List[float]:
+    pipeline, _ = get_model(model_name)
+    return predict_df(df, pipeline=pipeline, model_name=model_name).tolist()
+
+
+def score_proba(model_name: str, df: pd.DataFrame) -> List[float]:
+    pipeline, _ = get_model(model_name)
+    return get_proba_df(df, pipeline=pipeline, model_name=model_name).tolist()
+
+
+# model name -> scorer(model_name, features_df) returning one float per row;
+# module-level so they can be shipped to a process pool
+SCORERS: Dict[str, Callable[[str, pd.DataFrame], List[float]]] = {
+    "mainrace": score_predict,
+    "qualifying": score_predict,
+    "status": score_proba,  # positive-class percentage, like get_proba_df
+}
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions for one model. `submit` puts
+    a feature dict on an asyncio queue; a background task flushes the queue
+    into one scoring call once `max_batch_size` rows are waiting or the
+    oldest has waited `max_wait_ms`, and resolves each caller with its own
+    row. Scoring runs on the inference executor; rows waiting beyond
+    `max_queue` are rejected with InferenceSaturated.
+    - batch_sizes: rows per flush
+    - queue_wait_ms: time from submit to the start of its flush
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        score: Callable[[pd.DataFrame], List[float]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        max_queue: int = 1024,
+        executor=None,
+    ):
+        self.model_name = model_name
+        self.score = score
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.max_queue = max_queue
+        self.executor = executor
+        self.batch_sizes = Histogram(f"{model_name}_micro_batch_size", BATCH_SIZE_BUCKETS, "Rows per micro-batch flush")
+        self.queue_wait_ms = Histogram(f"{model_name}_micro_batch_queue_wait_ms", LATENCY_MS_BUCKETS, "Queue wait before flush (ms)")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            # (re)bind to the current loop, e.g. a new TestClient or server restart
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            # own context: the flush loop outlives the request that started it
+            self._task = loop.create_task(
+                self._run(), name=f"micro-batcher-{self.model_name}", context=contextvars.Context()
+            )
+
+    async def submit(self, features: Dict) -> float:
+        """
+        Score one feature dict (a feature builder's output) and return its float.
+        """
+        if profiling_active():
+            # a profiled request scores on its own so its capture includes the pipeline call
+            return float((await self._score(pd.DataFrame([features])))[0])
+        self._ensure_running()
+        if self._queue.qsize() >= self.max_queue:
+            raise InferenceSaturated(retry_after=config.INFERENCE_RETRY_AFTER_SECONDS)
+        future = self._loop.create_future()
+        self._queue.put_nowait((features, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> list:
+        queue = self._queue
+        batch = [await queue.get()]
+        deadline = self._loop.time() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _score(self, df: pd.DataFrame) -> List[float]:
+        executor = self.executor or get_inference_executor()
+        return await executor.run(self.score, df)
+
+    async def _run(self):
+        bind_route(f"micro-batch:{self.model_name}")
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            self.batch_sizes.observe(len(batch))
+            for _, _, enqueued in batch:
+                self.queue_wait_ms.observe((started - enqueued) * 1000.0)
+            live = [(features, future) for features, future, _ in batch if not future.done()]
+            if not live:
+                continue
+            try:
+                scores = await self._score(pd.DataFrame([features for features, _ in live]))
+            except Exception as e:
+                if len(live) == 1 or isinstance(e, InferenceSaturated):
+                    for _, future in live:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    # one bad row must not fail its neighbours: rescore row by row
+                    logger.warning("Micro-batch of %d failed for %s, scoring rows separately", len(live), self.model_name)
+                    await self._flush_rows(live)
+                continue
+            for (_, future), value in zip(live, scores):
+                if not future.done():
+                    future.set_result(float(value))
+
+    async def _flush_rows(self, live: list):
+        for features, future in live:
+            try:
+                value = (await self._score(pd.DataFrame([features])))[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(float(value))
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+
+    def stats(self) -> Dict:
+        return {"batch_size": self.batch_sizes.snapshot(), "queue_wait_ms": self.queue_wait_ms.snapshot()}
+
+
+_batchers: Dict[str, MicroBatcher] = {}
+
+
+def get_batcher(model_name: str) -> MicroBatcher:
+    """
+    Process-wide MicroBatcher for a model in SCORERS, sized from config
+    (MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS, MICRO_BATCH_MAX_QUEUE) on first use.
+    """
+    batcher = _batchers.get(model_name)
+    if batcher is None:
+        if model_name not in SCORERS:
+            raise KeyError(f"Unknown model: {model_name}")
+        batcher = MicroBatcher(
+            model_name,
+            functools.partial(SCORERS[model_name], model_name),
+            max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+            max_wait_ms=config.MICRO_BATCH_MAX_WAIT_MS,
+            max_queue=config.MICRO_BATCH_MAX_QUEUE,
+        )
+        _batchers[model_name] = batcher
+    return batcher
+
+
+def _collect_metrics():
+    """/metrics histograms of every micro-batcher, labelled by model."""
+    for name, batcher in _batchers.items():
+        labels = (("model", name),)
+        yield ("f1_micro_batch_size", "histogram", "Rows per micro-batch flush", labels, batcher.batch_sizes)
+        yield ("f1_micro_batch_queue_wait_ms", "histogram", "Queue wait before flush (ms)", labels, batcher.queue_wait_ms)
+
+
+metrics_registry.add_collector(_collect_metrics)
+
+
+async def stop_batchers():
+    for batcher in list(_batchers.values()):
+        await batcher.stop()
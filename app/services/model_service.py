@@ -1,13 +1,25 @@
+import functools
+import hashlib
 import json
+import logging
 import os
 import subprocess
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 import joblib
 import pandas as pd
 import numpy as np
 
+from app.core import config
+from app.core.logging import timed_stage
+from app.core.metrics import metrics_registry
+
 project_root = Path(__file__).resolve().parents[2]  # repo root (.. / .. from this file)
 MODEL_DIR = Path(os.environ.get("MODEL_DIR", str(project_root / "models")))
 MAIN_RACE_MODEL_FILE = MODEL_DIR / "trained_mainrace_pipeline.pkl"
@@ -15,20 +27,70 @@ MAIN_RACE_META_FILE = MODEL_DIR / "mainrace_metadata.json"
 QUALIFYING_MODEL_FILE = MODEL_DIR / "trained_qualifying_pipeline.pkl"
 QUALIFYING_META_FILE = MODEL_DIR / "qualifying_metadata.json"
 
+# name -> (pipeline file, metadata file), both relative to MODEL_DIR
+MODEL_SPECS: Dict[str, tuple[str, str]] = {
+    "mainrace": ("trained_mainrace_pipeline.pkl", "mainrace_metadata.json"),
+    "qualifying": ("trained_qualifying_pipeline.pkl", "qualifying_metadata.json"),
+    "status": ("trained_status_pipeline.pkl", "status_metadata.json"),
+}
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=1)
 def _git_commit_hash() -> Optional[str]:
+    # once per process: containers usually have no .git, and forking git per load adds up
     try:
         root = Path(__file__).resolve().parents[1]
-        out = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=root, text=True).strip()
+        out = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=root, text=True, stderr=subprocess.DEVNULL).strip()
         return out
     except Exception:
         return None
 
 
-def load_model(path: Optional[str] = None, meta_path: Optional[str] = None) -> tuple:
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
     """
-    Load models pipeline (joblib) and metadata. Returns (pipeline, metadata_dict).
-    - path: optional path to .pkl file (overrides MODEL_FILE).
+    Content hash of a model artifact, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class ModelProvenance:
+    """
+    Identity of one loaded artifact, computed once at load time and cached
+    with the model by the registry:
+    - artifact_hash: sha256 of the .pkl, from the metadata when training
+      recorded it, else hashed from the file at load
+    - git_commit / n_rows / n_features: from the metadata (git_commit falls
+      back to one cached `git rev-parse` per process)
+    - loaded_at (UTC ISO-8601) and load_seconds
+    """
+    artifact: str
+    artifact_hash: str
+    git_commit: Optional[str]
+    n_rows: Optional[int]
+    n_features: Optional[int]
+    loaded_at: str
+    load_seconds: float
+
+    @property
+    def version(self) -> str:
+        return self.artifact_hash
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def load_model_with_provenance(path: str, meta_path: str) -> tuple:
     """
+    load_model plus the ModelProvenance of the artifact.
+    Returns (pipeline, metadata_dict, provenance).
+    """
+    started = time.perf_counter()
     p = MODEL_DIR / path
     if not p.exists():
         raise FileNotFoundError(f"Model not found: {p}")
@@ -38,33 +100,384 @@ def load_model(path: Optional[str] = None, meta_path: Optional[str] = None) -> t
     if not p_meta.exists():
         raise FileNotFoundError(f"Meta not found: {p}")
     meta = json.loads(p_meta.read_text())
-    # attach runtime provenance if missing
-    meta.setdefault("git_commit", _git_commit_hash())
+    # attach runtime provenance if missing (setdefault would run git on every load)
+    if "git_commit" not in meta:
+        meta["git_commit"] = _git_commit_hash()
+    provenance = ModelProvenance(
+        artifact=p.name,
+        artifact_hash=meta.get("artifact_hash") or file_sha256(p),
+        git_commit=meta["git_commit"],
+        n_rows=meta.get("n_rows"),
+        n_features=meta.get("n_features"),
+        loaded_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        load_seconds=round(time.perf_counter() - started, 4),
+    )
+    return pipeline, meta, provenance
+
+
+def load_model(path: Optional[str] = None, meta_path: Optional[str] = None) -> tuple:
+    """
+    Load models pipeline (joblib) and metadata. Returns (pipeline, metadata_dict).
+    - path: optional path to .pkl file (overrides MODEL_FILE).
+    """
+    pipeline, meta, _ = load_model_with_provenance(path, meta_path)
     return pipeline, meta
 
 
-def predict_df(df: pd.DataFrame, pipeline=None, model_path: Optional[str] = None) -> pd.Series:
+_MISSING = object()
+
+
+class PredictionCache:
+    """
+    Bounded LRU map of per-row model outputs with a time-to-live.
+    Keys come from `prediction_keys`: (model name, model version, scoring
+    method, feature columns, feature values), so a retrained artifact never
+    serves stale scores. Thread-safe; `max_entries <= 0` disables caching.
+    - hits, misses, evictions (LRU), expirations (TTL): running counters
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 900.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get_many(self, keys: List[tuple]) -> List[Any]:
+        """
+        Cached value per key, or the module's _MISSING sentinel.
+        """
+        now = self._clock()
+        out = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    out.append(_MISSING)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    out.append(entry[1])
+        return out
+
+    def put_many(self, items: Iterable[tuple[tuple, Any]]):
+        if not self.enabled:
+            return
+        expires = self._clock() + self.ttl_seconds
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def prediction_keys(df: pd.DataFrame, model_name: str, version: Optional[str], method: str) -> List[tuple]:
+    """
+    One cache key per row: the canonical feature tuple (values in the feature
+    builders' column order) prefixed by model name, version and method.
+    Missing values (NaN, NaT, pd.NA) become None: NaN != NaN, so a key
+    holding one would never match again.
+    """
+    columns = tuple(df.columns)
+    prefix = (model_name, version, method, columns)
+    rows = zip(*(_key_values(df[column]) for column in columns))
+    return [prefix + (row,) for row in rows]
+
+
+def _key_values(column: pd.Series) -> list:
+    values = column.tolist()
+    missing = column.isna().to_numpy()
+    if missing.any():
+        for i in np.flatnonzero(missing).tolist():
+            values[i] = None
+    return values
+
+
+class ModelRegistry:
+    """
+    Process-wide store of fitted pipelines and their metadata.
+    Each (path, meta_path) pair is unpickled at most once; later lookups
+    return the cached (pipeline, metadata_dict) tuple.
+    - backend: "sklearn" or "compiled"; defaults to config.INFERENCE_BACKEND at load time
+    - cache: optional PredictionCache for the registry's models, cleared
+      whenever a model is (re)loaded
+    With config.FAST_PREPROCESSING the fitted ColumnTransformer is swapped for a
+    FastPreprocessor (same output, precomputed lookups).
+    """
+
+    def __init__(self, backend: Optional[str] = None, cache: Optional[PredictionCache] = None):
+        self._models: Dict[tuple[str, str], tuple] = {}
+        self._provenance: Dict[tuple[str, str], ModelProvenance] = {}
+        self._lock = threading.Lock()
+        self.backend = backend
+        self.cache = cache
+
+    def _serving_pipeline(self, pipeline):
+        # imported here: both import sklearn, which only has to load with the first model
+        from app.models.compiled_ensemble import compile_pipeline
+        from app.models.fast_preprocessor import FastPipeline, FastPreprocessor
+
+        backend = self.backend or config.INFERENCE_BACKEND
+        if backend not in ("sklearn", "compiled"):
+            raise ValueError(f"Unknown inference backend: {backend}")
+        preprocessor = None
+        if config.FAST_PREPROCESSING:
+            try:
+                # request batches are small: dense rows score faster than CSR, even for "sparse" artifacts
+                preprocessor = FastPreprocessor.from_pipeline(pipeline, sparse_output=False)
+            except TypeError as e:
+                logger.warning("Keeping the fitted ColumnTransformer, no fast path: %s", e)
+        if backend == "compiled":
+            try:
+                return compile_pipeline(pipeline, max_rows=config.COMPILED_MAX_ROWS, preprocessor=preprocessor)
+            except TypeError as e:
+                logger.warning("Serving sklearn pipeline, could not compile: %s", e)
+        if preprocessor is not None:
+            return FastPipeline(preprocessor, pipeline[-1])
+        return pipeline
+
+    def get_by_path(self, path: str, meta_path: str) -> tuple:
+        key = (path, meta_path)
+        entry = self._models.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is None:
+                    pipeline, meta, provenance = load_model_with_provenance(path, meta_path)
+                    entry = (self._serving_pipeline(pipeline), meta)
+                    self._models[key] = entry
+                    self._provenance[key] = provenance
+                    if self.cache is not None:
+                        self.cache.clear()
+        return entry
+
+    def get(self, name: str) -> tuple:
+        """
+        Return (pipeline, metadata_dict) for a model name from MODEL_SPECS,
+        loading it on first use if the startup hook did not.
+        """
+        if name not in MODEL_SPECS:
+            raise KeyError(f"Unknown model: {name}")
+        path, meta_path = MODEL_SPECS[name]
+        return self.get_by_path(path, meta_path)
+
+    def load_all(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Eagerly load the named models (default: all of MODEL_SPECS).
+        Missing artifacts are logged and skipped so the app can still start;
+        requests for them raise FileNotFoundError as before.
+        Returns the names that were loaded.
+        """
+        loaded = []
+        for name in names or MODEL_SPECS:
+            try:
+                self.get(name)
+                loaded.append(name)
+            except FileNotFoundError as e:
+                logger.warning("Skipping model %s: %s", name, e)
+        return loaded
+
+    def reload(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Drop and load again the named models (default: all of MODEL_SPECS),
+        e.g. after new artifacts were pulled. Returns the names that were loaded.
+        """
+        names = list(names or MODEL_SPECS)
+        with self._lock:
+            for name in names:
+                self._models.pop(MODEL_SPECS.get(name), None)
+                self._provenance.pop(MODEL_SPECS.get(name), None)
+            if self.cache is not None:
+                self.cache.clear()
+        return self.load_all(names)
+
+    def is_loaded(self, name: str) -> bool:
+        return MODEL_SPECS.get(name) in self._models
+
+    def provenance(self, name: str) -> ModelProvenance:
+        """ModelProvenance of a model name, loading the model if needed."""
+        self.get(name)
+        return self._provenance[MODEL_SPECS[name]]
+
+    def provenance_snapshot(self) -> Dict[str, Dict]:
+        """Provenance of the models loaded so far, by name (no loading)."""
+        return {
+            name: self._provenance[spec].as_dict()
+            for name, spec in MODEL_SPECS.items()
+            if spec in self._provenance
+        }
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._provenance.clear()
+            if self.cache is not None:
+                self.cache.clear()
+
+
+prediction_cache = PredictionCache(
+    max_entries=config.PREDICTION_CACHE_SIZE,
+    ttl_seconds=config.PREDICTION_CACHE_TTL_SECONDS,
+)
+model_registry = ModelRegistry(cache=prediction_cache)
+
+
+def get_model(name: str) -> tuple:
+    """
+    Return the registry's (pipeline, metadata_dict) for `name`.
+    """
+    return model_registry.get(name)
+
+
+def _resolve_pipeline(pipeline, model_name: Optional[str], model_path: Optional[str], meta_path: Optional[str]) -> tuple:
+    """
+    Shared lookup for the batch helpers: an explicit pipeline wins, then a
+    registry name, then a (model_path, meta_path) pair served from the registry.
+    """
+    if model_name is not None:
+        registered, meta = model_registry.get(model_name)
+        return (pipeline if pipeline is not None else registered), meta
+    if model_path:
+        registered, meta = model_registry.get_by_path(model_path, meta_path)
+        return (pipeline if pipeline is not None else registered), meta
+    return pipeline, {}
+
+
+DEDUP_ROWS_TOTAL = metrics_registry.counter(
+    "f1_dedup_rows_total",
+    "Feature rows before (input) and after (unique) collapsing repeated rows of a batch",
+    ("model", "rows"),
+)
+
+
+def dedupe_rows(df: pd.DataFrame) -> tuple[pd.DataFrame, Optional[np.ndarray]]:
+    """
+    Distinct rows of a feature frame, grouped on a 64-bit hash of their values
+    (pd.util.hash_pandas_object) and confirmed equal within each group:
+    returns (unique, inverse) with unique.iloc[inverse] equal to df row for
+    row, first occurrences in their original order. (df, None) when every row
+    is distinct, on a hash collision, or when BATCH_DEDUP is off.
+    """
+    if not config.BATCH_DEDUP or len(df) < 2:
+        return df, None
+    with timed_stage("dedup"):
+        codes, uniques = pd.factorize(pd.util.hash_pandas_object(df, index=False).to_numpy())
+        if len(uniques) == len(df):
+            return df, None
+        # first occurrence of each code (codes number the hashes in order of appearance)
+        _, first = np.unique(codes, return_index=True)
+        if not _rows_equal(df, first[codes]):
+            return df, None
+        return df.iloc[first], codes
+
+
+def _rows_equal(df: pd.DataFrame, rows: np.ndarray) -> bool:
+    """Whether each row of df equals row rows[i] (missing values equal each other)."""
+    for column in df.columns:
+        values = df[column].to_numpy()
+        other = values[rows]
+        missing = pd.isna(values)
+        if not ((values == other) | (missing & missing[rows])).all():
+            return False
+    return True
+
+
+def _score(df: pd.DataFrame, pipeline, method: str, model_name: Optional[str] = None) -> np.ndarray:
+    """
+    pipeline.<method>(df), scoring each distinct row once (dedupe_rows) and
+    served through the registry's PredictionCache when `pipeline` is the
+    registered model for `model_name`: cached rows are reused and only the
+    misses are scored, in one call. Results follow df's row order.
+    Timed as the "predict" stage of the current request.
+    """
+    with timed_stage("predict"):
+        unique, inverse = dedupe_rows(df)
+        if len(df) > 1:
+            label = model_name or ""
+            DEDUP_ROWS_TOTAL.labels(label, "input").inc(len(df))
+            DEDUP_ROWS_TOTAL.labels(label, "unique").inc(len(unique))
+        scores = _score_cached(unique, pipeline, method, model_name)
+        return scores if inverse is None else scores[inverse]
+
+
+def _score_cached(df: pd.DataFrame, pipeline, method: str, model_name: Optional[str]) -> np.ndarray:
+    cache = model_registry.cache
+    if model_name is None or cache is None or not cache.enabled or len(df) == 0:
+        return np.asarray(getattr(pipeline, method)(df))
+    registered, _ = model_registry.get(model_name)
+    if pipeline is not registered:
+        return np.asarray(getattr(pipeline, method)(df))
+
+    keys = prediction_keys(df, model_name, model_registry.provenance(model_name).version, method)
+    found = cache.get_many(keys)
+    missing = [i for i, value in enumerate(found) if value is _MISSING]
+    if missing:
+        subset = df if len(missing) == len(df) else df.iloc[missing]
+        # plain Python values: cached rows must not pin the whole batch array
+        fresh = np.asarray(getattr(pipeline, method)(subset)).tolist()
+        cache.put_many(zip((keys[i] for i in missing), fresh))
+        for i, value in zip(missing, fresh):
+            found[i] = value
+    return np.asarray(found, dtype=float)
+
+
+def predict_df(df: pd.DataFrame, pipeline=None, model_path: Optional[str] = None, model_name: Optional[str] = None) -> pd.Series:
     """
     Predict on a DataFrame. Accepts raw feature columns as expected by the
     training pipeline (same names/order isn't required if ColumnTransformer
     + OneHotEncoder with handle_unknown='ignore' used).
+    - model_name: registry name; rows already scored by that model come from the prediction cache
     Returns a pd.Series of predictions.
     """
     if pipeline is None:
-        pipeline, _ = load_model(model_path)
-    preds = pipeline.predict(df)
+        pipeline = get_model(model_name)[0] if model_name else load_model(model_path)[0]
+    preds = _score(df, pipeline, "predict", model_name)
     return pd.Series(preds, index=df.index)
 
-def get_proba_df(df: pd.DataFrame, pipeline=None, model_path: Optional[str] = None) -> pd.Series:
+def get_proba_df(df: pd.DataFrame, pipeline=None, model_path: Optional[str] = None, model_name: Optional[str] = None) -> pd.Series:
     """
     Get probability on a DataFrame. Accepts raw feature columns as expected by the
     training pipeline (same names/order isn't required if ColumnTransformer
     + OneHotEncoder with handle_unknown='ignore' used).
+    - model_name: registry name; rows already scored by that model come from the prediction cache
     Returns a pd.Series of probabilities for the positive class.
     """
     if pipeline is None:
-        pipeline, _ = load_model(model_path)
-    preds = pipeline.predict_proba(df)[:, 1]*100  # probability of positive class
+        pipeline = get_model(model_name)[0] if model_name else load_model(model_path)[0]
+    preds = _score(df, pipeline, "predict_proba", model_name)[:, 1]*100  # probability of positive class
     return pd.Series(preds, index=df.index)
 
 def predict_record(record: Dict, pipeline=None, model_path: Optional[str] = None) -> float:
@@ -82,13 +495,17 @@ def get_record_percentiles_for_classification(record: Dict, pipeline=None, model
     return float(get_proba_df(df, pipeline=pipeline, model_path=model_path).iloc[0])
 
 
-def save_metadata(extra: Dict, path: Optional[Path] = None):
+def save_metadata(extra: Dict, path: Optional[Path] = None, artifact: Optional[Path] = None):
     """
     Save metadata JSON next to models. Called by training script.
+    - artifact: the saved .pkl; its sha256 is recorded as artifact_hash so
+      serving can identify the model without hashing or running git
     """
     p = Path(path) if path else MAIN_RACE_META_FILE
     p.parent.mkdir(parents=True, exist_ok=True)
     base = {"git_commit": _git_commit_hash()}
+    if artifact is not None:
+        base["artifact_hash"] = file_sha256(Path(artifact))
     base.update(extra or {})
     p.write_text(json.dumps(base, indent=2))
 
@@ -98,21 +515,20 @@ def predict_batch_and_rank(
     model_path: Optional[str] = None,
     meta_path: Optional[str] = None,
     rank_keys: Optional[list] = None,
+    model_name: Optional[str] = None,
 ) -> tuple[pd.DataFrame, Dict]:
     """
     Predict for a batch DataFrame and compute predicted_final_position per race.
     - df: DataFrame of expanded features (must include rank_keys columns)
     - pipeline: optional preloaded pipeline
-    - model_path: optional model path (resolved by load_model)
+    - model_path: optional model path (served from the model registry)
     - rank_keys: list of columns to define a race group, defaults to ["race_year","race_month","race_day","circuit"]
+    - model_name: optional registry name (see MODEL_SPECS), preferred over model_path
     Returns (df_out, meta) where df_out contains 'predicted_deviation_from_median' and 'predicted_final_position'.
     """
-    if pipeline is None:
-        pipeline, meta = load_model(path= model_path, meta_path=meta_path)
-    else:
-        _, meta = load_model(path=model_path, meta_path=meta_path) if model_path else ({}, {})  # ensure meta loaded when requested
+    pipeline, meta = _resolve_pipeline(pipeline, model_name, model_path, meta_path)
     # predict
-    predictions = pipeline.predict(df)
+    predictions = _score(df, pipeline, "predict", model_name)
     df_out = df.copy()
     df_out["predicted_deviation_from_median"] = np.asarray(predictions).astype(float)
 
@@ -121,19 +537,20 @@ def predict_batch_and_rank(
         rank_keys = ["race_year", "race_month", "race_day", "circuit"]
     # keep only keys that exist
     used_keys = [k for k in rank_keys if k in df_out.columns]
-    if not used_keys:
-        # fallback: rank globally
-        df_out["predicted_final_position"] = df_out["predicted_deviation_from_median"].rank(
-            method="min", ascending=True
-        ).astype(int)
-        return df_out, meta
-
-    # compute predicted final position per group (lower deviation -> better pos)
-    df_out["predicted_final_position"] = (
-        df_out.groupby(used_keys)["predicted_deviation_from_median"]
-        .rank(method="min", ascending=True)
-        .astype(int)
-    )
+    with timed_stage("rank"):
+        if not used_keys:
+            # fallback: rank globally
+            df_out["predicted_final_position"] = df_out["predicted_deviation_from_median"].rank(
+                method="min", ascending=True
+            ).astype(int)
+            return df_out, meta
+
+        # compute predicted final position per group (lower deviation -> better pos)
+        df_out["predicted_final_position"] = (
+            df_out.groupby(used_keys)["predicted_deviation_from_median"]
+            .rank(method="min", ascending=True)
+            .astype(int)
+        )
 
     return df_out, meta
 
@@ -142,21 +559,49 @@ def get_batch_proba(
     pipeline=None,
     model_path: Optional[str] = None,
     meta_path: Optional[str] = None,
+    model_name: Optional[str] = None,
 ) -> tuple[pd.DataFrame, Dict]:
     """
     Predict probabilities for a batch DataFrame.
     - df: DataFrame of expanded features (must include rank_keys columns)
     - pipeline: optional preloaded pipeline
-    - model_path: optional model path (resolved by load_model)
+    - model_path: optional model path (served from the model registry)
+    - model_name: optional registry name (see MODEL_SPECS), preferred over model_path
     Returns (df_out, meta) where df_out contains 'predicted_proba' and.
     """
-    if pipeline is None:
-        pipeline, meta = load_model(path=model_path, meta_path=meta_path)
-    else:
-        _, meta = load_model(path=model_path, meta_path=meta_path) if model_path else ({}, {})
+    pipeline, meta = _resolve_pipeline(pipeline, model_name, model_path, meta_path)
     # predict probabilities
-    predictions = pipeline.predict_proba(df)[:, 1]*100
+    predictions = _score(df, pipeline, "predict_proba", model_name)[:, 1]*100
     df_out = df.copy()
     df_out["predicted_proba"] = np.asarray(predictions).astype(float)
 
-    return df_out, meta
\ No newline at end of file
+    return df_out, meta
+
+
+def _collect_metrics():
+    """/metrics samples for the prediction cache, batch dedup and the loaded models."""
+    cache = model_registry.cache
+    if cache is not None:
+        for field in ("hits", "misses", "evictions", "expirations"):
+            yield (f"f1_prediction_cache_{field}_total", "counter", f"Prediction cache {field}", (), getattr(cache, field))
+        yield ("f1_prediction_cache_entries", "gauge", "Rows held by the prediction cache", (), len(cache))
+    dedup: Dict[str, Dict[str, float]] = {}
+    for labels, counter in DEDUP_ROWS_TOTAL.samples():
+        model, rows = (value for _, value in labels)
+        dedup.setdefault(model, {})[rows] = counter.value
+    for model, rows in dedup.items():
+        if rows.get("input"):
+            yield (
+                "f1_dedup_ratio", "gauge", "Share of batch rows not scored because they repeat another row",
+                (("model", model),), 1.0 - rows.get("unique", 0.0) / rows["input"],
+            )
+    for name, provenance in model_registry.provenance_snapshot().items():
+        labels = (("model", name),)
+        yield ("f1_model_load_seconds", "gauge", "Seconds spent loading the model", labels, provenance["load_seconds"])
+        yield (
+            "f1_model_info", "gauge", "Loaded model artifact (value is always 1)",
+            labels + (("artifact_hash", provenance["artifact_hash"]), ("git_commit", provenance["git_commit"] or "")), 1,
+        )
+
+
+metrics_registry.add_collector(_collect_metrics)
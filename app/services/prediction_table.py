@@ -0,0 +1,414 @@
+import argparse
+import itertools
+import logging
+import os
+import pickle
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core import config
+from app.core.metrics import metrics_registry
+from app.services import model_service
+from app.services.feature_builder import (
+    _OPTIONAL_INT_COLUMNS,
+    build_main_race_features_batch,
+    build_qualifying_features_batch,
+    build_status_features_batch,
+    features_columns,
+)
+from app.services.reference_data import get_reference_index
+
+logger = logging.getLogger(__name__)
+
+# per model: batch feature builder, whether the output is the positive-class
+# percentage (as get_proba_df) rather than predict, and the DTO fields a
+# lookup is keyed on
+TABLE_SPECS = {
+    "mainrace": (
+        build_main_race_features_batch, False,
+        ("circuit", "race_date", "laps", "driver", "constructor", "qualification_position", "rain"),
+    ),
+    "qualifying": (build_qualifying_features_batch, False, ("circuit", "race_date", "driver", "constructor")),
+    "status": (
+        build_status_features_batch, True,
+        ("circuit", "race_date", "driver", "constructor", "qualification_position", "rain"),
+    ),
+}
+RAIN_VALUES = (0, 1)
+
+LOOKUPS_TOTAL = metrics_registry.counter(
+    "f1_prediction_table_lookups_total",
+    "Single predictions looked up in the prediction table (hit, miss, or stale: scored by another model version)",
+    ("model", "result"),
+)
+
+
+def _ref_key(ref) -> str:
+    """A driver / constructor / circuit ref as the feature builders read it (spelling kept)."""
+    return str(ref).strip()
+
+
+def _column(values: list) -> np.ndarray:
+    array = np.asarray(values)
+    # strings (and ints with None) as object arrays sharing the str objects, not fixed-width copies
+    return array if array.dtype.kind in "biuf" else np.asarray(values, dtype=object)
+
+
+class PredictionTable:
+    """
+    One model's precomputed single predictions for one race weekend, rows in
+    enumerate_inputs order (entrant, then grid slot, then rain):
+    - entrants: (driver, constructor) refs (_ref_key) -> entrant index
+    - columns: feature values per column (features_columns), as NumPy arrays
+    - outputs: deviation from median, or DNF percentage for status, per row
+    - version: artifact_hash of the model that scored the rows
+    A row is found from its entrant, qualification_position and rain
+    arithmetically; refs must be spelled as at refresh time (surrounding
+    whitespace aside), since the features carry the caller's spelling: a
+    differently cased ref misses and is answered live, with its own spelling.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        circuit: str,
+        race_date: date,
+        laps: int,
+        version: str,
+        entrants: Dict[tuple, int],
+        grid_size: int,
+        columns: Dict[str, np.ndarray],
+        outputs: np.ndarray,
+        built_at: str,
+        build_seconds: float,
+    ):
+        self.model_name = model_name
+        self.circuit = circuit
+        self.race_date = race_date
+        self.laps = laps
+        self.version = version
+        self.entrants = entrants
+        self.grid_size = grid_size
+        self.columns = columns
+        self.outputs = outputs
+        self.built_at = built_at
+        self.build_seconds = build_seconds
+
+    def __len__(self) -> int:
+        return len(self.outputs)
+
+    def row(self, dto: Dict) -> Optional[int]:
+        fields = TABLE_SPECS[self.model_name][2]
+        if _ref_key(dto.get("circuit")) != self.circuit or dto.get("race_date") != self.race_date:
+            return None
+        if "laps" in fields and dto.get("laps") != self.laps:
+            return None
+        entrant = self.entrants.get((_ref_key(dto.get("driver")), _ref_key(dto.get("constructor"))))
+        if entrant is None or "qualification_position" not in fields:
+            return entrant
+        position, rain = dto.get("qualification_position"), dto.get("rain")
+        if position not in range(1, self.grid_size + 1) or rain not in RAIN_VALUES:
+            return None
+        return (entrant * self.grid_size + position - 1) * len(RAIN_VALUES) + RAIN_VALUES.index(rain)
+
+    def features(self, row: int) -> Dict:
+        """Feature dict of a row, in the scalar builders' shape (see features_records)."""
+        record = {}
+        for column, values in self.columns.items():
+            value = values[row]
+            if value is None and column in _OPTIONAL_INT_COLUMNS:
+                continue
+            record[column] = value.item() if isinstance(value, np.generic) else value
+        return record
+
+    def summary(self) -> Dict:
+        return {
+            "circuit": self.circuit,
+            "race_date": self.race_date.isoformat(),
+            "laps": self.laps,
+            "entrants": len(self.entrants),
+            "rows": len(self),
+            "version": self.version,
+            "built_at": self.built_at,
+            "build_seconds": self.build_seconds,
+        }
+
+
+def _pickable(model_name: str, kind: str) -> frozenset:
+    """Lowercase pickable refs of `model_name`, as ReferenceIndex.is_pickable matches them."""
+    return get_reference_index().pickable.get(model_name, {}).get(kind, frozenset())
+
+
+def enumerate_inputs(
+    model_name: str,
+    circuit: str,
+    race_date: date,
+    laps: int,
+    entrants: Iterable[Dict],
+    grid_size: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Every single-prediction DTO `model_name` can be asked about at one race:
+    the weekend's entrants (dicts with driver and constructor), times
+    qualification_position 1..grid_size and rain 0/1 for the models that take
+    them. References keep the given spelling (stripped), exactly as a live
+    request carries it; pickability is checked case-insensitively like the
+    routes do, and entrants that are not pickable are skipped. Raises
+    ValueError when the circuit is not pickable.
+    """
+    circuit_ref = _ref_key(circuit)
+    if circuit_ref.lower() not in _pickable(model_name, "circuits"):
+        raise ValueError(f"Circuit {circuit!r} is not pickable for {model_name}")
+    drivers, constructors = _pickable(model_name, "drivers"), _pickable(model_name, "constructors")
+    pairs = {}
+    for entrant in entrants:
+        driver, constructor = _ref_key(entrant["driver"]), _ref_key(entrant["constructor"])
+        if driver.lower() not in drivers or constructor.lower() not in constructors:
+            logger.warning("Entrant %s / %s is not pickable for %s", entrant["driver"], entrant["constructor"], model_name)
+            continue
+        pairs.setdefault((driver, constructor), None)
+
+    fields = TABLE_SPECS[model_name][2]
+    grid = range(1, (grid_size or config.PREDICTION_TABLE_GRID_SIZE) + 1)
+    if "qualification_position" not in fields:
+        return [
+            {"driver": driver, "constructor": constructor, "circuit": circuit_ref, "race_date": race_date}
+            for driver, constructor in pairs
+        ]
+    dtos = [
+        {"qualification_position": position, "constructor": constructor, "circuit": circuit_ref,
+         "driver": driver, "race_date": race_date, "rain": rain}
+        for (driver, constructor), position, rain in itertools.product(pairs, grid, RAIN_VALUES)
+    ]
+    if "laps" in fields:
+        for dto in dtos:
+            dto["laps"] = laps
+    return dtos
+
+
+def build_prediction_table(
+    model_name: str,
+    circuit: str,
+    race_date: date,
+    laps: int,
+    entrants: Iterable[Dict],
+    grid_size: Optional[int] = None,
+) -> PredictionTable:
+    """
+    Enumerate `model_name`'s inputs for one race (enumerate_inputs) and score
+    them with the loaded model in one vectorized call. Rows bypass the
+    prediction cache: the table holds them instead.
+    """
+    t0 = time.perf_counter()
+    build, proba, fields = TABLE_SPECS[model_name]
+    grid_size = grid_size or config.PREDICTION_TABLE_GRID_SIZE
+    dtos = enumerate_inputs(model_name, circuit, race_date, laps, entrants, grid_size)
+    if not dtos:
+        raise ValueError(f"No pickable entrants for {model_name}")
+    pipeline, _ = model_service.get_model(model_name)
+    version = model_service.model_registry.provenance(model_name).version
+    df = build(dtos)
+    score = model_service.get_proba_df if proba else model_service.predict_df
+    outputs = score(df, pipeline=pipeline).to_numpy(dtype=float)
+    # enumerate_inputs keeps each entrant's rows together, in entrant order
+    pairs = dict.fromkeys((dto["driver"], dto["constructor"]) for dto in dtos)
+    return PredictionTable(
+        model_name=model_name,
+        circuit=dtos[0]["circuit"],
+        race_date=race_date,
+        laps=laps,
+        version=version,
+        entrants={pair: i for i, pair in enumerate(pairs)},
+        grid_size=grid_size if "qualification_position" in fields else 0,
+        columns={column: _column(values) for column, values in features_columns(df).items()},
+        outputs=outputs,
+        built_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        build_seconds=round(time.perf_counter() - t0, 4),
+    )
+
+
+def build_prediction_tables(
+    circuit: str,
+    race_date: date,
+    laps: int,
+    entrants: Iterable[Dict],
+    names: Optional[Iterable[str]] = None,
+) -> Dict[str, PredictionTable]:
+    """
+    build_prediction_table for each model (default: all of TABLE_SPECS) whose
+    pick list has the circuit and an entrant. Raises ValueError when none has.
+    """
+    entrants = list(entrants)
+    tables = {}
+    for name in names or TABLE_SPECS:
+        try:
+            tables[name] = build_prediction_table(name, circuit, race_date, laps, entrants)
+        except ValueError as e:
+            logger.warning("No prediction table for %s: %s", name, e)
+    if not tables:
+        raise ValueError(f"Circuit {circuit!r} or its entrants are not pickable for any model")
+    return tables
+
+
+def _signature(path: Path) -> Optional[tuple]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PredictionTableStore:
+    """
+    The prediction tables this process answers from, one per model. With
+    config.PREDICTION_TABLE_PATH, `install` also writes them there and
+    `lookup` has the file re-read once it changes (checked at most every
+    PREDICTION_TABLE_CHECK_SECONDS) by a background thread, so a refresh
+    reaches every server worker. Lookups take no lock: they read whichever
+    dict of tables is current, which writers replace whole. A table whose
+    version is not the loaded model's is kept but not served.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, PredictionTable] = {}
+        # serializes the writers (install, load, clear); lookups never take it
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._checked_at = float("-inf")
+        self._reloader: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _path() -> Optional[Path]:
+        return Path(config.PREDICTION_TABLE_PATH) if config.PREDICTION_TABLE_PATH else None
+
+    def lookup(self, model_name: str, dto: Dict) -> Optional[tuple]:
+        """
+        (features, output) for a single-prediction DTO when the table has it
+        and was scored by the loaded model, else None (predict live).
+        """
+        self._check_file()
+        table = self._tables.get(model_name)
+        row = table.row(dto) if table is not None else None
+        if row is None:
+            LOOKUPS_TOTAL.labels(model_name, "miss").inc()
+            return None
+        if table.version != model_service.model_registry.provenance(model_name).version:
+            LOOKUPS_TOTAL.labels(model_name, "stale").inc()
+            return None
+        LOOKUPS_TOTAL.labels(model_name, "hit").inc()
+        return table.features(row), float(table.outputs[row])
+
+    def install(self, tables: Dict[str, PredictionTable]):
+        """Serve `tables` (replacing every model's table) and persist them when configured."""
+        path = self._path()
+        with self._lock:
+            self._tables = dict(tables)
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                with open(tmp, "wb") as f:
+                    pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+                self._signature = _signature(path)
+
+    def load(self) -> int:
+        """Read the tables from PREDICTION_TABLE_PATH, if set and present. Returns the rows loaded."""
+        path = self._path()
+        if path is None:
+            return 0
+        with self._lock:
+            signature = _signature(path)
+            if signature is not None and signature != self._signature:
+                with open(path, "rb") as f:
+                    tables = pickle.load(f)
+                self._tables = tables
+                self._signature = signature
+                logger.info("Loaded prediction tables from %s: %s", path, {n: len(t) for n, t in tables.items()})
+            self._checked_at = time.monotonic()
+            return sum(len(table) for table in self._tables.values())
+
+    def _reload(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Reloading the prediction tables failed; serving the previous ones")
+
+    def _check_file(self):
+        """Start a background load() when the file is due a check and none is running."""
+        if not config.PREDICTION_TABLE_PATH or time.monotonic() - self._checked_at < config.PREDICTION_TABLE_CHECK_SECONDS:
+            return
+        self._checked_at = time.monotonic()
+        if self._reloader is None or not self._reloader.is_alive():
+            self._reloader = threading.Thread(target=self._reload, name="prediction-table-reload", daemon=True)
+            self._reloader.start()
+
+    def clear(self):
+        with self._lock:
+            self._tables = {}
+            self._signature = None
+            self._checked_at = float("-inf")
+
+    def snapshot(self) -> Dict:
+        """Per model: the table's summary plus whether it is stale (no loading)."""
+        loaded = model_service.model_registry.provenance_snapshot()
+        out = {}
+        for name, table in self._tables.items():
+            current = loaded.get(name, {}).get("artifact_hash")
+            out[name] = {**table.summary(), "stale": current is not None and current != table.version}
+        return out
+
+
+prediction_tables = PredictionTableStore()
+
+
+def refresh_prediction_tables(circuit: str, race_date: date, laps: int, entrants: Iterable[Dict]) -> Dict:
+    """Build every model's table for one race and its entrants and serve it. Returns the snapshot."""
+    prediction_tables.install(build_prediction_tables(circuit, race_date, laps, entrants))
+    return prediction_tables.snapshot()
+
+
+def load_prediction_tables() -> int:
+    """Startup hook: tables persisted at PREDICTION_TABLE_PATH, if any."""
+    return prediction_tables.load()
+
+
+def _entrant(value: str) -> Dict:
+    driver, sep, constructor = value.partition(":")
+    if not sep or not driver or not constructor:
+        raise argparse.ArgumentTypeError(f"expected driver:constructor, got {value!r}")
+    return {"driver": driver, "constructor": constructor}
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Precompute job: load the models and reference data, build the tables for
+    one race and its entrants (driver:constructor) and write them to --output
+    (default PREDICTION_TABLE_PATH), where running servers pick them up.
+
+        python -m app.services.prediction_table --circuit silverstone --race-date 2025-07-06 --laps 52 \\
+            --entrants hamilton:ferrari leclerc:ferrari norris:mclaren piastri:mclaren
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--circuit", required=True)
+    parser.add_argument("--race-date", required=True, type=date.fromisoformat)
+    parser.add_argument("--laps", required=True, type=int)
+    parser.add_argument("--entrants", required=True, nargs="+", type=_entrant, help="driver:constructor per car")
+    parser.add_argument("--output", default=config.PREDICTION_TABLE_PATH, help="table file (default: PREDICTION_TABLE_PATH)")
+    args = parser.parse_args(argv)
+    if not args.output:
+        parser.error("--output is required when PREDICTION_TABLE_PATH is not set")
+    logging.basicConfig(level=logging.INFO)
+
+    config.PREDICTION_TABLE_PATH = args.output
+    model_service.model_registry.load_all()
+    for name, summary in refresh_prediction_tables(args.circuit, args.race_date, args.laps, args.entrants).items():
+        logger.info("%s: %d rows in %.2fs (model %s)", name, summary["rows"], summary["build_seconds"], summary["version"])
+
+
+if __name__ == "__main__":
+    main()
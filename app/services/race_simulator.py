@@ -0,0 +1,167 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from app.core import config
+from app.services import model_service
+
+# quantile levels recorded by training: the empirical residual CDF at 1% steps
+RESIDUAL_QUANTILES = 101
+
+
+class NoResidualNoise(Exception):
+    """
+    Raised by noise_for when the loaded model has no recorded residuals and
+    SIMULATION_RESIDUAL_STD is unset; the simulate route answers 503.
+    """
+
+
+class ResidualNoise:
+    """
+    Error model of a regression model's predicted deviation (ms), from
+    training residuals (actual - predicted):
+    - quantiles: residual quantiles at evenly spaced levels 0..1; draws invert
+      this empirical CDF, so skew and heavy tails carry over
+    - std: residual standard deviation, drawn as a normal when there are no quantiles
+    - source: how the residuals were obtained (e.g. "3-fold out-of-fold")
+    """
+
+    def __init__(self, quantiles: Optional[Sequence[float]] = None, std: Optional[float] = None, source: str = ""):
+        if quantiles is None and std is None:
+            raise ValueError("ResidualNoise needs quantiles or a std")
+        self.quantiles = np.asarray(quantiles, dtype=float) if quantiles is not None else None
+        self.std = float(std) if std is not None else float(np.std(self.quantiles))
+        self.source = source
+        self._levels = np.linspace(0.0, 1.0, len(self.quantiles)) if self.quantiles is not None else None
+
+    @classmethod
+    def from_residuals(cls, residuals, source: str = "") -> "ResidualNoise":
+        residuals = np.asarray(residuals, dtype=float)
+        levels = np.linspace(0.0, 1.0, RESIDUAL_QUANTILES)
+        return cls(np.quantile(residuals, levels), float(np.std(residuals)), source)
+
+    def as_dict(self) -> Dict:
+        return {
+            "source": self.source,
+            "std": self.std,
+            "quantiles": self.quantiles.tolist() if self.quantiles is not None else None,
+        }
+
+    def sample(self, rng: np.random.Generator, shape) -> np.ndarray:
+        if self.quantiles is not None:
+            return np.interp(rng.random(shape), self._levels, self.quantiles)
+        return rng.normal(0.0, self.std, shape)
+
+
+def residuals_file(model_name: str) -> Path:
+    """
+    Where training writes a model's ResidualNoise: next to its metadata
+    (MODEL_DIR/<name>_residuals.json), not in it, as every prediction
+    response carries the metadata.
+    """
+    return Path(model_service.MODEL_DIR) / f"{model_name}_residuals.json"
+
+
+def save_residuals(noise: ResidualNoise, path: Path, artifact: Path):
+    """Write `noise` for the artifact it was measured on (sha256, as artifact_hash)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"artifact_hash": model_service.file_sha256(Path(artifact)), **noise.as_dict()}, indent=2))
+
+
+# (residuals file, model version) -> ResidualNoise, or None when the file is missing or for another artifact
+_noise_cache: Dict[tuple, Optional[ResidualNoise]] = {}
+
+
+def _load_residuals(path: Path, version: str) -> Optional[ResidualNoise]:
+    key = (str(path), version)
+    if key not in _noise_cache:
+        noise = None
+        if path.exists():
+            recorded = json.loads(path.read_text())
+            if recorded.get("artifact_hash") == version:
+                noise = ResidualNoise(recorded.get("quantiles"), recorded.get("std"), recorded.get("source", ""))
+        _noise_cache[key] = noise
+    return _noise_cache[key]
+
+
+def noise_for(model_name: str) -> ResidualNoise:
+    """
+    The loaded model's ResidualNoise (residuals_file, when recorded for this
+    artifact), else a normal with SIMULATION_RESIDUAL_STD. Raises
+    NoResidualNoise when neither is available.
+    """
+    version = model_service.model_registry.provenance(model_name).version
+    noise = _load_residuals(residuals_file(model_name), version)
+    if noise is not None:
+        return noise
+    if config.SIMULATION_RESIDUAL_STD is not None:
+        return ResidualNoise(std=config.SIMULATION_RESIDUAL_STD, source="SIMULATION_RESIDUAL_STD")
+    raise NoResidualNoise(
+        f"No residuals recorded for the loaded {model_name} model (retrain with --residual-folds) "
+        "and SIMULATION_RESIDUAL_STD is not set (e.g. 57000, the held-out RMSE in research/Thesis.ipynb)"
+    )
+
+
+@dataclass
+class RaceSimulation:
+    """
+    Finishing positions of one grid over n_simulations simulated races:
+    - position_probabilities: [car, position - 1] share of races the car
+      finished there (rows and columns sum to 1)
+    - dnf_rate: share of races the car retired in
+    """
+    n_simulations: int
+    position_probabilities: np.ndarray
+    dnf_rate: np.ndarray
+
+    @property
+    def expected_position(self) -> np.ndarray:
+        positions = np.arange(1, self.position_probabilities.shape[1] + 1)
+        return self.position_probabilities @ positions
+
+    def top(self, k: int) -> np.ndarray:
+        """P(finishing position <= k) per car: k=1 wins, 3 podiums, 10 points."""
+        return self.position_probabilities[:, :k].sum(axis=1)
+
+
+def simulate_race(
+    deviation: Sequence[float],
+    dnf_probability: Sequence[float],
+    noise: ResidualNoise,
+    n_simulations: int = 10000,
+    rng: Optional[np.random.Generator] = None,
+) -> RaceSimulation:
+    """
+    Simulate one grid n_simulations times, all races at once as
+    (n_simulations, cars) arrays: each car's time is its predicted deviation
+    plus a residual draw, it retires with its DNF probability (0..1), and
+    the cars are ranked by time within each race, retirements behind every
+    finisher (in drawn-time order).
+    """
+    deviation = np.asarray(deviation, dtype=float)
+    dnf_probability = np.asarray(dnf_probability, dtype=float)
+    n_cars = len(deviation)
+    rng = rng if rng is not None else np.random.default_rng()
+
+    times = deviation + noise.sample(rng, (n_simulations, n_cars))
+    retired = rng.random((n_simulations, n_cars)) < dnf_probability
+    if retired.any():
+        # past the slowest finisher of any race, keeping the retirements' own order
+        times[retired] += np.ptp(times) + 1.0
+    order = np.argsort(times, axis=1)
+    # position of each car in each race: scatter 0..n-1 along the sorted order
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_cars), axis=1)
+
+    counts = np.bincount(
+        (np.arange(n_cars) * n_cars + positions).ravel(), minlength=n_cars * n_cars
+    ).reshape(n_cars, n_cars)
+    return RaceSimulation(
+        n_simulations=n_simulations,
+        position_probabilities=counts / n_simulations,
+        dnf_rate=retired.mean(axis=0),
+    )
@@ -0,0 +1,207 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parents[2]  # repo root (.. / .. from this file)
+DATA_DIR = Path(os.environ.get("MODEL_DIR", str(project_root / "data")))
+
+MODEL_TYPES = ("mainrace", "qualifying", "status")
+
+
+def _load_csv(path: Path) -> pd.DataFrame:
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_csv(path, dtype=str)
+
+
+def _lower_keys(df: pd.DataFrame, column: str) -> Optional[pd.Series]:
+    if df.empty or column not in df.columns:
+        return None
+    return df[column].fillna("").str.lower()
+
+
+def _first_by_key(df: pd.DataFrame, keys: Optional[pd.Series]) -> Dict[str, dict]:
+    """
+    Map lowercase key -> first matching row (as a dict), mirroring the
+    `df[mask].iloc[0]` lookups the feature builders used to do.
+    """
+    if keys is None:
+        return {}
+    out: Dict[str, dict] = {}
+    for key, record in zip(keys.tolist(), df.to_dict(orient="records")):
+        out.setdefault(key, record)
+    return out
+
+
+def _parse_date(record: dict, column: str):
+    if column not in record:
+        return None
+    try:
+        return pd.to_datetime(record[column], errors="coerce")
+    except Exception:
+        return None
+
+
+class ReferenceIndex:
+    """
+    In-memory hash maps over data/processed/{drivers,constructors,circuits}.csv
+    and the features_helper pick lists, keyed by lowercase reference.
+    Built once per process; lookups are O(1) and do no I/O.
+    pick_lists keeps each pick list's references as written, in file order.
+    """
+
+    def __init__(
+        self,
+        drivers: Dict[str, dict],
+        driver_aliases: Dict[str, dict],
+        constructors: Dict[str, dict],
+        circuits: Dict[str, dict],
+        pickable: Dict[str, Dict[str, FrozenSet[str]]],
+        pick_lists: Optional[Dict[str, Dict[str, tuple]]] = None,
+    ):
+        self.drivers = drivers
+        self.driver_aliases = driver_aliases
+        self.constructors = constructors
+        self.circuits = circuits
+        self.pickable = pickable
+        self.pick_lists = pick_lists or {}
+        self._tables: Dict[str, tuple] = {}
+
+    @classmethod
+    def from_dir(cls, data_dir: Optional[Path] = None) -> "ReferenceIndex":
+        data_dir = Path(data_dir) if data_dir else DATA_DIR
+        processed = data_dir / "processed"
+
+        drivers = _load_csv(processed / "drivers.csv")
+        driver_records = {}
+        for key, record in _first_by_key(drivers, _lower_keys(drivers, "driverRef")).items():
+            driver_records[key] = cls._driver_entry(record)
+        driver_aliases = {}
+        if "forename" in drivers.columns and "surname" in drivers.columns:
+            full = (drivers["forename"].fillna("") + " " + drivers["surname"].fillna("")).str.lower()
+            for key, record in _first_by_key(drivers, full).items():
+                driver_aliases[key] = cls._driver_entry(record)
+
+        constructors = _load_csv(processed / "constructors.csv")
+        constructor_records = {
+            key: {"constructor_nationality": record.get("constructor_nationality")}
+            for key, record in _first_by_key(constructors, _lower_keys(constructors, "constructorRef")).items()
+        }
+
+        circuits = _load_csv(processed / "circuits.csv")
+        circuit_records = {
+            key: {
+                "circuit_nationality": record.get("circuit_nationality"),
+                "type_circuit": record.get("type_circuit"),
+            }
+            for key, record in _first_by_key(circuits, _lower_keys(circuits, "circuitRef")).items()
+        }
+
+        pickable, pick_lists = {}, {}
+        helper = processed / "features_helper"
+        for model_type in MODEL_TYPES:
+            refs, lists = {}, {}
+            for kind, column in (("drivers", "driverRef"), ("constructors", "constructorRef"), ("circuits", "circuitRef")):
+                pick_list = _load_csv(helper / f"{kind}_{model_type}.csv")
+                keys = _lower_keys(pick_list, column)
+                refs[kind] = frozenset(keys.tolist()) if keys is not None else frozenset()
+                lists[kind] = tuple(record[column].strip() for key, record in _first_by_key(pick_list, keys).items() if key)
+            pickable[model_type] = refs
+            pick_lists[model_type] = lists
+
+        return cls(driver_records, driver_aliases, constructor_records, circuit_records, pickable, pick_lists)
+
+    @staticmethod
+    def _driver_entry(record: dict) -> dict:
+        return {
+            "driver_nationality": record.get("driver_nationality"),
+            "driver_date_of_birth": _parse_date(record, "driver_date_of_birth"),
+            "first_race_date": _parse_date(record, "first_race_date"),
+        }
+
+    def driver(self, ref: str) -> Optional[dict]:
+        """Lookup by driverRef, falling back to "forename surname"."""
+        key = ref.lower()
+        entry = self.drivers.get(key)
+        return entry if entry is not None else self.driver_aliases.get(key)
+
+    def constructor(self, ref: str) -> Optional[dict]:
+        return self.constructors.get(ref.lower())
+
+    def circuit(self, ref: str) -> Optional[dict]:
+        return self.circuits.get(ref.lower())
+
+    def table(self, kind: str) -> tuple[pd.Index, Dict[str, np.ndarray]]:
+        """
+        Lookup table for `kind` in ("drivers", "constructors", "circuits") as a
+        lowercase-key Index plus one aligned array per attribute, for vectorized
+        joins via `keys.get_indexer(...)`. Drivers merge the driverRef map with
+        the forename+surname aliases (driverRef wins), so a batch resolves
+        drivers with one join.
+        """
+        cached = self._tables.get(kind)
+        if cached is not None:
+            return cached
+        if kind == "drivers":
+            records = {**self.driver_aliases, **self.drivers}
+            columns = ["driver_nationality", "driver_date_of_birth", "first_race_date"]
+        elif kind == "constructors":
+            records = self.constructors
+            columns = ["constructor_nationality"]
+        elif kind == "circuits":
+            records = self.circuits
+            columns = ["circuit_nationality", "type_circuit"]
+        else:
+            raise KeyError(f"Unknown reference table: {kind}")
+        frame = pd.DataFrame.from_dict(records, orient="index", columns=columns)
+        arrays = {}
+        for column in columns:
+            if column in ("driver_date_of_birth", "first_race_date"):
+                arrays[column] = pd.to_datetime(frame[column], errors="coerce").to_numpy(dtype="datetime64[ns]")
+            else:
+                arrays[column] = frame[column].to_numpy(dtype=object)
+        table = (pd.Index(frame.index, dtype=object), arrays)
+        self._tables[kind] = table
+        return table
+
+    def is_pickable(self, driver: str, constructor: str, circuit: str, type: str) -> bool:
+        refs = self.pickable.get(type)
+        if refs is None:
+            return False
+        return (
+            driver.lower() in refs["drivers"]
+            and constructor.lower() in refs["constructors"]
+            and circuit.lower() in refs["circuits"]
+        )
+
+
+_index: Optional[ReferenceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_reference_index() -> ReferenceIndex:
+    """
+    Return the process-wide ReferenceIndex, building it on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ReferenceIndex.from_dir(DATA_DIR)
+    return _index
+
+
+def load_reference_index(data_dir: Optional[Path] = None) -> ReferenceIndex:
+    """
+    (Re)build the process-wide ReferenceIndex, e.g. at startup or after the
+    processed CSVs change.
+    """
+    global _index
+    index = ReferenceIndex.from_dir(data_dir or DATA_DIR)
+    with _index_lock:
+        _index = index
+    return index
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from app.core import config
+from app.services import model_service
+from app.services.feature_service import warm_options_cache
+from app.services.prediction_table import load_prediction_tables
+from app.services.reference_data import load_reference_index
+from app.utils import dvc_pull_with_gcp_key
+
+logger = logging.getLogger(__name__)
+
+STARTUP_MODES = ("blocking", "background", "prestart", "preloaded")
+
+
+class StartupState:
+    """
+    Startup progress of this process, behind /ready:
+    - status: "idle" (startup not run), "starting", "ready" or "failed"
+    - timings: seconds spent in each step (sync, models, reference, options,
+      tables when PREDICTION_TABLE_PATH is set)
+    - error: why startup failed
+    """
+
+    def __init__(self):
+        self.status = "idle"
+        self.mode: Optional[str] = None
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        # green only once every model is loaded, not just when startup returned
+        return self.status == "ready" and all(
+            model_service.model_registry.is_loaded(name) for name in model_service.MODEL_SPECS
+        )
+
+    @property
+    def starting(self) -> bool:
+        return self.status == "starting"
+
+    def snapshot(self) -> Dict:
+        return {
+            "status": "ready" if self.ready else ("degraded" if self.status == "ready" else self.status),
+            "mode": self.mode,
+            "models": {name: model_service.model_registry.is_loaded(name) for name in model_service.MODEL_SPECS},
+            "provenance": model_service.model_registry.provenance_snapshot(),
+            "timings_s": dict(self.timings),
+            "error": self.error,
+        }
+
+
+startup_state = StartupState()
+
+
+def _timed(state: StartupState, step: str, fn, *args):
+    t0 = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        state.timings[step] = round(time.perf_counter() - t0, 4)
+
+
+def run_startup(state: StartupState, sync: bool, raise_errors: bool = True) -> StartupState:
+    """
+    Pull artifacts (when `sync`), then unpickle every pipeline once per
+    process and warm the reference index and option lists (and read the
+    persisted prediction tables, if any).
+    """
+    state.status, state.error = "starting", None
+    try:
+        if sync:
+            _timed(state, "sync", dvc_pull_with_gcp_key)
+        _timed(state, "models", model_service.model_registry.load_all)
+        _timed(state, "reference", load_reference_index)
+        _timed(state, "options", warm_options_cache)
+        if config.PREDICTION_TABLE_PATH:
+            _timed(state, "tables", load_prediction_tables)
+    except Exception as e:
+        state.status, state.error = "failed", f"{type(e).__name__}: {e}"
+        if raise_errors:
+            raise
+        logger.exception("Startup failed")
+        return state
+    state.status = "ready"
+    logger.info("Startup complete (%s): %s", state.mode, state.timings)
+    return state
+
+
+def start(mode: str, state: Optional[StartupState] = None) -> StartupState:
+    """
+    Startup per APP_STARTUP_MODE:
+    - "blocking": pull artifacts and load everything before serving
+    - "background": serve at once (health checks pass, other routes answer
+      503 until ready) while a thread pulls and loads
+    - "prestart": artifacts were pulled by a separate step
+      (python -m app.utils); load everything before serving
+    - "preloaded": a forked server worker (app.server) whose parent already
+      ran startup; keeps the inherited models, index and state
+    """
+    if mode not in STARTUP_MODES:
+        raise ValueError(f"Unknown startup mode: {mode} (expected one of {STARTUP_MODES})")
+    state = state or startup_state
+    if mode == "preloaded":
+        if state.status != "ready":
+            raise RuntimeError(f"Startup mode 'preloaded' needs a completed startup, got status {state.status!r}")
+        state.mode = mode
+        return state
+    state.mode, state.timings = mode, {}
+    if mode == "background":
+        state.status = "starting"
+        state.thread = threading.Thread(
+            target=run_startup, args=(state, True, False), name="startup", daemon=True
+        )
+        state.thread.start()
+        return state
+    return run_startup(state, sync=mode == "blocking")
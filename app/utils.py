@@ -14,3 +14,8 @@ def dvc_pull_with_gcp_key():
         os.remove(key_path)
     else:
         print('GCP_SA_KEY_B64 not provided; skipping dvc pull')
+
+
+if __name__ == "__main__":
+    # pre-start step for APP_STARTUP_MODE=prestart: python -m app.utils
+    dvc_pull_with_gcp_key()
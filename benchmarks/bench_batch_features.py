@@ -0,0 +1,58 @@
+"""
+Feature building for /predict/batch: per-row scalar builders vs the columnar
+batch builders, on grids of 20, 200 and 2,000 rows.
+
+    python benchmarks/bench_batch_features.py --sizes 20 200 2000
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import grid_dtos, write_data_dir
+from app.services import feature_builder, reference_data
+
+BUILDERS = {
+    "mainrace": (feature_builder.build_main_race_features_from_dto, feature_builder.build_main_race_features_batch),
+    "qualifying": (feature_builder.build_qualifying_features_from_dto, feature_builder.build_qualifying_features_batch),
+    "status": (feature_builder.build_status_features_from_dto, feature_builder.build_status_features_batch),
+}
+
+
+def _best_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[20, 200, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference_data.load_reference_index(write_data_dir(Path(tmp)))
+        for name, (scalar, batch) in BUILDERS.items():
+            print(f"[{name}]")
+            for size in args.sizes:
+                dtos = grid_dtos(size)
+                pd.testing.assert_frame_equal(batch(dtos), pd.DataFrame([scalar(d) for d in dtos]))
+                scalar_ms = _best_ms(lambda: pd.DataFrame([scalar(d) for d in dtos]), args.repeat)
+                batch_ms = _best_ms(lambda: batch(dtos), args.repeat)
+                print(f"  rows={size:<6} scalar={scalar_ms:9.2f}ms  batch={batch_ms:8.2f}ms  speedup x{scalar_ms / batch_ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
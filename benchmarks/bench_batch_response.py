@@ -0,0 +1,88 @@
+"""
+Batch response assembly after scoring: iterrows + one Pydantic item per row
++ response_model re-validation + JSON (before) vs column-wise payload and
+fast JSON encoding (after, rows and columnar), at 20, 200 and 2,000 rows.
+
+    python benchmarks/bench_batch_response.py --sizes 20 200 2000
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.synthetic import grid_dtos, write_data_dir
+from app.api.responses import prediction_payload, render_json
+from app.schemas.dto import MainRacePredictInput, MainRacePredictionItem, MainRacePredictResponse
+from app.services import reference_data
+from app.services.feature_builder import build_main_race_features_batch, features_records
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def _before(inputs, df, df_preds, meta) -> bytes:
+    items = []
+    for inp, feats, (_, row) in zip(inputs, features_records(df), df_preds.iterrows()):
+        items.append(MainRacePredictionItem(
+            input=inp,
+            features=feats,
+            predicted_deviation_from_median=float(row["predicted_deviation_from_median"]),
+            predicted_final_position=int(row["predicted_final_position"]),
+        ))
+    response = MainRacePredictResponse(predictions=items, model_meta=meta)
+    # what FastAPI's response_model does with the returned object
+    validated = MainRacePredictResponse.model_validate(response.model_dump())
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode("utf-8")
+
+
+def _after(inputs, df, df_preds, meta, columnar=False) -> bytes:
+    outputs = {
+        "predicted_deviation_from_median": df_preds["predicted_deviation_from_median"].to_numpy(dtype=float).tolist(),
+        "predicted_final_position": df_preds["predicted_final_position"].to_numpy(dtype=int).tolist(),
+    }
+    return render_json(prediction_payload("predictions", inputs, df, outputs, meta, columnar=columnar))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[20, 200, 2000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference_data.load_reference_index(write_data_dir(Path(tmp)))
+        meta = {"git_commit": "synthetic"}
+        for size in args.sizes:
+            inputs = [MainRacePredictInput(**d).model_dump() for d in grid_dtos(size)]
+            df = build_main_race_features_batch(inputs)
+            df_preds = df.copy()
+            df_preds["predicted_deviation_from_median"] = np.random.default_rng(0).normal(0, 1e4, size)
+            df_preds["predicted_final_position"] = df_preds.groupby("circuit")["predicted_deviation_from_median"].rank().astype(int)
+
+            assert json.loads(_before(inputs, df, df_preds, meta)) == json.loads(_after(inputs, df, df_preds, meta))
+            before = _median_ms(lambda: _before(inputs, df, df_preds, meta), args.repeat)
+            rows = _median_ms(lambda: _after(inputs, df, df_preds, meta), args.repeat)
+            columnar = _median_ms(lambda: _after(inputs, df, df_preds, meta, columnar=True), args.repeat)
+            print(f"rows={size:<6} iterrows+pydantic={before:8.2f}ms  column-wise={rows:7.2f}ms x{before / rows:5.1f}"
+                  f"  columnar={columnar:7.2f}ms x{before / columnar:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Feature representations (app.models.representation) and artifact
+compression, per model kind, on synthetic training data:
+- fit: seconds and peak memory growth while fitting (ru_maxrss, each variant
+  in a fresh process), plus the size of the transformed training matrix
+- artifact: .pkl size and joblib.load seconds (best of --repeats) for each
+  --compress level
+- serve: transformed size of a --batch-rows batch as served (FastPreprocessor,
+  dense rows), the prediction difference against the "dense" variant (max
+  and mean; predict_proba for status), and the largest one between the
+  served and sklearn pipelines of the same variant
+
+    python benchmarks/bench_compact.py --kinds mainrace status --rows 20000 --n-estimators 100 --compress 0 3 --output compact.json
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import joblib
+import numpy as np
+from scipy import sparse as sp
+
+from benchmarks.synthetic import fit_pipeline, training_frame
+from app.models.fast_preprocessor import FastPipeline, FastPreprocessor
+from app.models.representation import REPRESENTATIONS
+
+MIB = 1024 * 1024
+
+
+def _nbytes(X) -> int:
+    if sp.issparse(X):
+        X = X.tocsr()
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return np.asarray(X).nbytes
+
+
+def _peak_rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux reports kB
+
+
+def _fit(kind: str, representation: str, rows: int, n_estimators: int, path: str) -> dict:
+    # runs in a fresh process, so ru_maxrss only reflects this variant
+    X, _ = training_frame(kind, n_rows=rows)
+    before = _peak_rss()
+    t0 = time.perf_counter()
+    pipeline = fit_pipeline(kind, n_rows=rows, n_estimators=n_estimators, representation=representation)
+    fit_seconds = time.perf_counter() - t0
+    peak = _peak_rss() - before
+    matrix = _nbytes(pipeline[:-1].transform(X))
+    joblib.dump(pipeline, path)
+    return {"fit_s": round(fit_seconds, 2), "fit_peak_mib": round(peak / MIB, 1), "train_matrix_mib": round(matrix / MIB, 2)}
+
+
+def _load_seconds(path: Path, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        joblib.load(path)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _scores(pipeline, X, kind: str) -> np.ndarray:
+    return pipeline.predict_proba(X) if kind == "status" else pipeline.predict(X)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kinds", nargs="+", default=["mainrace"], choices=["mainrace", "qualifying", "status"])
+    parser.add_argument("--rows", type=int, default=20000, help="training rows")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--compress", nargs="+", type=int, default=[0, 3], help="joblib compression levels")
+    parser.add_argument("--batch-rows", type=int, default=1000, help="rows of the served batch")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    rows = []
+    spawn = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for kind in args.kinds:
+            X_serve, _ = training_frame(kind, n_rows=args.batch_rows, seed=1)
+            reference = None
+            for representation in REPRESENTATIONS:
+                path = tmp / f"{kind}_{representation}.pkl"
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    fitted = pool.submit(_fit, kind, representation, args.rows, args.n_estimators, str(path)).result()
+                pipeline = joblib.load(path)
+                scores = _scores(pipeline, X_serve, kind)
+                if reference is None:
+                    reference = scores
+                fast = FastPipeline(FastPreprocessor.from_pipeline(pipeline, sparse_output=False), pipeline[-1])
+                row = {
+                    "kind": kind,
+                    "representation": representation,
+                    **fitted,
+                    "serve_batch_mib": round(_nbytes(fast.transform(X_serve)) / MIB, 2),
+                    "max_diff_vs_dense": float(np.max(np.abs(scores - reference))),
+                    "mean_diff_vs_dense": float(np.mean(np.abs(scores - reference))),
+                    "max_diff_served": float(np.max(np.abs(_scores(fast, X_serve, kind) - scores))),
+                    "artifacts": [],
+                }
+                for level in args.compress:
+                    artifact = tmp / f"{kind}_{representation}_{level}.pkl"
+                    joblib.dump(pipeline, artifact, compress=level)
+                    row["artifacts"].append({
+                        "compress": level,
+                        "size_mib": round(artifact.stat().st_size / MIB, 2),
+                        "load_s": round(_load_seconds(artifact, args.repeats), 4),
+                    })
+                rows.append(row)
+                artifacts = "  ".join(f"c{a['compress']}: {a['size_mib']:6.2f} MiB load {a['load_s'] * 1000:6.1f}ms"
+                                      for a in row["artifacts"])
+                print(f"{kind:<10} {representation:<8} fit {row['fit_s']:6.1f}s peak +{row['fit_peak_mib']:7.1f} MiB "
+                      f"matrix {row['train_matrix_mib']:7.2f} MiB  serve batch {row['serve_batch_mib']:6.2f} MiB  "
+                      f"diff vs dense max {row['max_diff_vs_dense']:.3g} mean {row['mean_diff_vs_dense']:.3g} served {row['max_diff_served']:.3g}  {artifacts}")
+    if args.output:
+        args.output.write_text(json.dumps({"rows": args.rows, "n_estimators": args.n_estimators, "variants": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+sklearn Pipeline.predict vs the compiled NumPy tree evaluator, end to end
+(preprocessing included) and estimator-only, for 1, 20 and 2,000 rows.
+Also checks parity of every variant.
+
+    python benchmarks/bench_compiled_ensemble.py --models mainrace status
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import fit_pipeline, training_frame
+from app.models.compiled_ensemble import compile_pipeline
+
+
+def _median_ms(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=["mainrace", "qualifying", "status"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1, 20, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for name in args.models:
+        pipeline = fit_pipeline(name)
+        compiled = compile_pipeline(pipeline)  # no sklearn fallback: time the evaluator itself
+        method = "predict_proba" if name == "status" else "predict"
+        print(f"[{name}]")
+        for size in args.sizes:
+            X, _ = training_frame(name, n_rows=size, seed=7)
+            Xt = compiled.transform(X)
+            expected = getattr(pipeline, method)(X)
+            np.testing.assert_allclose(getattr(compiled, method)(X), expected, rtol=1e-9, atol=1e-9)
+
+            sk_full = _median_ms(lambda: getattr(pipeline, method)(X), args.repeat)
+            co_full = _median_ms(lambda: getattr(compiled, method)(X), args.repeat)
+            sk_est = _median_ms(lambda: getattr(pipeline[-1], method)(Xt), args.repeat)
+            co_est = _median_ms(lambda: getattr(compiled.ensemble, method)(Xt), args.repeat)
+            print(f"  rows={size:<5} pipeline: sklearn={sk_full:8.3f}ms compiled={co_full:8.3f}ms | "
+                  f"estimator: sklearn={sk_est:8.3f}ms compiled={co_est:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+predict_batch_and_rank with and without BATCH_DEDUP on a synthetic fitted
+main race pipeline, served as the registry serves it (FastPreprocessor):
+batches of --rows rows drawn from fewer distinct rows as the repeated share
+grows. Reports the best of --repeats seconds per variant, and the cost of
+dedupe_rows alone (its overhead when nothing repeats).
+
+    python benchmarks/bench_dedup.py --rows 10000 --repeated 0 0.5 0.9 0.99 --n-estimators 400
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from benchmarks.synthetic import fit_pipeline, training_frame
+from app.core import config
+from app.models.fast_preprocessor import FastPipeline, FastPreprocessor
+from app.services.model_service import dedupe_rows, predict_batch_and_rank
+
+
+def _best(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000, help="rows per batch")
+    parser.add_argument("--repeated", nargs="+", type=float, default=[0.0, 0.5, 0.9, 0.99],
+                        help="share of rows repeating another row of the batch")
+    parser.add_argument("--n-estimators", type=int, default=400)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pipeline = fit_pipeline("mainrace", n_estimators=args.n_estimators)
+    served = FastPipeline(FastPreprocessor.from_pipeline(pipeline, sparse_output=False), pipeline[-1])
+    rng = np.random.default_rng(args.seed)
+    for repeated in args.repeated:
+        distinct = max(1, round(args.rows * (1.0 - repeated)))
+        X, _ = training_frame("mainrace", n_rows=distinct, seed=args.seed + 1)
+        # every distinct row at least once, the rest drawn from them
+        picks = np.concatenate([np.arange(distinct), rng.integers(0, distinct, args.rows - distinct)])
+        df = X.iloc[rng.permutation(picks)].reset_index(drop=True)
+
+        timings = {}
+        for dedup in (False, True):
+            config.BATCH_DEDUP = dedup
+            timings[dedup] = _best(lambda: predict_batch_and_rank(df, pipeline=served), args.repeats)
+        config.BATCH_DEDUP = True
+        unique, _ = dedupe_rows(df)
+        hashing = _best(lambda: dedupe_rows(df), args.repeats)
+        print(f"repeated={repeated:4.2f} unique rows {len(unique):6d}/{len(df)}  "
+              f"no dedup {timings[False] * 1000:8.1f}ms  dedup {timings[True] * 1000:8.1f}ms  "
+              f"x{timings[False] / timings[True]:5.2f}  (dedupe_rows {hashing * 1000:6.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Preprocessing on the hot path: the fitted ColumnTransformer vs the precomputed
+FastPreprocessor, transform alone and end-to-end predict, at 1, 20 and 2,000 rows.
+
+    python benchmarks/bench_fast_preprocessor.py --sizes 1 20 2000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import fit_pipeline, training_frame
+from app.models.fast_preprocessor import FastPipeline, FastPreprocessor
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1, 20, 2000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--models", nargs="+", default=["mainrace", "qualifying", "status"])
+    args = parser.parse_args()
+
+    for name in args.models:
+        pipeline = fit_pipeline(name, n_estimators=400)
+        preprocessor = pipeline.named_steps["preprocessing"]
+        fast = FastPreprocessor.from_pipeline(pipeline)
+        fast_pipeline = FastPipeline(fast, pipeline[-1])
+        score = "predict_proba" if name == "status" else "predict"
+        print(f"[{name}] output columns={fast.n_output}")
+        for size in args.sizes:
+            X, _ = training_frame(name, n_rows=size, seed=7)
+            assert np.array_equal(fast.transform(X), preprocessor.transform(X))
+            assert np.array_equal(getattr(fast_pipeline, score)(X), getattr(pipeline, score)(X))
+            ct_ms = _median_ms(lambda: preprocessor.transform(X), args.repeat)
+            fast_ms = _median_ms(lambda: fast.transform(X), args.repeat)
+            e2e_ct = _median_ms(lambda: getattr(pipeline, score)(X), args.repeat)
+            e2e_fast = _median_ms(lambda: getattr(fast_pipeline, score)(X), args.repeat)
+            print(f"  rows={size:<6} transform: ct={ct_ms:8.3f}ms fast={fast_ms:8.3f}ms x{ct_ms / fast_ms:5.1f}"
+                  f"   {score}: ct={e2e_ct:8.3f}ms fast={e2e_fast:8.3f}ms x{e2e_ct / e2e_fast:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
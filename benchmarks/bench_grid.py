@@ -0,0 +1,79 @@
+"""
+One 20-car race: /main-race/predict/batch (every row repeats circuit, date,
+laps and rain; race-level features resolved per row) vs /main-race/predict/grid
+(race header + compact entries; race-level features resolved once). Times
+request validation + features + scoring + encoding, and compares body sizes.
+
+    python benchmarks/bench_grid.py --repeat 200
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import grid_dtos, write_data_dir, write_model_dir
+from app.api.routers import predict_mainrace
+from app.schemas.dto import MainRaceGridPredictInput, MainRacePredictInput
+from app.services import model_service, reference_data
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cars", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_model_dir(tmp, kinds=("mainrace",))
+        reference_data.load_reference_index(write_data_dir(tmp))
+        model_service.MODEL_DIR = tmp
+        model_service.prediction_cache.max_entries = 0  # score every call
+        model_service.get_model("mainrace")
+
+        rows = grid_dtos(args.cars)
+        header = {k: rows[0][k] for k in ("circuit", "race_date", "laps", "rain")}
+        rows = [{**row, **header} for row in rows]  # one race
+        grid = {
+            "race": header,
+            "entries": [{k: row[k] for k in ("driver", "constructor", "qualification_position")} for row in rows],
+        }
+        batch_body = json.dumps(rows, default=str).encode()
+        grid_body = json.dumps(grid, default=str).encode()
+
+        def batch():
+            inputs = [MainRacePredictInput(**d).model_dump() for d in json.loads(batch_body)]
+            return predict_mainrace._predict_batch(inputs)
+
+        def whole_grid():
+            return predict_mainrace._predict_grid(MainRaceGridPredictInput.model_validate_json(grid_body).model_dump())
+
+        batch_out = json.loads(batch())
+        grid_out = json.loads(whole_grid())
+        assert [p["predicted_final_position"] for p in batch_out["predictions"]] == \
+            [p["predicted_final_position"] for p in grid_out["predictions"]]
+
+        batch_ms = _median_ms(batch, args.repeat)
+        grid_ms = _median_ms(whole_grid, args.repeat)
+        print(f"cars={args.cars} batch={batch_ms:6.2f}ms ({len(batch_body)}B in, {len(batch())}B out)"
+              f"  grid={grid_ms:6.2f}ms ({len(grid_body)}B in, {len(whole_grid())}B out)  x{batch_ms / grid_ms:4.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+optimize_lineups (app.services.lineup_optimizer) on full-grid fantasy
+instances: --drivers drivers and --constructors constructors with prices
+drawn like a season's price list (4.5-30.0 in 0.1 steps, expensive picks
+scoring more), 5 drivers + 2 constructors under a 100.0 budget. Reports the
+best of --repeats seconds per top_k, and the exhaustive enumeration of every
+lineup the optimizer replaces (checked to agree on the best lineup).
+
+    python benchmarks/bench_lineups.py --drivers 20 --constructors 10 --top-k 1 10 50 --instances 5
+"""
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from app.services.lineup_optimizer import optimize_lineups, price_units
+
+PRICE_STEP = 0.1
+
+
+def _instance(rng: np.random.Generator, n_drivers: int, n_constructors: int):
+    """Prices on a 4.5-30.0 ladder; expected points track price, with noise."""
+    def side(n, points_scale):
+        prices = np.round(np.sort(rng.uniform(4.5, 30.0, n))[::-1], 1)
+        points = prices * points_scale + rng.normal(0.0, 6.0, n)
+        return points, price_units(prices, PRICE_STEP)
+    return side(n_drivers, 0.8) + side(n_constructors, 1.4)
+
+
+def _enumerate(driver_points, driver_units, constructor_points, constructor_units, budget):
+    """Every 5 + 2 lineup, the best one that fits (the client-side brute force)."""
+    best, best_lineup = -np.inf, None
+    constructor_pairs = [
+        (constructor_points[list(pair)].sum(), constructor_units[list(pair)].sum(), pair)
+        for pair in itertools.combinations(range(len(constructor_points)), 2)
+    ]
+    for drivers in itertools.combinations(range(len(driver_points)), 5):
+        cost = driver_units[list(drivers)].sum()
+        value = driver_points[list(drivers)].sum()
+        for pair_points, pair_cost, pair in constructor_pairs:
+            if cost + pair_cost <= budget and value + pair_points > best:
+                best, best_lineup = value + pair_points, (drivers, pair)
+    return best, best_lineup
+
+
+def _best(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--constructors", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=100.0)
+    parser.add_argument("--top-k", nargs="+", type=int, default=[1, 10, 50])
+    parser.add_argument("--instances", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-enumerate", action="store_true", help="skip the exhaustive baseline")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    budget = int(round(args.budget / PRICE_STEP))
+    timings = {k: [] for k in args.top_k}
+    enumeration = []
+    for _ in range(args.instances):
+        instance = _instance(rng, args.drivers, args.constructors)
+        for k in args.top_k:
+            timings[k].append(_best(lambda: optimize_lineups(*instance, budget, 5, 2, k), args.repeats))
+        if not args.no_enumerate:
+            t0 = time.perf_counter()
+            best, _ = _enumerate(*instance, budget)
+            enumeration.append(time.perf_counter() - t0)
+            lineup = optimize_lineups(*instance, budget, 5, 2, 1)[0]
+            assert abs(lineup.expected_points - best) < 1e-9, (lineup.expected_points, best)
+
+    print(f"{args.drivers} drivers x {args.constructors} constructors, budget {args.budget}, "
+          f"{args.instances} instances (median of best-of-{args.repeats})")
+    for k, seconds in timings.items():
+        print(f"optimize top_k={k:<3d} {np.median(seconds) * 1000:8.1f}ms")
+    if enumeration:
+        print(f"enumerate best      {np.median(enumeration) * 1000:8.1f}ms  "
+              f"(x{np.median(enumeration) / np.median(timings[args.top_k[0]]):.0f} vs top_k={args.top_k[0]})")
+
+
+if __name__ == "__main__":
+    main()
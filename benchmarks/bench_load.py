@@ -0,0 +1,287 @@
+"""
+Load test: drives the ASGI app in-process (no server, no sockets) with
+--concurrency clients sending a weighted mix of requests back to back, on
+synthetic fitted pipelines and reference data (no DVC artifacts needed).
+Scenarios (--mix name=weight,...):
+- single: POST /main-race/predict, one DTO
+- grid: POST /main-race/predict/batch, one 20-car race
+- large: POST /main-race/predict/batch, --large-rows rows
+- options: GET /main-race/options/drivers
+Per concurrency level: --warmup seconds discarded, then --duration seconds
+measured. Reports requests/s and p50/p95/p99 latency per scenario and
+overall, and writes them with the run's settings to --output (JSON).
+With --baseline, compares against an earlier --output file and exits 1 when
+a scenario's throughput or p95 regressed by more than --tolerance.
+Latencies include the in-process client (small) but not HTTP parsing or
+the network; the prediction cache is off unless --cache is passed.
+
+    python benchmarks/bench_load.py --concurrency 1 8 32 --duration 10 --output load.json
+    python benchmarks/bench_load.py --concurrency 1 8 32 --duration 10 --baseline load.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import grid_dtos, write_data_dir, write_model_dir
+from app.core import config
+from app.services import feature_service, model_service, reference_data
+
+DEFAULT_MIX = "single=6,grid=3,large=1,options=2"
+# config knobs recorded with the results, so runs are compared like for like
+CONFIG_KEYS = (
+    "INFERENCE_BACKEND", "FAST_PREPROCESSING", "INFERENCE_EXECUTOR", "INFERENCE_WORKERS", "INFERENCE_MAX_QUEUE",
+    "MICRO_BATCH_MAX_SIZE", "MICRO_BATCH_MAX_WAIT_MS", "PREDICTION_CACHE_SIZE", "METRICS_ENABLED",
+)
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, default=str).encode()
+
+
+def scenarios(large_rows: int, seed: int = 0) -> dict:
+    """
+    name -> (method, path, bodies): requests of each scenario cycle through
+    their bodies, so consecutive requests do not repeat one payload.
+    """
+    races = grid_dtos(20 * 50, seed=seed)
+    return {
+        "single": ("POST", "/main-race/predict", [_encode(dto) for dto in races[:500]]),
+        "grid": ("POST", "/main-race/predict/batch", [_encode(races[i:i + 20]) for i in range(0, len(races), 20)]),
+        "large": ("POST", "/main-race/predict/batch", [_encode(grid_dtos(large_rows, seed=seed + 1))]),
+        "options": ("GET", "/main-race/options/drivers", [b""]),
+    }
+
+
+def parse_mix(mix: str, known) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in known:
+            raise SystemExit(f"Unknown scenario {name!r} (expected one of {sorted(known)})")
+        weights[name] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+class ASGIClient:
+    """Minimal HTTP/1.1 client calling an ASGI app directly."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> tuple[int, int]:
+        """Send one request; returns (status, response body bytes)."""
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "server": ("loadtest", 80), "client": ("loadtest", 1),
+            "headers": [(b"host", b"loadtest"), (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode())],
+        }
+        status, size = 0, 0
+        body_sent = False
+        disconnected = asyncio.Event()
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            disconnected.set()
+        return status, size
+
+
+def percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return float("nan")
+    return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+
+
+def summarize(latencies_ms: list, errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies_ms)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else float("nan"),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else float("nan"),
+    }
+
+
+async def _drive(client: ASGIClient, specs: dict, weights: dict, concurrency: int, seconds: float, seed: int) -> dict:
+    """`concurrency` clients for `seconds`; returns name -> (latencies_ms, errors), plus the elapsed time."""
+    names, cumulative = list(weights), []
+    total = 0.0
+    for name in names:
+        total += weights[name]
+        cumulative.append(total)
+    results = {name: ([], [0]) for name in names}
+    cursors = {name: 0 for name in names}
+    deadline = time.perf_counter() + seconds
+
+    async def worker(i: int):
+        rng = random.Random(seed * 1000 + i)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, cum_weights=cumulative)[0]
+            method, path, bodies = specs[name]
+            body = bodies[cursors[name] % len(bodies)]
+            cursors[name] += 1
+            t0 = time.perf_counter()
+            status, _ = await client.request(method, path, body)
+            latencies, errors = results[name]
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            if status >= 400:
+                errors[0] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return {"elapsed": time.perf_counter() - t0, "results": results}
+
+
+async def run_level(app, specs: dict, weights: dict, concurrency: int, warmup: float, duration: float, seed: int) -> dict:
+    """One concurrency level, inside the app's lifespan (models loaded, batchers and executor stopped after)."""
+    client = ASGIClient(app)
+    async with app.router.lifespan_context(app):
+        if warmup > 0:
+            await _drive(client, specs, weights, concurrency, warmup, seed)
+        measured = await _drive(client, specs, weights, concurrency, duration, seed + 1)
+    elapsed = measured["elapsed"]
+    endpoints = {
+        name: {"method": specs[name][0], "path": specs[name][1], **summarize(latencies, errors[0], elapsed)}
+        for name, (latencies, errors) in measured["results"].items()
+    }
+    everything = [ms for latencies, _ in measured["results"].values() for ms in latencies]
+    errors = sum(e[0] for _, e in measured["results"].values())
+    return {"concurrency": concurrency, "duration_s": round(elapsed, 3),
+            "total": summarize(everything, errors, elapsed), "endpoints": endpoints}
+
+
+def _print_level(level: dict):
+    print(f"concurrency={level['concurrency']} ({level['duration_s']}s)")
+    rows = [("total", level["total"])] + list(level["endpoints"].items())
+    for name, stats in rows:
+        print(f"  {name:<8} {stats['requests']:>7} req {stats['rps']:9.1f} req/s  p50={stats['p50_ms']:8.2f}ms "
+              f"p95={stats['p95_ms']:8.2f}ms p99={stats['p99_ms']:8.2f}ms  errors={stats['errors']}")
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """
+    Regressions of `current` against `baseline` (both --output documents),
+    matched by concurrency and scenario: throughput below (1 - tolerance)x or
+    p95 above (1 + tolerance)x the baseline.
+    """
+    previous = {level["concurrency"]: level for level in baseline.get("runs", [])}
+    regressions = []
+    for level in current["runs"]:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        for name, stats in level["endpoints"].items():
+            old = before["endpoints"].get(name)
+            if not old or not old["requests"] or not stats["requests"]:
+                continue
+            if stats["rps"] < old["rps"] * (1 - tolerance):
+                regressions.append(f"c={level['concurrency']} {name}: {stats['rps']:.1f} req/s (baseline {old['rps']:.1f})")
+            if stats["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+                regressions.append(f"c={level['concurrency']} {name}: p95 {stats['p95_ms']:.2f}ms (baseline {old['p95_ms']:.2f}ms)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="discarded seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,... (single, grid, large, options)")
+    parser.add_argument("--large-rows", type=int, default=1000)
+    parser.add_argument("--n-estimators", type=int, default=200, help="trees per synthetic model")
+    parser.add_argument("--cache", action="store_true", help="keep the prediction cache on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="earlier --output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression vs --baseline")
+    args = parser.parse_args()
+
+    specs = scenarios(args.large_rows, seed=args.seed)
+    weights = parse_mix(args.mix, specs)
+    if not args.cache:
+        config.PREDICTION_CACHE_SIZE = 0
+        model_service.prediction_cache.max_entries = 0
+    # the lifespan loads what is already on disk, without a DVC pull
+    config.APP_STARTUP_MODE = "prestart"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_model_dir(tmp, n_estimators=args.n_estimators)
+        processed = write_data_dir(tmp) / "processed"
+        model_service.MODEL_DIR = tmp
+        reference_data.DATA_DIR = tmp
+        feature_service.PROCESSED_DIR = processed
+        feature_service.FEATURES_HELPER_DIR = processed / "features_helper"
+        from app.main import create_app
+
+        # the app's own stack (metrics, startup gate, routes), without CORS / API key
+        app = create_app()
+        runs = []
+        for concurrency in args.concurrency:
+            level = asyncio.run(run_level(app, specs, weights, concurrency, args.warmup, args.duration, args.seed))
+            _print_level(level)
+            runs.append(level)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": model_service._git_commit_hash(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+            "weights": weights,
+            "config": {key: getattr(config, key) for key in CONFIG_KEYS},
+        },
+        "runs": runs,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"results written to {args.output}")
+    if args.baseline:
+        regressions = compare(json.loads(args.baseline.read_text()), result, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regression beyond {args.tolerance:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Cost of request instrumentation (METRICS_ENABLED), in microseconds:
+- stage: one `with timed_stage(...)` block (a batch request records 8)
+- middleware: MetricsMiddleware around a minimal ASGI app (request histogram + counter)
+- route: an async endpoint's FastAPI handler as InstrumentedRoute vs APIRoute
+  (route labelling plus the validation / endpoint / response stages)
+- profiling off: what Ml-Profile support adds to a request that does not
+  send the header (header scan in MetricsMiddleware, plus the checks in the
+  inference executor and micro-batcher)
+- batch: POST /main-race/predict/batch with --rows rows through create_app()
+  called as an ASGI app, metrics off vs on, for scale (the difference is
+  within run-to-run noise at this size)
+Each figure is the best of --repeats runs.
+
+    python benchmarks/bench_metrics.py --requests 20000 --rows 20
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import timeit
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import grid_dtos, write_data_dir, write_model_dir
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+
+from app.core import config
+from app.core.logging import (
+    InstrumentedRoute,
+    MetricsMiddleware,
+    RequestTiming,
+    _timing,
+    call_profiled,
+    profiling_active,
+    timed_stage,
+)
+from app.services import model_service, reference_data
+
+
+def _scope(method: str, path: str, body: bytes) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+
+
+async def _run(app, method: str, path: str, body: bytes, n: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} answered {message['status']}")
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await app(_scope(method, path, body), receive, send)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def _off_on(app, method: str, path: str, body: bytes, n: int, repeats: int) -> dict:
+    best = {False: float("inf"), True: float("inf")}
+    for _ in range(repeats):
+        for enabled in (False, True):
+            config.METRICS_ENABLED = enabled
+            best[enabled] = min(best[enabled], asyncio.run(_run(app, method, path, body, n)))
+    return best
+
+
+async def _minimal(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _ping():
+    return None
+
+
+async def _route(route_class, n: int) -> float:
+    # the route's request handler alone, as if inside MetricsMiddleware
+    handler = route_class("/ping", _ping, methods=["GET"]).get_route_handler()
+    scope = {"type": "http", "method": "GET", "path": "/ping", "headers": [], "query_string": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        _timing.set(RequestTiming(time.perf_counter()))
+        async with AsyncExitStack() as outer, AsyncExitStack() as inner:
+            stacks = {"fastapi_middleware_astack": outer, "fastapi_inner_astack": inner, "fastapi_function_astack": inner}
+            await handler(Request({**scope, **stacks}, receive))
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    config.METRICS_ENABLED = True
+    n = args.requests * 10
+    stage = min(timeit.repeat("with timed_stage('features'): pass", globals={"timed_stage": timed_stage},
+                              number=n, repeat=args.repeats)) / n * 1e6
+    print(f"stage      {stage:6.2f}us per timed_stage block")
+    bare = min(asyncio.run(_run(_minimal, "GET", "/", b"", n)) for _ in range(args.repeats))
+    wrapped = min(asyncio.run(_run(MetricsMiddleware(_minimal), "GET", "/", b"", n)) for _ in range(args.repeats))
+    print(f"middleware {wrapped - bare:6.2f}us per request ({bare:.2f}us -> {wrapped:.2f}us)")
+    plain = min(asyncio.run(_route(APIRoute, args.requests)) for _ in range(args.repeats))
+    instrumented = min(asyncio.run(_route(InstrumentedRoute, args.requests)) for _ in range(args.repeats))
+    print(f"route      {instrumented - plain:6.2f}us per request ({plain:.2f}us -> {instrumented:.2f}us)")
+    allowed = min(asyncio.run(_run(MetricsMiddleware(_minimal, profiling=True), "GET", "/", b"", n))
+                  for _ in range(args.repeats))
+    hooks = min(timeit.repeat("profiling_active(); call_profiled(int)", number=n, repeat=args.repeats,
+                              globals={"profiling_active": profiling_active, "call_profiled": call_profiled})) / n * 1e6
+    print(f"profiling off {allowed - wrapped + hooks:6.2f}us per request "
+          f"(header scan {allowed - wrapped:.2f}us, executor / batcher checks {hooks:.2f}us)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_model_dir(tmp, kinds=("mainrace",), n_estimators=50)
+        reference_data.load_reference_index(write_data_dir(tmp))
+        model_service.MODEL_DIR = tmp
+        model_service.prediction_cache.max_entries = 0  # score every request
+        from app.main import create_app
+
+        # the app's own stack (metrics, startup gate, routes), without CORS / API key
+        app = create_app()
+
+        body = json.dumps(grid_dtos(args.rows), default=str).encode()
+        best = _off_on(app, "POST", "/main-race/predict/batch", body, max(1, args.requests // 100), args.repeats)
+        print(f"batch      {best[True] - best[False]:6.2f}us per request "
+              f"({args.rows} rows: off {best[False]:.1f}us, on {best[True]:.1f}us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Concurrent single-row predictions: one pipeline call per request
+(max batch size 1) vs the asyncio micro-batcher coalescing them.
+
+    python benchmarks/bench_micro_batcher.py --concurrency 64 --requests 1024
+"""
+import argparse
+import asyncio
+import functools
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import training_frame, write_model_dir
+from app.services import model_service
+from app.services.micro_batcher import SCORERS, MicroBatcher
+
+
+async def _drive(batcher: MicroBatcher, rows: list[dict], concurrency: int) -> list[float]:
+    """
+    `concurrency` clients each sending requests back to back; returns per-request latency (ms).
+    """
+    latencies = []
+    pending = iter(rows)
+
+    async def client():
+        for features in pending:
+            t0 = time.perf_counter()
+            await batcher.submit(features)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    try:
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    finally:
+        await batcher.stop()
+    return latencies
+
+
+def _report(label: str, latencies: list[float], elapsed: float):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {label:<22} {len(latencies) / elapsed:8.0f} req/s  p50={statistics.median(latencies):7.2f}ms  p99={p99:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=1024)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--models", nargs="+", default=["mainrace", "status"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_service.MODEL_DIR = write_model_dir(Path(tmp), kinds=args.models)
+        model_service.prediction_cache.max_entries = 0  # measure scoring, not cache hits
+        for name in args.models:
+            model_service.model_registry.load_all([name])
+            X, _ = training_frame(name, n_rows=args.requests, seed=3)
+            rows = X.to_dict(orient="records")
+            print(f"[{name}] concurrency={args.concurrency}")
+            for label, size in (("one call per request", 1), ("micro-batched", 64)):
+                batcher = MicroBatcher(name, functools.partial(SCORERS[name], name), max_batch_size=size, max_wait_ms=args.max_wait_ms)
+                t0 = time.perf_counter()
+                latencies = asyncio.run(_drive(batcher, rows, args.concurrency))
+                _report(label, latencies, time.perf_counter() - t0)
+                sizes = batcher.batch_sizes.snapshot()
+                print(f"  {'':<22} mean batch={sizes['sum'] / sizes['count']:.1f} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Per-request latency of a single-row prediction, before and after the model registry.
+
+before: load_model() (joblib.load + metadata read) on every request
+after:  model_registry.get() returning the pipeline loaded at startup
+
+    python benchmarks/bench_model_registry.py --requests 50
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import training_frame, write_model_dir
+from app.services import model_service
+
+
+def _time_requests(fn, n: int) -> list[float]:
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000.0)
+    return out
+
+
+def _report(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<28} mean={statistics.mean(samples):8.2f}ms  p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--models", nargs="+", default=["mainrace", "qualifying", "status"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_service.MODEL_DIR = write_model_dir(Path(tmp), kinds=args.models)
+
+        for name in args.models:
+            path, meta_path = model_service.MODEL_SPECS[name]
+            X, _ = training_frame(name, n_rows=1, seed=1)
+            score = model_service.get_proba_df if name == "status" else model_service.predict_df
+
+            def before():
+                pipeline, _ = model_service.load_model(path=path, meta_path=meta_path)
+                score(X, pipeline=pipeline)
+
+            def after():
+                pipeline, _ = model_service.get_model(name)
+                score(X, pipeline=pipeline)
+
+            model_service.model_registry.clear()
+            model_service.model_registry.load_all([name])
+
+            before_ms = _time_requests(before, args.requests)
+            after_ms = _time_requests(after, args.requests)
+            print(f"[{name}]")
+            _report("  load_model per request", before_ms)
+            _report("  registry (load once)", after_ms)
+            print(f"  speedup x{statistics.mean(before_ms) / statistics.mean(after_ms):.1f}")
+
+
+if __name__ == "__main__":
+    main()
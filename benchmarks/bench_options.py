@@ -0,0 +1,59 @@
+"""
+/options/* endpoints: read_options_csv + FastAPI JSON encoding on every call
+vs the pre-encoded, ETag-cached payloads (200 and 304).
+
+    python benchmarks/bench_options.py --requests 500
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.synthetic import write_data_dir
+from app.main import create_app
+from app.services import feature_service
+
+
+def _median_ms(client: TestClient, path: str, n: int, headers=None) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        client.get(path, headers=headers)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        processed = write_data_dir(Path(tmp)) / "processed"
+        feature_service.PROCESSED_DIR = processed
+        feature_service.FEATURES_HELPER_DIR = processed / "features_helper"
+
+        # the route as it was before: parse + encode per request
+        legacy = FastAPI()
+        legacy.get("/options/drivers")(lambda: feature_service.read_options_csv("drivers_mainrace.csv", "drivers.csv"))
+        with TestClient(legacy) as old, TestClient(create_app()) as new:
+            etag = new.get("/main-race/options/drivers").headers["ETag"]
+            before = _median_ms(old, "/options/drivers", args.requests)
+            cached = _median_ms(new, "/main-race/options/drivers", args.requests)
+            not_modified = _median_ms(new, "/main-race/options/drivers", args.requests, headers={"If-None-Match": etag})
+        print(f"read_options_csv per call  {before:7.3f}ms")
+        print(f"pre-encoded 200            {cached:7.3f}ms  x{before / cached:.1f}")
+        print(f"If-None-Match 304          {not_modified:7.3f}ms  x{before / not_modified:.1f}")
+
+
+if __name__ == "__main__":
+    main()
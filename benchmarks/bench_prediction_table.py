@@ -0,0 +1,107 @@
+"""
+Materialized prediction tables (app.services.prediction_table) on synthetic
+fitted pipelines, for a weekend of --entrants cars (pick-list drivers, two
+per pick-list constructor):
+- build: rows and seconds per model, persisted file size and load seconds
+- serve: median /main-race/predict latency for a request the table holds
+  (lookup) and for the same request at another lap count (live features +
+  micro-batched scoring)
+
+    python benchmarks/bench_prediction_table.py --entrants 20 --requests 300
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from benchmarks.synthetic import write_data_dir, write_model_dir
+from app.core import config
+from app.main import create_app
+from app.services import feature_service, model_service, reference_data
+from app.services.prediction_table import PredictionTableStore, prediction_tables, refresh_prediction_tables
+
+MIB = 1024 * 1024
+
+
+def _weekend(data_dir: Path, n_entrants: int) -> tuple:
+    """The first circuit of the pick lists and n_entrants (driver, constructor) pairs."""
+    helper = data_dir / "processed" / "features_helper"
+    drivers = pd.read_csv(helper / "drivers_mainrace.csv", dtype=str)["driverRef"].tolist()
+    constructors = pd.read_csv(helper / "constructors_mainrace.csv", dtype=str)["constructorRef"].tolist()
+    circuit = pd.read_csv(helper / "circuits_mainrace.csv", dtype=str)["circuitRef"].iloc[0]
+    entrants = [
+        {"driver": driver, "constructor": constructors[i // 2 % len(constructors)]}
+        for i, driver in enumerate(drivers[:n_entrants])
+    ]
+    return circuit, entrants
+
+
+def _median_ms(client: TestClient, bodies: list) -> float:
+    samples = []
+    for body in bodies:
+        t0 = time.perf_counter()
+        response = client.post("/main-race/predict", json=body)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+        assert response.status_code == 200, response.text
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entrants", type=int, default=20, help="cars of the weekend")
+    parser.add_argument("--n-estimators", type=int, default=400, help="trees per synthetic model")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config.APP_STARTUP_MODE = "prestart"
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_model_dir(tmp, n_estimators=args.n_estimators)
+        write_data_dir(tmp)
+        circuit, entrants = _weekend(tmp, args.entrants)
+        processed = tmp / "processed"
+        model_service.MODEL_DIR = tmp
+        reference_data.DATA_DIR = tmp
+        feature_service.PROCESSED_DIR = processed
+        feature_service.FEATURES_HELPER_DIR = processed / "features_helper"
+        config.PREDICTION_TABLE_PATH = str(tmp / "tables.pkl")
+        race_date, laps = date(2025, 7, 6), 52
+
+        with TestClient(create_app()) as client:
+            t0 = time.perf_counter()
+            snapshot = refresh_prediction_tables(circuit, race_date, laps, entrants)
+            total = time.perf_counter() - t0
+            for name, summary in snapshot.items():
+                print(f"build {name:<10} {summary['rows']:7d} rows  {summary['build_seconds']:6.2f}s")
+            path = Path(config.PREDICTION_TABLE_PATH)
+            t0 = time.perf_counter()
+            PredictionTableStore().load()
+            print(f"total {total:.2f}s  file {path.stat().st_size / MIB:.2f} MiB  load {time.perf_counter() - t0:.3f}s")
+
+            rng = random.Random(args.seed)
+            table = prediction_tables._tables["mainrace"]
+            bodies = [
+                {**rng.choice(entrants), "circuit": circuit, "race_date": race_date.isoformat(), "laps": laps,
+                 "qualification_position": rng.randint(1, table.grid_size), "rain": rng.choice((0, 1))}
+                for _ in range(args.requests)
+            ]
+            _median_ms(client, bodies[:20])  # warm up
+            hit = _median_ms(client, bodies)
+            live = _median_ms(client, [{**body, "laps": laps + 1} for body in bodies])
+        print(f"/main-race/predict median: table {hit:.3f}ms  live {live:.3f}ms  x{live / hit:.1f}")
+
+
+if __name__ == "__main__":
+    main()
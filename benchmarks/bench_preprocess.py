@@ -0,0 +1,123 @@
+"""
+Full preprocessing rebuild (build_driver_country_table + serve_mainrace_df +
+serve_qualifying_df + serve_status_df) on a synthetic jolpica dump of
+--seasons seasons, with the base join (app.preprocess.preprocess_base):
+- separate: use_cache=False, the join repeated by each of the four (as before)
+- cold: an empty cache, joined once and written, then read back
+- warm: the cache already written for these CSVs
+Each variant runs in a fresh process, so its peak RSS is its own. Reports the
+best of --repeats wall-clock seconds, for the whole rebuild and for the base
+join alone (joining, hashing, writing and reading the cache), and the peak RSS.
+
+    python benchmarks/bench_preprocess.py --seasons 20 --repeats 3
+"""
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+VARIANTS = ("separate", "cold", "warm")
+
+
+def _rebuild(raw: Path, processed: Path, use_cache: bool):
+    from app.preprocess.preprocess_general import build_driver_country_table
+    from app.preprocess.preprocess_mainrace import serve_mainrace_df
+    from app.preprocess.preprocess_qualifying import serve_qualifying_df
+    from app.preprocess.preprocess_status import serve_status_df
+
+    build_driver_country_table(save_to=str(processed / "drivers.csv"), raw_dir=str(raw),
+                               cache_dir=str(processed / "cache"), use_cache=use_cache)
+    for serve in (serve_mainrace_df, serve_qualifying_df, serve_status_df):
+        serve(str(raw), str(processed), use_cache=use_cache)
+
+
+def _timed(module, name: str, spent: list):
+    fn = getattr(module, name)
+
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            spent.append(time.perf_counter() - t0)
+
+    setattr(module, name, wrapper)
+
+
+def _child(variant: str, raw: Path, processed: Path):
+    """
+    One rebuild in this process: prints {seconds, base_seconds, peak_rss_mib}
+    as JSON, base_seconds being the time spent joining or reading the cache.
+    """
+    import pandas  # noqa: F401  (imported before timing, as in the scripts)
+    from app.preprocess import preprocess_base
+
+    spent = []
+    for name in ("build_base_join", "_read_cache", "_write_cache", "raw_tables_hash"):
+        _timed(preprocess_base, name, spent)
+    if variant == "cold":
+        shutil.rmtree(processed / "cache", ignore_errors=True)
+    t0 = time.perf_counter()
+    _rebuild(raw, processed, use_cache=variant != "separate")
+    seconds = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(json.dumps({"seconds": seconds, "base_seconds": sum(spent), "peak_rss_mib": peak}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=22)
+    parser.add_argument("--cars", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--raw", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--processed", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        _child(args.variant, args.raw, args.processed)
+        return
+
+    from benchmarks.synthetic import write_raw_dir
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw, processed = Path(tmp) / "raw", Path(tmp) / "processed"
+        write_raw_dir(raw, n_seasons=args.seasons, n_rounds=args.rounds, n_cars=args.cars, seed=args.seed)
+        sizes = sum(p.stat().st_size for p in (raw / "jolpica-dump").iterdir())
+        laps = sum(1 for _ in open(raw / "jolpica-dump" / "formula_one_lap.csv")) - 1
+        print(f"jolpica dump: {sizes / 2 ** 20:.1f} MiB of CSV, {laps} laps")
+
+        results = {}
+        for variant in VARIANTS:
+            runs = []
+            for _ in range(args.repeats):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--variant", variant, "--raw", str(raw), "--processed", str(processed)],
+                    check=True, capture_output=True, text=True,
+                )
+                runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            results[variant] = (
+                min(r["seconds"] for r in runs),
+                min(r["base_seconds"] for r in runs),
+                max(r["peak_rss_mib"] for r in runs),
+            )
+        cache = sum(p.stat().st_size for p in (processed / "cache").iterdir())
+        print(f"cache file {cache / 2 ** 20:.1f} MiB")
+
+    for variant, (seconds, base, peak) in results.items():
+        print(f"{variant:<9} rebuild {seconds:7.2f}s  base join {base:6.2f}s "
+              f"(x{results['separate'][1] / base:4.1f})  peak RSS {peak:7.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+simulate_race (app.services.race_simulator) on a synthetic --cars grid:
+--simulations races as one array operation, with quantile (empirical residual
+CDF) and normal noise, against a Python loop of one simulated race at a time.
+Reports the best of --repeats seconds and simulated races per second.
+
+    python benchmarks/bench_simulator.py --cars 20 --simulations 10000 --repeats 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from app.services.race_simulator import ResidualNoise, simulate_race
+
+
+def _best(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _loop(deviation, dnf_probability, noise, n_simulations, rng):
+    """One race per iteration: the per-simulation baseline."""
+    n_cars = len(deviation)
+    counts = np.zeros((n_cars, n_cars))
+    for _ in range(n_simulations):
+        times = deviation + noise.sample(rng, n_cars)
+        retired = rng.random(n_cars) < dnf_probability
+        ranked = sorted(range(n_cars), key=lambda car: (retired[car], times[car]))
+        for position, car in enumerate(ranked):
+            counts[car, position] += 1
+    return counts / n_simulations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cars", type=int, default=20)
+    parser.add_argument("--simulations", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    deviation = np.sort(rng.normal(0.0, 20000.0, args.cars))
+    dnf_probability = rng.uniform(0.02, 0.15, args.cars)
+    residuals = rng.standard_t(3, 20000) * 8000.0
+    noises = {
+        "quantile": ResidualNoise.from_residuals(residuals, source="bench"),
+        "normal": ResidualNoise(std=float(np.std(residuals))),
+    }
+
+    for label, noise in noises.items():
+        seconds = _best(
+            lambda: simulate_race(deviation, dnf_probability, noise, args.simulations, np.random.default_rng(args.seed)),
+            args.repeats,
+        )
+        print(f"vectorized {label:<8} {args.simulations} x {args.cars} cars  {seconds * 1000:8.1f}ms  "
+              f"{args.simulations / seconds:12,.0f} races/s")
+
+    noise = noises["quantile"]
+    loop = _best(lambda: _loop(deviation, dnf_probability, noise, args.simulations, np.random.default_rng(args.seed)), 1)
+    vectorized = _best(
+        lambda: simulate_race(deviation, dnf_probability, noise, args.simulations, np.random.default_rng(args.seed)),
+        args.repeats,
+    )
+    print(f"python loop quantile  {args.simulations} x {args.cars} cars  {loop * 1000:8.1f}ms  "
+          f"{args.simulations / loop:12,.0f} races/s  (vectorized x{loop / vectorized:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Cold start: import-to-first-successful-prediction in a fresh interpreter per
+configuration, with the DVC pull replaced by a sleep of --pull-seconds.
+- eager: sklearn imported with the app (as app/__init__ and model_service
+  used to), APP_STARTUP_MODE=blocking
+- blocking / background: lazy imports with each startup mode
+Reports seconds from process start to: app.main imported, serving (lifespan
+startup returned, i.e. the port would be bound), /ready green and the first
+200 from /main-race/predict/batch.
+
+    python benchmarks/bench_startup.py --pull-seconds 2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+CONFIGS = {
+    "eager": ("blocking", True),
+    "blocking": ("blocking", False),
+    "background": ("background", False),
+}
+
+
+def _child(pull_seconds: float, eager: bool, dto: dict):
+    t0 = time.perf_counter()
+    times = {}
+    if eager:
+        import app.models.compiled_ensemble  # noqa: F401  (sklearn, scipy)
+        import app.models.mainrace_pipeline  # noqa: F401
+    import app.main
+    from app.services import startup
+    times["import"] = time.perf_counter() - t0
+
+    startup.dvc_pull_with_gcp_key = lambda: time.sleep(pull_seconds)
+    from fastapi.testclient import TestClient
+
+    with TestClient(app.main.create_app()) as client:
+        times["serving"] = time.perf_counter() - t0
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.005)
+        times["ready"] = time.perf_counter() - t0
+        while client.post("/main-race/predict/batch", json=[dto]).status_code != 200:
+            time.sleep(0.005)
+        times["first_prediction"] = time.perf_counter() - t0
+    print(json.dumps(times))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pull-seconds", type=float, default=2.0)
+    parser.add_argument("--child", choices=list(CONFIGS))
+    parser.add_argument("--dto")
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.pull_seconds, CONFIGS[args.child][1], json.loads(args.dto))
+        return
+
+    from benchmarks.synthetic import grid_dtos, write_data_dir, write_model_dir
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # MODEL_DIR also locates the reference data (reference_data.DATA_DIR)
+        write_model_dir(tmp)
+        write_data_dir(tmp)
+        dto = grid_dtos(1)[0]
+        dto["race_date"] = str(dto["race_date"])
+        for name, (mode, _) in CONFIGS.items():
+            env = {**os.environ, "MODEL_DIR": str(tmp), "APP_STARTUP_MODE": mode}
+            t0 = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", name, "--pull-seconds", str(args.pull_seconds), "--dto", json.dumps(dto)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            wall = time.perf_counter() - t0
+            times = json.loads(out.strip().splitlines()[-1])
+            print(f"{name:<10} import={times['import']:5.2f}s serving={times['serving']:5.2f}s "
+                  f"ready={times['ready']:5.2f}s first_prediction={times['first_prediction']:5.2f}s "
+                  f"(process wall {wall:5.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Large main race backfills: one /predict/batch call (whole JSON body parsed,
+scored and encoded at once) vs the NDJSON /predict/stream path (body read
+incrementally, scored in chunks). Reports wall time and the Python heap peak
+(tracemalloc) per input size; the streaming peak should stay flat.
+
+    python benchmarks/bench_streaming.py --sizes 2000 20000 60000 --chunk-rows 512
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import grid_dtos, write_data_dir, write_model_dir
+from app.api.routers import predict_mainrace
+from app.api.streaming import stream_predictions
+from app.core import config
+from app.schemas.dto import MainRacePredictInput
+from app.services import model_service, reference_data
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def _batch(body: bytes) -> int:
+    # what FastAPI + the batch route do: parse and validate the whole list, then score it
+    inputs = [MainRacePredictInput(**d).model_dump() for d in json.loads(body)]
+    return len(predict_mainrace._predict_batch(inputs))
+
+
+def _stream(lines: list[bytes], chunk_rows: int, piece: int = 65536) -> int:
+    async def body():
+        # the client's NDJSON in network-sized pieces, produced on demand
+        buffer = b""
+        for line in lines:
+            buffer += line
+            if len(buffer) >= piece:
+                yield buffer
+                buffer = b""
+        yield buffer
+
+    async def consume():
+        written = 0
+        async for out in stream_predictions(predict_mainrace._STREAM, body(), {"git_commit": "synthetic"}, chunk_rows, config.STREAM_MAX_LINE_BYTES):
+            written += len(out)
+        return written
+
+    return asyncio.run(consume())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[2000, 20000, 60000])
+    parser.add_argument("--chunk-rows", type=int, default=512)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_model_dir(tmp, kinds=("mainrace",), n_estimators=100)
+        reference_data.load_reference_index(write_data_dir(tmp))
+        model_service.MODEL_DIR = tmp
+        model_service.prediction_cache.max_entries = 0  # measure the scoring path, not the cache
+        model_service.get_model("mainrace")
+
+        for size in args.sizes:
+            dtos = grid_dtos(size)
+            lines = [json.dumps(d, default=str).encode() + b"\n" for d in dtos]
+            body = json.dumps(dtos, default=str).encode()
+
+            batch_bytes, batch_s, batch_mb = _measure(lambda: _batch(body))
+            stream_bytes, stream_s, stream_mb = _measure(lambda: _stream(lines, args.chunk_rows))
+            print(f"rows={size:<7} batch {batch_s * 1000:8.1f}ms peak {batch_mb:7.1f}MiB ({batch_bytes / 2**20:.1f}MiB out)"
+                  f" | stream {stream_s * 1000:8.1f}ms peak {stream_mb:6.1f}MiB ({stream_bytes / 2**20:.1f}MiB out)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Predicting a race weekend: the three-call client flow (qualifying batch ->
+ranks as qualification_position -> main race batch + status batch) vs one
+/weekend/predict call, both through the ASGI app in-process. Each HTTP call
+would also pay one network round trip; --rtt-ms adds that per call to the
+reported totals.
+
+    python benchmarks/bench_weekend.py --cars 20 --repeat 100 --rtt-ms 20
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+
+from benchmarks.synthetic import grid_dtos, write_data_dir, write_model_dir
+from app.services import model_service, reference_data
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cars", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_model_dir(tmp)
+        reference_data.load_reference_index(write_data_dir(tmp))
+        model_service.MODEL_DIR = tmp
+        model_service.prediction_cache.max_entries = 0  # score every call
+        model_service.model_registry.load_all()
+        from app.main import create_app
+        client = TestClient(create_app())
+
+        rows = grid_dtos(args.cars)
+        race = {"circuit": rows[0]["circuit"], "race_date": str(rows[0]["race_date"]), "laps": 57, "rain": 1}
+        entries = [{"driver": r["driver"], "constructor": r["constructor"]} for r in rows]
+
+        def three_calls():
+            quali = client.post("/qualifying/predict/batch", json=[
+                {**e, "circuit": race["circuit"], "race_date": race["race_date"]} for e in entries
+            ]).json()["predictions"]
+            race_rows = [
+                {**e, **race, "qualification_position": q["predicted_final_position"]} for e, q in zip(entries, quali)
+            ]
+            finish = client.post("/main-race/predict/batch", json=race_rows).json()["predictions"]
+            dnf = client.post(
+                "/status/predict/batch", json=[{k: v for k, v in r.items() if k != "laps"} for r in race_rows]
+            ).json()["percentages"]
+            return [f["predicted_final_position"] for f in finish], [d["dnf_percentage"] for d in dnf]
+
+        def weekend():
+            items = client.post("/weekend/predict", json={"race": race, "entries": entries}).json()["predictions"]
+            return [i["predicted_final_position"] for i in items], [i["dnf_percentage"] for i in items]
+
+        assert three_calls() == weekend()
+        chained = _median_ms(three_calls, args.repeat)
+        single = _median_ms(weekend, args.repeat)
+        print(f"cars={args.cars} three calls={chained:6.2f}ms (+{3 * args.rtt_ms:.0f}ms RTT = {chained + 3 * args.rtt_ms:6.1f}ms)"
+              f"  weekend={single:6.2f}ms (+{args.rtt_ms:.0f}ms RTT = {single + args.rtt_ms:6.1f}ms)"
+              f"  x{chained / single:4.2f} in-process, x{(chained + 3 * args.rtt_ms) / (single + args.rtt_ms):4.2f} with RTT")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Memory per server worker as SERVER_WORKERS grows: starts `python -m app.main`
+on synthetic fitted pipelines and reference data for each worker count, with
+SERVER_PRELOAD on (models loaded once in the parent, shared copy-on-write)
+and off (each worker loads its own copy), sends --requests predictions so
+every worker has served traffic, then reads /proc/<pid>/smaps_rollup:
+- rss: resident memory of one worker, counting shared pages in full
+- pss: resident memory with each shared page split between its users
+- private: pages only that worker holds
+- total_pss: parent plus all workers, i.e. what the dyno pays
+Linux only (smaps_rollup). With one worker there is no fork: the server
+process is the worker.
+
+    python benchmarks/bench_workers.py --workers 1 2 4 --n-estimators 400 --output workers.json
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import grid_dtos, write_data_dir, write_model_dir
+
+
+def process_memory(pid: int) -> dict:
+    """rss / pss / private / shared of a process in MiB, from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0])  # kB
+    mib = 1.0 / 1024
+    return {
+        "rss": fields["Rss"] * mib,
+        "pss": fields["Pss"] * mib,
+        "private": (fields["Private_Clean"] + fields["Private_Dirty"]) * mib,
+        "shared": (fields["Shared_Clean"] + fields["Shared_Dirty"]) * mib,
+    }
+
+
+def _children(pid: int) -> list:
+    return [int(child) for child in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _post(url: str, body: bytes) -> int:
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+        return response.status
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            # refused, or accepted into the backlog while every worker is still loading
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def measure(model_dir: Path, workers: int, preload: bool, requests: int, timeout: float) -> dict:
+    port = _free_port()
+    env = {**os.environ, "MODEL_DIR": str(model_dir), "APP_STARTUP_MODE": "prestart", "PORT": str(port),
+           "SERVER_WORKERS": str(workers), "SERVER_PRELOAD": str(preload).lower(), "APP_MODE": "dev"}
+    base = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen([sys.executable, "-m", "app.main"], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(f"{base}/ready", process, timeout)
+        pids = _children(process.pid) if workers > 1 else [process.pid]
+        # without preload a worker loads on its own startup: wait until every one answers
+        while len(pids) < workers:
+            time.sleep(0.2)
+            pids = _children(process.pid)
+        single = [json.dumps(dto, default=str).encode() for dto in grid_dtos(200)]
+        grid = json.dumps(grid_dtos(20), default=str).encode()
+        calls = [(f"{base}/main-race/predict", single[i % len(single)]) if i % 2 else
+                 (f"{base}/main-race/predict/batch", grid) for i in range(requests)]
+        with ThreadPoolExecutor(max_workers=max(4, 2 * workers)) as pool:
+            statuses = list(pool.map(lambda call: _post(*call), calls))
+        if any(status != 200 for status in statuses):
+            raise RuntimeError(f"predict answered {sorted(set(statuses))}")
+
+        per_worker = [process_memory(pid) for pid in pids]
+        parent = process_memory(process.pid) if workers > 1 else None
+        mean = {key: sum(m[key] for m in per_worker) / len(per_worker) for key in per_worker[0]}
+        return {
+            "workers": workers,
+            "preload": preload,
+            "worker_rss_mib": round(mean["rss"], 1),
+            "worker_pss_mib": round(mean["pss"], 1),
+            "worker_private_mib": round(mean["private"], 1),
+            "parent_pss_mib": round(parent["pss"], 1) if parent else 0.0,
+            "total_pss_mib": round(sum(m["pss"] for m in per_worker) + (parent["pss"] if parent else 0.0), 1),
+        }
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--n-estimators", type=int, default=400, help="trees per synthetic model")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for /ready")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+    if not Path("/proc/self/smaps_rollup").exists():
+        raise SystemExit("needs /proc/<pid>/smaps_rollup (Linux)")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_model_dir(tmp, n_estimators=args.n_estimators)
+        write_data_dir(tmp)
+        for workers in args.workers:
+            for preload in ((True, False) if workers > 1 else (True,)):
+                row = measure(tmp, workers, preload, args.requests, args.timeout)
+                rows.append(row)
+                print(f"workers={workers} preload={str(preload):<5} per worker: rss {row['worker_rss_mib']:7.1f} MiB "
+                      f"pss {row['worker_pss_mib']:7.1f} MiB private {row['worker_private_mib']:7.1f} MiB  "
+                      f"total pss {row['total_pss_mib']:7.1f} MiB")
+    if args.output:
+        args.output.write_text(json.dumps({"n_estimators": args.n_estimators, "runs": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Synthetic training data and fitted pipelines for the benchmarks.
+Lets every benchmark run without the DVC-tracked data/ and models/ artifacts.
+"""
+import json
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.models.mainrace_pipeline import build_mainrace_pipeline
+from app.models.qualifying_pipeline import build_qualifying_pipeline
+from app.models.status_pipeline import build_status_pipeline
+from app.services.model_service import MODEL_SPECS, file_sha256
+
+NATIONALITIES = ["GBR", "ITA", "DEU", "FRA", "ESP", "NLD", "AUS", "BRA", "USA", "JPN", "MEX", "CAN", "FIN", "MCO"]
+CIRCUIT_TYPES = ["Race circuit", "Street circuit", "Road circuit"]
+
+# columns each model is trained on (mirrors the feature builders' output)
+MODEL_COLUMNS = {
+    "mainrace": [
+        "qualification_position", "laps", "constructor", "circuit", "type_circuit", "driver",
+        "circuit_nationality", "driver_nationality", "constructor_nationality", "race_year",
+        "race_month", "race_day", "rain", "driver_home", "constructor_home", "age_at_gp_in_days",
+        "days_since_first_race",
+    ],
+    "qualifying": [
+        "constructor", "circuit", "type_circuit", "driver", "circuit_nationality", "driver_nationality",
+        "constructor_nationality", "race_year", "race_month", "race_day", "driver_home",
+        "constructor_home", "age_at_gp_in_days", "days_since_first_race",
+    ],
+    "status": [
+        "qualification_position", "constructor", "circuit", "type_circuit", "driver", "circuit_nationality",
+        "driver_nationality", "constructor_nationality", "race_year", "race_month", "race_day", "rain",
+        "driver_home", "constructor_home", "age_at_gp_in_days", "days_since_first_race",
+    ],
+}
+
+PIPELINE_BUILDERS = {
+    "mainrace": build_mainrace_pipeline,
+    "qualifying": build_qualifying_pipeline,
+    "status": build_status_pipeline,
+}
+
+
+def reference_tables(n_drivers: int = 300, n_constructors: int = 60, n_circuits: int = 80, seed: int = 0):
+    """
+    Return (drivers, constructors, circuits) DataFrames shaped like data/processed/*.csv.
+    """
+    rng = np.random.default_rng(seed)
+    dob = pd.Timestamp("1950-01-01") + pd.to_timedelta(rng.integers(0, 18000, n_drivers), unit="D")
+    first = dob + pd.to_timedelta(rng.integers(6500, 9000, n_drivers), unit="D")
+    drivers = pd.DataFrame({
+        "driverRef": [f"driver_{i}" for i in range(n_drivers)],
+        "driver_nationality": rng.choice(NATIONALITIES, n_drivers),
+        "driver_date_of_birth": dob.strftime("%Y-%m-%d"),
+        "first_race_date": first.strftime("%Y-%m-%d"),
+    })
+    constructors = pd.DataFrame({
+        "constructorRef": [f"constructor_{i}" for i in range(n_constructors)],
+        "constructor_nationality": rng.choice(NATIONALITIES, n_constructors),
+    })
+    circuits = pd.DataFrame({
+        "circuitRef": [f"circuit_{i}" for i in range(n_circuits)],
+        "circuit_nationality": rng.choice(NATIONALITIES, n_circuits),
+        "type_circuit": rng.choice(CIRCUIT_TYPES, n_circuits),
+    })
+    return drivers, constructors, circuits
+
+
+def training_frame(kind: str, n_rows: int = 3000, seed: int = 0) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Return (X, y) for `kind` in MODEL_COLUMNS, with categorical cardinalities
+    in the same ballpark as the real cleaned_data_*.csv files.
+    """
+    rng = np.random.default_rng(seed)
+    drivers, constructors, circuits = reference_tables(seed=seed)
+    d = drivers.sample(n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    c = constructors.sample(n_rows, replace=True, random_state=seed + 1).reset_index(drop=True)
+    ci = circuits.sample(n_rows, replace=True, random_state=seed + 2).reset_index(drop=True)
+    race_date = pd.Timestamp("1981-01-01") + pd.to_timedelta(rng.integers(0, 16000, n_rows), unit="D")
+    X = pd.DataFrame({
+        "qualification_position": rng.integers(1, 25, n_rows),
+        "laps": rng.integers(40, 80, n_rows),
+        "constructor": c["constructorRef"],
+        "circuit": ci["circuitRef"],
+        "type_circuit": ci["type_circuit"],
+        "driver": d["driverRef"],
+        "circuit_nationality": ci["circuit_nationality"],
+        "driver_nationality": d["driver_nationality"],
+        "constructor_nationality": c["constructor_nationality"],
+        "race_year": race_date.year,
+        "race_month": race_date.month,
+        "race_day": race_date.day,
+        "rain": rng.integers(0, 2, n_rows),
+        "age_at_gp_in_days": rng.integers(6500, 15000, n_rows),
+        "days_since_first_race": rng.integers(0, 7000, n_rows),
+    })
+    X["driver_home"] = (X["driver_nationality"] == X["circuit_nationality"]).astype(int)
+    X["constructor_home"] = (X["constructor_nationality"] == X["circuit_nationality"]).astype(int)
+    X = X[MODEL_COLUMNS[kind]]
+
+    if kind == "status":
+        y = pd.Series((rng.random(n_rows) < 0.2).astype(int), name="dnf")
+    else:
+        qpos = rng.integers(1, 25, n_rows) if kind == "qualifying" else X["qualification_position"]
+        y = pd.Series(qpos * 4000.0 + rng.normal(0, 15000, n_rows), name="deviation_from_median")
+    return X, y
+
+
+def fit_pipeline(kind: str, n_rows: int = 3000, n_estimators: int = 400, seed: int = 0, representation: str = "dense"):
+    """
+    Fit the production pipeline builder for `kind` on synthetic data.
+    """
+    X, y = training_frame(kind, n_rows=n_rows, seed=seed)
+    pipeline = PIPELINE_BUILDERS[kind](representation=representation)
+    pipeline.set_params(models__n_estimators=n_estimators)
+    pipeline.fit(X, y)
+    return pipeline
+
+
+def write_model_dir(model_dir: Path, kinds=("mainrace", "qualifying", "status"), **fit_kwargs) -> Path:
+    """
+    Fit and persist synthetic pipelines + metadata under model_dir using the
+    same file names as MODEL_SPECS, so MODEL_DIR can point at it.
+    """
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    for kind in kinds:
+        pkl_name, meta_name = MODEL_SPECS[kind]
+        pipeline = fit_pipeline(kind, **fit_kwargs)
+        joblib.dump(pipeline, model_dir / pkl_name)
+        meta = {"git_commit": "synthetic", "artifact_hash": file_sha256(model_dir / pkl_name),
+                "n_rows": fit_kwargs.get("n_rows", 3000), "n_features": len(MODEL_COLUMNS[kind]), "target": "synthetic"}
+        (model_dir / meta_name).write_text(json.dumps(meta, indent=2))
+    return model_dir
+
+
+def write_data_dir(data_dir: Path, seed: int = 0) -> Path:
+    """
+    Persist synthetic processed reference tables and features_helper pick
+    lists under data_dir, laid out like data/ so ReferenceIndex.from_dir works.
+    """
+    data_dir = Path(data_dir)
+    processed = data_dir / "processed"
+    helper = processed / "features_helper"
+    helper.mkdir(parents=True, exist_ok=True)
+    drivers, constructors, circuits = reference_tables(seed=seed)
+    drivers.to_csv(processed / "drivers.csv", index=False)
+    constructors.to_csv(processed / "constructors.csv", index=False)
+    circuits.to_csv(processed / "circuits.csv", index=False)
+    for model_type in ("mainrace", "qualifying", "status"):
+        drivers.to_csv(helper / f"drivers_{model_type}.csv", index=False)
+        constructors.to_csv(helper / f"constructors_{model_type}.csv", index=False)
+        circuits[["circuitRef", "circuit_nationality"]].to_csv(helper / f"circuits_{model_type}.csv", index=False)
+    return data_dir
+
+
+def grid_dtos(n_rows: int, seed: int = 0) -> list[dict]:
+    """
+    Minimal MainRacePredictInput-shaped dicts over the synthetic reference tables,
+    20 drivers per race so ranking groups look like real grids.
+    """
+    rng = np.random.default_rng(seed)
+    drivers, constructors, circuits = reference_tables(seed=seed)
+    out = []
+    for i in range(n_rows):
+        race = i // 20
+        out.append({
+            "qualification_position": i % 20 + 1,
+            "laps": 57,
+            "constructor": constructors["constructorRef"].iloc[rng.integers(len(constructors))],
+            "circuit": circuits["circuitRef"].iloc[race % len(circuits)],
+            "driver": drivers["driverRef"].iloc[rng.integers(len(drivers))],
+            "race_date": (pd.Timestamp("2024-03-02") + pd.Timedelta(days=7 * race)).date(),
+            "rain": int(rng.integers(0, 2)),
+        })
+    return out
+
+
+def _durations(ms: np.ndarray) -> list[str]:
+    """H:MM:SS.mmm strings, as the jolpica dump writes session entry and lap times."""
+    ms = np.asarray(ms, dtype=np.int64)
+    return [f"{t // 3600000}:{t // 60000 % 60:02d}:{t // 1000 % 60:02d}.{t % 1000:03d}" for t in ms.tolist()]
+
+
+def write_raw_dir(raw_dir: Path, n_seasons: int = 10, n_rounds: int = 22, n_cars: int = 20,
+                  race_laps: int = 55, seed: int = 0) -> Path:
+    """
+    Persist a synthetic jolpica dump (raw_dir/jolpica-dump/formula_one_*.csv)
+    plus race_weather.csv and circuit_type.csv, laid out like data/raw so the
+    serve_*_df pipelines run on it: n_seasons x n_rounds rounds of Q1 / Q2 / Q3
+    (20 / 15 / 10 cars, 3 laps each) and a race of up to race_laps laps.
+    """
+    rng = np.random.default_rng(seed)
+    dump = Path(raw_dir) / "jolpica-dump"
+    dump.mkdir(parents=True, exist_ok=True)
+    n_circuits, n_drivers, n_teams = n_rounds + 4, n_cars + 10, max(1, n_cars // 2)
+
+    circuits = pd.DataFrame({
+        "id": np.arange(1, n_circuits + 1),
+        "reference": [f"circuit_{i}" for i in range(n_circuits)],
+        "name": [f"Circuit {i}" for i in range(n_circuits)],
+        "locality": "Town", "country": "Country",
+        "country_code": rng.choice(NATIONALITIES, n_circuits),
+        "latitude": rng.uniform(-50, 60, n_circuits), "longitude": rng.uniform(-120, 150, n_circuits),
+        "altitude": rng.integers(0, 2000, n_circuits), "wikipedia": "https://en.wikipedia.org/wiki/Circuit",
+    })
+    drivers = pd.DataFrame({
+        "id": np.arange(1, n_drivers + 1),
+        "reference": [f"driver_{i}" for i in range(n_drivers)],
+        "forename": "First", "surname": [f"Driver{i}" for i in range(n_drivers)],
+        "abbreviation": [f"D{i:02d}" for i in range(n_drivers)],
+        "nationality": "Nationality", "country_code": rng.choice(NATIONALITIES, n_drivers),
+        "permanent_car_number": np.arange(1, n_drivers + 1),
+        "date_of_birth": (pd.Timestamp("1980-01-01") + pd.to_timedelta(rng.integers(0, 8000, n_drivers), unit="D")).strftime("%Y-%m-%d"),
+        "wikipedia": "https://en.wikipedia.org/wiki/Driver",
+    })
+    teams = pd.DataFrame({
+        "id": np.arange(1, n_teams + 1),
+        "reference": [f"team_{i}" for i in range(n_teams)],
+        "name": [f"Team {i}" for i in range(n_teams)],
+        "nationality": "Nationality", "country_code": rng.choice(NATIONALITIES, n_teams),
+        "base_team_id": np.arange(1, n_teams + 1), "wikipedia": "https://en.wikipedia.org/wiki/Team",
+    })
+
+    # one team driver per car and season
+    seasons = np.repeat(np.arange(1, n_seasons + 1), n_cars)
+    season_drivers = np.concatenate([rng.permutation(n_drivers)[:n_cars] + 1 for _ in range(n_seasons)])
+    team_drivers = pd.DataFrame({
+        "id": np.arange(1, len(seasons) + 1), "team_id": np.tile(np.arange(n_cars) // 2 % n_teams + 1, n_seasons),
+        "driver_id": season_drivers, "season_id": seasons, "role": "permanent",
+    })
+
+    n_round_rows = n_seasons * n_rounds
+    round_season = np.repeat(np.arange(1, n_seasons + 1), n_rounds)
+    round_dates = pd.to_datetime([f"{2014 + s}-03-10" for s in round_season]) + pd.to_timedelta(
+        np.tile(np.arange(n_rounds) * 14, n_seasons), unit="D")
+    rounds = pd.DataFrame({
+        "id": np.arange(1, n_round_rows + 1), "season_id": round_season,
+        "circuit_id": np.tile(np.arange(n_rounds) + 1, n_seasons), "number": np.tile(np.arange(n_rounds) + 1, n_seasons),
+        "name": "Grand Prix", "date": round_dates.strftime("%Y-%m-%d"), "race_number": np.arange(1, n_round_rows + 1),
+        "wikipedia": "https://en.wikipedia.org/wiki/Grand_Prix", "is_cancelled": "f",
+    })
+
+    # Q1 / Q2 / Q3 the day before, then the race
+    kinds = [("Q1", n_cars, -1), ("Q2", min(15, n_cars), -1), ("Q3", min(10, n_cars), -1), ("R", n_cars, 0)]
+    session_rows, entry_rows, lap_frames = [], [], []
+    round_entry_ids = np.arange(1, n_round_rows * n_cars + 1).reshape(n_round_rows, n_cars)
+    session_id, entry_id, lap_id = 1, 1, 1
+    for r in range(n_round_rows):
+        pace = rng.permutation(n_cars)  # car index per finishing order
+        for number, (kind, cars, offset) in enumerate(kinds, start=1):
+            is_race = kind == "R"
+            session_rows.append((session_id, r + 1, number, kind, (round_dates[r] + pd.Timedelta(days=offset)).strftime("%Y-%m-%d"),
+                                 "14:00:00", race_laps if is_race else np.nan, 1, "f"))
+            order = pace[:cars]
+            retired = rng.random(cars) < 0.1 if is_race else np.zeros(cars, dtype=bool)
+            laps_done = np.where(retired, rng.integers(1, race_laps, cars), race_laps) if is_race else np.full(cars, 3)
+            lap_ms = 90000 + order * 150 + rng.integers(0, 2000, (cars,))
+            ids = np.arange(entry_id, entry_id + cars)
+            for i in range(cars):
+                entry_rows.append((
+                    ids[i], session_id, round_entry_ids[r, order[i]], i + 1,
+                    ("f" if retired[i] else "t") if is_race else np.nan,
+                    "Retired" if retired[i] else "Finished", np.nan, 0.0, "t",
+                    int(rng.integers(1, n_cars + 1)) if is_race else np.nan,
+                    _durations([lap_ms[i] * race_laps])[0] if is_race and not retired[i] else np.nan,
+                    np.nan, laps_done[i],
+                ))
+            n_laps = int(laps_done.sum())
+            lap_frames.append(pd.DataFrame({
+                "id": np.arange(lap_id, lap_id + n_laps), "session_entry_id": np.repeat(ids, laps_done),
+                "number": np.concatenate([np.arange(1, n + 1) for n in laps_done]),
+                "position": np.repeat(np.arange(1, cars + 1), laps_done),
+                "time": _durations(np.repeat(lap_ms, laps_done) + rng.integers(-500, 500, n_laps)),
+                "average_speed": np.nan, "is_deleted": "f", "is_entry_fastest_lap": "f",
+            }))
+            session_id, entry_id, lap_id = session_id + 1, entry_id + cars, lap_id + n_laps
+
+    sessions = pd.DataFrame(session_rows, columns=[
+        "id", "round_id", "number", "type", "date", "time", "scheduled_laps", "point_system_id", "is_cancelled"])
+    round_entries = pd.DataFrame({
+        "id": round_entry_ids.ravel(), "round_id": np.repeat(np.arange(1, n_round_rows + 1), n_cars),
+        "team_driver_id": ((np.repeat(round_season, n_cars) - 1) * n_cars + np.tile(np.arange(n_cars), n_round_rows) + 1),
+        "car_number": np.tile(np.arange(1, n_cars + 1), n_round_rows),
+    })
+    session_entries = pd.DataFrame(entry_rows, columns=[
+        "id", "session_id", "round_entry_id", "position", "is_classified", "status", "detail", "points",
+        "is_eligible_for_points", "grid", "time", "fastest_lap_rank", "laps_completed"])
+
+    for table, df in (("circuit", circuits), ("driver", drivers), ("team", teams), ("teamdriver", team_drivers),
+                      ("round", rounds), ("session", sessions), ("roundentry", round_entries),
+                      ("sessionentry", session_entries), ("lap", pd.concat(lap_frames, ignore_index=True))):
+        df.to_csv(dump / f"formula_one_{table}.csv", index=False)
+    pd.DataFrame({
+        "date": rounds["date"], "weather": rng.choice(["Dry", "Rain", "Changeable", "Very changeable"], n_round_rows),
+    }).to_csv(Path(raw_dir) / "race_weather.csv", index=False)
+    pd.DataFrame({
+        "circuit": circuits["reference"], "type_circuit": rng.choice(CIRCUIT_TYPES, n_circuits),
+    }).to_csv(Path(raw_dir) / "circuit_type.csv", index=False)
+    return Path(raw_dir)
@@ -1,3 +1,4 @@
+import argparse
 import joblib
 import sys
 from pathlib import Path
@@ -6,25 +7,45 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from app.services.model_service import save_metadata
+from app.services.race_simulator import ResidualNoise, save_residuals
+from app.models.representation import REPRESENTATIONS
 from app.models.mainrace_pipeline import build_mainrace_pipeline  # if you have a helper; adapt as needed
 from pathlib import Path
 import pandas as pd
+from sklearn.model_selection import KFold, cross_val_predict
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--representation", choices=REPRESENTATIONS, default="dense",
+                        help="features handed to the estimator (float32 / sparse: no dense float64 matrix)")
+    parser.add_argument("--compress", type=int, default=0, help="joblib compression level of the artifact (0: none)")
+    parser.add_argument("--residual-folds", type=int, default=5,
+                        help="folds of out-of-fold residuals recorded for race simulations, one extra fit "
+                             "per fold (0: skip; the simulator then needs SIMULATION_RESIDUAL_STD)")
+    args = parser.parse_args()
+
     path = ROOT / "data" / "processed" / "cleaned_data_main_race_with_median.csv"
 
     Xy = pd.read_csv(path)
     y = Xy["deviation_from_median"]
     X = Xy.drop(columns=["deviation_from_median"])
-    pipeline = build_mainrace_pipeline()
+    pipeline = build_mainrace_pipeline(representation=args.representation)
     pipeline.fit(X, y)
     Path("models").mkdir(exist_ok=True)
-    joblib.dump(pipeline, "models/trained_mainrace_pipeline.pkl")
+    joblib.dump(pipeline, "models/trained_mainrace_pipeline.pkl", compress=args.compress)
     # Save metadata: training time, dataset md5, sample params
     meta = {
         "n_rows": int(X.shape[0]),
         "n_features": int(X.shape[1]),
         "target": "deviation_from_median",
+        "representation": args.representation,
+        "compress": args.compress,
     }
-    save_metadata(meta, path=Path("models/mainrace_metadata.json"))
+    save_metadata(meta, path=Path("models/mainrace_metadata.json"), artifact=Path("models/trained_mainrace_pipeline.pkl"))
+    if args.residual_folds > 1:
+        # out-of-fold: in-sample residuals of the boosted trees understate the error
+        cv = KFold(args.residual_folds, shuffle=True, random_state=42)
+        predicted = cross_val_predict(build_mainrace_pipeline(representation=args.representation), X, y, cv=cv)
+        noise = ResidualNoise.from_residuals(y - predicted, source=f"{args.residual_folds}-fold out-of-fold")
+        save_residuals(noise, Path("models/mainrace_residuals.json"), artifact=Path("models/trained_mainrace_pipeline.pkl"))
     print("Model saved: models/trained_mainrace_pipeline.pkl")
\ No newline at end of file
@@ -1,3 +1,4 @@
+import argparse
 import joblib
 import sys
 from pathlib import Path
@@ -6,25 +7,34 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from app.services.model_service import save_metadata
+from app.models.representation import REPRESENTATIONS
 from app.models.qualifying_pipeline import build_qualifying_pipeline  # if you have a helper; adapt as needed
 from pathlib import Path
 import pandas as pd
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--representation", choices=REPRESENTATIONS, default="dense",
+                        help="features handed to the estimator (float32 / sparse: no dense float64 matrix)")
+    parser.add_argument("--compress", type=int, default=0, help="joblib compression level of the artifact (0: none)")
+    args = parser.parse_args()
+
     path = ROOT / "data" / "processed" / "cleaned_data_qualifying_with_median.csv"
 
     Xy = pd.read_csv(path)
     y = Xy["deviation_from_median"]
     X = Xy.drop(columns=["deviation_from_median"])
-    pipeline = build_qualifying_pipeline()
+    pipeline = build_qualifying_pipeline(representation=args.representation)
     pipeline.fit(X, y)
     Path("models").mkdir(exist_ok=True)
-    joblib.dump(pipeline, "models/trained_qualifying_pipeline.pkl")
+    joblib.dump(pipeline, "models/trained_qualifying_pipeline.pkl", compress=args.compress)
     # Save metadata: training time, dataset md5, sample params
     meta = {
         "n_rows": int(X.shape[0]),
         "n_features": int(X.shape[1]),
         "target": "deviation_from_median",
+        "representation": args.representation,
+        "compress": args.compress,
     }
-    save_metadata(meta, path=Path("models/qualifying_metadata.json"))
+    save_metadata(meta, path=Path("models/qualifying_metadata.json"), artifact=Path("models/trained_qualifying_pipeline.pkl"))
     print("Model saved: models/trained_qualifying_pipeline.pkl")
\ No newline at end of file
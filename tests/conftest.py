@@ -6,3 +6,36 @@ import pytest
 ROOT = Path(__file__).resolve().parents[1]  # repo root
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+def _write_csv(p: Path, content: str):
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(content)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Minimal data/ tree with processed reference tables and pick lists."""
+    proc = tmp_path / "processed"
+    _write_csv(proc / "drivers.csv",
+               "driverRef,driver_nationality,driver_date_of_birth,first_race_date,forename,surname\n"
+               "hamilton,GBR,1985-01-07,2007-03-18,Lewis,Hamilton\n"
+               "leclerc,MCO,1997-10-16,2018-03-25,Charles,Leclerc\n"
+               "bearman,,2005-05-08,2024-03-09,Oliver,Bearman\n")
+    _write_csv(proc / "constructors.csv", "constructorRef,constructor_nationality\nferrari,ITA\nmclaren,GBR\n")
+    _write_csv(proc / "circuits.csv", "circuitRef,circuit_nationality,type_circuit\nsilverstone,GBR,Race circuit\nmonaco,MCO,Street circuit\n")
+    for t in ("mainrace", "qualifying", "status"):
+        _write_csv(proc / "features_helper" / f"drivers_{t}.csv", "driverRef\nHamilton\nleclerc\nbearman\nrookie\n")
+        _write_csv(proc / "features_helper" / f"constructors_{t}.csv", "constructorRef\nferrari\nmclaren\nwilliams\n")
+        _write_csv(proc / "features_helper" / f"circuits_{t}.csv", "circuitRef\nsilverstone\nmonaco\nmonza\n")
+    return tmp_path
+
+
+@pytest.fixture
+def reference_index(data_dir, monkeypatch):
+    """Install a ReferenceIndex over data_dir as the process-wide index."""
+    from app.services import reference_data
+
+    index = reference_data.ReferenceIndex.from_dir(data_dir)
+    monkeypatch.setattr(reference_data, "_index", index)
+    return index
@@ -0,0 +1,152 @@
+import json
+from datetime import date
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.api import responses
+from app.schemas.dto import (
+    MainRacePredictionItem,
+    MainRacePredictResponse,
+    StatusPredictInput,
+    StatusPredictionItem,
+    StatusPredictResponse,
+)
+from app.services import model_service
+from app.services.feature_builder import build_main_race_features_from_dto, build_status_features_from_dto
+
+
+class PositionPipeline:
+    """Picklable stand-in: deviation = 100 * qualification position, DNF odds rise with it."""
+    def predict(self, X):
+        return X["qualification_position"].to_numpy(dtype=float) * 100.0
+
+    def predict_proba(self, X):
+        p = X["qualification_position"].to_numpy(dtype=float) / 40.0
+        return np.column_stack([1.0 - p, p])
+
+
+DTOS = [
+    {"qualification_position": 3, "laps": 52, "constructor": "ferrari", "circuit": "silverstone",
+     "driver": "hamilton", "race_date": "2024-07-07", "rain": 0},
+    {"qualification_position": 1, "laps": 52, "constructor": "mclaren", "circuit": "silverstone",
+     "driver": "leclerc", "race_date": "2024-07-07", "rain": 0},
+    {"qualification_position": 2, "laps": 52, "constructor": "williams", "circuit": "silverstone",
+     "driver": "rookie", "race_date": "2024-07-07", "rain": 0},
+]
+
+
+@pytest.fixture
+def client(reference_index, tmp_path, monkeypatch):
+    for name in ("mainrace", "status"):
+        pkl, meta = model_service.MODEL_SPECS[name]
+        joblib.dump(PositionPipeline(), tmp_path / pkl)
+        (tmp_path / meta).write_text(json.dumps({"git_commit": "abc"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry())
+    from app.main import create_app
+    return TestClient(create_app())
+
+
+def _expected_mainrace():
+    items = []
+    for dto, position in zip(DTOS, [3, 1, 2]):
+        parsed = {**dto, "race_date": date(2024, 7, 7)}
+        items.append(MainRacePredictionItem(
+            input=parsed,
+            features=build_main_race_features_from_dto(parsed),
+            predicted_deviation_from_median=dto["qualification_position"] * 100.0,
+            predicted_final_position=position,
+        ))
+    return jsonable_encoder(MainRacePredictResponse(predictions=items, model_meta={"git_commit": "abc"}))
+
+
+def test_batch_rows_match_pydantic_response(client):
+    response = client.post("/main-race/predict/batch", json=DTOS)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == _expected_mainrace()
+
+
+def test_status_batch_rows_match_pydantic_response(client):
+    dtos = [{k: v for k, v in d.items() if k != "laps"} for d in DTOS]
+    response = client.post("/status/predict/batch", json=dtos)
+
+    expected = jsonable_encoder(StatusPredictResponse(
+        percentages=[
+            StatusPredictionItem(
+                input=d,
+                features=build_status_features_from_dto(StatusPredictInput(**d).model_dump()),
+                dnf_percentage=d["qualification_position"] / 40.0 * 100,
+            )
+            for d in dtos
+        ],
+        model_meta={"git_commit": "abc"},
+    ))
+    assert response.json() == expected
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"params": {"format": "columnar"}},
+    {"headers": {"Accept": "application/vnd.f1.columnar+json"}},
+])
+def test_batch_columnar_format(client, kwargs):
+    response = client.post("/main-race/predict/batch", json=DTOS, **kwargs)
+
+    assert response.headers["content-type"] == "application/vnd.f1.columnar+json"
+    body = response.json()
+    columns = body["predictions"]
+    expected = _expected_mainrace()["predictions"]
+    assert body["format"] == "columnar"
+    assert body["model_meta"] == {"git_commit": "abc"}
+    assert columns["predicted_final_position"] == [3, 1, 2]
+    assert columns["predicted_deviation_from_median"] == [300.0, 100.0, 200.0]
+    assert columns["input"]["driver"] == ["hamilton", "leclerc", "rookie"]
+    # rookie has no reference row: age stays in the column as null
+    assert columns["features"]["age_at_gp_in_days"] == [
+        item["features"].get("age_at_gp_in_days") for item in expected
+    ]
+    assert columns["features"]["driver_nationality"] == [item["features"]["driver_nationality"] for item in expected]
+
+
+def test_unknown_format_rejected(client):
+    assert client.post("/main-race/predict/batch?format=xml", json=DTOS).status_code == 422
+
+
+def test_grid_route_matches_batch(client):
+    race = {"circuit": "silverstone", "race_date": "2024-07-07", "laps": 52, "rain": 0}
+    entries = [{k: d[k] for k in ("driver", "constructor", "qualification_position")} for d in DTOS]
+
+    response = client.post("/main-race/predict/grid", json={"race": race, "entries": entries})
+
+    assert response.status_code == 200
+    body = response.json()
+    expected = _expected_mainrace()
+    assert body["race"] == race
+    assert body["model_meta"] == expected["model_meta"]
+    assert body["race_features"]["circuit_nationality"] == "GBR"
+    for item, entry, batch_item in zip(body["predictions"], entries, expected["predictions"]):
+        assert item["entry"] == entry
+        assert {**body["race_features"], **item["features"]} == batch_item["features"]
+        assert item["predicted_deviation_from_median"] == batch_item["predicted_deviation_from_median"]
+        assert item["predicted_final_position"] == batch_item["predicted_final_position"]
+    assert "circuit" not in body["predictions"][0]["features"]
+
+
+def test_grid_route_requires_entries(client):
+    race = {"circuit": "silverstone", "race_date": "2024-07-07", "laps": 52}
+    assert client.post("/main-race/predict/grid", json={"race": race, "entries": []}).status_code == 422
+
+
+def test_render_json_without_orjson_matches(monkeypatch):
+    payload = {"race_date": date(2024, 7, 7), "values": [1.5, float("nan"), np.float64("inf")],
+               "array": np.array([np.nan, 2.0]), "nested": {"x": (float("-inf"), np.int64(3))}}
+    expected = responses.render_json(payload)
+    monkeypatch.setattr(responses, "orjson", None)
+    assert json.loads(responses.render_json(payload)) == json.loads(expected) == {
+        "race_date": "2024-07-07", "values": [1.5, None, None], "array": [None, 2.0], "nested": {"x": [None, 3]},
+    }
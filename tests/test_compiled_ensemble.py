@@ -0,0 +1,89 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.compiled_ensemble import CompiledPipeline, compile_pipeline
+from app.models.mainrace_pipeline import build_mainrace_pipeline
+from app.models.status_pipeline import build_status_pipeline
+from app.services import model_service
+
+
+def _frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    nat = np.array(["GBR", "ITA", "NLD", "MCO"])
+    df = pd.DataFrame({
+        "qualification_position": rng.integers(1, 21, n),
+        "age_at_gp_in_days": rng.integers(7000, 14000, n),
+        "days_since_first_race": rng.integers(0, 6000, n),
+        "laps": rng.integers(50, 70, n),
+        "race_year": rng.integers(2000, 2025, n),
+        "constructor": rng.choice(["ferrari", "mclaren", "red_bull"], n),
+        "circuit": rng.choice(["silverstone", "monza", "monaco", "zandvoort"], n),
+        "type_circuit": rng.choice(["Race circuit", "Street circuit"], n),
+        "driver": rng.choice([f"d{i}" for i in range(12)], n),
+        "circuit_nationality": rng.choice(nat, n),
+        "driver_nationality": rng.choice(nat, n),
+        "constructor_nationality": rng.choice(nat, n),
+        "race_month": rng.integers(3, 12, n),
+        "race_day": rng.integers(1, 29, n),
+        "rain": rng.integers(0, 2, n),
+    })
+    df["driver_home"] = (df["driver_nationality"] == df["circuit_nationality"]).astype(int)
+    df["constructor_home"] = (df["constructor_nationality"] == df["circuit_nationality"]).astype(int)
+    return df
+
+
+@pytest.fixture(scope="module")
+def mainrace_pipeline():
+    X = _frame(300)
+    y = X["qualification_position"] * 1000.0 + np.random.default_rng(1).normal(0, 500, len(X))
+    return build_mainrace_pipeline().set_params(models__n_estimators=30).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def status_pipeline():
+    X = _frame(300)
+    y = (np.random.default_rng(2).random(len(X)) < 0.3).astype(int)
+    return build_status_pipeline().set_params(models__n_estimators=30).fit(X, y)
+
+
+def test_compiled_regressor_matches_pipeline(mainrace_pipeline):
+    X = _frame(100, seed=5)
+    compiled = compile_pipeline(mainrace_pipeline)
+
+    np.testing.assert_allclose(compiled.predict(X), mainrace_pipeline.predict(X), rtol=1e-9)
+    np.testing.assert_allclose(compiled.predict(X.iloc[:1]), mainrace_pipeline.predict(X.iloc[:1]), rtol=1e-9)
+
+
+def test_compiled_classifier_matches_pipeline(status_pipeline):
+    X = _frame(100, seed=6)
+    compiled = compile_pipeline(status_pipeline)
+
+    np.testing.assert_allclose(compiled.predict_proba(X), status_pipeline.predict_proba(X), atol=1e-12)
+    assert (compiled.predict(X) == status_pipeline.predict(X)).all()
+
+
+def test_compiled_rejects_nan_and_uncompilable_estimators(mainrace_pipeline):
+    compiled = compile_pipeline(mainrace_pipeline)
+    X = _frame(2).astype({"age_at_gp_in_days": float})
+    X.loc[0, "age_at_gp_in_days"] = np.nan
+
+    with pytest.raises(ValueError):
+        compiled.predict(X)
+    with pytest.raises(TypeError):
+        compile_pipeline(build_mainrace_pipeline(estimator="rf").set_params(models__n_estimators=2).fit(_frame(20), np.arange(20)))
+
+
+def test_registry_serves_compiled_backend(mainrace_pipeline, tmp_path, monkeypatch):
+    joblib.dump(mainrace_pipeline, tmp_path / "trained_mainrace_pipeline.pkl")
+    (tmp_path / "mainrace_metadata.json").write_text(json.dumps({"git_commit": "abc"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+
+    pipeline, _ = model_service.ModelRegistry(backend="compiled").get("mainrace")
+
+    assert isinstance(pipeline, CompiledPipeline)
+    X = _frame(5, seed=7)
+    np.testing.assert_allclose(pipeline.predict(X), mainrace_pipeline.predict(X), rtol=1e-9)
@@ -0,0 +1,149 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.compiled_ensemble import CompiledPipeline
+from app.models.fast_preprocessor import FastPipeline, FastPreprocessor
+from app.models.mainrace_pipeline import build_mainrace_pipeline
+from app.models.representation import Float32Features
+from app.models.status_pipeline import build_status_pipeline
+from app.services import model_service
+
+
+def _frame(n: int, seed: int = 0, drivers: int = 12) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    nat = np.array(["GBR", "ITA", "NLD", "MCO"])
+    df = pd.DataFrame({
+        "qualification_position": rng.integers(1, 21, n),
+        "age_at_gp_in_days": rng.integers(7000, 14000, n),
+        "days_since_first_race": rng.integers(0, 6000, n),
+        "laps": rng.integers(50, 70, n),
+        "race_year": rng.integers(2000, 2025, n),
+        "constructor": rng.choice(["ferrari", "mclaren", "red_bull"], n),
+        "circuit": rng.choice(["silverstone", "monza", "monaco", "zandvoort"], n),
+        "type_circuit": rng.choice(["Race circuit", "Street circuit"], n),
+        "driver": rng.choice([f"d{i}" for i in range(drivers)], n),
+        "circuit_nationality": rng.choice(nat, n),
+        "driver_nationality": rng.choice(nat, n),
+        "constructor_nationality": rng.choice(nat, n),
+        "race_month": rng.integers(3, 12, n),
+        "race_day": rng.integers(1, 29, n),
+        "rain": rng.integers(0, 2, n),
+    })
+    df["driver_home"] = (df["driver_nationality"] == df["circuit_nationality"]).astype(int)
+    df["constructor_home"] = (df["constructor_nationality"] == df["circuit_nationality"]).astype(int)
+    return df
+
+
+@pytest.fixture(scope="module")
+def mainrace_pipeline():
+    X = _frame(300)
+    X.loc[::7, "driver_nationality"] = np.nan  # NaN becomes a fitted category
+    y = X["qualification_position"] * 1000.0
+    return build_mainrace_pipeline().set_params(models__n_estimators=10).fit(X, y)
+
+
+def _serving_frame() -> pd.DataFrame:
+    # unseen drivers (d12..d19), NaN and None nationalities, a float-typed categorical
+    X = _frame(60, seed=3, drivers=20).astype({"race_day": float, "driver_nationality": object})
+    X.loc[0, "driver_nationality"] = None
+    X.loc[1, "driver_nationality"] = np.nan
+    X.loc[2, "constructor"] = "unknown_team"
+    return X
+
+
+def test_transform_is_bit_identical(mainrace_pipeline):
+    preprocessor = mainrace_pipeline.named_steps["preprocessing"]
+    fast = FastPreprocessor.from_pipeline(mainrace_pipeline)
+    X = _serving_frame()
+
+    expected = preprocessor.transform(X)
+    actual = fast.transform(X)
+    assert actual.dtype == expected.dtype and actual.shape == expected.shape
+    assert np.array_equal(actual, expected, equal_nan=True)
+    assert np.array_equal(fast.transform(X.iloc[:1]), preprocessor.transform(X.iloc[:1]))
+
+    sparse = FastPreprocessor.from_pipeline(mainrace_pipeline, sparse_output=True).transform(X)
+    assert np.array_equal(sparse.toarray(), expected)
+
+
+def test_fast_pipeline_predictions_match(mainrace_pipeline):
+    X = _serving_frame()
+    fast = FastPipeline(FastPreprocessor.from_pipeline(mainrace_pipeline), mainrace_pipeline[-1])
+
+    assert np.array_equal(fast.predict(X), mainrace_pipeline.predict(X))
+
+
+def test_fast_path_for_classifier_probabilities():
+    X = _frame(200, seed=4).drop(columns=["laps"])  # status is trained without laps
+    pipeline = build_status_pipeline().set_params(models__n_estimators=10).fit(X, X["rain"])
+    fast = FastPipeline(FastPreprocessor.from_pipeline(pipeline), pipeline[-1])
+
+    assert np.array_equal(fast.predict_proba(X), pipeline.predict_proba(X))
+
+
+@pytest.mark.parametrize("representation", ["float32", "sparse"])
+def test_compact_representations(representation, mainrace_pipeline):
+    X = _frame(300)
+    X.loc[::7, "driver_nationality"] = np.nan
+    y = X["qualification_position"] * 1000.0
+    pipeline = build_mainrace_pipeline(representation=representation).set_params(models__n_estimators=10).fit(X, y)
+    assert isinstance(pipeline.named_steps["compact"], Float32Features)
+
+    served = _serving_frame()
+    expected = pipeline[:-1].transform(served)
+    assert expected.dtype == np.float32 and hasattr(expected, "toarray") == (representation == "sparse")
+    fast = FastPreprocessor.from_pipeline(pipeline)
+    actual = fast.transform(served)
+    assert actual.dtype == np.float32 and type(actual) is type(expected)
+    dense = FastPreprocessor.from_pipeline(pipeline, sparse_output=False).transform(served)
+    reference = expected.toarray() if representation == "sparse" else expected
+    assert np.array_equal(dense, reference)
+    assert np.array_equal(FastPipeline(fast, pipeline[-1]).predict(served), pipeline.predict(served))
+    if representation == "float32":
+        # trees see the same float32 values as when trained on float64 features
+        assert np.array_equal(pipeline.predict(served), mainrace_pipeline.predict(served))
+
+
+def test_missing_columns_and_unsupported_layouts(mainrace_pipeline):
+    fast = FastPreprocessor.from_pipeline(mainrace_pipeline)
+    with pytest.raises(ValueError):
+        fast.transform(_frame(2).drop(columns=["driver"]))
+
+    X = _frame(40).assign(extra=1.0)
+    with_remainder = build_mainrace_pipeline().set_params(models__n_estimators=2).fit(X, X["laps"])
+    with pytest.raises(TypeError):
+        FastPreprocessor.from_pipeline(with_remainder)
+
+
+def test_registry_wraps_fast_preprocessor(mainrace_pipeline, tmp_path, monkeypatch):
+    joblib.dump(mainrace_pipeline, tmp_path / "trained_mainrace_pipeline.pkl")
+    (tmp_path / "mainrace_metadata.json").write_text(json.dumps({"git_commit": "abc"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+
+    sklearn_backend, _ = model_service.ModelRegistry(backend="sklearn").get("mainrace")
+    compiled_backend, _ = model_service.ModelRegistry(backend="compiled").get("mainrace")
+    assert isinstance(sklearn_backend, FastPipeline)
+    assert isinstance(compiled_backend, CompiledPipeline)
+    assert isinstance(compiled_backend.preprocessor, FastPreprocessor)
+
+    monkeypatch.setattr(model_service.config, "FAST_PREPROCESSING", False)
+    plain, _ = model_service.ModelRegistry(backend="sklearn").get("mainrace")
+    assert plain.__class__ is mainrace_pipeline.__class__
+
+
+def test_registry_serves_sparse_artifacts_dense(tmp_path, monkeypatch):
+    X = _frame(300)
+    pipeline = build_mainrace_pipeline(representation="sparse").set_params(models__n_estimators=10).fit(X, X["laps"])
+    joblib.dump(pipeline, tmp_path / "trained_mainrace_pipeline.pkl", compress=3)
+    (tmp_path / "mainrace_metadata.json").write_text(json.dumps({"git_commit": "abc"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    served = _serving_frame()
+
+    for backend in ("sklearn", "compiled"):
+        model, _ = model_service.ModelRegistry(backend=backend).get("mainrace")
+        assert isinstance(model.transform(served), np.ndarray)
+        assert np.allclose(model.predict(served), pipeline.predict(served))
@@ -0,0 +1,90 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from app.services.feature_builder import (
+    WeekendFeatures,
+    build_main_race_features_batch,
+    build_main_race_features_from_dto,
+    build_main_race_grid_features,
+    build_qualifying_features_batch,
+    build_qualifying_features_from_dto,
+    build_status_features_batch,
+    build_status_features_from_dto,
+    features_records,
+)
+
+BUILDERS = [
+    (build_main_race_features_batch, build_main_race_features_from_dto),
+    (build_qualifying_features_batch, build_qualifying_features_from_dto),
+    (build_status_features_batch, build_status_features_from_dto),
+]
+
+# known driver, mixed case, blank nationality, and rows missing from the reference tables
+GRID = [
+    ("hamilton", "ferrari", "silverstone"),
+    ("LECLERC", "mclaren", "monaco"),
+    (" bearman ", "ferrari", "silverstone"),
+    ("rookie", "williams", "monza"),
+]
+
+
+def _dtos(rows):
+    return [
+        {"qualification_position": i + 1, "laps": 57, "constructor": c, "circuit": ci, "driver": d,
+         "race_date": date(2024, 7, 7), "rain": i % 2}
+        for i, (d, c, ci) in enumerate(rows)
+    ]
+
+
+@pytest.mark.parametrize("batch, scalar", BUILDERS)
+@pytest.mark.parametrize("rows", [GRID, GRID[:2], GRID[3:]])
+def test_batch_builder_matches_scalar(reference_index, batch, scalar, rows):
+    dtos = _dtos(rows)
+    expected = [scalar(d) for d in dtos]
+
+    df = batch(dtos)
+
+    pd.testing.assert_frame_equal(df, pd.DataFrame(expected))
+    assert features_records(df) == expected
+
+
+def test_batch_builder_rejects_unpickable_rows(reference_index):
+    with pytest.raises(ValueError):
+        build_main_race_features_batch(_dtos(GRID + [("hamilton", "ferrari", "spa")]))
+
+
+@pytest.mark.parametrize("circuit", ["silverstone", " Monaco", "monza"])
+def test_grid_builder_matches_batch(reference_index, circuit):
+    race = {"circuit": circuit, "race_date": date(2024, 7, 7), "laps": 52, "rain": 1}
+    entries = [
+        {"driver": d, "constructor": c, "qualification_position": i + 1}
+        for i, (d, c, _) in enumerate(GRID)
+    ]
+
+    grid = build_main_race_grid_features(race, entries)
+
+    expected = build_main_race_features_batch([{**race, **entry} for entry in entries])
+    pd.testing.assert_frame_equal(grid, expected)
+
+
+def test_grid_builder_rejects_unpickable_circuit(reference_index):
+    with pytest.raises(ValueError):
+        build_main_race_grid_features(
+            {"circuit": "spa", "race_date": date(2024, 7, 7), "laps": 44},
+            [{"driver": "hamilton", "constructor": "ferrari", "qualification_position": 1}],
+        )
+
+
+def test_weekend_features_match_batch_builders(reference_index):
+    race = {"circuit": "silverstone", "race_date": date(2024, 7, 7), "laps": 52, "rain": 1}
+    entries = [{"driver": d, "constructor": c} for d, c, _ in GRID]
+    grid = [3, 1, 4, 2]
+    rows = [{**race, **entry, "qualification_position": q} for entry, q in zip(entries, grid)]
+
+    weekend = WeekendFeatures(race, entries)
+
+    pd.testing.assert_frame_equal(weekend.qualifying(), build_qualifying_features_batch(rows))
+    pd.testing.assert_frame_equal(weekend.main_race(grid), build_main_race_features_batch(rows))
+    pd.testing.assert_frame_equal(weekend.status(grid), build_status_features_batch(rows))
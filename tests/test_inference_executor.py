@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import inference_executor
+from app.services.inference_executor import InferenceExecutor, InferenceSaturated
+
+
+def test_executor_gauges_and_backpressure():
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        while executor.in_flight < 1:
+            await asyncio.sleep(0.001)
+        gauges = (executor.in_flight, executor.queued)
+        with pytest.raises(InferenceSaturated):
+            await executor.run(lambda: "rejected")
+        release.set()
+        return gauges, await running, await queued
+
+    try:
+        gauges, first, second = asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert gauges == (1, 1)
+    assert (first, second) == (True, "queued")
+    assert executor.stats()["rejected"] == 1
+    assert (executor.in_flight, executor.queued) == (0, 0)
+
+
+def test_saturated_batch_route_returns_503(monkeypatch):
+    from app.main import create_app
+
+    saturated = InferenceExecutor(kind="thread", max_workers=1, max_queue=0)
+    saturated._pending = 1  # one job running, no queue left
+    monkeypatch.setattr(inference_executor, "_executor", saturated)
+    monkeypatch.setattr(inference_executor.config, "INFERENCE_RETRY_AFTER_SECONDS", 2.5)
+
+    response = TestClient(create_app()).post("/main-race/predict/batch", json=[])
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
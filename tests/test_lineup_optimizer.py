@@ -0,0 +1,52 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from app.services.lineup_optimizer import ScoringRules, expected_driver_points, optimize_lineups, price_units
+
+
+def _enumerate(driver_points, driver_units, constructor_points, constructor_units, budget, n_drivers, n_constructors):
+    totals = []
+    for drivers in itertools.combinations(range(len(driver_points)), n_drivers):
+        for constructors in itertools.combinations(range(len(constructor_points)), n_constructors):
+            if driver_units[list(drivers)].sum() + constructor_units[list(constructors)].sum() <= budget:
+                totals.append(driver_points[list(drivers)].sum() + constructor_points[list(constructors)].sum())
+    return sorted(totals, reverse=True)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matches_enumeration(seed):
+    rng = np.random.default_rng(seed)
+    driver_points, driver_units = rng.normal(10.0, 8.0, 10), rng.integers(5, 60, 10)
+    constructor_points, constructor_units = rng.normal(20.0, 8.0, 5), rng.integers(5, 60, 5)
+    budget, top_k = int(rng.integers(60, 200)), 5
+
+    lineups = optimize_lineups(driver_points, driver_units, constructor_points, constructor_units, budget, 3, 2, top_k)
+
+    expected = _enumerate(driver_points, driver_units, constructor_points, constructor_units, budget, 3, 2)[:top_k]
+    np.testing.assert_allclose([lineup.expected_points for lineup in lineups], expected)
+    assert len({(tuple(lineup.drivers), tuple(lineup.constructors)) for lineup in lineups}) == len(lineups)
+    for lineup in lineups:
+        assert len(lineup.drivers) == 3 and len(lineup.constructors) == 2
+        assert lineup.price_units == driver_units[lineup.drivers].sum() + constructor_units[lineup.constructors].sum()
+        assert lineup.price_units <= budget
+        assert lineup.expected_points == pytest.approx(
+            driver_points[lineup.drivers].sum() + constructor_points[lineup.constructors].sum()
+        )
+
+
+def test_nothing_fits():
+    assert optimize_lineups([1.0, 2.0], [10, 10], [1.0], [10], 25, 2, 1) == []
+    assert optimize_lineups([1.0], [1], [1.0], [1], 100, 2, 1) == []
+
+
+def test_expected_points_and_prices():
+    rules = ScoringRules(qualifying_points=(3.0, 1.0), race_points=(10.0, 5.0), positions_gained_points=2.0, dnf_points=-4.0)
+    points = expected_driver_points([2, 1, 3], [1, 2, 3], [0.0, 0.5, 1.0], rules)
+    # P2 -> P1: 1 + 10 + 2; P1 -> P2 half the time: 3 + 0.5 * (5 - 2) + 0.5 * -4; P3 always retires: -4
+    np.testing.assert_allclose(points, [13.0, 2.5, -4.0])
+
+    np.testing.assert_array_equal(price_units([30.4, 4.5, 100.0], 0.1), [304, 45, 1000])
+    with pytest.raises(ValueError, match="multiples of 0.1"):
+        price_units([30.45], 0.1)
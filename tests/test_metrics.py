@@ -0,0 +1,135 @@
+import json
+import os
+import re
+
+import joblib
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.metrics import Counter, Histogram, MetricsRegistry, metrics_registry
+from app.services import model_service
+
+
+class PositionPipeline:
+    """Picklable stand-in: deviation = 100 * qualification position."""
+    def predict(self, X):
+        return X["qualification_position"].to_numpy(dtype=float) * 100.0
+
+
+DTOS = [
+    {"qualification_position": 3, "laps": 52, "constructor": "ferrari", "circuit": "silverstone",
+     "driver": "hamilton", "race_date": "2024-07-07", "rain": 0},
+    {"qualification_position": 1, "laps": 52, "constructor": "mclaren", "circuit": "silverstone",
+     "driver": "leclerc", "race_date": "2024-07-07", "rain": 0},
+]
+
+
+@pytest.fixture
+def client(reference_index, tmp_path, monkeypatch):
+    pkl, meta = model_service.MODEL_SPECS["mainrace"]
+    joblib.dump(PositionPipeline(), tmp_path / pkl)
+    (tmp_path / meta).write_text(json.dumps({"git_commit": "abc", "artifact_hash": "feed"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry(cache=model_service.PredictionCache()))
+    metrics_registry.reset()
+    from app.main import create_app
+    return TestClient(create_app())
+
+
+def _samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    registry.histogram("req_seconds", (0.1, 1.0), "Request time", ("route",)).labels("/a").observe(0.5)
+    registry.counter("req_total", "Requests", ("route",)).labels('/"b"').inc(2)
+    registry.counter("unused_total", "Never incremented")
+    registry.add_collector(lambda: [("up", "gauge", "Up", (), 1)])
+
+    assert registry.expose().splitlines() == [
+        "# HELP req_seconds Request time",
+        "# TYPE req_seconds histogram",
+        'req_seconds_bucket{route="/a",le="0.1"} 0',
+        'req_seconds_bucket{route="/a",le="1.0"} 1',
+        'req_seconds_bucket{route="/a",le="+Inf"} 1',
+        'req_seconds_sum{route="/a"} 0.5',
+        'req_seconds_count{route="/a"} 1',
+        "# HELP req_total Requests",
+        "# TYPE req_total counter",
+        'req_total{route="/\\"b\\""} 2',
+        "# HELP up Up",
+        "# TYPE up gauge",
+        "up 1",
+    ]
+    assert isinstance(registry.counter("req_total", label_names=("route",)).labels("/c"), Counter)
+    assert isinstance(registry.histogram("req_seconds", (0.1, 1.0), label_names=("route",)).labels("/a"), Histogram)
+    with pytest.raises(ValueError):
+        registry.counter("req_seconds", label_names=("route",))
+    with pytest.raises(ValueError):
+        registry.counter("req_total", label_names=("route",)).labels("/a", "GET")
+
+
+def test_shared_registry_merges_workers(tmp_path):
+    def worker(requests, seconds, in_flight):
+        registry = MetricsRegistry()
+        registry.counter("req_total", "Requests", ("route",)).labels("/a").inc(requests)
+        registry.histogram("req_seconds", (0.1, 1.0), "Request time").labels().observe(seconds)
+        registry.add_collector(lambda: [("in_flight", "gauge", "Running", (), in_flight)])
+        return registry
+
+    (tmp_path / "12345.json").write_text(json.dumps(worker(3, 0.05, 2).collect()))
+    registry = worker(2, 0.5, 1)
+    registry.share(str(tmp_path), flush_seconds=60.0)
+
+    samples = _samples(registry.expose())
+    assert samples['req_total{route="/a"}'] == 5
+    assert samples['req_seconds_bucket{le="0.1"}'] == 1 and samples['req_seconds_bucket{le="1.0"}'] == 2
+    assert samples["req_seconds_sum"] == pytest.approx(0.55) and samples["req_seconds_count"] == 2
+    assert samples['in_flight{worker="12345"}'] == 2
+    assert samples[f'in_flight{{worker="{os.getpid()}"}}'] == 1
+
+
+def test_batch_request_records_route_and_stages(client):
+    assert client.post("/main-race/predict/batch", json=DTOS).status_code == 200
+    assert client.post("/main-race/predict/batch", json=DTOS).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.text)
+    route = 'route="/main-race/predict/batch"'
+    assert samples[f'f1_http_requests_total{{{route},method="POST",status="200"}}'] == 2
+    assert samples[f'f1_http_request_duration_seconds_count{{{route},method="POST"}}'] == 2
+    for stage in ("validation", "endpoint", "response", "features", "dataframe", "predict", "rank", "serialize"):
+        assert samples[f'f1_stage_duration_seconds_count{{{route},stage="{stage}"}}'] == 2, stage
+    # the second request is served from the prediction cache
+    assert samples["f1_prediction_cache_hits_total"] == 2
+    assert samples["f1_prediction_cache_misses_total"] == 2
+    assert samples["f1_prediction_cache_entries"] == 2
+    assert samples['f1_model_info{model="mainrace",artifact_hash="feed",git_commit="abc"}'] == 1
+    assert 'f1_model_load_seconds{model="mainrace"}' in samples
+
+
+def test_single_request_stages_and_micro_batch(client):
+    assert client.post("/main-race/predict", json=DTOS[0]).status_code == 200
+
+    samples = _samples(client.get("/metrics").text)
+    assert samples['f1_stage_duration_seconds_count{route="/main-race/predict",stage="predict"}'] == 1
+    # the pipeline call itself runs on the micro-batcher's flush loop
+    assert samples['f1_stage_duration_seconds_count{route="micro-batch:mainrace",stage="predict"}'] == 1
+    assert samples['f1_micro_batch_size_count{model="mainrace"}'] >= 1
+    assert not any(re.search(r'route="unmatched".*POST', name) for name in samples)
+
+
+def test_metrics_disabled_records_nothing(client, monkeypatch):
+    monkeypatch.setattr(config, "METRICS_ENABLED", False)
+    assert client.post("/main-race/predict/batch", json=DTOS).status_code == 200
+
+    assert "f1_http_requests_total" not in client.get("/metrics").text
+    assert "f1_stage_duration_seconds" not in client.get("/metrics").text
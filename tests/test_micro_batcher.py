@@ -0,0 +1,73 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.core.metrics import Histogram
+from app.services.micro_batcher import MicroBatcher
+
+
+class RecordingScorer:
+    """Scores each row as its qualification position; records batch sizes."""
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def __call__(self, df: pd.DataFrame):
+        self.batches.append(len(df))
+        if self.fail_on is not None and (df["qualification_position"] == self.fail_on).any():
+            raise ValueError("bad row")
+        return df["qualification_position"].astype(float).tolist()
+
+
+async def _submit_all(batcher, positions):
+    try:
+        return await asyncio.gather(
+            *(batcher.submit({"qualification_position": p}) for p in positions), return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+
+
+def test_concurrent_submits_share_one_call():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher("mainrace", scorer, max_batch_size=32, max_wait_ms=50)
+
+    results = asyncio.run(_submit_all(batcher, range(1, 11)))
+
+    assert results == [float(p) for p in range(1, 11)]
+    assert scorer.batches == [10]
+    snapshot = batcher.stats()
+    assert snapshot["batch_size"]["count"] == 1 and snapshot["batch_size"]["sum"] == 10
+    assert snapshot["queue_wait_ms"]["count"] == 10
+
+
+def test_flushes_at_max_batch_size():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher("mainrace", scorer, max_batch_size=4, max_wait_ms=50)
+
+    results = asyncio.run(_submit_all(batcher, range(10)))
+
+    assert results == [float(p) for p in range(10)]
+    assert scorer.batches == [4, 4, 2]
+
+
+def test_bad_row_only_fails_its_caller():
+    scorer = RecordingScorer(fail_on=3)
+    batcher = MicroBatcher("mainrace", scorer, max_batch_size=8, max_wait_ms=50)
+
+    results = asyncio.run(_submit_all(batcher, [1, 3, 5]))
+
+    assert results[0] == 1.0 and results[2] == 5.0
+    assert isinstance(results[1], ValueError)
+    assert scorer.batches == [3, 1, 1, 1]
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("h", [1, 5, 10])
+    for v in (0.5, 1, 3, 7, 50):
+        h.observe(v)
+
+    snap = h.snapshot()
+    assert snap["buckets"] == {"1": 2, "5": 3, "10": 4, "+Inf": 5}
+    assert snap["count"] == 5 and snap["sum"] == pytest.approx(61.5)
@@ -0,0 +1,105 @@
+import json
+
+import joblib
+import pandas as pd
+import pytest
+
+from app.services import model_service
+from app.services.model_service import ModelRegistry, predict_batch_and_rank
+
+
+class ConstPipeline:
+    """Picklable stand-in for a fitted pipeline."""
+    def predict(self, X):
+        return [float(i) for i in range(len(X))]
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    joblib.dump(ConstPipeline(), tmp_path / "trained_mainrace_pipeline.pkl")
+    (tmp_path / "mainrace_metadata.json").write_text(json.dumps({"git_commit": "abc", "n_rows": 1}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    return tmp_path
+
+
+def test_registry_loads_each_model_once(model_dir, monkeypatch):
+    calls = []
+    real_load = joblib.load
+    monkeypatch.setattr(model_service.joblib, "load", lambda p: calls.append(p) or real_load(p))
+
+    registry = ModelRegistry()
+    first = registry.get("mainrace")
+    second = registry.get("mainrace")
+
+    assert first is second
+    assert len(calls) == 1
+    assert first[1]["git_commit"] == "abc"
+
+
+def test_registry_load_all_skips_missing_artifacts(model_dir):
+    registry = ModelRegistry()
+    loaded = registry.load_all()
+
+    assert loaded == ["mainrace"]
+    assert registry.is_loaded("mainrace")
+    assert not registry.is_loaded("status")
+    with pytest.raises(FileNotFoundError):
+        registry.get("status")
+
+
+def test_predict_batch_and_rank_uses_registry(model_dir, monkeypatch):
+    registry = ModelRegistry()
+    monkeypatch.setattr(model_service, "model_registry", registry)
+    # distinct rows: repeated ones are scored once (see dedupe_rows)
+    df = pd.DataFrame([{"circuit": "monza", "driver": "a"}, {"circuit": "monza", "driver": "b"}])
+
+    df_out, meta = predict_batch_and_rank(df, model_name="mainrace")
+
+    assert registry.is_loaded("mainrace")
+    assert meta["git_commit"] == "abc"
+    assert df_out["predicted_final_position"].tolist() == [1, 2]
+
+
+def test_provenance_computed_once_without_git(model_dir, monkeypatch):
+    monkeypatch.setattr(model_service.subprocess, "check_output", lambda *a, **k: pytest.fail("ran git"))
+    expected_hash = model_service.file_sha256(model_dir / "trained_mainrace_pipeline.pkl")
+
+    registry = ModelRegistry()
+    provenance = registry.provenance("mainrace")
+
+    assert provenance is registry.provenance("mainrace")
+    assert provenance.artifact_hash == expected_hash
+    assert provenance.version == expected_hash
+    assert (provenance.git_commit, provenance.n_rows, provenance.n_features) == ("abc", 1, None)
+    assert provenance.artifact == "trained_mainrace_pipeline.pkl"
+    assert registry.provenance_snapshot()["mainrace"]["loaded_at"] == provenance.loaded_at
+    # the served metadata is what training wrote
+    assert registry.get("mainrace")[1] == {"git_commit": "abc", "n_rows": 1}
+
+
+def test_missing_git_commit_looked_up_once(model_dir, monkeypatch):
+    (model_dir / "mainrace_metadata.json").write_text(json.dumps({"artifact_hash": "recorded"}))
+    calls = []
+    monkeypatch.setattr(model_service.subprocess, "check_output", lambda *a, **k: calls.append(a) or "deadbeef\n")
+    model_service._git_commit_hash.cache_clear()
+    try:
+        for _ in range(3):
+            registry = ModelRegistry()
+            assert registry.get("mainrace")[1]["git_commit"] == "deadbeef"
+            # training recorded the hash: serving trusts it instead of re-hashing
+            assert registry.provenance("mainrace").artifact_hash == "recorded"
+    finally:
+        model_service._git_commit_hash.cache_clear()
+
+    assert len(calls) == 1
+
+
+def test_save_metadata_records_artifact_hash(tmp_path):
+    artifact = tmp_path / "model.pkl"
+    joblib.dump(ConstPipeline(), artifact)
+
+    model_service.save_metadata({"n_rows": 3}, path=tmp_path / "meta.json", artifact=artifact)
+
+    meta = json.loads((tmp_path / "meta.json").read_text())
+    assert meta["artifact_hash"] == model_service.file_sha256(artifact)
+    assert meta["n_rows"] == 3
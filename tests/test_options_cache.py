@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import feature_service
+
+
+@pytest.fixture
+def options_dir(tmp_path, monkeypatch):
+    helper = tmp_path / "features_helper"
+    helper.mkdir()
+    (helper / "drivers_mainrace.csv").write_text("driverRef,driver_nationality\nhamilton,GBR\nbearman,\n")
+    (tmp_path / "constructors.csv").write_text("constructorRef\nferrari\n")
+    monkeypatch.setattr(feature_service, "PROCESSED_DIR", tmp_path)
+    monkeypatch.setattr(feature_service, "FEATURES_HELPER_DIR", helper)
+    monkeypatch.setattr(feature_service, "_options", {})
+    return tmp_path
+
+
+@pytest.fixture
+def client(options_dir):
+    from app.main import create_app
+    return TestClient(create_app())
+
+
+def test_options_served_with_etag_and_304(client):
+    response = client.get("/main-race/options/drivers")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"driverRef": "hamilton", "driver_nationality": "GBR"},
+        {"driverRef": "bearman", "driver_nationality": ""},
+    ]
+    assert response.headers["Cache-Control"] == "public, max-age=300"
+    etag = response.headers["ETag"]
+
+    cached = client.get("/main-race/options/drivers", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+
+def test_options_encoded_once_until_file_changes(client, options_dir, monkeypatch):
+    reads = []
+    real_read = feature_service.read_options_csv
+    monkeypatch.setattr(feature_service, "read_options_csv", lambda *a: reads.append(a) or real_read(*a))
+
+    first = client.get("/main-race/options/drivers")
+    client.get("/main-race/options/drivers")
+    assert len(reads) == 1
+
+    path = options_dir / "features_helper" / "drivers_mainrace.csv"
+    path.write_text("driverRef,driver_nationality\nleclerc,MCO\n")
+    os.utime(path, ns=(1, 1))
+    changed = client.get("/main-race/options/drivers")
+
+    assert len(reads) == 2
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert changed.json() == [{"driverRef": "leclerc", "driver_nationality": "MCO"}]
+
+
+def test_options_fallback_and_missing(client):
+    fallback = client.get("/status/options/constructors")
+    assert fallback.status_code == 200
+    assert json.loads(fallback.content) == [{"constructorRef": "ferrari"}]
+
+    assert client.get("/status/options/circuits").status_code == 404
@@ -1,7 +1,9 @@
 import pandas as pd
 import numpy as np
 
-from app.services.model_service import predict_batch_and_rank
+from app.core import config
+from app.core.metrics import metrics_registry
+from app.services.model_service import dedupe_rows, get_batch_proba, predict_batch_and_rank
 
 class FakePipeline:
     """Deterministic fake pipeline: returns qualification_position as prediction if present."""
@@ -49,4 +51,85 @@ def test_predict_batch_and_rank_global_fallback():
     assert np.allclose(df_out["predicted_deviation_from_median"].to_numpy(), np.array([3.0,1.0,2.0]))
 
     # global ranks ascending -> [3,1,2]
-    assert df_out["predicted_final_position"].tolist() == [3,1,2]
\ No newline at end of file
+    assert df_out["predicted_final_position"].tolist() == [3,1,2]
+
+
+class CountingPipeline(FakePipeline):
+    """FakePipeline that records how many rows each call scored."""
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return super().predict(X)
+
+    def predict_proba(self, X):
+        p = self.predict(X) / 40.0
+        return np.column_stack([1.0 - p, p])
+
+
+def _dedup_rows(rows):
+    for line in metrics_registry.expose().splitlines():
+        if line.startswith(f'f1_dedup_rows_total{{model="",rows="{rows}"}}'):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def _lineups():
+    # two hypothetical lineups at one race sharing drivers: rows repeat
+    row = {"race_year": 2023, "race_month": 7, "race_day": 14, "circuit": "silverstone", "driver": "hamilton"}
+    return pd.DataFrame([
+        {**row, "qualification_position": 4},
+        {**row, "driver": "leclerc", "qualification_position": 2},
+        {**row, "qualification_position": 4},
+        {**row, "driver": "norris", "qualification_position": 1},
+        {**row, "driver": "leclerc", "qualification_position": 2},
+    ])
+
+
+def test_dedupe_rows_round_trips():
+    df = _lineups()
+    unique, inverse = dedupe_rows(df)
+
+    assert unique.index.tolist() == [0, 1, 3]  # first occurrences, in order
+    assert inverse.tolist() == [0, 1, 0, 2, 1]
+    pd.testing.assert_frame_equal(unique.iloc[inverse].reset_index(drop=True), df)
+    assert dedupe_rows(df.iloc[[0, 1, 3]])[1] is None
+
+
+def test_dedupe_rows_confirms_hash_groups(monkeypatch):
+    df = _lineups()
+    # every row hashing alike: the rows are compared, not merged
+    monkeypatch.setattr(pd.util, "hash_pandas_object", lambda frame, index: pd.Series(0, index=frame.index, dtype="uint64"))
+
+    unique, inverse = dedupe_rows(df)
+
+    assert inverse is None and unique is df
+
+
+def test_predict_batch_and_rank_scores_repeated_rows_once(monkeypatch):
+    df = _lineups()
+    pipeline = CountingPipeline()
+    inputs, unique = _dedup_rows("input"), _dedup_rows("unique")
+
+    df_out, _ = predict_batch_and_rank(df, pipeline=pipeline)
+
+    assert pipeline.calls == [3]
+    assert (_dedup_rows("input") - inputs, _dedup_rows("unique") - unique) == (5, 3)
+    assert "f1_dedup_ratio" in metrics_registry.expose()
+    # same predictions and ranks (ties included) as scoring every row
+    monkeypatch.setattr(config, "BATCH_DEDUP", False)
+    expected, _ = predict_batch_and_rank(df, pipeline=pipeline)
+    assert pipeline.calls == [3, 5]
+    pd.testing.assert_frame_equal(df_out, expected)
+    assert df_out["predicted_final_position"].tolist() == [4, 2, 4, 1, 2]
+
+
+def test_get_batch_proba_scores_repeated_rows_once():
+    df = _lineups()
+    pipeline = CountingPipeline()
+
+    df_out, _ = get_batch_proba(df, pipeline=pipeline)
+
+    assert pipeline.calls == [3]
+    assert df_out["predicted_proba"].tolist() == [10.0, 5.0, 10.0, 2.5, 5.0]
@@ -0,0 +1,111 @@
+import json
+
+import joblib
+import pandas as pd
+import pytest
+
+from app.services import model_service
+from app.services.model_service import ModelRegistry, PredictionCache, predict_batch_and_rank, predict_df
+
+
+class CountingPipeline:
+    """Picklable stand-in scoring each row as its qualification position; records batch sizes."""
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return X["qualification_position"].astype(float).to_numpy()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    joblib.dump(CountingPipeline(), tmp_path / "trained_mainrace_pipeline.pkl")
+    (tmp_path / "mainrace_metadata.json").write_text(json.dumps({"git_commit": "abc"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    registry = ModelRegistry(cache=PredictionCache(max_entries=100, ttl_seconds=60))
+    monkeypatch.setattr(model_service, "model_registry", registry)
+    return registry
+
+
+def _grid(positions):
+    return pd.DataFrame({"qualification_position": positions, "circuit": "monza", "race_year": 2024})
+
+
+def test_cache_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = PredictionCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put_many([(("a",), 1.0), (("b",), 2.0)])
+    assert cache.get_many([("a",)]) == [1.0]  # "a" is now most recently used
+    cache.put_many([(("c",), 3.0)])
+
+    assert cache.get_many([("b",)])[0] is model_service._MISSING
+    clock.now = 11
+    assert cache.get_many([("a",), ("c",)]) == [model_service._MISSING, model_service._MISSING]
+    assert cache.stats() == {"size": 0, "max_entries": 2, "hits": 1, "misses": 3, "evictions": 1, "expirations": 2}
+
+
+def test_single_path_is_served_from_cache(registry):
+    pipeline, _ = registry.get("mainrace")
+    df = _grid([3])
+
+    first = predict_df(df, pipeline=pipeline, model_name="mainrace")
+    second = predict_df(df, pipeline=pipeline, model_name="mainrace")
+
+    assert first.tolist() == second.tolist() == [3.0]
+    assert pipeline.calls == [1]
+    assert registry.cache.hits == 1
+
+
+def test_batch_path_scores_only_misses(registry):
+    pipeline, _ = registry.get("mainrace")
+    predict_df(_grid([2]), pipeline=pipeline, model_name="mainrace")
+
+    df_out, _ = predict_batch_and_rank(_grid([5, 2, 1]), model_name="mainrace")
+
+    assert pipeline.calls == [1, 2]
+    assert df_out["predicted_deviation_from_median"].tolist() == [5.0, 2.0, 1.0]
+    assert df_out["predicted_final_position"].tolist() == [3, 2, 1]
+
+
+def test_reload_invalidates_cache(registry):
+    pipeline, _ = registry.get("mainrace")
+    predict_df(_grid([1, 2]), pipeline=pipeline, model_name="mainrace")
+    assert len(registry.cache) == 2
+
+    registry.reload(["mainrace"])
+    reloaded, _ = registry.get("mainrace")
+
+    assert reloaded is not pipeline
+    assert len(registry.cache) == 0
+    predict_df(_grid([1, 2]), pipeline=reloaded, model_name="mainrace")
+    assert reloaded.calls == [2]
+
+
+def test_explicit_pipeline_bypasses_cache(registry):
+    registry.get("mainrace")
+    other = CountingPipeline()
+    predict_df(_grid([4]), pipeline=other, model_name="mainrace")
+    predict_df(_grid([4]), pipeline=other, model_name="mainrace")
+
+    assert other.calls == [1, 1]
+    assert len(registry.cache) == 0
+
+
+def test_rows_with_missing_features_hit(registry):
+    pipeline, _ = registry.get("mainrace")
+    df = _grid([3]).assign(age_at_gp_in_days=float("nan"))
+
+    predict_df(df, pipeline=pipeline, model_name="mainrace")
+    predict_df(df.copy(), pipeline=pipeline, model_name="mainrace")
+
+    assert pipeline.calls == [1]
+    assert len(registry.cache) == 1
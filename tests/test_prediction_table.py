@@ -0,0 +1,231 @@
+import json
+from datetime import date
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.metrics import metrics_registry
+from app.services import model_service
+from app.services.feature_builder import (
+    build_main_race_features_from_dto,
+    build_qualifying_features_from_dto,
+    build_status_features_from_dto,
+)
+from app.services.prediction_table import (
+    PredictionTableStore,
+    build_prediction_table,
+    enumerate_inputs,
+    prediction_tables,
+)
+
+
+class RowPipeline:
+    """Picklable stand-in: a distinct output per driver / constructor / grid slot."""
+    def __init__(self, scale=1.0):
+        self.scale = scale
+
+    def predict(self, X):
+        slot = X["qualification_position"].to_numpy(dtype=float) if "qualification_position" in X else 1.0
+        return self.scale * slot * X["driver"].str.len().to_numpy(dtype=float) + X["constructor"].str.len().to_numpy(dtype=float)
+
+    def predict_proba(self, X):
+        p = self.predict(X) / 1000.0
+        return np.column_stack([1.0 - p, p])
+
+
+RACE_DATE = date(2024, 7, 7)
+ENTRANTS = [
+    {"driver": "hamilton", "constructor": "ferrari"},
+    {"driver": "leclerc", "constructor": "ferrari"},
+    {"driver": "bearman", "constructor": "mclaren"},
+]
+REFRESH = {"circuit": "silverstone", "race_date": "2024-07-07", "laps": 52, "entrants": ENTRANTS}
+BUILDERS = {
+    "mainrace": build_main_race_features_from_dto,
+    "qualifying": build_qualifying_features_from_dto,
+    "status": build_status_features_from_dto,
+}
+
+
+def _write_model(model_dir, name, pipeline):
+    pkl, meta = model_service.MODEL_SPECS[name]
+    joblib.dump(pipeline, model_dir / pkl)
+    (model_dir / meta).write_text(json.dumps({"git_commit": name}))
+
+
+@pytest.fixture
+def models(reference_index, tmp_path, monkeypatch):
+    model_dir = tmp_path / "models"
+    model_dir.mkdir()
+    for name in model_service.MODEL_SPECS:
+        _write_model(model_dir, name, RowPipeline())
+    monkeypatch.setattr(model_service, "MODEL_DIR", model_dir)
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry())
+    monkeypatch.setattr(config, "PREDICTION_TABLE_ADMIN_KEY", "secret")
+    prediction_tables.clear()
+    yield model_dir
+    prediction_tables.clear()
+
+
+@pytest.fixture
+def client(models):
+    from app.main import create_app
+    return TestClient(create_app())
+
+
+def _lookups(model, result):
+    for line in metrics_registry.expose().splitlines():
+        if line.startswith(f'f1_prediction_table_lookups_total{{model="{model}",result="{result}"}}'):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_enumerates_entrants(reference_index):
+    entrants = ENTRANTS + [
+        {"driver": " leclerc ", "constructor": "ferrari"},
+        {"driver": "Leclerc", "constructor": "FERRARI"},
+        {"driver": "verstappen", "constructor": "red_bull"},
+    ]
+    mainrace = enumerate_inputs("mainrace", " Silverstone", RACE_DATE, 52, entrants, grid_size=20)
+    qualifying = enumerate_inputs("qualifying", "silverstone", RACE_DATE, 52, entrants)
+
+    # 4 pickable entrants (duplicates and unknown refs dropped) x 20 grid slots x rain 0/1
+    assert len(mainrace) == 4 * 20 * 2
+    # spelled as given, like a live request: the features carry the spelling
+    assert {dto["circuit"] for dto in mainrace} == {"Silverstone"}
+    assert list(dict.fromkeys((dto["driver"], dto["constructor"]) for dto in mainrace)) == [
+        ("hamilton", "ferrari"), ("leclerc", "ferrari"), ("bearman", "mclaren"), ("Leclerc", "FERRARI")
+    ]
+    assert all(dto["laps"] == 52 for dto in mainrace)
+    assert len(qualifying) == 4 and "qualification_position" not in qualifying[0]
+    with pytest.raises(ValueError):
+        enumerate_inputs("status", "spa", RACE_DATE, 44, ENTRANTS)
+
+
+@pytest.mark.parametrize("name", ["mainrace", "qualifying", "status"])
+def test_table_rows_match_live_path(models, name):
+    table = build_prediction_table(name, "silverstone", RACE_DATE, 52, ENTRANTS, grid_size=3)
+    pipeline, _ = model_service.get_model(name)
+
+    dtos = enumerate_inputs(name, "silverstone", RACE_DATE, 52, ENTRANTS, grid_size=3)
+    assert len(table) == len(dtos)
+    assert table.version == model_service.model_registry.provenance(name).version
+    for dto in dtos:
+        row = table.row(dto)
+        features = BUILDERS[name](dto)
+        assert table.features(row) == features
+        score = model_service.get_proba_df if name == "status" else model_service.predict_df
+        live = score(pd.DataFrame([features]), pipeline=pipeline).iloc[0]
+        assert table.outputs[row] == pytest.approx(live)
+    # refs matched as the feature builders read them; another spelling misses
+    dto = {**dtos[0], "driver": " hamilton ", "circuit": "silverstone "}
+    assert table.row(dto) == 0
+    assert table.row({**dto, "driver": "HAMILTON"}) is None
+    assert table.row({**dto, "circuit": "Silverstone"}) is None
+    assert table.row({**dto, "race_date": date(2024, 7, 14)}) is None
+    assert table.row({**dto, "constructor": "mclaren"}) is None
+    if name != "qualifying":
+        assert table.row({**dto, "qualification_position": 4}) is None
+        assert table.row({**dto, "rain": None}) is None
+
+
+def test_predict_routes_answer_from_table(client):
+    single = {"qualification_position": 3, "laps": 52, "constructor": "ferrari", "circuit": "silverstone",
+              "driver": "leclerc", "race_date": "2024-07-07", "rain": 1}
+    live = client.post("/main-race/predict", json=single).json()
+
+    response = client.post("/prediction-table/refresh", json=REFRESH, headers={"Ml-Admin-Key": "secret"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"mainrace", "qualifying", "status"}
+    assert response.json()["mainrace"]["rows"] == len(ENTRANTS) * config.PREDICTION_TABLE_GRID_SIZE * 2
+
+    hits = _lookups("mainrace", "hit")
+    assert client.post("/main-race/predict", json=single).json() == live
+    assert client.post("/main-race/predict", json={**single, "driver": " leclerc "}).status_code == 200
+    assert _lookups("mainrace", "hit") == hits + 2
+
+    status = {k: v for k, v in single.items() if k != "laps"}
+    quali = {k: single[k] for k in ("constructor", "circuit", "driver", "race_date")}
+    assert client.post("/status/predict", json=status).status_code == 200
+    assert client.post("/qualifying/predict", json=quali).status_code == 200
+    assert _lookups("status", "hit") >= 1 and _lookups("qualifying", "hit") >= 1
+
+    # another race: live inference
+    misses = _lookups("mainrace", "miss")
+    other = client.post("/main-race/predict", json={**single, "laps": 53})
+    assert other.status_code == 200
+    assert other.json()["predictions"][0]["features"]["laps"] == 53
+    assert _lookups("mainrace", "miss") == misses + 1
+
+
+def test_table_answers_like_live_inference(client):
+    single = {"qualification_position": 3, "laps": 52, "constructor": "ferrari", "circuit": "silverstone",
+              "driver": "leclerc", "race_date": "2024-07-07", "rain": 1}
+    requests = [
+        ("/main-race/predict", single),
+        ("/main-race/predict", {**single, "driver": " leclerc "}),
+        ("/main-race/predict", {**single, "driver": "Leclerc", "circuit": "Silverstone"}),
+        ("/status/predict", {k: v for k, v in single.items() if k != "laps"}),
+        ("/qualifying/predict", {k: single[k] for k in ("constructor", "circuit", "driver", "race_date")}),
+        ("/qualifying/predict", {"constructor": "FERRARI", "circuit": "silverstone", "driver": "hamilton",
+                                 "race_date": "2024-07-07"}),
+    ]
+    live = [client.post(path, json=dto).json() for path, dto in requests]
+
+    assert client.post("/prediction-table/refresh", json=REFRESH, headers={"Ml-Admin-Key": "secret"}).status_code == 200
+    hits = _lookups("mainrace", "hit")
+    assert [client.post(path, json=dto).json() for path, dto in requests] == live
+    # the exact spellings hit; the recased one misses and is answered live
+    assert _lookups("mainrace", "hit") == hits + 2
+
+
+def test_refresh_needs_admin_key(client, monkeypatch):
+    body = REFRESH
+    assert client.post("/prediction-table/refresh", json=body).status_code == 403
+    assert client.post("/prediction-table/refresh", json=body, headers={"Ml-Admin-Key": "nope"}).status_code == 403
+    monkeypatch.setattr(config, "PREDICTION_TABLE_ADMIN_KEY", None)
+    assert client.post("/prediction-table/refresh", json=body, headers={"Ml-Admin-Key": "secret"}).status_code == 403
+    assert client.get("/prediction-table/").json() == {}
+
+
+def test_stale_table_is_not_served(client, models):
+    client.post("/prediction-table/refresh", json=REFRESH, headers={"Ml-Admin-Key": "secret"})
+    single = {"qualification_position": 2, "laps": 52, "constructor": "mclaren", "circuit": "silverstone",
+              "driver": "bearman", "race_date": "2024-07-07"}
+
+    # a new artifact is deployed and reloaded
+    _write_model(models, "mainrace", RowPipeline(scale=10.0))
+    model_service.model_registry.reload(["mainrace"])
+
+    stale = _lookups("mainrace", "stale")
+    body = client.post("/main-race/predict", json=single).json()
+    assert body["predictions"][0]["predicted_deviation_from_median"] == 10.0 * 2 * len("bearman") + len("mclaren")
+    assert _lookups("mainrace", "stale") == stale + 1
+    snapshot = client.get("/prediction-table/").json()
+    assert snapshot["mainrace"]["stale"] is True
+    assert snapshot["status"]["stale"] is False
+
+
+def test_tables_persist_and_reload(models, tmp_path, monkeypatch):
+    path = tmp_path / "tables" / "weekend.pkl"
+    monkeypatch.setattr(config, "PREDICTION_TABLE_PATH", str(path))
+    monkeypatch.setattr(config, "PREDICTION_TABLE_CHECK_SECONDS", 0.0)
+    writer, reader = PredictionTableStore(), PredictionTableStore()
+    dto = {"driver": "hamilton", "constructor": "ferrari", "circuit": "silverstone", "race_date": RACE_DATE}
+
+    assert reader.lookup("qualifying", dto) is None
+    reader._reloader.join()
+    writer.install({"qualifying": build_prediction_table("qualifying", "silverstone", RACE_DATE, 52, ENTRANTS)})
+    assert path.exists()
+
+    # another worker's next lookup has the file re-read in the background
+    reader.lookup("qualifying", dto)
+    reader._reloader.join()
+    features, output = reader.lookup("qualifying", dto)
+    assert features == build_qualifying_features_from_dto(dto)
+    assert output == len("hamilton") + len("ferrari")
+    assert reader.snapshot()["qualifying"]["rows"] == len(ENTRANTS)
@@ -1,7 +1,128 @@
 from pathlib import Path
 import pandas as pd
+import pytest
+
+from app.preprocess import preprocess_base
+from app.preprocess.preprocess_base import load_base_join
+from app.preprocess.preprocess_general import build_driver_country_table
+from app.preprocess.preprocess_mainrace import serve_mainrace_df
+from app.preprocess.preprocess_qualifying import serve_qualifying_df
+from app.preprocess.preprocess_status import serve_status_df
 
 def _write_csv(path: Path, text: str):
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(text)
 
+
+
+# one round at silverstone: Q1 and the race, hamilton (mercedes) and leclerc (ferrari, retires on lap 1)
+JOLPICA = {
+    "round": "id,season_id,circuit_id,number,name,date,race_number,wikipedia,is_cancelled\n"
+             "1,1,1,1,British Grand Prix,2024-07-07,1,w,f\n",
+    "session": "id,round_id,number,type,date,time,scheduled_laps,point_system_id,is_cancelled\n"
+               "1,1,1,Q1,2024-07-06,14:00:00,,1,f\n"
+               "2,1,2,R,2024-07-07,14:00:00,52,1,f\n",
+    "roundentry": "id,round_id,team_driver_id,car_number\n1,1,1,44\n2,1,2,16\n",
+    "sessionentry": "id,session_id,round_entry_id,position,is_classified,status,detail,points,"
+                    "is_eligible_for_points,grid,time,fastest_lap_rank,laps_completed\n"
+                    "1,1,1,1,,,,0,t,,,,2\n"
+                    "2,1,2,2,,,,0,t,,,,2\n"
+                    "3,2,1,1,t,Finished,,25,t,2,1:22:27.059,,2\n"
+                    "4,2,2,2,f,Retired,,0,t,1,,,1\n",
+    "teamdriver": "id,team_id,driver_id,season_id,role\n1,1,1,1,permanent\n2,2,2,1,permanent\n",
+    "driver": "id,reference,forename,surname,abbreviation,nationality,country_code,permanent_car_number,date_of_birth,wikipedia\n"
+              "1,hamilton,Lewis,Hamilton,HAM,British,GBR,44,1985-01-07,w\n"
+              "2,leclerc,Charles,Leclerc,LEC,Monegasque,MCO,16,1997-10-16,w\n",
+    "team": "id,reference,name,nationality,country_code,base_team_id,wikipedia\n"
+            "1,mercedes,Mercedes,German,DEU,1,w\n2,ferrari,Ferrari,Italian,ITA,2,w\n",
+    "circuit": "id,reference,name,locality,country,country_code,latitude,longitude,altitude,wikipedia\n"
+               "1,silverstone,Silverstone,Silverstone,UK,GBR,52.07,-1.01,153,w\n",
+    "lap": "id,session_entry_id,number,position,time,average_speed,is_deleted,is_entry_fastest_lap\n"
+           "1,1,1,1,0:01:26.100,,f,f\n2,1,2,1,0:01:25.900,,f,t\n"
+           "3,2,1,2,0:01:26.500,,f,f\n4,2,2,2,0:01:26.300,,f,f\n"
+           "5,3,1,1,0:01:35.000,,f,f\n6,3,2,1,0:01:34.000,,f,f\n"
+           "7,4,1,2,0:01:36.000,,f,f\n",
+}
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    raw = tmp_path / "raw"
+    for table, text in JOLPICA.items():
+        _write_csv(raw / "jolpica-dump" / f"formula_one_{table}.csv", text)
+    _write_csv(raw / "race_weather.csv", "date,weather\n2024-07-07,Rain\n")
+    _write_csv(raw / "circuit_type.csv", "circuit,type_circuit\nsilverstone,Race circuit\n")
+    return raw
+
+
+@pytest.fixture
+def count_joins(monkeypatch):
+    calls = []
+    build = preprocess_base.build_base_join
+
+    def counting(paths):
+        calls.append(paths)
+        return build(paths)
+
+    monkeypatch.setattr(preprocess_base, "build_base_join", counting)
+    return calls
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_base_join_cached_per_input_hash(raw_dir, tmp_path, count_joins, monkeypatch, columnar):
+    if not columnar:
+        monkeypatch.setattr(preprocess_base, "pyarrow", None)
+    elif preprocess_base.pyarrow is None:
+        pytest.skip("pyarrow not installed")
+    cache = tmp_path / "cache"
+
+    joined = load_base_join(raw_dir, cache)
+    assert len(joined) == 7  # one row per lap
+    (cached,) = cache.iterdir()
+    assert cached.suffix == (".feather" if columnar else ".pkl")
+
+    pd.testing.assert_frame_equal(load_base_join(raw_dir, cache), joined)
+    pd.testing.assert_frame_equal(
+        load_base_join(raw_dir, cache, columns=["reference", "time_lap"]), joined[["reference", "time_lap"]]
+    )
+    assert len(count_joins) == 1
+
+    # another input: joined again, and the previous file replaced
+    lap_csv = raw_dir / "jolpica-dump" / "formula_one_lap.csv"
+    lap_csv.write_text(lap_csv.read_text() + "8,4,2,2,0:01:37.000,,f,f\n")
+    assert len(load_base_join(raw_dir, cache)) == 8
+    assert len(count_joins) == 2
+    assert [p.name for p in cache.iterdir()] != [cached.name] and len(list(cache.iterdir())) == 1
+
+
+def test_pipelines_share_one_join(raw_dir, tmp_path, count_joins):
+    processed = tmp_path / "processed"
+    frames = [
+        serve_mainrace_df(raw_dir, processed),
+        serve_qualifying_df(raw_dir, processed),
+        serve_status_df(raw_dir, processed),
+    ]
+    build_driver_country_table(save_to=str(tmp_path / "drivers.csv"), raw_dir=raw_dir, cache_dir=processed / "cache")
+    assert len(count_joins) == 1
+
+    # same frames as joining afresh
+    fresh = [
+        serve_mainrace_df(raw_dir, processed, use_cache=False),
+        serve_qualifying_df(raw_dir, processed, use_cache=False),
+        serve_status_df(raw_dir, processed, use_cache=False),
+    ]
+    for cached, joined in zip(frames, fresh):
+        pd.testing.assert_frame_equal(cached, joined)
+
+    mainrace, qualifying, status = frames
+    assert sorted(mainrace["driver"].unique()) == ["hamilton", "leclerc"]
+    assert mainrace["rain"].eq(1).all() and len(mainrace) == 3
+    assert mainrace.loc[mainrace["driver"] == "hamilton", "milliseconds"].iloc[0] == 4947059
+    assert len(qualifying) == 4 and (qualifying["date"] == pd.Timestamp("2024-07-06")).all()
+    assert status.set_index("driver")["is_classified"].to_dict() == {"hamilton": "t", "leclerc": "f"}
+
+    drivers = pd.read_csv(tmp_path / "drivers.csv")
+    assert drivers.to_dict("records") == [
+        {"driverRef": "hamilton", "driver_nationality": "GBR", "driver_date_of_birth": "1985-01-07", "first_race_date": "2024-07-07"},
+        {"driverRef": "leclerc", "driver_nationality": "MCO", "driver_date_of_birth": "1997-10-16", "first_race_date": "2024-07-07"},
+    ]
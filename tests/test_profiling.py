@@ -0,0 +1,89 @@
+import json
+import pstats
+
+import joblib
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.services import model_service
+
+
+class PositionPipeline:
+    """Picklable stand-in: deviation = 100 * qualification position."""
+    def predict(self, X):
+        return X["qualification_position"].to_numpy(dtype=float) * 100.0
+
+
+DTOS = [
+    {"qualification_position": 3, "laps": 52, "constructor": "ferrari", "circuit": "silverstone",
+     "driver": "hamilton", "race_date": "2024-07-07", "rain": 0},
+    {"qualification_position": 1, "laps": 52, "constructor": "mclaren", "circuit": "silverstone",
+     "driver": "leclerc", "race_date": "2024-07-07", "rain": 0},
+]
+
+
+@pytest.fixture
+def make_client(reference_index, tmp_path, monkeypatch):
+    pkl, meta = model_service.MODEL_SPECS["mainrace"]
+    joblib.dump(PositionPipeline(), tmp_path / pkl)
+    (tmp_path / meta).write_text(json.dumps({"git_commit": "abc"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry())
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path / "profiles"))
+    from app import main
+
+    def make(app_mode="dev"):
+        monkeypatch.setattr(main, "APP_MODE", app_mode)
+        return TestClient(main.create_app())
+    return make
+
+
+def _server_timing(response) -> dict:
+    entries = {}
+    for part in response.headers["server-timing"].split(", "):
+        name, dur = part.split(";dur=")
+        entries[name] = float(dur)
+    return entries
+
+
+def test_timing_header_lists_stages(make_client):
+    client = make_client()
+    assert "server-timing" not in client.post("/main-race/predict/batch", json=DTOS).headers
+
+    response = client.post("/main-race/predict/batch", json=DTOS, headers={"Ml-Profile": "timing"})
+
+    assert response.status_code == 200
+    timing = _server_timing(response)
+    assert {"validation", "features", "dataframe", "predict", "rank", "serialize", "endpoint", "response", "total"} <= set(timing)
+    assert timing["total"] >= timing["endpoint"] >= timing["predict"]
+    assert "ml-profile-id" not in response.headers
+
+
+def test_cprofile_dump_includes_executor_work(make_client, tmp_path):
+    client = make_client()
+
+    response = client.post("/main-race/predict", json=DTOS[0], headers={"Ml-Profile": "cprofile"})
+
+    assert response.status_code == 200
+    assert "predict" in _server_timing(response)
+    path = tmp_path / "profiles" / f"{response.headers['ml-profile-id']}.prof"
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    # the pipeline runs on an inference executor thread, not the event loop
+    assert "predict" in functions and "build_main_race_features_from_dto" in functions
+
+
+def test_profiling_gated_by_app_mode_and_admin_key(make_client, monkeypatch):
+    headers = {"Ml-Profile": "timing"}
+    assert "server-timing" not in make_client("prod").post("/main-race/predict/batch", json=DTOS, headers=headers).headers
+
+    monkeypatch.setattr(config, "PROFILING_APP_MODES", ("dev", "prod"))
+    # prod needs an admin key configured
+    assert "server-timing" not in make_client("prod").post("/main-race/predict/batch", json=DTOS, headers=headers).headers
+
+    monkeypatch.setattr(config, "PROFILING_ADMIN_KEY", "secret")
+    client = make_client("prod")
+    wrong = client.post("/main-race/predict/batch", json=DTOS, headers={**headers, "Ml-Admin-Key": "nope"})
+    right = client.post("/main-race/predict/batch", json=DTOS, headers={**headers, "Ml-Admin-Key": "secret"})
+    assert "server-timing" not in wrong.headers
+    assert "predict" in _server_timing(right)
@@ -0,0 +1,138 @@
+import json
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.services import model_service
+from app.services.race_simulator import ResidualNoise, noise_for, residuals_file, save_residuals, simulate_race
+
+
+class PositionPipeline:
+    """Picklable stand-in: deviation = 100 * qualification position, DNF odds rise with it."""
+    def predict(self, X):
+        return X["qualification_position"].to_numpy(dtype=float) * 100.0
+
+    def predict_proba(self, X):
+        p = X["qualification_position"].to_numpy(dtype=float) / 40.0
+        return np.column_stack([1.0 - p, p])
+
+
+def test_without_noise_or_retirements_follows_point_estimates():
+    simulation = simulate_race([300.0, 100.0, 200.0], [0.0, 0.0, 0.0], ResidualNoise(std=0.0), 500)
+
+    np.testing.assert_array_equal(simulation.position_probabilities, [[0, 0, 1], [1, 0, 0], [0, 1, 0]])
+    np.testing.assert_array_equal(simulation.expected_position, [3.0, 1.0, 2.0])
+    np.testing.assert_array_equal(simulation.top(1), [0.0, 1.0, 0.0])
+    np.testing.assert_array_equal(simulation.dnf_rate, [0.0, 0.0, 0.0])
+
+
+def test_distributions_are_consistent():
+    rng = np.random.default_rng(0)
+    deviation = np.arange(20) * 50.0
+    dnf = np.full(20, 0.1)
+    noise = ResidualNoise.from_residuals(rng.standard_t(3, 5000) * 200.0)
+
+    simulation = simulate_race(deviation, dnf, noise, 20000, np.random.default_rng(1))
+
+    probabilities = simulation.position_probabilities
+    np.testing.assert_allclose(probabilities.sum(axis=0), 1.0)
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+    np.testing.assert_allclose(simulation.dnf_rate, 0.1, atol=0.01)
+    # faster cars win more often, and a retirement always ranks behind the finishers
+    assert np.all(np.diff(simulation.top(1)) <= 0.01)
+    assert simulation.top(1)[0] > simulation.top(1)[-1]
+    assert probabilities[:, -2:].sum() == pytest.approx(2.0, abs=0.05)  # mostly retirements
+    # the same seed gives the same distribution
+    again = simulate_race(deviation, dnf, noise, 20000, np.random.default_rng(1))
+    np.testing.assert_array_equal(again.position_probabilities, probabilities)
+
+
+def test_certain_retirement_finishes_last():
+    simulation = simulate_race([100.0, 200.0, 300.0], [1.0, 0.0, 0.0], ResidualNoise(std=50.0), 1000)
+
+    assert simulation.position_probabilities[0, 2] == 1.0
+    assert simulation.dnf_rate[0] == 1.0
+
+
+def test_quantile_noise_reproduces_residuals():
+    residuals = np.random.default_rng(0).exponential(1000.0, 20000) - 1000.0  # skewed
+    noise = ResidualNoise.from_residuals(residuals, source="test")
+
+    draws = noise.sample(np.random.default_rng(1), (200000,))
+
+    assert np.mean(draws) == pytest.approx(0.0, abs=30.0)
+    # 1% quantile steps: the top step interpolates towards the sample maximum
+    assert np.std(draws) == pytest.approx(noise.std, rel=0.1)
+    assert np.median(draws) == pytest.approx(np.median(residuals), abs=30.0)
+
+
+@pytest.fixture
+def client(reference_index, tmp_path, monkeypatch):
+    for name in ("mainrace", "status"):
+        pkl, meta = model_service.MODEL_SPECS[name]
+        joblib.dump(PositionPipeline(), tmp_path / pkl)
+        (tmp_path / meta).write_text(json.dumps({"git_commit": name}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry())
+    from app.main import create_app
+    return TestClient(create_app())
+
+
+GRID = {
+    "race": {"circuit": "silverstone", "race_date": "2024-07-07", "laps": 52, "rain": 0},
+    "entries": [
+        {"driver": "hamilton", "constructor": "ferrari", "qualification_position": 2},
+        {"driver": "leclerc", "constructor": "mclaren", "qualification_position": 1},
+        {"driver": "bearman", "constructor": "ferrari", "qualification_position": 3},
+    ],
+}
+
+
+def test_simulate_route(client, tmp_path):
+    noise = ResidualNoise.from_residuals(np.random.default_rng(0).normal(0.0, 80.0, 5000), source="test")
+    save_residuals(noise, residuals_file("mainrace"), artifact=tmp_path / model_service.MODEL_SPECS["mainrace"][0])
+
+    response = client.post("/main-race/simulate", json={**GRID, "simulations": 5000, "seed": 7})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["simulation"] == {"simulations": 5000, "seed": 7, "noise": {"source": "test", "std": noise.std}}
+    items = body["predictions"]
+    assert [item["entry"] for item in items] == GRID["entries"]
+    assert [item["predicted_final_position"] for item in items] == [2, 1, 3]
+    assert [item["dnf_percentage"] for item in items] == [5.0, 2.5, 7.5]
+    assert sum(item["win_probability"] for item in items) == pytest.approx(1.0)
+    assert max(items, key=lambda item: item["win_probability"])["entry"]["driver"] == "leclerc"
+    for item in items:
+        assert len(item["position_probabilities"]) == 3
+        assert item["top10_probability"] == pytest.approx(1.0)
+        assert item["expected_position"] == pytest.approx(
+            sum((i + 1) * p for i, p in enumerate(item["position_probabilities"]))
+        )
+    # same seed, same answer
+    assert client.post("/main-race/simulate", json={**GRID, "simulations": 5000, "seed": 7}).json() == body
+
+
+def test_simulate_needs_a_noise_model(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SIMULATION_RESIDUAL_STD", None)
+    # recorded for another artifact: not used
+    other = tmp_path / "other.pkl"
+    other.write_bytes(b"other")
+    save_residuals(ResidualNoise(std=1.0), residuals_file("mainrace"), artifact=other)
+
+    response = client.post("/main-race/simulate", json=GRID)
+    assert response.status_code == 503
+    assert "SIMULATION_RESIDUAL_STD" in response.json()["detail"]
+
+    monkeypatch.setattr(config, "SIMULATION_RESIDUAL_STD", 150.0)
+    assert noise_for("mainrace").source == "SIMULATION_RESIDUAL_STD"
+    body = client.post("/main-race/simulate", json={**GRID, "simulations": 100}).json()
+    assert body["simulation"]["noise"] == {"source": "SIMULATION_RESIDUAL_STD", "std": 150.0}
+
+    monkeypatch.setattr(config, "SIMULATION_MAX_RUNS", 1000)
+    assert client.post("/main-race/simulate", json={**GRID, "simulations": 1001}).status_code == 422
+    # (simulations, cars) arrays: the grid is capped too
+    assert client.post("/main-race/simulate", json={**GRID, "entries": GRID["entries"] * 9}).status_code == 422
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from app.services import reference_data
+from app.services.feature_builder import build_main_race_features_from_dto, build_status_features_from_dto
+from app.services.reference_data import ReferenceIndex
+
+
+def test_reference_index_lookups_are_case_insensitive(data_dir):
+    index = ReferenceIndex.from_dir(data_dir)
+
+    assert index.driver("HAMILTON")["driver_nationality"] == "GBR"
+    assert index.driver("charles leclerc")["driver_nationality"] == "MCO"
+    assert index.driver("unknown") is None
+    assert index.constructor("Ferrari")["constructor_nationality"] == "ITA"
+    assert index.circuit("silverstone")["type_circuit"] == "Race circuit"
+    assert index.is_pickable("hamilton", "FERRARI", "Silverstone", "mainrace")
+    assert not index.is_pickable("hamilton", "ferrari", "spa", "status")
+    assert isinstance(index.pickable["status"]["drivers"], frozenset)
+
+
+def test_feature_builders_do_no_csv_io(reference_index, monkeypatch):
+    monkeypatch.setattr(reference_data, "_load_csv", lambda p: pytest.fail(f"unexpected read of {p}"))
+
+    dto = {"qualification_position": 3, "laps": 52, "constructor": "mclaren", "circuit": "silverstone",
+           "driver": "hamilton", "race_date": "2023-07-09", "rain": 1}
+    features = build_main_race_features_from_dto(dto)
+
+    race_date = pd.Timestamp("2023-07-09")
+    assert features["driver_home"] == 1
+    assert features["constructor_home"] == 1
+    assert features["type_circuit"] == "Race circuit"
+    assert features["age_at_gp_in_days"] == (race_date - pd.Timestamp("1985-01-07")).days
+    assert features["days_since_first_race"] == (race_date - pd.Timestamp("2007-03-18")).days
+
+    with pytest.raises(ValueError):
+        build_status_features_from_dto({**dto, "circuit": "spa"})
@@ -0,0 +1,76 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.dummy import DummyClassifier, DummyRegressor
+
+from app.services import model_service
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DTO = {"qualification_position": 2, "laps": 52, "constructor": "ferrari", "circuit": "silverstone",
+       "driver": "hamilton", "race_date": "2024-07-07", "rain": 0}
+
+
+def _get(url: str) -> tuple[int, dict]:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.status, json.loads(response.read())
+
+
+@pytest.mark.skipif(not Path("/proc/self/task").exists() or not hasattr(os, "fork"), reason="forking server, Linux /proc")
+def test_forked_workers_serve_preloaded_models(data_dir):
+    X, y = pd.DataFrame({"x": [0.0, 1.0]}), np.array([0, 1])
+    for name, (pkl, meta) in model_service.MODEL_SPECS.items():
+        model = DummyClassifier().fit(X, y) if name == "status" else DummyRegressor().fit(X, y)
+        joblib.dump(model, data_dir / pkl)
+        (data_dir / meta).write_text(json.dumps({"git_commit": "abc"}))
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = {**os.environ, "MODEL_DIR": str(data_dir), "APP_STARTUP_MODE": "prestart", "PORT": str(port),
+           "SERVER_WORKERS": "2", "SERVER_PRELOAD": "true", "METRICS_FLUSH_SECONDS": "0.1"}
+    server = subprocess.Popen([sys.executable, "-m", "app.main"], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            assert server.poll() is None and time.monotonic() < deadline
+            try:
+                status, ready = _get(f"{base}/ready")
+                break
+            except OSError:
+                time.sleep(0.2)
+
+        assert status == 200 and ready["mode"] == "preloaded"
+        workers = Path(f"/proc/{server.pid}/task/{server.pid}/children").read_text().split()
+        assert len(workers) == 2
+        request = urllib.request.Request(f"{base}/main-race/predict/batch", data=json.dumps([DTO]).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            assert response.status == 200
+
+        # /metrics reports both workers, whichever answers
+        route = 'f1_http_requests_total{route="/main-race/predict/batch",method="POST",status="200"} 1'
+        while True:
+            with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+                text = response.read().decode()
+            workers_seen = {line.split('worker="')[1].split('"')[0] for line in text.splitlines()
+                            if line.startswith("f1_model_load_seconds{model=\"mainrace\"")}
+            if route in text.splitlines() and len(workers_seen) == 2:
+                break
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(30) == 0
@@ -0,0 +1,115 @@
+import json
+import subprocess
+import sys
+import threading
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.services import model_service, startup
+
+
+class PositionPipeline:
+    """Picklable stand-in: deviation = 100 * qualification position, DNF odds rise with it."""
+    def predict(self, X):
+        return X["qualification_position"].to_numpy(dtype=float) * 100.0
+
+    def predict_proba(self, X):
+        p = X["qualification_position"].to_numpy(dtype=float) / 40.0
+        return np.column_stack([1.0 - p, p])
+
+
+DTO = {"qualification_position": 2, "laps": 52, "constructor": "ferrari", "circuit": "silverstone",
+       "driver": "hamilton", "race_date": "2024-07-07", "rain": 0}
+
+
+@pytest.fixture
+def app_factory(reference_index, tmp_path, monkeypatch):
+    for name in model_service.MODEL_SPECS:
+        pkl, meta = model_service.MODEL_SPECS[name]
+        joblib.dump(PositionPipeline(), tmp_path / pkl)
+        (tmp_path / meta).write_text(json.dumps({"git_commit": "abc"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry())
+    monkeypatch.setattr(startup, "startup_state", startup.StartupState())
+    # the index comes from the reference_index fixture
+    monkeypatch.setattr(startup, "load_reference_index", lambda: reference_index)
+    monkeypatch.setattr(startup, "warm_options_cache", lambda: 0)
+    monkeypatch.setattr(config, "APP_STARTUP_MODE", "background")
+    from app.main import create_app
+    return create_app
+
+
+def test_background_startup_serves_health_then_turns_ready(app_factory, monkeypatch):
+    pulled = threading.Event()
+    monkeypatch.setattr(startup, "dvc_pull_with_gcp_key", lambda: pulled.wait(5))
+
+    with TestClient(app_factory()) as client:
+        assert client.get("/health").status_code == 200
+        not_ready = client.get("/ready")
+        assert not_ready.status_code == 503
+        assert not_ready.json()["status"] == "starting"
+        blocked = client.post("/main-race/predict/batch", json=[DTO])
+        assert blocked.status_code == 503
+        assert "Retry-After" in blocked.headers
+
+        pulled.set()
+        startup.startup_state.thread.join(5)
+
+        ready = client.get("/ready")
+        assert ready.status_code == 200
+        assert ready.json()["models"] == {name: True for name in model_service.MODEL_SPECS}
+        assert set(ready.json()["timings_s"]) == {"sync", "models", "reference", "options"}
+        assert client.post("/main-race/predict/batch", json=[DTO]).status_code == 200
+
+
+def test_failed_background_startup_is_reported(app_factory, monkeypatch):
+    def broken_pull():
+        raise RuntimeError("dvc pull failed")
+
+    monkeypatch.setattr(startup, "dvc_pull_with_gcp_key", broken_pull)
+
+    with TestClient(app_factory()) as client:
+        startup.startup_state.thread.join(5)
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert "dvc pull failed" in response.json()["error"]
+
+
+def test_prestart_mode_loads_without_pulling(app_factory, monkeypatch):
+    monkeypatch.setattr(config, "APP_STARTUP_MODE", "prestart")
+    monkeypatch.setattr(startup, "dvc_pull_with_gcp_key", lambda: pytest.fail("pulled in prestart mode"))
+
+    with TestClient(app_factory()) as client:
+        assert client.get("/ready").status_code == 200
+
+
+def test_importing_app_does_not_load_sklearn():
+    code = "import sys, app.main; print(sorted(m for m in ('sklearn', 'scipy') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == "[]"
+
+
+def test_preloaded_mode_keeps_parent_startup(app_factory, monkeypatch):
+    # a forked worker: the parent ran startup, the worker must not pull or load again
+    state = startup.run_startup(startup.startup_state, sync=False)
+    monkeypatch.setattr(config, "APP_STARTUP_MODE", "preloaded")
+    monkeypatch.setattr(model_service.model_registry, "load_all", lambda: pytest.fail("loaded again"))
+    monkeypatch.setattr(startup, "dvc_pull_with_gcp_key", lambda: pytest.fail("pulled again"))
+
+    with TestClient(app_factory()) as client:
+        ready = client.get("/ready")
+
+    assert ready.status_code == 200
+    assert ready.json()["mode"] == "preloaded"
+    assert set(ready.json()["timings_s"]) == set(state.timings)
+
+
+def test_preloaded_mode_needs_completed_startup():
+    with pytest.raises(RuntimeError):
+        startup.start("preloaded", startup.StartupState())
@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routers import predict_mainrace
+from app.api.streaming import ndjson_lines, stream_predictions
+from app.core import config
+from app.services import model_service
+
+
+class PositionPipeline:
+    """Picklable stand-in: deviation = 100 * qualification position, DNF odds rise with it."""
+    def predict(self, X):
+        return X["qualification_position"].to_numpy(dtype=float) * 100.0
+
+    def predict_proba(self, X):
+        p = X["qualification_position"].to_numpy(dtype=float) / 40.0
+        return np.column_stack([1.0 - p, p])
+
+
+def _race(circuit, race_date, grid):
+    return [
+        {"qualification_position": q, "laps": 52, "constructor": constructor, "circuit": circuit,
+         "driver": driver, "race_date": race_date, "rain": 0}
+        for driver, constructor, q in grid
+    ]
+
+
+SILVERSTONE = _race("silverstone", "2024-07-07", [("hamilton", "ferrari", 3), ("leclerc", "mclaren", 1), ("rookie", "williams", 2)])
+MONACO = _race("monaco", "2024-05-26", [("leclerc", "ferrari", 2), ("hamilton", "mclaren", 1), ("bearman", "williams", 4)])
+
+
+@pytest.fixture
+def client(reference_index, tmp_path, monkeypatch):
+    for name in ("mainrace", "status"):
+        pkl, meta = model_service.MODEL_SPECS[name]
+        joblib.dump(PositionPipeline(), tmp_path / pkl)
+        (tmp_path / meta).write_text(json.dumps({"git_commit": "abc"}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry())
+    monkeypatch.setattr(config, "STREAM_CHUNK_ROWS", 2)
+    from app.main import create_app
+    return TestClient(create_app())
+
+
+def _ndjson(rows):
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+
+def _stream(client, path, rows):
+    response = client.post(path, content=_ndjson(rows), headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_mainrace_stream_ranks_races_across_chunks(client):
+    # chunks of 2: each race spans a chunk boundary
+    lines = _stream(client, "/main-race/predict/stream", SILVERSTONE + MONACO)
+
+    batch = client.post("/main-race/predict/batch", json=SILVERSTONE + MONACO).json()
+    assert lines[0] == {"model_meta": batch["model_meta"]}
+    assert lines[1:] == batch["predictions"]
+    assert [item["predicted_final_position"] for item in lines[1:]] == [3, 1, 2, 2, 1, 3]
+
+
+def test_status_stream_matches_batch(client):
+    dtos = [{k: v for k, v in d.items() if k != "laps"} for d in SILVERSTONE]
+    lines = _stream(client, "/status/predict/stream", dtos)
+
+    assert lines[1:] == client.post("/status/predict/batch", json=dtos).json()["percentages"]
+
+
+def test_stream_reports_bad_lines_and_keeps_going(client):
+    unknown = {**SILVERSTONE[0], "driver": "nobody"}
+    lines = _stream(client, "/main-race/predict/stream", [SILVERSTONE[0], "{not json", unknown, *SILVERSTONE[1:]])
+
+    errors = {line["line"]: line["error"] for line in lines if "error" in line}
+    assert set(errors) == {2, 3}
+    assert "not pickable" in errors[3]
+    items = [line for line in lines[1:] if "error" not in line]
+    assert [item["input"]["driver"] for item in items] == ["hamilton", "leclerc", "rookie"]
+    assert [item["predicted_final_position"] for item in items] == [3, 1, 2]
+
+
+def test_stream_rejects_race_that_reappears(client):
+    rows = SILVERSTONE[:2] + MONACO + SILVERSTONE[2:]
+    lines = _stream(client, "/main-race/predict/stream", rows)
+
+    assert lines[-1]["line"] == 6
+    assert "already ranked" in lines[-1]["error"]
+    ranked = {(item["input"]["circuit"], item["input"]["driver"]): item["predicted_final_position"] for item in lines[1:-1]}
+    assert ranked == {
+        ("silverstone", "hamilton"): 2, ("silverstone", "leclerc"): 1,
+        ("monaco", "leclerc"): 2, ("monaco", "hamilton"): 1, ("monaco", "bearman"): 3,
+    }
+
+
+def test_stream_rejects_oversized_lines(client, monkeypatch):
+    monkeypatch.setattr(config, "STREAM_MAX_LINE_BYTES", 400)
+    padded = json.dumps({**SILVERSTONE[1], "driver": "leclerc" + " " * 1000})
+    lines = _stream(client, "/main-race/predict/stream", [SILVERSTONE[0], padded, *SILVERSTONE[2:]])
+
+    assert [line for line in lines if "error" in line] == [{"line": 2, "error": "Line is longer than 400 bytes"}]
+    assert [item["input"]["driver"] for item in lines[1:] if "error" not in item] == ["hamilton", "rookie"]
+
+
+def test_ndjson_lines_drop_oversized_partial_lines():
+    async def body():
+        yield b'{"a": 1}\n' + b"x" * 10
+        yield b"x" * 10
+        yield b"x" * 10 + b'\n{"b": 2}\n\n'
+        yield b"y" * 30
+
+    async def collect():
+        return [pair async for pair in ndjson_lines(body(), 16)]
+
+    assert asyncio.run(collect()) == [(1, b'{"a": 1}'), (2, None), (3, b'{"b": 2}'), (5, None)]
+
+
+def test_stream_writes_error_runs_without_waiting_for_inputs():
+    consumed = []
+
+    async def body():
+        for i in range(6):
+            consumed.append(i)
+            yield b"{not json\n"
+
+    async def first_errors():
+        stream = stream_predictions(predict_mainrace._STREAM, body(), None, 2, 1024)
+        await stream.__anext__()  # model_meta
+        out = await stream.__anext__()
+        await stream.aclose()
+        return out
+
+    out = asyncio.run(first_errors())
+    assert [json.loads(line)["line"] for line in out.splitlines()] == [1, 2]
+    assert len(consumed) == 2
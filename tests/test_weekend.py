@@ -0,0 +1,151 @@
+import json
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routers import predict_weekend
+from app.core import config
+from app.services import model_service
+
+
+class DriverPacePipeline:
+    """Picklable qualifying stand-in: fixed deviation per driver."""
+    def __init__(self, pace):
+        self.pace = pace
+
+    def predict(self, X):
+        return np.array([self.pace[d] for d in X["driver"]], dtype=float)
+
+
+class PositionPipeline:
+    """Picklable stand-in: deviation = 100 * qualification position, DNF odds rise with it."""
+    def predict(self, X):
+        return X["qualification_position"].to_numpy(dtype=float) * 100.0
+
+    def predict_proba(self, X):
+        p = X["qualification_position"].to_numpy(dtype=float) / 40.0
+        return np.column_stack([1.0 - p, p])
+
+
+RACE = {"circuit": "silverstone", "race_date": "2024-07-07", "laps": 52, "rain": 1}
+ENTRIES = [
+    {"driver": "hamilton", "constructor": "ferrari"},
+    {"driver": "leclerc", "constructor": "mclaren"},
+    {"driver": "bearman", "constructor": "ferrari"},
+]
+
+
+@pytest.fixture
+def client(reference_index, tmp_path, monkeypatch):
+    pipelines = {
+        "qualifying": DriverPacePipeline({"hamilton": 30.0, "leclerc": 10.0, "bearman": 20.0}),
+        "mainrace": PositionPipeline(),
+        "status": PositionPipeline(),
+    }
+    for name, pipeline in pipelines.items():
+        pkl, meta = model_service.MODEL_SPECS[name]
+        joblib.dump(pipeline, tmp_path / pkl)
+        (tmp_path / meta).write_text(json.dumps({"git_commit": name}))
+    monkeypatch.setattr(model_service, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(model_service, "model_registry", model_service.ModelRegistry())
+    from app.main import create_app
+    return TestClient(create_app())
+
+
+def test_weekend_chains_qualifying_into_race_and_status(client):
+    response = client.post("/weekend/predict", json={"race": RACE, "entries": ENTRIES})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model_meta"] == {name: {"git_commit": name} for name in ("qualifying", "mainrace", "status")}
+    items = body["predictions"]
+    assert [item["entry"] for item in items] == ENTRIES
+    assert [item["predicted_qualifying_deviation_from_median"] for item in items] == [30.0, 10.0, 20.0]
+    assert [item["predicted_qualifying_position"] for item in items] == [3, 1, 2]
+    assert [item["predicted_deviation_from_median"] for item in items] == [300.0, 100.0, 200.0]
+    assert [item["predicted_final_position"] for item in items] == [3, 1, 2]
+    assert [item["dnf_percentage"] for item in items] == [7.5, 2.5, 5.0]
+
+
+def test_weekend_matches_three_call_flow(client):
+    quali = client.post("/qualifying/predict/batch", json=[
+        {**entry, "circuit": RACE["circuit"], "race_date": RACE["race_date"]} for entry in ENTRIES
+    ]).json()["predictions"]
+    rows = [
+        {**entry, **RACE, "qualification_position": q["predicted_final_position"]}
+        for entry, q in zip(ENTRIES, quali)
+    ]
+    race = client.post("/main-race/predict/batch", json=rows).json()["predictions"]
+    status = client.post(
+        "/status/predict/batch", json=[{k: v for k, v in row.items() if k != "laps"} for row in rows]
+    ).json()["percentages"]
+
+    body = client.post("/weekend/predict", json={"race": RACE, "entries": ENTRIES}).json()
+
+    for item, q, r, s in zip(body["predictions"], quali, race, status):
+        assert item["predicted_qualifying_position"] == q["predicted_final_position"]
+        assert {**body["race_features"], **item["features"]} == r["features"]
+        assert item["predicted_final_position"] == r["predicted_final_position"]
+        assert item["dnf_percentage"] == s["dnf_percentage"]
+
+
+LINEUP_REQUEST = {
+    "race": RACE,
+    "entries": ENTRIES,
+    "driver_prices": {"leclerc": 30.0, "bearman": 10.0, "Hamilton": 25.5},
+    "constructor_prices": {"ferrari": 30.0, "mclaren": 20.0},
+    "budget": 70.0,
+    "drivers": 2,
+    "constructors": 1,
+    "top_k": 3,
+}
+
+
+def test_lineups_route(client):
+    response = client.post("/weekend/lineups", json=LINEUP_REQUEST)
+
+    assert response.status_code == 200
+    body = response.json()
+    # grid leclerc, bearman, hamilton: finishing in that order with DNF odds 2.5 / 5 / 7.5%
+    items = body["predictions"]
+    assert [item["expected_points"] for item in items] == pytest.approx([20.375, 33.875, 25.1])
+    assert [item["price"] for item in items] == [25.5, 30.0, 10.0]
+    assert body["constructors"] == [
+        {"constructor": "ferrari", "expected_points": pytest.approx(45.475), "price": 30.0},
+        {"constructor": "mclaren", "expected_points": pytest.approx(33.875), "price": 20.0},
+    ]
+    lineups = [(sorted(lineup["drivers"]), lineup["constructors"], lineup["price"]) for lineup in body["lineups"]]
+    assert lineups == [
+        (["bearman", "leclerc"], ["ferrari"], 70.0),
+        (["bearman", "leclerc"], ["mclaren"], 60.0),
+        (["bearman", "hamilton"], ["ferrari"], 65.5),
+    ]
+    assert [lineup["expected_points"] for lineup in body["lineups"]] == pytest.approx([104.45, 92.85, 90.95])
+
+
+def test_lineups_route_rejects_bad_prices(client, monkeypatch):
+    def post(**changes):
+        return client.post("/weekend/lineups", json={**LINEUP_REQUEST, **changes})
+
+    assert post(driver_prices={"verstappen": 30.0}).status_code == 422
+    assert "multiples" in post(constructor_prices={"ferrari": 30.05}).json()["detail"]
+    assert post(driver_prices={"leclerc": 1e9}).status_code == 422
+    assert post(top_k=10**6).status_code == 422
+    assert post(budget=1e12).status_code == 422
+    monkeypatch.setattr(config, "LINEUP_MAX_BUDGET_UNITS", 700)
+    assert post().status_code == 200
+    assert "at most 70.0" in post(budget=70.1).json()["detail"]
+    monkeypatch.setattr(config, "LINEUP_MAX_TOP_K", 2)
+    assert post().status_code == 422
+    assert post(top_k=2, budget=10.0).json()["lineups"] == []
+
+
+def test_lineups_route_model_errors_are_not_client_errors(client, monkeypatch):
+    def broken(race, entries):
+        raise ValueError("Input X contains NaN")
+
+    monkeypatch.setattr(predict_weekend, "_weekend_outputs", broken)
+    with pytest.raises(ValueError, match="NaN"):
+        client.post("/weekend/lineups", json=LINEUP_REQUEST)